@@ -1,4 +1,5 @@
 #!/usr/bin/env python
+import asyncio
 import logging
 import multiprocessing
 from datetime import datetime, timedelta, timezone
@@ -44,10 +45,12 @@ def run_flows_for_month(interval_start: datetime, interval_end: datetime) -> Non
     logger.info(f"Running for {interval_start} to {interval_end}")
 
     if not settings.dry_run:
-        run_aggregate_flow_for_interval_v3(
-            network=NetworkNEM,
-            interval_start=interval_start,
-            interval_end=interval_end,
+        asyncio.run(
+            run_aggregate_flow_for_interval_v3(
+                network=NetworkNEM,
+                interval_start=interval_start,
+                interval_end=interval_end,
+            )
         )
 
 
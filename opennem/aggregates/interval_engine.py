@@ -0,0 +1,436 @@
+"""
+Single scan interval aggregation engine.
+
+Each interval the facility aggregates (at_facility_intervals in postgres), market summary and
+unit intervals (both in ClickHouse) are updated. Rather than each target joining facility_scada,
+units, facilities and a gap-filled balancing_summary for its own overlapping window, this engine
+reads the combined window of facility_scada (with unit metadata) and balancing_summary once each,
+computes energy, emissions and market value for every target in polars and writes all three.
+
+The window covers the last num_intervals, any intervals since the last stored in ClickHouse and
+any intervals marked dirty by ingest, bounded to INTERVAL_ENGINE_MAX_WINDOW. Dirty intervals older
+than that are left for run_unit_intervals_aggregate_dirty.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+import logfire
+import polars as pl
+
+from opennem import settings
+from opennem.aggregates.market_summary import (
+    MARKET_SUMMARY_SOURCE_SCHEMA,
+    _insert_market_summary_frame,
+    _prepare_market_summary_frame,
+)
+from opennem.aggregates.unit_intervals import (
+    UNIT_INTERVALS_DIRTY_LOOKBACK,
+    UNIT_INTERVALS_SOURCE_SCHEMA,
+    _insert_unit_interval_frame,
+    _prepare_unit_interval_frame,
+    run_unit_intervals_aggregate_dirty,
+)
+from opennem.aggregates.watermark import (
+    MARKET_SUMMARY_WATERMARK,
+    UNIT_INTERVALS_WATERMARK,
+    bump_watermark_version,
+    clear_dirty_intervals,
+    get_dirty_intervals,
+)
+from opennem.db.bulk_insert_csv import bulkinsert_mms_items
+from opennem.db.clickhouse import get_clickhouse_client
+from opennem.db.copy_frame import copy_query_frame
+from opennem.db.models.opennem import FacilityAggregate
+from opennem.schema.network import NetworkNEM
+from opennem.utils.dates import get_last_completed_interval_for_network
+
+logger = logging.getLogger("opennem.aggregates.interval_engine")
+
+# the most the engine reads in a single run, older dirty intervals are aggregated separately
+INTERVAL_ENGINE_MAX_WINDOW = timedelta(days=1)
+
+# balancing summary is read this far back so the first interval in the window has a previous demand
+MARKET_SUMMARY_LOOKBACK = timedelta(hours=1)
+
+# unit fueltechs that aren't aggregated
+_EXCLUDED_FUELTECHS = ("imports", "exports", "interconnector", "battery")
+
+_UNIT_INTERVALS_EXCLUDED_NETWORKS = ("OPENNEM_ROOFTOP_BACKFILL",)
+
+_SCADA_QUERY = f"""
+    SELECT
+        fs.interval,
+        fs.network_id,
+        f.code as facility_code,
+        u.code as unit_code,
+        f.network_region,
+        u.status_id,
+        u.fueltech_id,
+        ftg.code as fueltech_group_id,
+        ftg.renewable,
+        u.emissions_factor_co2,
+        fs.generated,
+        fs.energy
+    FROM
+        facility_scada fs
+    JOIN units u ON fs.facility_code = u.code
+    JOIN facilities f ON u.station_id = f.id
+    LEFT JOIN fueltech ft ON ft.code = u.fueltech_id
+    LEFT JOIN fueltech_group ftg ON ftg.code = ft.fueltech_group_id
+    WHERE
+        fs.is_forecast IS FALSE
+        AND u.fueltech_id IS NOT NULL
+        AND u.fueltech_id NOT IN {_EXCLUDED_FUELTECHS}
+        AND fs.interval >= $1
+        AND fs.interval <= $2
+"""
+
+_SCADA_SCHEMA = {
+    "interval": pl.Datetime,
+    "network_id": pl.String,
+    "facility_code": pl.String,
+    "unit_code": pl.String,
+    "network_region": pl.String,
+    "status_id": pl.String,
+    "fueltech_id": pl.String,
+    "fueltech_group_id": pl.String,
+    "renewable": pl.Boolean,
+    "emissions_factor_co2": pl.Float64,
+    "generated": pl.Float64,
+    "energy": pl.Float64,
+}
+
+_BALANCING_SUMMARY_QUERY = """
+    SELECT
+        bs.interval,
+        bs.network_id,
+        bs.network_region,
+        bs.is_forecast,
+        CAST(bs.price AS double precision) as price,
+        CAST(bs.demand AS double precision) as demand,
+        CAST(bs.demand_total AS double precision) as demand_total
+    FROM balancing_summary bs
+    WHERE
+        bs.interval >= $1
+        AND bs.interval <= $2
+"""
+
+_BALANCING_SUMMARY_SCHEMA = {
+    "interval": pl.Datetime,
+    "network_id": pl.String,
+    "network_region": pl.String,
+    "is_forecast": pl.Boolean,
+    "price": pl.Float64,
+    "demand": pl.Float64,
+    "demand_total": pl.Float64,
+}
+
+_FACILITY_AGGREGATE_UPDATE_FIELDS = [
+    "generated",
+    "energy",
+    "emissions",
+    "emissions_intensity",
+    "market_value",
+    "last_updated",
+]
+
+# only overwrite facility aggregates with a newer computation, as the per-target aggregate does
+_FACILITY_AGGREGATE_UPDATE_WHERE = "at_facility_intervals.last_updated < EXCLUDED.last_updated"
+
+
+@dataclass
+class IntervalAggregates:
+    """Frames computed for each aggregate target from one read of the source tables"""
+
+    facility_intervals: pl.DataFrame
+    unit_intervals: pl.DataFrame
+    market_summary: pl.DataFrame
+
+
+def _sum_or_null(column: str) -> pl.Expr:
+    """Sum that is null when every value is null, as sum() is in postgres"""
+    return pl.when(pl.col(column).is_not_null().any()).then(pl.col(column).sum()).otherwise(None)
+
+
+def _gapfill_locf(df: pl.DataFrame, keys: list[str], start: datetime, end: datetime, columns: list[str]) -> pl.DataFrame:
+    """
+    Fill each group in df onto a 5 minute grid from start to end and carry the last observed
+    value of columns forward, like time_bucket_gapfill with locf.
+    """
+    if df.is_empty():
+        return df
+
+    grid = pl.DataFrame({"interval": pl.datetime_range(start, end, interval="5m", closed="both", eager=True)}).with_columns(
+        pl.col("interval").cast(df.schema["interval"])
+    )
+
+    return (
+        df.select(keys)
+        .unique()
+        .join(grid, how="cross")
+        .join(df, on=["interval", *keys], how="left", join_nulls=True)
+        .sort([*keys, "interval"], nulls_last=True)
+        .with_columns(pl.col(columns).forward_fill().over(keys))
+        .select(df.columns)
+    )
+
+
+def _compute_facility_intervals(scada: pl.DataFrame, balancing: pl.DataFrame, start: datetime, end: datetime) -> pl.DataFrame:
+    """Facility aggregates for at_facility_intervals, priced from actual balancing summary"""
+    prices = (
+        balancing.filter(~pl.col("is_forecast") & (pl.col("network_region") != "SNOWY1"))
+        .group_by(pl.col("interval").dt.truncate("5m"), "network_id", "network_region")
+        .agg(pl.col("price").max())
+    )
+
+    prices = (
+        _gapfill_locf(prices, ["network_id", "network_region"], start, end, ["price"])
+        .group_by("interval", "network_region")
+        .agg(pl.col("price").max())
+    )
+
+    df = (
+        scada.filter((pl.col("interval") >= start) & (pl.col("interval") < end))
+        .with_columns(pl.col("interval").dt.truncate("5m"))
+        .join(prices, on=["interval", "network_region"], how="left")
+        .group_by("interval", "network_id", "facility_code", "unit_code", "fueltech_id", "network_region", "status_id")
+        .agg(
+            _sum_or_null("generated").alias("generated"),
+            _sum_or_null("energy").alias("energy"),
+            (pl.col("emissions_factor_co2") * pl.col("energy")).sum().alias("emissions"),
+            pl.col("price").max(),
+        )
+    )
+
+    has_energy = pl.col("energy") > 0
+
+    return df.select(
+        "interval",
+        "network_id",
+        "facility_code",
+        "unit_code",
+        pl.col("fueltech_id").alias("fueltech_code"),
+        "network_region",
+        "status_id",
+        pl.col("generated").round(4),
+        pl.col("energy").round(4),
+        pl.when(has_energy).then(pl.col("emissions").round(4)).otherwise(0.0).alias("emissions"),
+        pl.when(has_energy).then((pl.col("emissions") / pl.col("energy")).round(4)).otherwise(0.0).alias("emissions_intensity"),
+        pl.when(has_energy).then((pl.col("energy") * pl.col("price")).round(4)).otherwise(0.0).alias("market_value"),
+        pl.lit(datetime.now(UTC)).alias("last_updated"),
+    )
+
+
+def _compute_unit_intervals(scada: pl.DataFrame, balancing: pl.DataFrame, start: datetime, end: datetime) -> pl.DataFrame:
+    """Unit intervals for ClickHouse, with 30 minute rooftop solar gap filled onto 5 minute intervals"""
+    read_start = start - UNIT_INTERVALS_DIRTY_LOOKBACK
+    unit_keys = ["network_id", "network_region", "facility_code", "unit_code", "status_id", "fueltech_id"]
+
+    prices = balancing.group_by(pl.col("interval").dt.truncate("5m"), "network_id", "network_region").agg(pl.col("price").mean())
+
+    prices = (
+        _gapfill_locf(prices, ["network_id", "network_region"], read_start, end, ["price"])
+        .group_by("interval", "network_region")
+        .agg(pl.col("price").mean())
+    )
+
+    scada = scada.with_columns(pl.col("interval").dt.truncate("5m"))
+
+    facility_data = (
+        scada.filter(
+            (pl.col("fueltech_id") != "solar_rooftop")
+            & pl.col("fueltech_group_id").is_not_null()
+            & (pl.col("interval") >= start)
+            & (pl.col("interval") < end)
+        )
+        .group_by("interval", *unit_keys, "fueltech_group_id", "renewable")
+        .agg(
+            _sum_or_null("generated").round(4).alias("generated"),
+            _sum_or_null("energy").round(4).alias("energy"),
+            pl.col("emissions_factor_co2").first(),
+        )
+    )
+
+    solar_data = (
+        scada.filter(pl.col("fueltech_id") == "solar_rooftop")
+        .group_by("interval", *unit_keys)
+        .agg(
+            pl.col("generated").sum().round(4).alias("generated"),
+            (pl.col("energy").sum() / 6).round(4).alias("energy"),
+            pl.col("emissions_factor_co2").first(),
+        )
+    )
+
+    solar_data = _gapfill_locf(
+        solar_data, unit_keys, read_start, end, ["generated", "energy", "emissions_factor_co2"]
+    ).with_columns(
+        pl.lit("solar").alias("fueltech_group_id"),
+        pl.lit(True).alias("renewable"),
+    )
+
+    df = (
+        pl.concat([facility_data, solar_data.select(facility_data.columns)])
+        .filter(
+            (pl.col("interval") >= start)
+            & (pl.col("interval") < end)
+            & ~pl.col("network_id").is_in(_UNIT_INTERVALS_EXCLUDED_NETWORKS)
+        )
+        .join(prices, on=["interval", "network_region"], how="left")
+    )
+
+    has_energy = pl.col("energy") > 0
+
+    return df.select(
+        *[i for i in UNIT_INTERVALS_SOURCE_SCHEMA if i not in ("emissions", "emission_factor", "market_value")],
+        pl.when(has_energy)
+        .then((pl.col("emissions_factor_co2") * pl.col("energy")).round(4).fill_null(0.0))
+        .otherwise(0.0)
+        .alias("emissions"),
+        pl.when(has_energy).then(pl.col("emissions_factor_co2").round(4).fill_null(0.0)).otherwise(0.0).alias("emission_factor"),
+        pl.when(has_energy).then((pl.col("energy") * pl.col("price")).round(4)).otherwise(0.0).alias("market_value"),
+    ).sort("interval", "network_id", "network_region", "facility_code", "unit_code")
+
+
+def _compute_market_summary(balancing: pl.DataFrame, start: datetime, end: datetime) -> pl.DataFrame:
+    """Market summary rows that have a previous interval to average demand energy over"""
+    region_keys = ["network_id", "network_region"]
+
+    return (
+        balancing.filter(~pl.col("is_forecast"))
+        .sort("interval")
+        .with_columns(
+            pl.col("demand").shift(1).over(region_keys).alias("prev_demand"),
+            pl.col("demand_total").shift(1).over(region_keys).alias("prev_demand_total"),
+        )
+        .filter(
+            (pl.col("interval") >= start)
+            & (pl.col("interval") < end)
+            & pl.col("prev_demand").is_not_null()
+            & pl.col("prev_demand_total").is_not_null()
+        )
+        .select(list(MARKET_SUMMARY_SOURCE_SCHEMA))
+    )
+
+
+def compute_interval_aggregates(
+    scada: pl.DataFrame, balancing: pl.DataFrame, start: datetime, end: datetime
+) -> IntervalAggregates:
+    """
+    Compute every aggregate target for intervals from start up to end from one read of the
+    source tables.
+
+    Args:
+        scada: facility_scada with unit metadata from UNIT_INTERVALS_DIRTY_LOOKBACK before start to end
+        balancing: balancing_summary from MARKET_SUMMARY_LOOKBACK before start to end
+        start: first interval to aggregate
+        end: end of the window, exclusive
+
+    Returns:
+        IntervalAggregates: frames ready for each target
+    """
+    return IntervalAggregates(
+        facility_intervals=_compute_facility_intervals(scada, balancing, start, end),
+        unit_intervals=_prepare_unit_interval_frame(_compute_unit_intervals(scada, balancing, start, end)),
+        market_summary=_prepare_market_summary_frame(_compute_market_summary(balancing, start, end)),
+    )
+
+
+def _get_clickhouse_max_intervals() -> tuple[datetime | None, datetime | None]:
+    """Last interval stored in market_summary and unit_intervals"""
+    client = get_clickhouse_client()
+
+    market_summary_max = client.execute("SELECT MAX(interval) FROM market_summary FINAL")[0][0]
+    unit_intervals_max = client.execute("SELECT MAX(interval) FROM unit_intervals FINAL")[0][0]
+
+    return market_summary_max, unit_intervals_max
+
+
+def _insert_clickhouse_aggregates(aggregates: IntervalAggregates) -> tuple[int, int]:
+    client = get_clickhouse_client()
+
+    num_market = _insert_market_summary_frame(client, aggregates.market_summary)
+    num_unit = _insert_unit_interval_frame(client, aggregates.unit_intervals)
+
+    return num_market, num_unit
+
+
+@logfire.instrument("run_interval_aggregates")
+async def run_interval_aggregates(num_intervals: int = 3) -> IntervalAggregates:
+    """
+    Update facility aggregates, market summary and unit intervals from a single read of
+    facility_scada and balancing_summary.
+
+    Args:
+        num_intervals: number of trailing intervals always re-aggregated
+
+    Returns:
+        IntervalAggregates: the frames written to each target
+    """
+    touched_before = time.time()
+
+    end = get_last_completed_interval_for_network(network=NetworkNEM) + timedelta(minutes=5)
+    start = end - timedelta(minutes=num_intervals * 5)
+    min_start = end - INTERVAL_ENGINE_MAX_WINDOW
+
+    for max_interval in await asyncio.to_thread(_get_clickhouse_max_intervals):
+        if max_interval:
+            start = min(start, max_interval.replace(tzinfo=None) + timedelta(minutes=5))
+
+    dirty_intervals = await get_dirty_intervals(touched_before) if settings.unit_intervals_incremental else {}
+
+    for intervals in dirty_intervals.values():
+        in_window = [i for i in intervals if min_start <= i < end]
+
+        if in_window:
+            start = min(start, in_window[0])
+
+    start = max(start, min_start)
+
+    with logfire.span("interval_engine_read"):
+        scada, balancing = await asyncio.gather(
+            copy_query_frame(_SCADA_QUERY, _SCADA_SCHEMA, start - UNIT_INTERVALS_DIRTY_LOOKBACK, end),
+            copy_query_frame(_BALANCING_SUMMARY_QUERY, _BALANCING_SUMMARY_SCHEMA, start - MARKET_SUMMARY_LOOKBACK, end),
+        )
+
+    aggregates = await asyncio.to_thread(compute_interval_aggregates, scada, balancing, start, end)
+
+    with logfire.span("interval_engine_write"):
+        num_facility, (num_market, num_unit) = await asyncio.gather(
+            bulkinsert_mms_items(
+                FacilityAggregate,
+                aggregates.facility_intervals.to_pandas(),
+                update_fields=_FACILITY_AGGREGATE_UPDATE_FIELDS,
+                update_where=_FACILITY_AGGREGATE_UPDATE_WHERE,
+            ),
+            asyncio.to_thread(_insert_clickhouse_aggregates, aggregates),
+        )
+
+    if num_market:
+        await bump_watermark_version(MARKET_SUMMARY_WATERMARK, start, NetworkNEM)
+
+    if num_unit:
+        await bump_watermark_version(UNIT_INTERVALS_WATERMARK, start, NetworkNEM)
+
+    # only clear networks with every dirty interval inside the window, the rest are re-aggregated
+    # on their own ranges
+    dirty_remaining = False
+
+    for network_id, intervals in dirty_intervals.items():
+        if intervals[0] >= start and intervals[-1] < end:
+            await clear_dirty_intervals(network_id, touched_before)
+        else:
+            dirty_remaining = True
+
+    if dirty_remaining:
+        await run_unit_intervals_aggregate_dirty(touched_before)
+
+    logger.info(
+        f"Aggregated {start} to {end} from {len(scada)} scada and {len(balancing)} balancing rows: "
+        f"{num_facility} facility intervals, {num_unit} unit intervals, {num_market} market summary"
+    )
+
+    return aggregates
@@ -10,9 +10,11 @@ from collections.abc import Sequence
 from datetime import datetime, timedelta
 
 import polars as pl
+from clickhouse_driver import Client
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from opennem.aggregates.watermark import MARKET_SUMMARY_WATERMARK, bump_watermark_version
 from opennem.db import get_write_session
 from opennem.db.clickhouse import (
     create_table_if_not_exists,
@@ -22,15 +24,40 @@ from opennem.db.clickhouse import (
 from opennem.db.clickhouse_schema import (
     MARKET_SUMMARY_TABLE_SCHEMA,
 )
-
-# from opennem.db.clickhouse_views import (
-# MARKET_SUMMARY_DAILY_MV_TABLE_SCHEMA,
-# )
+from opennem.db.clickhouse_views import MARKET_SUMMARY_MONTHLY_ROLLUP, rebuild_rollup_months
 from opennem.schema.network import NetworkNEM
 from opennem.utils.dates import get_last_completed_interval_for_network
 
 logger = logging.getLogger("opennem.aggregates.market_summary")
 
+# monthly rollups of market_summary routed to by the v4 market query builder, rebuilt for closed
+# months by the daily rollup task and after a backlog run
+ROLLUP_TABLES = [
+    MARKET_SUMMARY_MONTHLY_ROLLUP,
+]
+
+# columns returned by the market summary query
+MARKET_SUMMARY_SOURCE_SCHEMA = {
+    "interval": pl.Datetime,
+    "network_id": pl.String,
+    "network_region": pl.String,
+    "price": pl.Float64,
+    "demand": pl.Float64,
+    "demand_total": pl.Float64,
+    "prev_demand": pl.Float64,
+    "prev_demand_total": pl.Float64,
+}
+
+_MARKET_SUMMARY_INSERT_QUERY = """
+    INSERT INTO market_summary
+    (
+        interval, network_id, network_region, price, demand, demand_total,
+        demand_energy, demand_total_energy, demand_market_value,
+        demand_total_market_value, version
+    )
+    VALUES
+"""
+
 
 async def _get_market_summary_data(
     session: AsyncSession, start_time: datetime, end_time: datetime
@@ -117,20 +144,22 @@ def _prepare_market_summary_data(
         return []
 
     # Convert records to polars DataFrame
-    df = pl.DataFrame(
-        records,
-        schema={
-            "interval": pl.Datetime,
-            "network_id": pl.String,
-            "network_region": pl.String,
-            "price": pl.Float64,
-            "demand": pl.Float64,
-            "demand_total": pl.Float64,
-            "prev_demand": pl.Float64,
-            "prev_demand_total": pl.Float64,
-        },
-    )
+    df = pl.DataFrame(records, schema=MARKET_SUMMARY_SOURCE_SCHEMA, orient="row")
+
+    # Convert back to list of tuples for ClickHouse insertion
+    return _prepare_market_summary_frame(df).rows()
 
+
+def _prepare_market_summary_frame(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Prepare a frame of market summary data for ClickHouse by calculating energy values.
+
+    Args:
+        df: Market summary data with MARKET_SUMMARY_SOURCE_SCHEMA columns
+
+    Returns:
+        Frame ready for ClickHouse insertion with columns in table order
+    """
     network_intervals = {
         "NEM": 5,
         "WEM": 30,
@@ -198,8 +227,22 @@ def _prepare_market_summary_data(
         ]
     )
 
-    # Convert back to list of tuples for ClickHouse insertion
-    return result_df.rows()
+    return result_df
+
+
+def _insert_market_summary_frame(client: Client, df: pl.DataFrame) -> int:
+    """Insert a prepared frame into market_summary column-wise"""
+    if df.is_empty():
+        return 0
+
+    client.execute(_MARKET_SUMMARY_INSERT_QUERY, [df.get_column(i).to_list() for i in df.columns], columnar=True)
+
+    return len(df)
+
+
+def _rebuild_market_summary_rollups(client: Client, start: datetime, end: datetime) -> None:
+    """Rebuild the monthly rollups for the closed months of market_summary written between start and end"""
+    rebuild_rollup_months(client, ROLLUP_TABLES, start, end)
 
 
 def _ensure_clickhouse_schema() -> None:
@@ -212,6 +255,11 @@ def _ensure_clickhouse_schema() -> None:
     if not table_exists(client, "market_summary"):
         create_table_if_not_exists(client, "market_summary", MARKET_SUMMARY_TABLE_SCHEMA)
 
+    for rollup in ROLLUP_TABLES:
+        if not table_exists(client, rollup.name):
+            client.execute(rollup.schema)
+            logger.info(f"Created {rollup.name}")
+
 
 def _refresh_clickhouse_schema() -> None:
     """
@@ -219,6 +267,10 @@ def _refresh_clickhouse_schema() -> None:
 
     """
     client = get_clickhouse_client()
+
+    for rollup in ROLLUP_TABLES:
+        client.execute(f"DROP TABLE IF EXISTS {rollup.name}")
+
     client.execute("DROP TABLE IF EXISTS market_summary")
 
     _ensure_clickhouse_schema()
@@ -244,6 +296,7 @@ async def process_market_summary_backlog(
     current_start = start_date
     client = get_clickhouse_client()
     _ensure_clickhouse_schema()
+    records_inserted = False
 
     while current_start < end_date:
         chunk_end = min(current_start + chunk_size, end_date)
@@ -266,11 +319,16 @@ async def process_market_summary_backlog(
                 """,
                 prepared_data,
             )
+            await bump_watermark_version(MARKET_SUMMARY_WATERMARK, current_start, NetworkNEM)
+            records_inserted = True
 
             logger.info(f"Processed {len(prepared_data)} records from {current_start} to {chunk_end}")
 
         current_start = chunk_end
 
+    if records_inserted:
+        _rebuild_market_summary_rollups(client, start_date, end_date)
+
 
 async def run_market_summary_aggregate_to_now() -> int:
     """ """
@@ -309,6 +367,8 @@ async def run_market_summary_aggregate_to_now() -> int:
         prepared_data,
     )
 
+    await bump_watermark_version(MARKET_SUMMARY_WATERMARK, date_from, NetworkNEM)
+
     logger.info(f"Processed {len(prepared_data)} records from {date_from} to {date_to}")
 
     return len(prepared_data)
@@ -340,6 +400,8 @@ async def run_market_summary_aggregate_for_last_intervals(num_intervals: int) ->
         prepared_data,
     )
 
+    await bump_watermark_version(MARKET_SUMMARY_WATERMARK, start_date, NetworkNEM)
+
     logger.info(f"Processed {len(prepared_data)} records from {start_date} to {end_date}")
 
     return len(prepared_data)
@@ -7,18 +7,19 @@ and market_value
 
 import logging
 from datetime import datetime, timedelta
-from textwrap import dedent
 
 import logfire
 import pandas as pd
-from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy.orm import Session
+from sqlalchemy import TextClause, text
 
 from opennem import settings
 from opennem.core.flow_solver import (
+    FlowSolverException,
     solve_flow_emissions_with_pandas,
+    solve_region_flows_for_interval_range,
 )
-from opennem.db import db_connect_sync
+from opennem.db import get_read_session
+from opennem.db.bulk_insert_csv import bulkinsert_mms_items
 from opennem.db.models.opennem import AggregateNetworkFlows
 from opennem.schema.network import NetworkNEM, NetworkSchema
 from opennem.utils.dates import day_series, get_last_completed_interval_for_network
@@ -34,7 +35,78 @@ class FlowsValidationError(Exception):
     pass
 
 
-def load_interconnector_intervals(
+_INTERCONNECTOR_INTERVALS_QUERY = text("""
+    select
+        fs.interval as interval,
+        u.interconnector_region_from,
+        u.interconnector_region_to,
+        coalesce(sum(fs.generated), 0) as generated,
+        coalesce(sum(fs.energy), sum(fs.generated) / 12, 0) as energy
+    from facility_scada fs
+    left join units u
+        on fs.facility_code = u.code
+    left join facilities f
+        on u.station_id = f.id
+    where
+        fs.interval >= :interval_start
+        and fs.interval <= :interval_end
+        and u.interconnector is True
+        and f.network_id = :network_id
+    group by 1, 2, 3
+    order by
+        1 asc
+""")
+
+_ENERGY_AND_EMISSIONS_QUERY = text("""
+    select
+        fs.interval as interval,
+        fs.network_id,
+        fs.network_region,
+        sum(fs.generated) as generated,
+        sum(fs.energy) as energy,
+        sum(fs.emissions) as emissions,
+        case when sum(fs.emissions) > 0
+            then sum(fs.emissions) / sum(fs.energy)
+            else 0
+        end as emissions_intensity
+    from at_facility_intervals fs
+    where
+        fs.interval >= :interval_start
+        and fs.interval <= :interval_end
+        and fs.network_id = :network_id
+        and fs.fueltech_code not in ('battery_charging')
+        and fs.generated > 0
+    group by 1, 2, 3
+    order by 1 asc
+""")
+
+
+async def _fetch_interval_frame(
+    query: TextClause, network: NetworkSchema, interval_start: datetime, interval_end: datetime, numeric_columns: list[str]
+) -> pd.DataFrame:
+    """Run an interval range query on the shared async pool and return it as a frame
+
+    Intervals are stored without a timezone in network time so the bounds are bound naive.
+    """
+    async with get_read_session() as session:
+        result = await session.execute(
+            query,
+            {
+                "interval_start": interval_start.replace(tzinfo=None),
+                "interval_end": interval_end.replace(tzinfo=None),
+                "network_id": network.code,
+            },
+        )
+        df = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+    # numeric sums come back as Decimal
+    for column in numeric_columns:
+        df[column] = pd.to_numeric(df[column], errors="coerce").astype(float)
+
+    return df
+
+
+async def load_interconnector_intervals(
     network: NetworkSchema, interval_start: datetime, interval_end: datetime | None = None
 ) -> pd.DataFrame:
     """Load interconnector flows for an interval.
@@ -51,45 +123,16 @@ def load_interconnector_intervals(
         2023-04-09 10:15:00                       VIC1                     NSW1 -261.80997 -21.817498
         2023-04-09 10:15:00                       VIC1                      SA1  412.31787  34.359822
     """
-    engine = db_connect_sync()
-
     if not interval_end:
         interval_end = interval_start
 
-    query = f"""
-        select
-            fs.interval as interval,
-            u.interconnector_region_from,
-            u.interconnector_region_to,
-            coalesce(sum(fs.generated), 0) as generated,
-            coalesce(sum(fs.energy), sum(fs.generated) / 12, 0) as energy
-        from facility_scada fs
-        left join units u
-            on fs.facility_code = u.code
-        left join facilities f
-            on u.station_id = f.id
-        where
-            fs.interval >= '{interval_start}'
-            and fs.interval <= '{interval_end}'
-            and u.interconnector is True
-            and f.network_id = '{network.code}'
-        group by 1, 2, 3
-        order by
-            1 asc;
-
-    """
-
-    logger.debug(dedent(query))
-
-    df_gen = pd.read_sql(query, con=engine, index_col=["interval"])  # type: ignore
-
-    if df_gen.empty:
-        raise FlowWorkerException("No results from load_interconnector_intervals")
-
-    # convert index to local timezone
-    # df_gen.index.tz_localize(network.get_fixed_offset(), ambiguous="infer")
-
-    df_gen.reset_index(inplace=True)
+    df_gen = await _fetch_interval_frame(
+        _INTERCONNECTOR_INTERVALS_QUERY,
+        network=network,
+        interval_start=interval_start,
+        interval_end=interval_end,
+        numeric_columns=["generated", "energy"],
+    )
 
     if df_gen.empty:
         raise FlowWorkerException("No results from load_interconnector_intervals")
@@ -97,7 +140,7 @@ def load_interconnector_intervals(
     return df_gen
 
 
-def load_energy_and_emissions_for_intervals(
+async def load_energy_and_emissions_for_intervals(
     network: NetworkSchema, interval_start: datetime, interval_end: datetime | None = None
 ) -> pd.DataFrame:
     """
@@ -134,45 +177,16 @@ def load_energy_and_emissions_for_intervals(
         2023-04-09 10:20:00        NEM           VIC1  387.120670  236.121274             0.609942
     """
 
-    engine = db_connect_sync()
-
     if not interval_end:
         interval_end = interval_start
 
-    query = f"""
-        select
-            fs.interval as interval,
-            fs.network_id,
-            fs.network_region,
-            sum(fs.generated) as generated,
-            sum(fs.energy) as energy,
-            sum(fs.emissions) as emissions,
-            case when sum(fs.emissions) > 0
-                then sum(fs.emissions) / sum(fs.energy)
-                else 0
-            end as emissions_intensity
-        from at_facility_intervals fs
-        where
-            fs.interval >= '{interval_start}'
-            and fs.interval <= '{interval_end}'
-            and fs.network_id IN ('{network.code}')
-            and fs.fueltech_code not in ('battery_charging')
-            and fs.generated > 0
-        group by 1, 2, 3
-        order by 1 asc;
-    """
-
-    logger.debug(dedent(query))
-
-    df_gen = pd.read_sql(query, con=engine, index_col=["interval"])  # type: ignore
-
-    if df_gen.empty:
-        raise FlowWorkerException("No results from load_energy_and_emissions_for_intervals")
-
-    # convert index to local timezone
-    # df_gen.index.tz_localize(network.get_fixed_offset(), ambiguous="infer")
-
-    df_gen.reset_index(inplace=True)
+    df_gen = await _fetch_interval_frame(
+        _ENERGY_AND_EMISSIONS_QUERY,
+        network=network,
+        interval_start=interval_start,
+        interval_end=interval_end,
+        numeric_columns=["generated", "energy", "emissions", "emissions_intensity"],
+    )
 
     if df_gen.empty:
         raise FlowWorkerException("No results from load_energy_and_emissions_for_intervals")
@@ -294,47 +308,33 @@ def calculate_demand_region_for_interval(energy_and_emissions: pd.DataFrame, imp
     return df_with_demand
 
 
-def persist_network_flows_and_emissions_for_interval(flow_results: pd.DataFrame, network: NetworkSchema = NetworkNEM) -> int:
-    """persists the records to at_network_flows"""
-    engine = db_connect_sync()
-    session = Session(engine)
-
-    records_to_store = flow_results.to_dict(orient="records")
-
-    for rec in records_to_store:
-        rec["network_id"] = network.code
-        rec["interval"] = rec["interval"]
-
-    # insert
-    stmt = insert(AggregateNetworkFlows).values(records_to_store)
-    stmt.bind = engine
-    stmt = stmt.on_conflict_do_update(
-        index_elements=["interval", "network_id", "network_region"],
-        set_={
-            "energy_imports": stmt.excluded.energy_imports,
-            "energy_exports": stmt.excluded.energy_exports,
-            "emissions_exports": stmt.excluded.emissions_exports,
-            "emissions_imports": stmt.excluded.emissions_imports,
-            "market_value_exports": stmt.excluded.market_value_exports,
-            "market_value_imports": stmt.excluded.market_value_imports,
-        },
-    )
+async def persist_network_flows_and_emissions_for_interval(
+    flow_results: pd.DataFrame, network: NetworkSchema = NetworkNEM
+) -> int:
+    """persists the records to at_network_flows using the COPY bulk loader"""
+    records_to_store = flow_results.assign(network_id=network.code)
 
     try:
-        session.execute(stmt)
-        session.commit()
+        inserted_records = await bulkinsert_mms_items(
+            AggregateNetworkFlows,  # type: ignore
+            records_to_store,
+            [
+                "energy_imports",
+                "energy_exports",
+                "emissions_exports",
+                "emissions_imports",
+                "market_value_exports",
+                "market_value_imports",
+            ],
+        )
     except Exception as e:
         logger.error("Error inserting records")
         raise e
-    finally:
-        session.rollback()
-        session.close()
-        engine.dispose()
 
-    return len(records_to_store)
+    return inserted_records
 
 
-def run_flows_for_last_intervals(interval_number: int, network: NetworkSchema = NetworkNEM) -> None:
+async def run_flows_for_last_intervals(interval_number: int, network: NetworkSchema = NetworkNEM) -> None:
     """ " Run flow processor for last x interval starting from now"""
 
     logger.info(f"Running flows for last {interval_number} intervals")
@@ -345,13 +345,13 @@ def run_flows_for_last_intervals(interval_number: int, network: NetworkSchema =
     if interval_number == 1:
         start_interval = end_interval
 
-    run_aggregate_flow_for_interval_v3(
+    await run_aggregate_flow_for_interval_v3(
         interval_start=start_interval, interval_end=end_interval, network=network, validate_results=False
     )
 
 
 @logfire.instrument("run_flows_for_last_days")
-def run_flows_for_last_days(days: int, network: NetworkSchema = NetworkNEM) -> None:
+async def run_flows_for_last_days(days: int, network: NetworkSchema = NetworkNEM) -> None:
     """ " Run flow processor for last x interval starting from now"""
 
     logger.info(f"Running flows for last {days}")
@@ -359,14 +359,14 @@ def run_flows_for_last_days(days: int, network: NetworkSchema = NetworkNEM) -> N
     interval_end = get_last_completed_interval_for_network(network=network)
     interval_start = interval_end - timedelta(days=days)
 
-    run_aggregate_flow_for_interval_v3(
+    await run_aggregate_flow_for_interval_v3(
         network=network,
         interval_start=interval_start,
         interval_end=interval_end,
     )
 
 
-def run_flows_by_day_for_range(
+async def run_flows_by_day_for_range(
     period_start: datetime | None = None, period_end: datetime | None = None, network: NetworkSchema = NetworkNEM
 ) -> None:
     """Run the entire archive"""
@@ -387,7 +387,7 @@ def run_flows_by_day_for_range(
         logger.debug(f"Running for {day} to {day_next}")
 
         if not settings.dry_run:
-            run_aggregate_flow_for_interval_v3(
+            await run_aggregate_flow_for_interval_v3(
                 network=NetworkNEM,
                 interval_start=day,
                 interval_end=day_next,
@@ -442,7 +442,7 @@ def validate_network_flows(flow_records: pd.DataFrame, raise_exception: bool = T
     return None
 
 
-def run_aggregate_flow_for_interval_v3(
+async def run_aggregate_flow_for_interval_v3(
     network: NetworkSchema, interval_start: datetime, interval_end: datetime | None = None, validate_results: bool = False
 ) -> int | None:
     """This method runs the aggregate for an interval and for a network using flow solver
@@ -454,7 +454,7 @@ def run_aggregate_flow_for_interval_v3(
 
     # 1. get
     try:
-        energy_and_emissions = load_energy_and_emissions_for_intervals(
+        energy_and_emissions = await load_energy_and_emissions_for_intervals(
             network=network, interval_start=interval_start, interval_end=interval_end
         )
     except Exception as e:
@@ -462,7 +462,7 @@ def run_aggregate_flow_for_interval_v3(
 
     # 2. get interconnector data and calculate region imports/exports net
     try:
-        interconnector_data = load_interconnector_intervals(
+        interconnector_data = await load_interconnector_intervals(
             network=network, interval_start=interval_start, interval_end=interval_end
         )
     except Exception as e:
@@ -479,16 +479,20 @@ def run_aggregate_flow_for_interval_v3(
         energy_and_emissions=energy_and_emissions, imports_and_export=region_imports_and_exports
     )
 
-    # 5. Solve.
-    # Replace the original solve_flow_emissions_for_interval with the new pandas-based function
-    network_flow_records = solve_flow_emissions_with_pandas(interconnector_data_net, region_net_demand)
+    # 5. Solve the whole range in one batch. Ranges with gaps in region or interconnector
+    # data fall back to the join based solver which skips the missing flows
+    try:
+        network_flow_records = solve_region_flows_for_interval_range(interconnector_data_net, region_net_demand, network=network)
+    except FlowSolverException as e:
+        logger.warning(f"Batched flow solver failed for {interval_start} => {interval_end}, using join solver: {e}")
+        network_flow_records = solve_flow_emissions_with_pandas(interconnector_data_net, region_net_demand, network=network)
 
     # 7. Validate flows - this will throw errors on bad values
     if validate_results:
         validate_network_flows(flow_records=network_flow_records)
 
     # 7. Persist to database aggregate table
-    inserted_records = persist_network_flows_and_emissions_for_interval(flow_results=network_flow_records)
+    inserted_records = await persist_network_flows_and_emissions_for_interval(flow_results=network_flow_records)
 
     logger.info(f"Inserted {inserted_records} records for interval {interval_start} and network {network.code}")
 
@@ -505,4 +509,6 @@ if __name__ == "__main__":
     #     interval_end=latest_interval - timedelta(days=15),
     # )
 
-    run_flows_for_last_days(days=1, network=NetworkNEM)
+    import asyncio
+
+    asyncio.run(run_flows_for_last_days(days=1, network=NetworkNEM))
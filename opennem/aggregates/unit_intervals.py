@@ -5,15 +5,27 @@ This module handles the aggregation of unit interval data from PostgreSQL to Cli
 It calculates energy values, emissions, and market values for each unit and stores them in ClickHouse.
 """
 
+import asyncio
 import logging
+import time
 from collections.abc import Sequence
 from datetime import datetime, timedelta
 
 import polars as pl
+from clickhouse_driver import Client
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from opennem.db import get_write_session
+from opennem import settings
+from opennem.aggregates.watermark import (
+    UNIT_INTERVALS_WATERMARK,
+    bump_watermark_version,
+    clear_dirty_intervals,
+    get_dirty_intervals,
+    group_interval_ranges,
+)
+from opennem.core.networks import network_from_network_code
+from opennem.db import get_read_session, get_write_session
 from opennem.db.clickhouse import (
     create_table_if_not_exists,
     get_clickhouse_client,
@@ -22,12 +34,16 @@ from opennem.db.clickhouse import (
 from opennem.db.clickhouse_schema import UNIT_INTERVALS_TABLE_SCHEMA, optimize_clickhouse_tables
 from opennem.db.clickhouse_views import (
     FUELTECH_INTERVALS_DAILY_VIEW,
+    FUELTECH_INTERVALS_MONTHLY_ROLLUP,
     FUELTECH_INTERVALS_VIEW,
     RENEWABLE_INTERVALS_DAILY_VIEW,
     RENEWABLE_INTERVALS_VIEW,
     UNIT_INTERVALS_DAILY_VIEW,
-    MaterializedView,
+    UNIT_INTERVALS_MONTHLY_ROLLUP,
+    backfill_clickhouse_views,
+    rebuild_rollup_months,
 )
+from opennem.db.copy_frame import copy_query_frame
 from opennem.schema.network import NetworkNEM, NetworkSchema
 from opennem.utils.dates import get_last_completed_interval_for_network
 
@@ -42,32 +58,62 @@ MATERIALIZED_VIEWS = [
     RENEWABLE_INTERVALS_DAILY_VIEW,
 ]
 
+# monthly rollups of unit_intervals, rebuilt for closed months by the daily rollup task and
+# after a backlog run
+ROLLUP_TABLES = [
+    UNIT_INTERVALS_MONTHLY_ROLLUP,
+    FUELTECH_INTERVALS_MONTHLY_ROLLUP,
+]
 
-async def _get_unit_interval_data(
-    session: AsyncSession, start_time: datetime, end_time: datetime, network: NetworkSchema | None = None
-) -> list[tuple]:
-    """
-    Get unit interval data from PostgreSQL for a given time range.
+# rooftop solar is gap filled with locf from 30 minute intervals so dirty ranges are queried
+# with this much lookback to carry the previous value forward
+UNIT_INTERVALS_DIRTY_LOOKBACK = timedelta(minutes=30)
+
+# columns returned by the unit interval query
+UNIT_INTERVALS_SOURCE_SCHEMA = {
+    "interval": pl.Datetime,
+    "network_id": pl.String,
+    "network_region": pl.String,
+    "facility_code": pl.String,
+    "unit_code": pl.String,
+    "status_id": pl.String,
+    "fueltech_id": pl.String,
+    "fueltech_group_id": pl.String,
+    "renewable": pl.Boolean,
+    "generated": pl.Float64,
+    "energy": pl.Float64,
+    "emissions": pl.Float64,
+    "emission_factor": pl.Float64,
+    "market_value": pl.Float64,
+}
+
+# number of backlog chunks fetched ahead of the chunk being inserted
+UNIT_INTERVALS_BACKLOG_PREFETCH = 1
+
+_UNIT_INTERVALS_INSERT_QUERY = """
+    INSERT INTO unit_intervals
+    (
+        interval, network_id, network_region, facility_code, unit_code,
+        status_id, fueltech_id, fueltech_group_id, renewable,
+        generated, energy, emissions, emission_factor, market_value,
+        version
+    )
+    VALUES
+"""
 
-    Args:
-        session: Database session
-        start_time: Start time for data range
-        end_time: End date for data range
-        network: Optional network filter
 
-    Returns:
-        List of tuples containing unit interval data
+def _get_unit_interval_query(network: NetworkSchema | None = None) -> str:
     """
-    # Strip timezone info
-    start_time_naive = start_time.replace(tzinfo=None)
-    end_time_naive = end_time.replace(tzinfo=None)
+    Get the unit interval query for a time range with :start_time and :end_time binds.
 
+    When a network is passed the query also takes a :network_id bind.
+    """
     network_where_clause = ""
 
     if network:
-        network_where_clause = f"AND fs.network_id = '{network.code}'"
+        network_where_clause = "AND fs.network_id = :network_id"
 
-    query = text(f"""
+    return f"""
     WITH filled_balancing_summary AS (
         SELECT
             time_bucket_gapfill('5 minutes', bs.interval) as interval,
@@ -213,12 +259,55 @@ async def _get_unit_interval_data(
         AND cd.interval < :end_time
         and cd.network_id not in ('OPENNEM_ROOFTOP_BACKFILL')
     ORDER BY 1,2,3,4,5
-    """)
+    """
+
 
-    result = await session.execute(query, {"start_time": start_time_naive, "end_time": end_time_naive})
+async def _get_unit_interval_data(
+    session: AsyncSession, start_time: datetime, end_time: datetime, network: NetworkSchema | None = None
+) -> list[tuple]:
+    """
+    Get unit interval data from PostgreSQL for a given time range.
+
+    Args:
+        session: Database session
+        start_time: Start time for data range
+        end_time: End date for data range
+        network: Optional network filter
+
+    Returns:
+        List of tuples containing unit interval data
+    """
+    # Strip timezone info
+    params = {"start_time": start_time.replace(tzinfo=None), "end_time": end_time.replace(tzinfo=None)}
+
+    if network:
+        params["network_id"] = network.code
+
+    result = await session.execute(text(_get_unit_interval_query(network)), params)
     return result.fetchall()
 
 
+async def _fetch_unit_interval_frame(
+    start_time: datetime, end_time: datetime, network: NetworkSchema | None = None
+) -> pl.DataFrame:
+    """
+    Get unit interval data from PostgreSQL for a given time range as a polars frame.
+
+    The query result is streamed out of postgres with COPY and parsed column-wise by polars
+    so no per-row python objects are created.
+    """
+    query = _get_unit_interval_query(network)
+    args: list = [start_time.replace(tzinfo=None), end_time.replace(tzinfo=None)]
+
+    for position, bind in enumerate(["start_time", "end_time", "network_id"], start=1):
+        query = query.replace(f":{bind}", f"${position}")
+
+    if network:
+        args.append(network.code)
+
+    return await copy_query_frame(query, UNIT_INTERVALS_SOURCE_SCHEMA, *args)
+
+
 def _prepare_unit_interval_data(records: Sequence[tuple]) -> list[tuple]:
     """
     Prepare unit interval data for ClickHouse by converting to the correct format.
@@ -233,26 +322,22 @@ def _prepare_unit_interval_data(records: Sequence[tuple]) -> list[tuple]:
         return []
 
     # Convert records to polars DataFrame
-    df = pl.DataFrame(
-        records,
-        schema={
-            "interval": pl.Datetime,
-            "network_id": pl.String,
-            "network_region": pl.String,
-            "facility_code": pl.String,
-            "unit_code": pl.String,
-            "status_id": pl.String,
-            "fueltech_id": pl.String,
-            "fueltech_group_id": pl.String,
-            "renewable": pl.Boolean,
-            "generated": pl.Float64,
-            "energy": pl.Float64,
-            "emissions": pl.Float64,
-            "emission_factor": pl.Float64,
-            "market_value": pl.Float64,
-        },
-    )
+    df = pl.DataFrame(records, schema=UNIT_INTERVALS_SOURCE_SCHEMA, orient="row")
+
+    # Convert back to list of tuples for ClickHouse insertion
+    return _prepare_unit_interval_frame(df).rows()
+
 
+def _prepare_unit_interval_frame(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Prepare a frame of unit interval data for ClickHouse with columns in table order.
+
+    Args:
+        df: Unit interval data with UNIT_INTERVALS_SOURCE_SCHEMA columns
+
+    Returns:
+        Frame ready for ClickHouse insertion
+    """
     # Round numeric values to 4 decimal places
     numeric_cols = ["generated", "energy", "emissions", "emission_factor", "market_value"]
     df = df.with_columns([pl.col(col).round(4) for col in numeric_cols])
@@ -299,8 +384,22 @@ def _prepare_unit_interval_data(records: Sequence[tuple]) -> list[tuple]:
         ]
     )
 
-    # Convert back to list of tuples for ClickHouse insertion
-    return result_df.rows()
+    return result_df
+
+
+def _insert_unit_interval_frame(client: Client, df: pl.DataFrame) -> int:
+    """Insert a prepared frame into unit_intervals column-wise"""
+    if df.is_empty():
+        return 0
+
+    client.execute(_UNIT_INTERVALS_INSERT_QUERY, [df.get_column(i).to_list() for i in df.columns], columnar=True)
+
+    return len(df)
+
+
+def _rebuild_unit_intervals_rollups(client: Client, start: datetime, end: datetime) -> None:
+    """Rebuild the monthly rollups for the closed months of unit_intervals written between start and end"""
+    rebuild_rollup_months(client, ROLLUP_TABLES, start, end)
 
 
 def _ensure_clickhouse_schema() -> None:
@@ -312,7 +411,7 @@ def _ensure_clickhouse_schema() -> None:
         create_table_if_not_exists(client, "unit_intervals", UNIT_INTERVALS_TABLE_SCHEMA)
         logger.info("Created unit_intervals")
 
-    for view in MATERIALIZED_VIEWS:
+    for view in [*MATERIALIZED_VIEWS, *ROLLUP_TABLES]:
         if not table_exists(client, view.name):
             client.execute(view.schema)
             logger.info(f"Created {view.name}")
@@ -330,7 +429,7 @@ def _refresh_clickhouse_schema() -> None:
     client = get_clickhouse_client()
 
     # Drop views first (in reverse order of creation to handle dependencies)
-    for view in reversed(MATERIALIZED_VIEWS):
+    for view in reversed([*MATERIALIZED_VIEWS, *ROLLUP_TABLES]):
         client.execute(f"DROP TABLE IF EXISTS {view.name}")
         logger.info(f"Dropped {view.name}")
 
@@ -341,7 +440,6 @@ def _refresh_clickhouse_schema() -> None:
 
 
 async def process_unit_intervals_backlog(
-    session: AsyncSession,
     start_date: datetime,
     end_date: datetime,
     chunk_size: timedelta = timedelta(days=7),
@@ -350,49 +448,132 @@ async def process_unit_intervals_backlog(
     """
     Process historical unit interval data in chunks.
 
+    Chunks are fetched from postgres with COPY into polars frames and inserted into ClickHouse
+    column-wise. The next chunk is fetched while the current one is being inserted.
+
     Args:
-        session: Database session
         start_date: Start date for processing
         end_date: End date for processing
         chunk_size: Size of each processing chunk
+        network: Optional network filter
     """
-    current_start = start_date
     client = get_clickhouse_client()
     _ensure_clickhouse_schema()
 
+    chunks: list[tuple[datetime, datetime]] = []
+    current_start = start_date
+
     while current_start <= end_date:
         # For the last chunk, ensure we include the full end date
         chunk_end = min(current_start + chunk_size, end_date + timedelta(minutes=5))
+        chunks.append((current_start, chunk_end))
+        current_start = chunk_end
+
+    fetch_tasks = [
+        asyncio.create_task(_fetch_unit_interval_frame(chunk_start, chunk_end, network))
+        for chunk_start, chunk_end in chunks[: UNIT_INTERVALS_BACKLOG_PREFETCH + 1]
+    ]
+
+    records_inserted = False
+
+    try:
+        for chunk_number, (chunk_start, chunk_end) in enumerate(chunks):
+            df = await fetch_tasks[chunk_number]
+
+            # queue the next fetch before inserting so postgres and clickhouse work overlap
+            next_chunk = chunk_number + UNIT_INTERVALS_BACKLOG_PREFETCH + 1
+
+            if next_chunk < len(chunks):
+                fetch_tasks.append(asyncio.create_task(_fetch_unit_interval_frame(*chunks[next_chunk], network)))
+
+            if df.is_empty():
+                continue
+
+            num_records = await asyncio.to_thread(_insert_unit_interval_frame, client, _prepare_unit_interval_frame(df))
+            records_inserted = records_inserted or num_records > 0
+
+            logger.info(f"Processed {num_records} records from {chunk_start} to {chunk_end}")
+    finally:
+        for task in fetch_tasks:
+            task.cancel()
+
+    if records_inserted:
+        await asyncio.to_thread(_rebuild_unit_intervals_rollups, client, start_date, end_date)
+        await bump_watermark_version(UNIT_INTERVALS_WATERMARK, start_date, network or NetworkNEM)
 
-        # Get and process data for this chunk
-        records = await _get_unit_interval_data(session, current_start, chunk_end, network)
-        if records:
-            prepared_data = _prepare_unit_interval_data(records)
-
-            # Batch insert into ClickHouse
-            client.execute(
-                """
-                INSERT INTO unit_intervals
-                (
-                    interval, network_id, network_region, facility_code, unit_code,
-                    status_id, fueltech_id, fueltech_group_id, renewable,
-                    generated, energy, emissions, emission_factor, market_value,
-                    version
+
+async def run_unit_intervals_aggregate_dirty(
+    touched_before: float | None = None, extra_intervals: dict[str, list[datetime]] | None = None
+) -> int:
+    """
+    Re-aggregate only the intervals marked dirty by ingest since the last run.
+
+    Dirty intervals are grouped into contiguous ranges per network and each range is
+    re-queried and re-inserted with a new version. Intervals are cleared only once they are
+    stored and only if they haven't been touched again since touched_before.
+
+    Args:
+        touched_before: unix timestamp, defaults to now
+        extra_intervals: additional intervals per network to aggregate alongside the dirty set
+
+    Returns:
+        int: Number of records processed
+    """
+    if touched_before is None:
+        touched_before = time.time()
+
+    dirty_intervals = await get_dirty_intervals(touched_before)
+
+    for network_id, intervals in (extra_intervals or {}).items():
+        dirty_intervals[network_id] = sorted(set(dirty_intervals.get(network_id, [])) | set(intervals))
+
+    if not dirty_intervals:
+        logger.info("No dirty intervals to process")
+        return 0
+
+    client = get_clickhouse_client()
+    num_records = 0
+
+    for network_id, intervals in dirty_intervals.items():
+        try:
+            network = network_from_network_code(network_id)
+        except ValueError:
+            # left dirty so the intervals are picked up if the network becomes known
+            logger.warning(f"Skipping {len(intervals)} dirty intervals on unknown network {network_id}")
+            continue
+
+        interval_size = timedelta(minutes=network.interval_size)
+        records: list[tuple] = []
+
+        async with get_read_session() as session:
+            for range_start, range_end in group_interval_ranges(intervals, interval_size=network.interval_size):
+                range_records = await _get_unit_interval_data(
+                    session, range_start - UNIT_INTERVALS_DIRTY_LOOKBACK, range_end + interval_size, network
                 )
-                VALUES
-                """,
-                prepared_data,
-            )
+                records.extend(i for i in range_records if range_start <= i[0] < range_end + interval_size)
+
+        prepared_data = _prepare_unit_interval_data(records)
 
-            logger.info(f"Processed {len(prepared_data)} records from {current_start} to {chunk_end}")
+        if prepared_data:
+            client.execute(_UNIT_INTERVALS_INSERT_QUERY, prepared_data)
+            await bump_watermark_version(UNIT_INTERVALS_WATERMARK, intervals[0], network)
 
-        current_start = chunk_end
+        await clear_dirty_intervals(network_id, touched_before)
+
+        logger.info(f"Processed {len(prepared_data)} records for {len(intervals)} dirty intervals on {network_id}")
+
+        num_records += len(prepared_data)
+
+    return num_records
 
 
 async def run_unit_intervals_aggregate_to_now() -> int:
     """
     Run the unit intervals aggregation from the last processed interval to now.
 
+    With settings.unit_intervals_incremental only intervals marked dirty by ingest are
+    re-aggregated, along with any new NEM intervals since the last processed interval.
+
     Returns:
         int: Number of records processed
     """
@@ -405,6 +586,19 @@ async def run_unit_intervals_aggregate_to_now() -> int:
     date_from = max_interval + timedelta(minutes=5)
     date_to = get_last_completed_interval_for_network(network=NetworkNEM)
 
+    if settings.unit_intervals_incremental:
+        # new intervals are normally marked by ingest, include them in case marking failed
+        new_intervals = []
+
+        if date_to - date_from <= timedelta(days=1):
+            interval = date_from
+
+            while interval <= date_to:
+                new_intervals.append(interval)
+                interval += timedelta(minutes=5)
+
+        return await run_unit_intervals_aggregate_dirty(extra_intervals={NetworkNEM.code: new_intervals})
+
     if date_from > date_to:
         logger.info("No new data to process")
         return 0
@@ -432,6 +626,8 @@ async def run_unit_intervals_aggregate_to_now() -> int:
         prepared_data,
     )
 
+    await bump_watermark_version(UNIT_INTERVALS_WATERMARK, date_from, NetworkNEM)
+
     logger.info(f"Processed {len(prepared_data)} records from {date_from} to {date_to}")
 
     return len(prepared_data)
@@ -456,34 +652,23 @@ async def run_unit_intervals_aggregate_for_last_intervals(num_intervals: int) ->
 
     client = get_clickhouse_client()
 
-    client.execute(
-        """
-        INSERT INTO unit_intervals
-        (
-            interval, network_id, network_region, facility_code, unit_code,
-            status_id, fueltech_id, fueltech_group_id, renewable,
-            generated, energy, emissions, emission_factor, market_value,
-            version
-        )
-        VALUES
-        """,
-        prepared_data,
-    )
+    client.execute(_UNIT_INTERVALS_INSERT_QUERY, prepared_data)
+
+    await bump_watermark_version(UNIT_INTERVALS_WATERMARK, start_date, NetworkNEM)
 
     logger.info(f"Processed {len(prepared_data)} records from {start_date} to {end_date}")
 
     return len(prepared_data)
 
 
-async def run_unit_intervals_aggregate_for_last_days(days: int) -> int:
+async def run_unit_intervals_aggregate_for_last_days(days: int) -> None:
     """
     Run the unit intervals aggregation for the last days.
     """
     end_date = get_last_completed_interval_for_network(network=NetworkNEM)
     start_date = end_date - timedelta(days=days)
 
-    async with get_write_session() as session:
-        await process_unit_intervals_backlog(session=session, start_date=start_date, end_date=end_date)
+    await process_unit_intervals_backlog(start_date=start_date, end_date=end_date)
 
 
 async def run_unit_intervals_backlog(start_date: datetime | None = None, network: NetworkSchema | None = None) -> None:
@@ -496,18 +681,15 @@ async def run_unit_intervals_backlog(start_date: datetime | None = None, network
     if not start_date:
         start_date = NetworkNEM.data_first_seen.replace(tzinfo=None)
 
-    # Ensure ClickHouse schema exists
     client = get_clickhouse_client()
 
     # Process the data
-    async with get_write_session() as session:
-        await process_unit_intervals_backlog(
-            session=session,
-            start_date=start_date,
-            end_date=end_date,
-            chunk_size=timedelta(days=30),
-            network=network,
-        )
+    await process_unit_intervals_backlog(
+        start_date=start_date,
+        end_date=end_date,
+        chunk_size=timedelta(days=30),
+        network=network,
+    )
 
     # Verify the data was inserted
     result = client.execute(
@@ -550,111 +732,6 @@ async def _solar_and_wind_fixes() -> None:
     )
 
 
-def _backfill_materialized_view(client: any, view: MaterializedView, start_date: datetime, end_date: datetime) -> int:
-    """
-    Backfill a single materialized view for a given date range.
-
-    Args:
-        client: ClickHouse client
-        view: MaterializedView definition
-        start_date: Start date for backfill
-        end_date: End date for backfill
-
-    Returns:
-        int: Number of records processed
-    """
-
-    # if the view backfill query has start and end parameters, use them
-    if "%(start)s" in view.backfill_query and "%(end)s" in view.backfill_query:
-        # Process month by month
-        current_date = start_date.replace(day=1)
-        while current_date <= end_date:
-            next_month = (current_date.replace(day=1) + timedelta(days=32)).replace(day=1)
-            logger.info(f"Processing month {current_date.strftime('%Y-%m')} for {view.name}")
-
-            client.execute(
-                view.backfill_query,
-                {"start": current_date, "end": next_month},
-            )
-
-            current_date = next_month
-    else:
-        logger.info(f"Processing {view.name}")
-        client.execute(view.backfill_query)
-
-    # Return count of records
-    result = client.execute(f"SELECT count() FROM {view.name}")
-    return result[0][0]
-
-
-def _get_view_by_name(view_name: str) -> MaterializedView:
-    """
-    Get a materialized view definition by its name.
-
-    Args:
-        view_name: Name of the view to find
-
-    Returns:
-        MaterializedView if found, None otherwise
-    """
-    for view in MATERIALIZED_VIEWS:
-        if view.name == view_name:
-            return view
-    raise ValueError(f"View {view_name} not found")
-
-
-def backfill_materialized_views(view: MaterializedView | str | None = None, refresh_views: bool = False) -> None:
-    """
-    Backfill materialized views from the base unit_intervals table.
-    This should be run after bulk loading data into unit_intervals if the views are empty.
-
-    Args:
-        view: Optional view to backfill. Can be either a MaterializedView instance or a view name.
-              If None, all views will be backfilled.
-
-    Raises:
-        ValueError: If a view name is provided but not found
-    """
-    client = get_clickhouse_client()
-
-    # Get date range from base table
-    result = client.execute("""
-        SELECT
-            min(interval) as min_date,
-            max(interval) as max_date
-        FROM unit_intervals
-    """)
-    start_date, end_date = result[0]
-
-    # Determine which views to process
-    views_to_process = []
-    if view is None:
-        views_to_process = MATERIALIZED_VIEWS
-    elif isinstance(view, MaterializedView):
-        views_to_process = [view]
-    elif isinstance(view, str):
-        found_view = _get_view_by_name(view)
-        if found_view is None:
-            raise ValueError(f"View {view} not found")
-        views_to_process = [found_view]
-
-    # Process each view
-    for view in views_to_process:
-        # delete and recreate the view if we are refreshing
-        if refresh_views:
-            logger.info(f"Refreshing {view.name}")
-            client.execute(f"DROP TABLE IF EXISTS {view.name}")
-            client.execute(view.schema)
-
-        record_count = _backfill_materialized_view(
-            client=client,
-            view=view,
-            start_date=start_date,
-            end_date=end_date,
-        )
-        logger.info(f"Backfill complete for {view.name}. Records: {record_count}")
-
-
 if __name__ == "__main__":
     # Run the test
     async def reset_unit_intervals():
@@ -665,8 +742,6 @@ if __name__ == "__main__":
         await optimize_clickhouse_tables()
 
         # Uncomment to backfill views:
-        backfill_materialized_views(refresh_views=True)
-
-    import asyncio
+        backfill_clickhouse_views(refresh_views=True)
 
     asyncio.run(reset_unit_intervals())
@@ -0,0 +1,190 @@
+"""
+Ingest watermarks for incremental aggregation.
+
+Controllers mark the (network, interval) pairs they write to facility_scada. Each mark is stored
+in a per-network Redis sorted set with the interval as the member and the time it was last
+touched as the score. Aggregates read the intervals touched before they started and clear only
+those once processed, so intervals touched again while an aggregate is running stay dirty.
+"""
+
+import logging
+import time
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+
+from arq import ArqRedis
+
+from opennem.schema.network import NetworkSchema
+from opennem.tasks.broker import get_redis_pool
+from opennem.utils.dates import get_last_completed_interval_for_network
+
+logger = logging.getLogger("opennem.aggregates.watermark")
+
+REDIS_KEY_PREFIX = "opennem:watermark:"
+REDIS_VERSION_KEY_PREFIX = "opennem:watermark-version:"
+
+UNIT_INTERVALS_WATERMARK = "unit_intervals"
+MARKET_SUMMARY_WATERMARK = "market_summary"
+
+WATERMARK_VERSION_LIVE = "live"
+WATERMARK_VERSION_HISTORICAL = "historical"
+
+_redis_pool: ArqRedis | None = None
+
+
+async def get_watermark_redis() -> ArqRedis:
+    global _redis_pool
+
+    if _redis_pool is None:
+        _redis_pool = await get_redis_pool()
+
+    return _redis_pool
+
+
+def _watermark_key(watermark: str, network_id: str) -> str:
+    return f"{REDIS_KEY_PREFIX}{watermark}:{network_id}"
+
+
+async def mark_intervals_dirty(
+    network_intervals: Iterable[tuple[str, datetime]], watermark: str = UNIT_INTERVALS_WATERMARK
+) -> int:
+    """
+    Mark (network_id, interval) pairs as touched for a watermark.
+
+    Intervals are stored naive in network time as they are in facility_scada. Errors are logged
+    and not raised so ingestion is never blocked on the watermark store.
+
+    Returns:
+        int: Number of distinct intervals marked
+    """
+    touched_at = time.time()
+    intervals_by_network: dict[str, dict[str, float]] = {}
+
+    for network_id, interval in network_intervals:
+        if not network_id or not interval:
+            continue
+
+        intervals_by_network.setdefault(network_id, {})[interval.replace(tzinfo=None).isoformat()] = touched_at
+
+    if not intervals_by_network:
+        return 0
+
+    try:
+        redis = await get_watermark_redis()
+
+        for network_id, intervals in intervals_by_network.items():
+            await redis.zadd(_watermark_key(watermark, network_id), intervals)
+    except Exception as e:
+        logger.error(f"Could not mark dirty intervals for {watermark}: {e}")
+        return 0
+
+    return sum(len(i) for i in intervals_by_network.values())
+
+
+async def mark_interval_range_dirty(
+    network_id: str,
+    interval_start: datetime,
+    interval_end: datetime,
+    interval_size: int = 5,
+    watermark: str = UNIT_INTERVALS_WATERMARK,
+) -> int:
+    """Mark every interval from interval_start to interval_end inclusive as touched"""
+    intervals = []
+    interval = interval_start
+
+    while interval <= interval_end:
+        intervals.append((network_id, interval))
+        interval += timedelta(minutes=interval_size)
+
+    return await mark_intervals_dirty(intervals, watermark=watermark)
+
+
+async def get_dirty_intervals(touched_before: float, watermark: str = UNIT_INTERVALS_WATERMARK) -> dict[str, list[datetime]]:
+    """
+    Get the intervals touched before a point in time for each network.
+
+    Args:
+        touched_before: unix timestamp, usually the time the aggregate run started
+
+    Returns:
+        dict of network_id to a sorted list of naive intervals
+    """
+    redis = await get_watermark_redis()
+    dirty_intervals: dict[str, list[datetime]] = {}
+    key_prefix = _watermark_key(watermark, "")
+
+    async for key in redis.scan_iter(match=f"{key_prefix}*"):
+        key = key.decode() if isinstance(key, bytes) else key
+        members = await redis.zrangebyscore(key, "-inf", touched_before)
+
+        if not members:
+            continue
+
+        dirty_intervals[key.removeprefix(key_prefix)] = sorted(
+            datetime.fromisoformat(i.decode() if isinstance(i, bytes) else i) for i in members
+        )
+
+    return dirty_intervals
+
+
+async def clear_dirty_intervals(network_id: str, touched_before: float, watermark: str = UNIT_INTERVALS_WATERMARK) -> int:
+    """Clear intervals for a network that have not been touched since touched_before"""
+    redis = await get_watermark_redis()
+
+    return await redis.zremrangebyscore(_watermark_key(watermark, network_id), "-inf", touched_before)
+
+
+def group_interval_ranges(intervals: list[datetime], interval_size: int = 5) -> list[tuple[datetime, datetime]]:
+    """Group sorted intervals into contiguous (start, end) ranges, end inclusive"""
+    ranges: list[tuple[datetime, datetime]] = []
+
+    for interval in intervals:
+        if ranges and interval - ranges[-1][1] <= timedelta(minutes=interval_size):
+            ranges[-1] = (ranges[-1][0], interval)
+        else:
+            ranges.append((interval, interval))
+
+    return ranges
+
+
+def get_network_day_start(network: NetworkSchema) -> datetime:
+    """Start of the current (open) day in naive network time"""
+    return get_last_completed_interval_for_network(network=network).replace(hour=0, minute=0)
+
+
+def _version_key(watermark: str, tier: str) -> str:
+    return f"{REDIS_VERSION_KEY_PREFIX}{watermark}:{tier}"
+
+
+async def bump_watermark_version(watermark: str, interval_start: datetime | None, network: NetworkSchema) -> None:
+    """
+    Bump the output version of an aggregate after it has written data from interval_start on.
+
+    The historical version is only bumped when interval_start is before the start of the current
+    network day. Errors are logged and not raised so aggregates are never blocked on the store.
+    """
+    if not interval_start:
+        return
+
+    try:
+        redis = await get_watermark_redis()
+        await redis.incr(_version_key(watermark, WATERMARK_VERSION_LIVE))
+
+        if interval_start.replace(tzinfo=None) < get_network_day_start(network):
+            await redis.incr(_version_key(watermark, WATERMARK_VERSION_HISTORICAL))
+    except Exception as e:
+        logger.error(f"Could not bump watermark version for {watermark}: {e}")
+
+
+async def get_watermark_versions(watermark: str) -> tuple[int, int]:
+    """
+    Get the (live, historical) output versions for an aggregate.
+
+    Raises on redis errors so callers can decide whether to bypass what depends on them.
+    """
+    redis = await get_watermark_redis()
+    live, historical = await redis.mget(
+        _version_key(watermark, WATERMARK_VERSION_LIVE), _version_key(watermark, WATERMARK_VERSION_HISTORICAL)
+    )
+
+    return int(live or 0), int(historical or 0)
@@ -0,0 +1,218 @@
+"""
+Shared response cache for the v4 data and market endpoints.
+
+Responses are cached as serialised JSON in a per-process LRU (L1) in front of redis (L2) and
+keyed on the normalised query from get_timeseries_query. Entries are invalidated by the
+aggregate watermark versions rather than a wall clock TTL:
+
+ * windows that end before the start of the current network day are keyed on the historical
+   version which only moves when completed days are re-aggregated, so they are kept for a long time
+ * windows that include the open day are keyed on the live version which moves on every aggregate
+   run, so they are recomputed once new intervals land
+
+If redis is unavailable the cache is bypassed for a short period and responses are built directly.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any
+
+import logfire
+from cachetools import LRUCache
+from fastapi import Response
+
+from opennem import settings
+from opennem.aggregates.watermark import (
+    MARKET_SUMMARY_WATERMARK,
+    UNIT_INTERVALS_WATERMARK,
+    WATERMARK_VERSION_HISTORICAL,
+    WATERMARK_VERSION_LIVE,
+    get_network_day_start,
+    get_watermark_redis,
+    get_watermark_versions,
+)
+from opennem.api.queries import QueryType
+from opennem.schema.network import NetworkSchema
+
+logger = logging.getLogger("opennem.api.cache")
+
+REDIS_CACHE_KEY_PREFIX = "opennem:api-response:"
+
+# how long to bypass the cache after a redis error
+REDIS_RETRY_SECONDS = 60
+
+_QUERY_TYPE_WATERMARKS = {
+    QueryType.DATA: UNIT_INTERVALS_WATERMARK,
+    QueryType.FACILITY: UNIT_INTERVALS_WATERMARK,
+    QueryType.MARKET: MARKET_SUMMARY_WATERMARK,
+}
+
+response_cache_counter = logfire.metric_counter("api_response_cache_counter")
+response_cache_bytes_counter = logfire.metric_counter("api_response_cache_bytes", unit="By")
+
+
+@dataclass
+class ResponseCacheStats:
+    hits_l1: int = 0
+    hits_l2: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    bytes_served: int = 0
+    bytes_stored: int = 0
+
+
+def get_response_cache_key(query_type: QueryType, query: str, params: dict[str, Any]) -> str:
+    """Stable digest of a normalised timeseries query and its bound parameters"""
+    normalised_query = " ".join(query.split())
+    payload = json.dumps([query_type.value, normalised_query, params], sort_keys=True, default=str)
+
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_response_cache_tier(network: NetworkSchema, date_end: datetime) -> str:
+    """Windows ending before the open network day are historical, everything else is live"""
+    if date_end.replace(tzinfo=None) <= get_network_day_start(network):
+        return WATERMARK_VERSION_HISTORICAL
+
+    return WATERMARK_VERSION_LIVE
+
+
+class ResponseCache:
+    """Two level response cache invalidated by aggregate watermark versions"""
+
+    def __init__(self, l1_bytes: int | None = None) -> None:
+        self._l1: LRUCache[str, bytes] = LRUCache(maxsize=l1_bytes or settings.api_response_cache_l1_bytes, getsizeof=len)
+        self._redis_retry_at = 0.0
+        self.stats = ResponseCacheStats()
+
+    def _record(self, result: str, num_bytes: int = 0) -> None:
+        response_cache_counter.add(1, {"result": result})
+
+        if result in ("hit_l1", "hit_l2"):
+            self.stats.bytes_served += num_bytes
+            response_cache_bytes_counter.add(num_bytes, {"direction": "served"})
+        elif result == "miss":
+            self.stats.bytes_stored += num_bytes
+            response_cache_bytes_counter.add(num_bytes, {"direction": "stored"})
+
+    def _redis_error(self, e: Exception) -> None:
+        logger.error(f"Response cache redis error, bypassing for {REDIS_RETRY_SECONDS}s: {e}")
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+
+    async def _get_versioned_key(self, query_type: QueryType, tier: str, key: str) -> str | None:
+        """Entry key for the current watermark version of the tier or None if redis is unavailable"""
+        if not settings.api_response_cache_enabled or time.monotonic() < self._redis_retry_at:
+            return None
+
+        watermark = _QUERY_TYPE_WATERMARKS[query_type]
+
+        try:
+            live_version, historical_version = await get_watermark_versions(watermark)
+        except Exception as e:
+            self._redis_error(e)
+            return None
+
+        version = historical_version if tier == WATERMARK_VERSION_HISTORICAL else live_version
+
+        return f"{REDIS_CACHE_KEY_PREFIX}{watermark}:{tier}:{version}:{key}"
+
+    async def get_or_build(
+        self,
+        query_type: QueryType,
+        network: NetworkSchema,
+        date_end: datetime,
+        query: str,
+        params: dict[str, Any],
+        build: Callable[[], Awaitable[bytes]],
+    ) -> tuple[bytes, str]:
+        """
+        Get a cached response body or build and store it.
+
+        Exceptions raised by build are not cached and propagate to the caller.
+
+        Returns:
+            tuple of the response body and the cache result (hit_l1, hit_l2, miss or bypass)
+        """
+        tier = get_response_cache_tier(network, date_end)
+        versioned_key = await self._get_versioned_key(query_type, tier, get_response_cache_key(query_type, query, params))
+
+        if not versioned_key:
+            self.stats.bypassed += 1
+            self._record("bypass")
+            return await build(), "bypass"
+
+        if (content := self._l1.get(versioned_key)) is not None:
+            self.stats.hits_l1 += 1
+            self._record("hit_l1", len(content))
+            return content, "hit_l1"
+
+        try:
+            redis = await get_watermark_redis()
+            content = await redis.get(versioned_key)
+        except Exception as e:
+            self._redis_error(e)
+            content = None
+
+        if content is not None:
+            self._l1[versioned_key] = content
+            self.stats.hits_l2 += 1
+            self._record("hit_l2", len(content))
+            return content, "hit_l2"
+
+        content = await build()
+
+        self.stats.misses += 1
+        self._record("miss", len(content))
+
+        if len(content) <= self._l1.maxsize:
+            self._l1[versioned_key] = content
+
+        ttl = (
+            settings.api_response_cache_historical_ttl
+            if tier == WATERMARK_VERSION_HISTORICAL
+            else settings.api_response_cache_live_ttl
+        )
+
+        try:
+            redis = await get_watermark_redis()
+            await redis.set(versioned_key, content, ex=ttl)
+        except Exception as e:
+            self._redis_error(e)
+
+        return content, "miss"
+
+    async def response(
+        self,
+        query_type: QueryType,
+        network: NetworkSchema,
+        date_end: datetime,
+        query: str,
+        params: dict[str, Any],
+        build: Callable[[], Awaitable[bytes]],
+    ) -> Response:
+        """JSON response served from the cache with the cache result in the X-Cache header"""
+        content, result = await self.get_or_build(query_type, network, date_end, query, params, build)
+
+        return Response(content=content, media_type="application/json", headers={"X-Cache": result})
+
+
+_response_cache: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+
+    return _response_cache
+
+
+def get_response_cache_stats() -> dict[str, int]:
+    """Hit, miss and byte counters for the response cache in this process"""
+    return asdict(get_response_cache().stats)
@@ -8,21 +8,22 @@ data queries.
 import logging
 import time
 from datetime import datetime
-from typing import Annotated, Any
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi_versionizer import api_version
 
+from opennem.api.cache import get_response_cache
 from opennem.api.data.utils import validate_date_range
 from opennem.api.queries import QueryType, get_timeseries_query
 from opennem.api.schema import APIV4ResponseSchema
 from opennem.api.security import authenticated_user
-from opennem.api.timeseries import format_timeseries_response
+from opennem.api.timeseries import format_timeseries_response_columnar
 from opennem.api.utils import get_api_network_from_code, validate_metrics
 from opennem.core.grouping import PrimaryGrouping, SecondaryGrouping
 from opennem.core.metric import Metric
 from opennem.core.time_interval import Interval
-from opennem.db.clickhouse import get_clickhouse_dependency
+from opennem.db.clickhouse import ClickHousePool, get_clickhouse_pool_dependency
 
 router = APIRouter()
 logger = logging.getLogger("opennem.api.data")
@@ -56,9 +57,9 @@ async def get_network_data(
     secondary_grouping: Annotated[
         SecondaryGrouping | None, Query(description="Optional secondary grouping to apply", example="fueltech_group")
     ] = None,
-    client: Any = Depends(get_clickhouse_dependency),
+    client: ClickHousePool = Depends(get_clickhouse_pool_dependency),
     user: authenticated_user = None,
-) -> APIV4ResponseSchema:
+) -> Response:
     """
     Get time series data for a network.
 
@@ -74,10 +75,10 @@ async def get_network_data(
         date_end: End time for the query
         primary_grouping: Primary grouping to apply
         secondary_grouping: Optional secondary grouping to apply
-        client: ClickHouse client dependency
+        client: ClickHouse pool dependency
 
     Returns:
-        APIV4ResponseSchema: Time series data response containing a list of TimeSeries objects,
+        Response: JSON APIV4ResponseSchema time series data response containing a list of TimeSeries objects,
         one per requested metric
     """
     # Get the network schema
@@ -122,40 +123,41 @@ async def get_network_data(
         fueltech_group=fueltech_group,
     )
 
-    # Execute query and log the timing of the query
-    start_time = time.time()
-    try:
-        logger.debug(query, params)
-        results = client.execute(query, params)
-        elapsed_ms = (time.time() - start_time) * 1000
-        logger.debug(f"Query execution time: {elapsed_ms:.2f} ms")
-    except Exception as e:
-        logger.error(f"Error executing query: {e}")
-        raise HTTPException(status_code=500, detail="Error executing query") from e
-
-    # Check if we got any results
-    if not results:
-        logger.info(f"No data found for network {network_code} in time range {date_start} to {date_end}")
-        raise HTTPException(
-            status_code=416,
-            detail=f"No data available for network {network_code} in the specified time range",
+    async def _build_response() -> bytes:
+        # Execute query and log the timing of the query
+        start_time = time.time()
+        try:
+            logger.debug(query, params)
+            results = await client.execute(query, params, columnar=True)
+            elapsed_ms = (time.time() - start_time) * 1000
+            logger.debug(f"Query execution time: {elapsed_ms:.2f} ms")
+        except Exception as e:
+            logger.error(f"Error executing query: {e}")
+            raise HTTPException(status_code=500, detail="Error executing query") from e
+
+        # Check if we got any results
+        if not results or not results[0]:
+            logger.info(f"No data found for network {network_code} in time range {date_start} to {date_end}")
+            raise HTTPException(
+                status_code=416,
+                detail=f"No data available for network {network_code} in the specified time range",
+            )
+
+        # Transform results into response format - returns one TimeSeries per metric
+        timeseries_list = format_timeseries_response_columnar(
+            network=network.code,
+            metrics=metrics,
+            interval=interval,
+            primary_grouping=primary_grouping,
+            secondary_groupings=secondary_groupings,
+            columns=dict(zip(column_names, results, strict=True)),
         )
 
-    # Convert results to list of dictionaries using column names
-    result_dicts = [dict(zip(column_names, row, strict=True)) for row in results]
+        # All TimeSeries objects, one per metric, serialised directly to JSON
+        return APIV4ResponseSchema(data=timeseries_list).model_dump_json(exclude_none=True).encode()
 
-    # Transform results into response format - returns one TimeSeries per metric
-    timeseries_list = format_timeseries_response(
-        network=network.code,
-        metrics=metrics,
-        interval=interval,
-        primary_grouping=primary_grouping,
-        secondary_groupings=secondary_groupings,
-        results=result_dicts,
-    )
-
-    # Return all TimeSeries objects, one per metric
-    return APIV4ResponseSchema(data=timeseries_list)
+    # Serve from the response cache, building it on a miss
+    return await get_response_cache().response(QueryType.DATA, network, date_end, query, params, _build_response)
 
 
 @api_version(4)
@@ -173,9 +175,9 @@ async def get_facility_data(
     ] = None,
     date_start: Annotated[datetime | None, Query(description="Start time for the query", example="2024-01-01T00:00:00")] = None,
     date_end: Annotated[datetime | None, Query(description="End time for the query", example="2024-01-02T00:00:00")] = None,
-    client: Any = Depends(get_clickhouse_dependency),
+    client: ClickHousePool = Depends(get_clickhouse_pool_dependency),
     user: authenticated_user = None,
-) -> APIV4ResponseSchema:
+) -> Response:
     """
     Get time series data for a specific facility.
 
@@ -189,10 +191,10 @@ async def get_facility_data(
         interval: The time interval to aggregate by
         date_start: Start time for the query
         date_end: End time for the query
-        client: ClickHouse client dependency
+        client: ClickHouse pool dependency
 
     Returns:
-        APIV4ResponseSchema: Time series data response containing a list of TimeSeries objects,
+        Response: JSON APIV4ResponseSchema time series data response containing a list of TimeSeries objects,
         one per requested metric, with data for each unit
     """
     # Get the network schema
@@ -220,35 +222,36 @@ async def get_facility_data(
         facility_code=facility_code,
     )
 
-    # Execute query
-    try:
-        logger.debug(query)
-        results = client.execute(query, params)
-    except Exception as e:
-        logger.error(f"Error executing query: {e}")
-        raise HTTPException(status_code=500, detail="Error executing query") from e
-
-    # Check if we got any results
-    if not results:
-        logger.info(f"No data found for facility {facility_code} in time range {date_start} to {date_end}")
-        raise HTTPException(
-            status_code=416,
-            detail=f"No data available for facility {facility_code} in the specified time range",
+    async def _build_response() -> bytes:
+        # Execute query
+        try:
+            logger.debug(query)
+            results = await client.execute(query, params, columnar=True)
+        except Exception as e:
+            logger.error(f"Error executing query: {e}")
+            raise HTTPException(status_code=500, detail="Error executing query") from e
+
+        # Check if we got any results
+        if not results or not results[0]:
+            logger.info(f"No data found for facility {facility_code} in time range {date_start} to {date_end}")
+            raise HTTPException(
+                status_code=416,
+                detail=f"No data available for facility {facility_code} in the specified time range",
+            )
+
+        # Transform results into response format - returns one TimeSeries per metric
+        timeseries_list = format_timeseries_response_columnar(
+            network=network.code,
+            metrics=metrics,
+            interval=interval,
+            primary_grouping=PrimaryGrouping.NETWORK,  # Not used for facility queries
+            secondary_groupings=None,  # Not used for facility queries
+            columns=dict(zip(column_names, results, strict=True)),
+            facility_code=facility_code,
         )
 
-    # Convert results to list of dictionaries using column names
-    result_dicts = [dict(zip(column_names, row, strict=True)) for row in results]
-
-    # Transform results into response format - returns one TimeSeries per metric
-    timeseries_list = format_timeseries_response(
-        network=network.code,
-        metrics=metrics,
-        interval=interval,
-        primary_grouping=PrimaryGrouping.NETWORK,  # Not used for facility queries
-        secondary_groupings=None,  # Not used for facility queries
-        results=result_dicts,
-        facility_code=facility_code,
-    )
+        # All TimeSeries objects, one per metric, serialised directly to JSON
+        return APIV4ResponseSchema(data=timeseries_list).model_dump_json(exclude_none=True).encode()
 
-    # Return all TimeSeries objects, one per metric
-    return APIV4ResponseSchema(data=timeseries_list)
+    # Serve from the response cache, building it on a miss
+    return await get_response_cache().response(QueryType.FACILITY, network, date_end, query, params, _build_response)
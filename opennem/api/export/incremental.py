@@ -0,0 +1,141 @@
+"""
+Incremental updates for all-history JSON exports
+
+All-history exports (ie. the daily and monthly stat sets) are published with the full history
+of each series. Rather than recomputing the whole history every run, the previously published
+set is loaded and only a trailing window is recomputed and spliced into each series history.
+
+"""
+
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+from datedelta import datedelta
+
+from opennem import settings
+from opennem.api.stats.schema import OpennemData, OpennemDataHistory, OpennemDataHistoryArray, OpennemDataSet
+from opennem.utils.httpx import http
+from opennem.utils.interval import get_human_interval
+
+logger = logging.getLogger("opennem.export.incremental")
+
+
+class ExportMergeException(Exception):
+    """Raised when an update can't be spliced into a published set and a full rebuild is needed"""
+
+
+async def load_published_dataset(path: str) -> OpennemDataSet | None:
+    """
+    Load a previously published data set from the local static folder or the bucket.
+
+    Returns None if the set has not been published or can't be read so callers fall
+    back to a full rebuild.
+    """
+    local_path = Path(settings.static_folder_path) / path.lstrip("/")
+
+    try:
+        if local_path.is_file():
+            return OpennemDataSet.model_validate_json(local_path.read_text())
+
+        response = await http.get(f"{str(settings.s3_bucket_public_url).rstrip('/')}/{path.lstrip('/')}")
+
+        if response.status_code != 200:
+            logger.info(f"No published data set at {path}: {response.status_code}")
+            return None
+
+        return OpennemDataSet.model_validate_json(response.content)
+    except Exception as e:
+        logger.error(f"Could not load published data set at {path}: {e}")
+
+    return None
+
+
+def _get_interval_offset(start: datetime, subject: datetime, interval_human: str) -> int:
+    """Number of intervals from start to subject. Raises if subject is not on the interval grid of start"""
+    interval = get_human_interval(interval_human)
+
+    if isinstance(interval, datedelta):
+        months = (subject.year - start.year) * 12 + subject.month - start.month
+        interval_months = interval.years * 12 + interval.months
+
+        if interval.days or not interval_months or months % interval_months:
+            raise ExportMergeException(f"{subject} is not on the {interval_human} interval grid from {start}")
+
+        offset = months // interval_months
+
+        if start + datedelta(months=offset * interval_months) != subject:
+            raise ExportMergeException(f"{subject} is not on the {interval_human} interval grid from {start}")
+
+        return offset
+
+    offset, remainder = divmod(subject - start, interval)
+
+    if remainder != timedelta(0):
+        raise ExportMergeException(f"{subject} is not on the {interval_human} interval grid from {start}")
+
+    return offset
+
+
+def merge_history(
+    existing: OpennemDataHistory | OpennemDataHistoryArray, update: OpennemDataHistory | OpennemDataHistoryArray
+) -> OpennemDataHistory | OpennemDataHistoryArray:
+    """Splice an updated trailing window into an existing history. Values from the update win
+
+    The merged history takes the representation of the update."""
+    if existing.interval != update.interval:
+        raise ExportMergeException(f"Interval mismatch: {existing.interval} and {update.interval}")
+
+    if update.start <= existing.start:
+        return update
+
+    offset = _get_interval_offset(existing.start, update.start, existing.interval)
+
+    if offset > len(existing.data):
+        raise ExportMergeException(f"Gap between published history ending {existing.last} and update from {update.start}")
+
+    if isinstance(update, OpennemDataHistoryArray):
+        return OpennemDataHistoryArray(
+            start=existing.start,
+            last=update.last,
+            interval=existing.interval,
+            data=np.concatenate((np.asarray(existing.data[:offset], dtype=np.float64), update.data)),
+        )
+
+    if isinstance(existing, OpennemDataHistoryArray):
+        existing = existing.to_history()
+
+    return OpennemDataHistory(
+        start=existing.start,
+        last=update.last,
+        interval=existing.interval,
+        data=existing.data[:offset] + update.data,
+    )
+
+
+def merge_dataset_histories(existing: OpennemDataSet, update: OpennemDataSet) -> OpennemDataSet:
+    """
+    Merge a data set computed over a trailing window into a previously published data set.
+
+    Series in the update have their history spliced onto the published history and take the
+    updated metadata. Series only in the published set are kept as published and series new in
+    the update are added as is.
+
+    Raises:
+        ExportMergeException: if a series can't be spliced and the set needs a full rebuild
+    """
+    existing_series = {i.id: i for i in existing.data}
+    merged_series: list[OpennemData] = []
+
+    for series in update.data:
+        published = existing_series.pop(series.id, None)
+
+        if published:
+            series = series.model_copy(update={"history": merge_history(published.history, series.history)})
+
+        merged_series.append(series)
+
+    merged_series.extend(existing_series.values())
+
+    return update.model_copy(update={"data": sorted(merged_series, key=lambda i: i.id or "")})
@@ -0,0 +1,164 @@
+"""
+Bounded concurrent scheduling for export tasks
+
+Exports fan out over network regions and stat exports. Each unit of work runs under a semaphore
+of settings.export_concurrency shared by all exports in the process so the database pool isn't
+exhausted. Uploads are started in the background so they overlap with the next computation,
+and every unit is timed so slow exports are visible.
+
+Usage:
+
+    async with ExportScheduler("export_power") as scheduler:
+        for stat in stats:
+            scheduler.submit(stat.path, export_stat(stat, scheduler))
+
+Exiting the block waits on all submitted work and uploads and raises the first exception once
+the remaining work has finished.
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from collections.abc import Coroutine
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+import logfire
+from pydantic import BaseModel
+
+from opennem import settings
+from opennem.api.export.utils import write_output
+
+logger = logging.getLogger("opennem.export.scheduler")
+
+T = TypeVar("T")
+
+export_duration_histogram = logfire.metric_histogram("export_stat_duration", unit="s")
+
+# one semaphore per event loop since asyncio primitives can't be shared across loops
+_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+
+
+def get_export_semaphore() -> asyncio.Semaphore:
+    """Process wide export semaphore for the running event loop"""
+    loop = asyncio.get_running_loop()
+
+    if loop not in _semaphores:
+        _semaphores[loop] = asyncio.Semaphore(max(1, settings.export_concurrency))
+
+    return _semaphores[loop]
+
+
+@dataclass
+class ExportTiming:
+    name: str
+    query_seconds: float = 0.0
+    upload_seconds: float = 0.0
+    upload_bytes: int = 0
+    failed: bool = False
+
+
+class ExportScheduler:
+    """Runs export work concurrently under the export semaphore and overlaps uploads"""
+
+    def __init__(self, name: str, semaphore: asyncio.Semaphore | None = None) -> None:
+        self.name = name
+        self.timings: dict[str, ExportTiming] = {}
+        self._semaphore = semaphore
+        self._tasks: list[asyncio.Task] = []
+        self._uploads: list[asyncio.Task] = []
+
+    def _get_timing(self, name: str) -> ExportTiming:
+        if name not in self.timings:
+            self.timings[name] = ExportTiming(name=name)
+
+        return self.timings[name]
+
+    async def _run(self, name: str, coro: Coroutine[Any, Any, T]) -> T:
+        semaphore = self._semaphore or get_export_semaphore()
+        timing = self._get_timing(name)
+
+        async with semaphore:
+            started = time.perf_counter()
+
+            try:
+                return await coro
+            except Exception:
+                timing.failed = True
+                raise
+            finally:
+                timing.query_seconds += time.perf_counter() - started
+                export_duration_histogram.record(timing.query_seconds, {"export": self.name, "stage": "query"})
+                logger.info(f"{self.name}: {name} computed in {timing.query_seconds:.2f}s")
+
+    async def _upload(self, path: str, stat_set: BaseModel) -> int:
+        timing = self._get_timing(path)
+        started = time.perf_counter()
+
+        try:
+            timing.upload_bytes = await write_output(path, stat_set)
+        except Exception:
+            timing.failed = True
+            raise
+        finally:
+            timing.upload_seconds = time.perf_counter() - started
+            export_duration_histogram.record(timing.upload_seconds, {"export": self.name, "stage": "upload"})
+
+        if timing.upload_bytes:
+            logger.info(f"{self.name}: {path} uploaded {timing.upload_bytes} bytes in {timing.upload_seconds:.2f}s")
+        else:
+            logger.info(f"{self.name}: {path} unchanged, skipped upload")
+
+        return timing.upload_bytes
+
+    def submit(self, name: str, coro: Coroutine[Any, Any, T]) -> "asyncio.Task[T]":
+        """Schedule a unit of export work. The task result is available once the scheduler exits"""
+        task = asyncio.create_task(self._run(name, coro))
+        self._tasks.append(task)
+        return task
+
+    def upload(self, path: str, stat_set: BaseModel) -> None:
+        """Start writing a stat set in the background so the caller can move on to the next computation"""
+        self._uploads.append(asyncio.create_task(self._upload(path, stat_set)))
+
+    async def wait(self) -> None:
+        """Wait for all submitted work and uploads and raise the first exception"""
+        results = await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        # uploads are queued while the work runs so only wait on them once it is all done
+        results += await asyncio.gather(*self._uploads, return_exceptions=True)
+
+        self._log_summary()
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def _log_summary(self) -> None:
+        if not self.timings:
+            return None
+
+        slowest = sorted(self.timings.values(), key=lambda i: i.query_seconds + i.upload_seconds, reverse=True)
+        failed = [i.name for i in slowest if i.failed]
+
+        logger.info(
+            f"{self.name}: ran {len(self.timings)} exports, slowest: "
+            + ", ".join(f"{i.name} ({i.query_seconds:.2f}s + {i.upload_seconds:.2f}s upload)" for i in slowest[:5])
+        )
+
+        if failed:
+            logger.error(f"{self.name}: {len(failed)} exports failed: {', '.join(failed)}")
+
+    async def __aenter__(self) -> "ExportScheduler":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            for task in self._tasks:
+                task.cancel()
+
+            await asyncio.gather(*self._tasks, *self._uploads, return_exceptions=True)
+            return None
+
+        await self.wait()
@@ -8,13 +8,16 @@ require the API
 
 """
 
-import contextlib
+import asyncio
 import logging
 from datetime import datetime, timedelta
+from typing import Any
 from zoneinfo import ZoneInfo
 
+from datedelta import datedelta
 from sqlalchemy import select
 
+from opennem import settings
 from opennem.api.export.controllers import (
     NoResults,
     demand_network_region_daily,
@@ -23,7 +26,9 @@ from opennem.api.export.controllers import (
     power_flows_network_week,
     power_week,
 )
+from opennem.api.export.incremental import ExportMergeException, load_published_dataset, merge_dataset_histories
 from opennem.api.export.map import PriorityType, StatExport, StatType, get_export_map
+from opennem.api.export.scheduler import ExportScheduler
 from opennem.api.export.utils import write_output
 from opennem.api.stats.controllers import get_scada_range, get_scada_range_optimized
 from opennem.api.stats.schema import OpennemDataSet, ScadaDateRange
@@ -53,6 +58,127 @@ from opennem.utils.version import get_version
 logger = logging.getLogger("opennem.export.tasks")
 
 
+async def _no_result() -> None:
+    return None
+
+
+async def _weather_set(
+    time_series: OpennemExportSeries, station_code: str, network_region: str | None = None, **kwargs: Any
+) -> OpennemDataSet | None:
+    """Weather series for a station. Errors are logged and not raised since weather is optional in exports"""
+    try:
+        return await run_weather_daily_v3(
+            time_series=time_series, station_code=station_code, network_region=network_region, **kwargs
+        )
+    except NoResults as e:
+        logger.info(f"No weather results for {station_code}: {e}")
+    except Exception as e:
+        logger.error(f"Weather export error for {station_code}: {e}")
+
+    return None
+
+
+async def _energy_region_set(
+    network: NetworkSchema,
+    time_series: OpennemExportSeries,
+    network_region_code: str | None = None,
+    network_region_query: str | None = None,
+    networks: list[NetworkSchema] | None = None,
+    include_flows: bool = False,
+    bom_station: str | None = None,
+    history_array: bool = False,
+) -> OpennemDataSet | None:
+    """
+    Energy, demand, interconnector flow and weather series for a region.
+
+    The sub-queries are independent so they are run concurrently. The set is only returned if
+    there is an energy result, which matches running them in sequence and stopping on no energy.
+    """
+    region_query = network_region_query or network_region_code
+
+    stat_set, *append_sets = await asyncio.gather(
+        energy_fueltech_daily_v3(
+            network=network, time_series=time_series, network_region_code=region_query, history_array=history_array
+        ),
+        demand_network_region_daily(time_series=time_series, network_region_code=network_region_code, networks=networks),
+        energy_interconnector_flows_and_emissions_v2(time_series=time_series, network_region_code=region_query)
+        if include_flows and region_query
+        else _no_result(),
+        _weather_set(time_series, bom_station, network_region_code) if bom_station else _no_result(),
+        return_exceptions=True,
+    )
+
+    if isinstance(stat_set, BaseException):
+        raise stat_set
+
+    if not stat_set:
+        return None
+
+    for append_set in append_sets:
+        if isinstance(append_set, BaseException):
+            raise append_set
+
+        stat_set.append_set(append_set)
+
+    return stat_set
+
+
+async def _export_power_stat(power_stat: StatExport, scheduler: ExportScheduler) -> bool:
+    """Compute a power stat set and queue its upload. Returns True if there was a set to write"""
+    date_range_networks = power_stat.network
+
+    if NetworkNEM == date_range_networks or NetworkAU == date_range_networks:
+        date_range_networks = NetworkNEM
+
+    date_range: ScadaDateRange = await get_scada_range(network=date_range_networks)
+
+    logger.debug(f"Date range for {power_stat.network.code}: {date_range.start} => {date_range.end}")
+
+    # Migrate to this time_series
+    time_series = OpennemExportSeries(
+        start=date_range.start,
+        end=date_range.end,
+        network=power_stat.network,
+        year=power_stat.year,
+        interval=power_stat.interval,
+        period=power_stat.period,
+    )
+
+    time_series_weather = time_series.model_copy()
+    time_series_weather.interval = human_to_interval("30m")
+
+    stat_set, flow_set, weather_set = await asyncio.gather(
+        power_week(
+            time_series=time_series,
+            network_region_code=power_stat.network_region_query or power_stat.network_region or None,
+            networks_query=power_stat.networks,
+        ),
+        power_flows_per_interval(time_series=time_series, network_region_code=power_stat.network_region)
+        if power_stat.network_region
+        else _no_result(),
+        _weather_set(
+            time_series_weather,
+            power_stat.bom_station,
+            power_stat.network_region,
+            include_min_max=False,
+            unit_name="temperature",
+        )
+        if power_stat.bom_station
+        else _no_result(),
+    )
+
+    if not stat_set:
+        logger.info(f"No power stat set for {power_stat.period} {power_stat.networks} {power_stat.network_region}")
+        return False
+
+    stat_set.append_set(flow_set)
+    stat_set.append_set(weather_set)
+
+    scheduler.upload(power_stat.path, stat_set)
+
+    return True
+
+
 async def export_power(
     stats: list[StatExport] | None = None,
     priority: PriorityType | None = None,
@@ -61,7 +187,8 @@ async def export_power(
     """
     Export power stats from the export map
 
-
+    Stats are computed concurrently up to settings.export_concurrency. With latest only
+    the first stat with a result is exported.
     """
 
     # Not passed a stat map so go and get one
@@ -73,68 +200,72 @@ async def export_power(
 
         stats = export_map.resources
 
-    output_count: int = 0
-
     logger.info(f"Running export_power {latest=} {priority} with {len(stats)} stats")
 
-    for power_stat in stats:
-        if power_stat.stat_type != StatType.power:
-            continue
+    async with ExportScheduler("export_power") as scheduler:
+        for power_stat in stats:
+            if power_stat.stat_type != StatType.power:
+                continue
 
-        if output_count >= 1 and latest:
-            return None
+            task = scheduler.submit(power_stat.path, _export_power_stat(power_stat, scheduler))
 
-        date_range_networks = power_stat.network
+            if latest and await task:
+                break
 
-        if NetworkNEM == date_range_networks or NetworkAU == date_range_networks:
-            date_range_networks = NetworkNEM
 
-        date_range: ScadaDateRange = await get_scada_range(network=date_range_networks)
+async def _export_energy_stat(energy_stat: StatExport, scheduler: ExportScheduler, latest: bool | None = False) -> None:
+    """Compute an energy stat set for a year or all time and queue its upload"""
+    # @FIX trim to NEM since it's the one with the shortest
+    # data time span.
+    # @TODO find a better and more flexible way to do this in the
+    # range method
+    date_range_network = energy_stat.network
 
-        logger.debug(f"Date range for {power_stat.network.code}: {date_range.start} => {date_range.end}")
+    if NetworkNEM == date_range_network or NetworkAU == date_range_network:
+        date_range_network = NetworkNEM
 
-        # Migrate to this time_series
-        time_series = OpennemExportSeries(
-            start=date_range.start,
-            end=date_range.end,
-            network=power_stat.network,
-            year=power_stat.year,
-            interval=power_stat.interval,
-            period=power_stat.period,
-        )
-
-        stat_set = await power_week(
-            time_series=time_series,
-            network_region_code=power_stat.network_region_query or power_stat.network_region or None,
-            networks_query=power_stat.networks,
-        )
+    date_range: ScadaDateRange = await get_scada_range(network=date_range_network)
 
-        if not stat_set:
-            logger.info(f"No power stat set for {power_stat.period} {power_stat.networks} {power_stat.network_region}")
+    logger.debug(f"Date range is: {energy_stat.network.code} {date_range.start} => {date_range.end}")
 
-            continue
+    # Migrate to this time_series
+    time_series = OpennemExportSeries(
+        start=date_range.start,
+        end=date_range.end,
+        network=energy_stat.network,
+        year=energy_stat.year,
+        interval=energy_stat.interval,
+        period=human_to_period("1Y"),
+    )
 
-        if power_stat.network_region:
-            if flow_set := await power_flows_per_interval(time_series=time_series, network_region_code=power_stat.network_region):
-                stat_set.append_set(flow_set)
+    if energy_stat.year:
+        pass
+    elif energy_stat.period and energy_stat.period.period_human == "all" and not latest:
+        time_series.period = human_to_period("all")
+        time_series.interval = human_to_interval("1M")
+        time_series.year = None
+    else:
+        return None
 
-        time_series_weather = time_series.model_copy()
-        time_series_weather.interval = human_to_interval("30m")
+    stat_set = await _energy_region_set(
+        network=energy_stat.network,
+        time_series=time_series,
+        network_region_code=energy_stat.network_region,
+        network_region_query=energy_stat.network_region_query,
+        networks=energy_stat.networks,
+        include_flows=bool(energy_stat.network.has_interconnectors and energy_stat.network_region),
+        bom_station=energy_stat.bom_station,
+    )
 
-        if power_stat.bom_station:
-            with contextlib.suppress(Exception):
-                weather_set = await run_weather_daily_v3(
-                    time_series=time_series_weather,
-                    station_code=power_stat.bom_station,
-                    network_region=power_stat.network_region,
-                    include_min_max=False,
-                    unit_name="temperature",
-                )
-                stat_set.append_set(weather_set)
+    if not stat_set:
+        logger.error(
+            f"No result from energy_fueltech_daily for {energy_stat.network} {energy_stat.period} {energy_stat.network_region}"
+        )
+        return None
 
-        await write_output(power_stat.path, stat_set)
+    logger.debug(f"Got {len(stat_set.data)} sets for {energy_stat.network} {energy_stat.period}{energy_stat.network_region}")
 
-        output_count += 1
+    scheduler.upload(energy_stat.path, stat_set)
 
 
 async def export_energy(
@@ -145,7 +276,7 @@ async def export_energy(
     """
     Export energy stats from the export map
 
-
+    Stats are computed concurrently up to settings.export_concurrency.
     """
     if not stats:
         export_map = get_export_map().get_by_stat_type(StatType.energy)
@@ -159,129 +290,53 @@ async def export_energy(
 
     logger.info(f"Running export_energy with {len(stats)} stats")
 
-    for energy_stat in stats:
-        if energy_stat.stat_type != StatType.energy:
-            continue
-
-        # @FIX trim to NEM since it's the one with the shortest
-        # data time span.
-        # @TODO find a better and more flexible way to do this in the
-        # range method
-        date_range_network = energy_stat.network
-
-        if NetworkNEM == date_range_network or NetworkAU == date_range_network:
-            date_range_network = NetworkNEM
-
-        date_range: ScadaDateRange = await get_scada_range(network=date_range_network)
-
-        logger.debug(f"Date range is: {energy_stat.network.code} {date_range.start} => {date_range.end}")
-
-        # Migrate to this time_series
-        time_series = OpennemExportSeries(
-            start=date_range.start,
-            end=date_range.end,
-            network=energy_stat.network,
-            year=energy_stat.year,
-            interval=energy_stat.interval,
-            period=human_to_period("1Y"),
-        )
+    async with ExportScheduler("export_energy") as scheduler:
+        for energy_stat in stats:
+            if energy_stat.stat_type != StatType.energy:
+                continue
 
-        if energy_stat.year:
-            if latest and energy_stat.year != CURRENT_YEAR:
+            if energy_stat.year and latest and energy_stat.year != CURRENT_YEAR:
                 logger.debug(f"Skipping since we only want latest and this is not the current year {energy_stat.year}")
                 continue
 
-            stat_set = await energy_fueltech_daily_v3(
-                network=energy_stat.network,
-                time_series=time_series,
-                network_region_code=energy_stat.network_region_query or energy_stat.network_region,
-            )
-
-            if not stat_set:
-                logger.error(
-                    f"No result from energy_fueltech_daily for {energy_stat.network} "
-                    "{energy_stat.period} {energy_stat.network_region}"
-                )
-                continue
+            scheduler.submit(energy_stat.path, _export_energy_stat(energy_stat, scheduler, latest=latest))
 
-            logger.debug(
-                f"Got {len(stat_set.data)} sets for {energy_stat.network} {energy_stat.period}{energy_stat.network_region}"
-            )
 
-            demand_energy_and_value = await demand_network_region_daily(
-                time_series=time_series, network_region_code=energy_stat.network_region, networks=energy_stat.networks
-            )
-            stat_set.append_set(demand_energy_and_value)
+async def _export_region_monthly_set(
+    network: NetworkSchema, network_region: NetworkRegion, networks: list[NetworkSchema], time_series: OpennemExportSeries
+) -> OpennemDataSet | None:
+    """Monthly energy, demand, flow and weather series for a network region over a time series"""
+    logger.info(f"Running monthlies for {network.code} and {network_region.code} from {time_series.start}")
 
-            # network flows
-            if energy_stat.network.has_interconnectors and energy_stat.network_region:
-                interconnector_flows = await energy_interconnector_flows_and_emissions_v2(
-                    time_series=time_series,
-                    network_region_code=energy_stat.network_region_query or energy_stat.network_region,
-                )
-                stat_set.append_set(interconnector_flows)
-
-            # weather output
-            if energy_stat.bom_station:
-                try:
-                    weather_stats = await run_weather_daily_v3(
-                        time_series=time_series,
-                        station_code=energy_stat.bom_station,
-                        network_region=energy_stat.network_region,
-                    )
-                    stat_set.append_set(weather_stats)
-                except NoResults as e:
-                    logger.info(f"No results for weather result: {e}")
-                except Exception as e:
-                    logger.error(f"weather_stat exception: {e}")
-
-            await write_output(energy_stat.path, stat_set)
-
-        elif energy_stat.period and energy_stat.period.period_human == "all" and not latest:
-            time_series.period = human_to_period("all")
-            time_series.interval = human_to_interval("1M")
-            time_series.year = None
-            time_series.interval = human_to_interval("1M")
-
-            stat_set = await energy_fueltech_daily_v3(
-                network=energy_stat.network,
-                time_series=time_series,
-                # networks_query=energy_stat.networks,
-                network_region_code=energy_stat.network_region_query or energy_stat.network_region,
-            )
+    stat_set = await _energy_region_set(
+        network=network,
+        time_series=time_series,
+        network_region_code=str(network_region.code),
+        networks=networks,
+        include_flows=bool(network.has_interconnectors),
+        bom_station=get_network_region_weather_station(str(network_region.code)),
+        history_array=True,
+    )
 
-            if not stat_set:
-                continue
+    if not stat_set:
+        logger.error(f"Could not get a monthly stat set for {network.code} and {network_region.code}")
 
-            demand_energy_and_value = await demand_network_region_daily(
-                time_series=time_series, network_region_code=energy_stat.network_region, networks=energy_stat.networks
-            )
-            stat_set.append_set(demand_energy_and_value)
+    return stat_set
 
-            if energy_stat.network.has_interconnectors and energy_stat.network_region:
-                interconnector_flows = await energy_interconnector_flows_and_emissions_v2(
-                    time_series=time_series,
-                    network_region_code=energy_stat.network_region_query or energy_stat.network_region,
-                )
-                stat_set.append_set(interconnector_flows)
-
-            if energy_stat.bom_station:
-                try:
-                    weather_stats = await run_weather_daily_v3(
-                        time_series=time_series,
-                        station_code=energy_stat.bom_station,
-                        network_region=energy_stat.network_region,
-                    )
-                    stat_set.append_set(weather_stats)
-                except NoResults as e:
-                    logger.info(f"No weather results: {e}")
-                except Exception:
-                    pass
 
-            await write_output(energy_stat.path, stat_set)
+async def export_all_monthly(
+    networks: list[NetworkSchema] | None = None, network_region_code: str | None = None, full_rebuild: bool = False
+) -> None:
+    """Export monthlies for all networks and regions
 
+    Unless full_rebuild is set only the trailing settings.export_incremental_months are
+    recomputed and merged into the published monthly set. Regions are computed concurrently
+    and appended in order.
+    """
+    output_path = "v4/stats/au/all/monthly.json"
+    requested_networks = networks
+    published_set = None if full_rebuild else await load_published_dataset(output_path)
 
-async def export_all_monthly(networks: list[NetworkSchema] | None = None, network_region_code: str | None = None) -> None:
     all_monthly = OpennemDataSet(code="au", data=[], version=get_version(), created_at=get_today_nem(), network=NetworkAU.code)
 
     cpi = await gov_stats_cpi()
@@ -291,7 +346,9 @@ async def export_all_monthly(networks: list[NetworkSchema] | None = None, networ
     if not networks:
         networks = [NetworkNEM, NetworkWEM]
 
-    async with SessionLocal() as session:
+    region_tasks: list[asyncio.Task] = []
+
+    async with SessionLocal() as session, ExportScheduler("export_all_monthly") as scheduler:
         for network in networks:
             # 1. Setup network regions for each network
             network_regions_query = select(NetworkRegion).filter(NetworkRegion.network_id == network.code)
@@ -312,64 +369,141 @@ async def export_all_monthly(networks: list[NetworkSchema] | None = None, networ
             #     networks += network.subnetworks
 
             # # @TODO replace this with NetworkSchema->subnetworks
-            networks = [NetworkNEM, NetworkAEMORooftop, NetworkAEMORooftopBackfill]
+            region_networks = [NetworkNEM, NetworkAEMORooftop, NetworkAEMORooftopBackfill]
 
             if network.code == "WEM":
-                networks = [NetworkWEM, NetworkAPVI]
+                region_networks = [NetworkWEM, NetworkAPVI]
 
             # @TODO replace with data_first_seen and current date
             scada_range = get_scada_range_optimized(network=network)
 
-            for network_region in network_regions:
-                logger.info(f"Running monthlies for {network.code} and {network_region.code}")
+            series_start = scada_range.start
 
+            if published_set:
+                series_start = scada_range.end.replace(day=1, hour=0, minute=0, second=0, microsecond=0) - datedelta(
+                    months=settings.export_incremental_months
+                )
+
+            for network_region in network_regions:
                 time_series = OpennemExportSeries(
-                    start=scada_range.start,
+                    start=series_start,
                     end=scada_range.end,
                     network=network,
                     interval=get_interval("1M"),
                     period=human_to_period("all"),
                 )
 
-                stat_set = await energy_fueltech_daily_v3(
-                    network=network,
-                    time_series=time_series,
-                    # networks_query=networks,
-                    network_region_code=str(network_region.code),
+                region_tasks.append(
+                    scheduler.submit(
+                        f"{network.code}/{network_region.code}",
+                        _export_region_monthly_set(network, network_region, region_networks, time_series),
+                    )
                 )
 
-                if not stat_set:
-                    logger.error(f"Could not get a monthly stat set for {network.code} and {network_region.code}")
-                    continue
+    for region_task in region_tasks:
+        all_monthly.append_set(region_task.result())
+
+    if published_set:
+        try:
+            all_monthly = merge_dataset_histories(published_set, all_monthly)
+        except ExportMergeException as e:
+            logger.warning(f"Could not merge monthly export, running a full rebuild: {e}")
+            return await export_all_monthly(requested_networks, network_region_code=network_region_code, full_rebuild=True)
+
+    await write_output(output_path, all_monthly)
+
+
+async def _export_region_daily_set(
+    network: NetworkSchema,
+    network_region: NetworkRegion,
+    networks: list[NetworkSchema],
+    time_series: OpennemExportSeries,
+    cpi: OpennemDataSet | None = None,
+) -> OpennemDataSet | None:
+    """Daily energy, demand, flow and weather series for a network region over a time series"""
+    stat_set = await _energy_region_set(
+        network=network,
+        time_series=time_series,
+        network_region_code=str(network_region.code),
+        networks=networks,
+        # Hard coded to NEM only atm but we'll put has_interconnectors
+        # in the metadata to automate all this
+        include_flows=network == NetworkNEM,
+        bom_station=get_network_region_weather_station(str(network_region.code)),
+        history_array=True,
+    )
 
-                demand_energy_and_value = await demand_network_region_daily(
-                    time_series=time_series, network_region_code=str(network_region.code), networks=networks
-                )
-                stat_set.append_set(demand_energy_and_value)
+    if stat_set and cpi:
+        stat_set.append_set(cpi)
 
-                if network.has_interconnectors:
-                    interconnector_flows = await energy_interconnector_flows_and_emissions_v2(
-                        time_series=time_series,
-                        network_region_code=str(network_region.code),
-                    )
-                    stat_set.append_set(interconnector_flows)
+    return stat_set
+
+
+async def _export_region_daily(
+    network: NetworkSchema,
+    network_region: NetworkRegion,
+    scheduler: ExportScheduler,
+    cpi: OpennemDataSet | None = None,
+    full_rebuild: bool = False,
+) -> None:
+    """Compute the daily set for a network region, merge it into the published set and queue its upload"""
+    logger.info(f"Exporting for network {network.code} and region {network_region.code}")
+
+    networks = [NetworkNEM, NetworkAEMORooftop, NetworkOpenNEMRooftopBackfill]
 
-                all_monthly.append_set(stat_set)
+    if str(network_region.code) == "WEM":
+        networks = [NetworkWEM, NetworkAPVI]
 
-                if bom_station := get_network_region_weather_station(str(network_region.code)):
-                    with contextlib.suppress(Exception):
-                        weather_stats = await run_weather_daily_v3(
-                            time_series=time_series,
-                            station_code=bom_station,
-                            network_region=str(network_region.code),
-                        )
-                        all_monthly.append_set(weather_stats)
+    last_day = get_last_complete_day_for_network(network=network) - timedelta(days=1)
 
-        await write_output("v4/stats/au/all/monthly.json", all_monthly)
+    if not last_day or not network.data_first_seen:
+        logger.error(f"Could not get scada range for network {network} and energy True")
+        return None
+
+    output_path = f"v4/stats/au/{network_region.code}/daily.json"
+    published_set = None if full_rebuild else await load_published_dataset(output_path)
+
+    series_start = network.data_first_seen
 
+    if published_set:
+        series_start = last_day - timedelta(days=settings.export_incremental_days)
 
-async def export_all_daily(networks: list[NetworkSchema] | None = None, network_region_code: str | None = None) -> None:
-    """Export dailies for all networks and regions"""
+    time_series = OpennemExportSeries(
+        start=series_start,
+        end=last_day,
+        network=network,
+        interval=human_to_interval("1d"),
+        period=human_to_period("all"),
+    )
+
+    stat_set = await _export_region_daily_set(network, network_region, networks, time_series, cpi)
+
+    if not stat_set:
+        return None
+
+    if published_set:
+        try:
+            stat_set = merge_dataset_histories(published_set, stat_set)
+        except ExportMergeException as e:
+            logger.warning(f"Could not merge daily export for {network_region.code}, running a full rebuild: {e}")
+            time_series.start = network.data_first_seen
+            stat_set = await _export_region_daily_set(network, network_region, networks, time_series, cpi)
+
+            if not stat_set:
+                return None
+
+    scheduler.upload(output_path, stat_set)
+
+
+async def export_all_daily(
+    networks: list[NetworkSchema] | None = None, network_region_code: str | None = None, full_rebuild: bool = False
+) -> None:
+    """Export dailies for all networks and regions
+
+    Unless full_rebuild is set only the trailing settings.export_incremental_days are
+    recomputed for each region and merged into its published daily set. Regions are
+    computed concurrently up to settings.export_concurrency.
+    """
 
     # default list of networks
     if networks is None:
@@ -380,7 +514,7 @@ async def export_all_daily(networks: list[NetworkSchema] | None = None, network_
 
     cpi = await gov_stats_cpi()
 
-    async with get_read_session() as session:
+    async with get_read_session() as session, ExportScheduler("export_all_daily") as scheduler:
         for network in networks:
             network_regions_query = select(NetworkRegion).filter_by(export_set=True).filter_by(network_id=network.code)
 
@@ -390,64 +524,11 @@ async def export_all_daily(networks: list[NetworkSchema] | None = None, network_
             network_regions = (await session.execute(network_regions_query)).scalars().all()
 
             for network_region in network_regions:
-                logging.info(f"Exporting for network {network.code} and region {network_region.code}")
-
-                networks = [NetworkNEM, NetworkAEMORooftop, NetworkOpenNEMRooftopBackfill]
-
-                if str(network_region.code) == "WEM":
-                    networks = [NetworkWEM, NetworkAPVI]
-
-                last_day = get_last_complete_day_for_network(network=network) - timedelta(days=1)
-
-                if not last_day or not network.data_first_seen:
-                    logger.error(f"Could not get scada range for network {network} and energy True")
-                    continue
-
-                time_series = OpennemExportSeries(
-                    start=network.data_first_seen,
-                    end=last_day,
-                    network=network,
-                    interval=human_to_interval("1d"),
-                    period=human_to_period("all"),
-                )
-
-                stat_set = await energy_fueltech_daily_v3(
-                    network=network,
-                    time_series=time_series,
-                    # networks_query=networks,
-                    network_region_code=str(network_region.code),
+                scheduler.submit(
+                    f"{network.code}/{network_region.code}",
+                    _export_region_daily(network, network_region, scheduler, cpi=cpi, full_rebuild=full_rebuild),
                 )
 
-                if not stat_set:
-                    continue
-
-                demand_energy_and_value = await demand_network_region_daily(
-                    time_series=time_series, network_region_code=str(network_region.code), networks=networks
-                )
-                stat_set.append_set(demand_energy_and_value)
-
-                # Hard coded to NEM only atm but we'll put has_interconnectors
-                # in the metadata to automate all this
-                if network == NetworkNEM:
-                    interconnector_flows = await energy_interconnector_flows_and_emissions_v2(
-                        time_series=time_series,
-                        network_region_code=str(network_region.code),
-                    )
-                    stat_set.append_set(interconnector_flows)
-
-                if bom_station := get_network_region_weather_station(str(network_region.code)):
-                    with contextlib.suppress(Exception):
-                        weather_stats = await run_weather_daily_v3(
-                            time_series=time_series,
-                            station_code=bom_station,
-                            network_region=str(network_region.code),
-                        )
-                        stat_set.append_set(weather_stats)
-                if cpi:
-                    stat_set.append_set(cpi)
-
-                await write_output(f"v4/stats/au/{network_region.code}/daily.json", stat_set)
-
 
 async def export_flows() -> None:
     date_range = await get_scada_range(network=NetworkNEM)
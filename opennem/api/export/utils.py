@@ -7,6 +7,7 @@ import logging
 
 from pydantic.main import BaseModel
 
+from opennem import settings
 from opennem.api.stats.schema import OpennemDataSet
 from opennem.exporter.local import write_to_local
 from opennem.exporter.storage_bucket import cloudflare_uploader
@@ -20,7 +21,10 @@ async def write_output(
     is_local: bool = False,
     exclude_unset: bool = True,
 ) -> int:
-    """Writes output of stat sets either locally or to s3"""
+    """Writes output of stat sets either locally or to s3
+
+    Bucket uploads are compressed with settings.export_content_encoding and skipped if the
+    content hasn't changed, in which case 0 bytes are returned."""
     write_content = stat_set.model_dump_json(exclude_unset=exclude_unset)
 
     byte_count = 0
@@ -28,10 +32,16 @@ async def write_output(
     if is_local:
         byte_count = write_to_local(path, write_content)
     elif isinstance(stat_set, str):
-        byte_count = await cloudflare_uploader.upload_content(stat_set, path, "application/json")
+        byte_count = await cloudflare_uploader.upload_content(
+            stat_set, path, "application/json", settings.export_content_encoding
+        )
     elif isinstance(stat_set, OpennemDataSet):
-        byte_count = await cloudflare_uploader.upload_content(write_content, path, "application/json")
+        byte_count = await cloudflare_uploader.upload_content(
+            write_content, path, "application/json", settings.export_content_encoding
+        )
     elif isinstance(stat_set, BaseModel):
-        byte_count = await cloudflare_uploader.upload_content(write_content, path, "application/json")
+        byte_count = await cloudflare_uploader.upload_content(
+            write_content, path, "application/json", settings.export_content_encoding
+        )
 
     return byte_count
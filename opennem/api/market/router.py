@@ -7,21 +7,22 @@ This module handles market-specific metrics like price and demand.
 import logging
 import time
 from datetime import datetime
-from typing import Annotated, Any
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi_versionizer import api_version
 
+from opennem.api.cache import get_response_cache
 from opennem.api.data.utils import validate_date_range
 from opennem.api.queries import QueryType, get_timeseries_query
 from opennem.api.schema import APIV4ResponseSchema
 from opennem.api.security import authenticated_user
-from opennem.api.timeseries import format_timeseries_response
+from opennem.api.timeseries import format_timeseries_response_columnar
 from opennem.api.utils import get_api_network_from_code, validate_metrics
 from opennem.core.grouping import PrimaryGrouping
 from opennem.core.metric import Metric
 from opennem.core.time_interval import Interval
-from opennem.db.clickhouse import get_clickhouse_dependency
+from opennem.db.clickhouse import ClickHousePool, get_clickhouse_pool_dependency
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -49,9 +50,9 @@ async def get_network_data(
     primary_grouping: Annotated[
         PrimaryGrouping, Query(description="Primary grouping to apply", example="network_region")
     ] = PrimaryGrouping.NETWORK,
-    client: Any = Depends(get_clickhouse_dependency),
+    client: ClickHousePool = Depends(get_clickhouse_pool_dependency),
     user: authenticated_user = None,
-) -> APIV4ResponseSchema:
+) -> Response:
     """
     Get market data for a network.
 
@@ -65,10 +66,10 @@ async def get_network_data(
         date_start: Start time for the query
         date_end: End time for the query
         primary_grouping: Primary grouping to apply
-        client: ClickHouse client dependency
+        client: ClickHouse pool dependency
 
     Returns:
-        APIV4ResponseSchema: Time series data response containing a list of TimeSeries objects,
+        Response: JSON APIV4ResponseSchema time series data response containing a list of TimeSeries objects,
         one per requested metric
     """
     # Get the network schema
@@ -100,37 +101,38 @@ async def get_network_data(
         network_region=network_region,
     )
 
-    # Execute query
-    start_time = time.time()
-    try:
-        logger.debug(query, params)
-        results = client.execute(query, params)
-        elapsed_ms = (time.time() - start_time) * 1000
-        logger.debug(f"Query execution time: {elapsed_ms:.2f} ms")
-    except Exception as e:
-        logger.error(f"Error executing query: {e}")
-        raise HTTPException(status_code=500, detail="Error executing query") from e
-
-    # Check if we got any results
-    if not results:
-        logger.info(f"No market data found for network {network_code} in time range {date_start} to {date_end}")
-        raise HTTPException(
-            status_code=416,
-            detail=f"No market data available for network {network_code} in the specified time range",
+    async def _build_response() -> bytes:
+        # Execute query
+        start_time = time.time()
+        try:
+            logger.debug(query, params)
+            results = await client.execute(query, params, columnar=True)
+            elapsed_ms = (time.time() - start_time) * 1000
+            logger.debug(f"Query execution time: {elapsed_ms:.2f} ms")
+        except Exception as e:
+            logger.error(f"Error executing query: {e}")
+            raise HTTPException(status_code=500, detail="Error executing query") from e
+
+        # Check if we got any results
+        if not results or not results[0]:
+            logger.info(f"No market data found for network {network_code} in time range {date_start} to {date_end}")
+            raise HTTPException(
+                status_code=416,
+                detail=f"No market data available for network {network_code} in the specified time range",
+            )
+
+        # Transform results into response format - returns one TimeSeries per metric
+        timeseries_list = format_timeseries_response_columnar(
+            network=network.code,
+            metrics=metrics,
+            interval=interval,
+            primary_grouping=primary_grouping,
+            secondary_groupings=None,
+            columns=dict(zip(column_names, results, strict=True)),
         )
 
-    # Convert results to list of dictionaries using column names
-    result_dicts = [dict(zip(column_names, row, strict=True)) for row in results]
+        # All TimeSeries objects, one per metric, serialised directly to JSON
+        return APIV4ResponseSchema(data=timeseries_list).model_dump_json(exclude_none=True).encode()
 
-    # Transform results into response format - returns one TimeSeries per metric
-    timeseries_list = format_timeseries_response(
-        network=network.code,
-        metrics=metrics,
-        interval=interval,
-        primary_grouping=primary_grouping,
-        secondary_groupings=None,
-        results=result_dicts,
-    )
-
-    # Return all TimeSeries objects, one per metric
-    return APIV4ResponseSchema(data=timeseries_list)
+    # Serve from the response cache, building it on a miss
+    return await get_response_cache().response(QueryType.MARKET, network, date_end, query, params, _build_response)
@@ -6,13 +6,16 @@ for both market and data endpoints.
 """
 
 import logging
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 from enum import Enum
 
+from opennem import settings
 from opennem.api.data.schema import DataMetric
 from opennem.api.market.schema import MarketMetric
 from opennem.core.grouping import PrimaryGrouping, SecondaryGrouping
 from opennem.core.time_interval import Interval, get_interval_function
+from opennem.db.clickhouse_views import get_rollups_closed_until
 from opennem.schema.network import NetworkSchema
 
 logger = logging.getLogger("opennem.api.queries")
@@ -29,6 +32,62 @@ class QueryType(str, Enum):
     FACILITY = "facility"
 
 
+# intervals that can be answered from rollups bucketed by date
+_DATE_INTERVALS = [
+    Interval.DAY,
+    Interval.WEEK,
+    Interval.MONTH,
+    Interval.QUARTER,
+    Interval.YEAR,
+    Interval.SEASON,
+    Interval.FINANCIAL_YEAR,
+]
+
+# intervals made up of whole calendar months that can be answered from monthly rollups
+_MONTH_INTERVALS = [
+    Interval.MONTH,
+    Interval.QUARTER,
+    Interval.YEAR,
+    Interval.SEASON,
+    Interval.FINANCIAL_YEAR,
+]
+
+
+@dataclass(frozen=True)
+class QueryRollup:
+    """
+    A materialized view or rollup table rolling up the base table of a query.
+
+    Attributes:
+        table: Name of the materialized view or rollup table
+        interval: Granularity of the rollup, either Interval.DAY or Interval.MONTH
+        columns: Dimension columns kept by the rollup
+        time_column: Name of the date column
+        requires_backfill: Only routed to once settings.clickhouse_rollup_routing is enabled
+    """
+
+    table: str
+    interval: Interval
+    columns: frozenset[str]
+    time_column: str = "date"
+    requires_backfill: bool = False
+
+
+@dataclass(frozen=True)
+class QuerySource:
+    """A table or rollup to read a date range from"""
+
+    table: str
+    time_column: str
+    date_start: datetime | date
+    date_end: datetime | date
+    is_rollup: bool = False
+
+
+def _next_month_start(dt: date) -> date:
+    return (dt.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
 class QueryConfig:
     """Configuration for building a time series query."""
 
@@ -36,10 +95,11 @@ class QueryConfig:
         self,
         query_type: QueryType,
         base_table: str,
-        daily_mv: str | None,
-        monthly_mv: str | None,
         metric_columns: dict[MetricType, str],
         metric_agg_functions: dict[MetricType, str],
+        rollups: list[QueryRollup] | None = None,
+        rollup_metric_selects: dict[MetricType, tuple[str, list[str]]] | None = None,
+        base_rollup_columns: dict[str, str] | None = None,
     ):
         """
         Initialize query configuration.
@@ -47,54 +107,141 @@ class QueryConfig:
         Args:
             query_type: Type of query (market or data)
             base_table: Name of the base table to query
-            daily_mv: Name of daily materialized view (if available)
-            monthly_mv: Name of monthly materialized view (if available)
             metric_columns: Mapping of metrics to their column names
             metric_agg_functions: Mapping of metrics to their aggregation functions
+            rollups: Materialized views of the base table, ordered from coarsest to finest
+            rollup_metric_selects: Aggregate expression and the columns it reads for metrics that
+                are not a plain aggregate of their column in the rollups (ie. averages)
+            base_rollup_columns: Expressions reading rollup columns that are not in the base table
+                when the base table is read alongside a rollup
         """
         self.query_type = query_type
         self.base_table = base_table
-        self.daily_mv = daily_mv
-        self.monthly_mv = monthly_mv
         self.metric_columns = metric_columns
         self.metric_agg_functions = metric_agg_functions
+        self.rollups = rollups or []
+        self.rollup_metric_selects = rollup_metric_selects or {}
+        self.base_rollup_columns = base_rollup_columns or {}
 
-    def _get_table_for_interval(self, interval: Interval) -> str:
+    def _get_rollup(self, interval: Interval, columns: set[str]) -> QueryRollup | None:
         """
-        Get the appropriate table or materialized view for the interval.
+        Get the coarsest rollup at a granularity that has all the columns a query needs.
+
+        Args:
+            interval: Granularity of the rollup
+            columns: Dimension columns used for grouping and filtering
+
+        Returns:
+            QueryRollup | None: The rollup or None if no rollup can answer the query
+        """
+        for rollup in self.rollups:
+            if rollup.requires_backfill and not settings.clickhouse_rollup_routing:
+                continue
+
+            if rollup.interval == interval and columns <= rollup.columns:
+                return rollup
+
+        return None
+
+    def _get_sources(
+        self, interval: Interval, columns: set[str], date_start: datetime | date, date_end: datetime | date
+    ) -> list[QuerySource]:
+        """
+        Get the tables to read a query from.
+
+        Sub-daily intervals read the base table. Daily and longer intervals read the coarsest daily
+        rollup, and intervals made of whole months read the whole closed months in the range from
+        the coarsest monthly rollup with the rest of the range from the daily rollup, or the base
+        table when there is no daily rollup.
 
         Args:
-            config: Query configuration
             interval: Time interval
+            columns: Dimension columns used for grouping and filtering
+            date_start: Start of the range (a date for daily and longer intervals)
+            date_end: End of the range, exclusive
 
         Returns:
-            str: Table or view name to query from
+            list[QuerySource]: Sources covering the range without overlap
         """
-        if interval in [Interval.INTERVAL, Interval.HOUR]:
-            return self.base_table
-        else:
-            return self.daily_mv or self.base_table
+        if interval not in _DATE_INTERVALS:
+            return [QuerySource(self.base_table, "interval", date_start, date_end)]
+
+        daily = self._get_rollup(Interval.DAY, columns)
+        monthly = self._get_rollup(Interval.MONTH, columns) if interval in _MONTH_INTERVALS else None
+
+        month_start = date_start if date_start.day == 1 else _next_month_start(date_start)
+
+        # monthly rollups only hold months the daily rollup rebuild has closed
+        month_end = min(date_end.replace(day=1), get_rollups_closed_until())
+
+        if monthly and month_start < month_end:
+            sources = [QuerySource(monthly.table, monthly.time_column, month_start, month_end, is_rollup=True)]
+
+            if date_start < month_start:
+                sources.insert(0, self._get_partial_source(daily, date_start, month_start))
 
-    def _get_time_column(self, interval: Interval) -> str:
+            if month_end < date_end:
+                sources.append(self._get_partial_source(daily, month_end, date_end))
+
+            return sources
+
+        if daily:
+            return [QuerySource(daily.table, daily.time_column, date_start, date_end, is_rollup=True)]
+
+        return [QuerySource(self.base_table, "interval", date_start, date_end)]
+
+    def _get_partial_source(
+        self, daily: QueryRollup | None, date_start: datetime | date, date_end: datetime | date
+    ) -> QuerySource:
+        """Source for the part of a range either side of the whole months read from a monthly rollup"""
+        if daily:
+            return QuerySource(daily.table, daily.time_column, date_start, date_end, is_rollup=True)
+
+        return QuerySource(self.base_table, "interval", date_start, date_end)
+
+    def _get_metric_select(self, metric: MetricType, rollup: bool) -> tuple[str, list[str]]:
         """
-        Get the appropriate time column for the interval.
+        Get the aggregate expression for a metric and the columns it reads.
         """
-        if not self.daily_mv and not self.monthly_mv:
-            return "interval"
+        if rollup and metric in self.rollup_metric_selects:
+            return self.rollup_metric_selects[metric]
 
-        if interval in [Interval.INTERVAL, Interval.HOUR]:
-            return "interval"
+        column = self.metric_columns[metric]
 
-        return "date"
+        return f"{self.metric_agg_functions[metric]}({column})", [column]
 
 
+_UNIT_ROLLUP_COLUMNS = frozenset(
+    [
+        "network_id",
+        "network_region",
+        "facility_code",
+        "unit_code",
+        "fueltech_id",
+        "fueltech_group_id",
+        "renewable",
+    ]
+)
+_FUELTECH_ROLLUP_COLUMNS = frozenset(["network_id", "network_region", "fueltech_id", "fueltech_group_id"])
+
+_UNIT_INTERVALS_ROLLUPS = [
+    QueryRollup("fueltech_intervals_monthly", Interval.MONTH, _FUELTECH_ROLLUP_COLUMNS, requires_backfill=True),
+    QueryRollup("unit_intervals_monthly", Interval.MONTH, _UNIT_ROLLUP_COLUMNS, requires_backfill=True),
+    QueryRollup("fueltech_intervals_daily_mv", Interval.DAY, _FUELTECH_ROLLUP_COLUMNS, requires_backfill=True),
+    QueryRollup("unit_intervals_daily_mv", Interval.DAY, _UNIT_ROLLUP_COLUMNS),
+]
+
+_MARKET_SUMMARY_ROLLUP_COLUMNS = frozenset(["network_id", "network_region"])
+
+_MARKET_SUMMARY_ROLLUPS = [
+    QueryRollup("market_summary_monthly", Interval.MONTH, _MARKET_SUMMARY_ROLLUP_COLUMNS, requires_backfill=True),
+]
+
 # Query configurations for different types
 QUERY_CONFIGS = {
     QueryType.MARKET: QueryConfig(
         query_type=QueryType.MARKET,
         base_table="market_summary",
-        daily_mv=None,  # Will be added when market summary MVs are created
-        monthly_mv=None,  # Will be added when market summary MVs are created
         metric_columns={
             MarketMetric.PRICE: "price",
             MarketMetric.DEMAND: "demand",
@@ -105,12 +252,22 @@ QUERY_CONFIGS = {
             MarketMetric.DEMAND: "avg",
             MarketMetric.DEMAND_ENERGY: "sum",
         },
+        rollups=_MARKET_SUMMARY_ROLLUPS,
+        # rollups keep sums and counts so averages are weighted by interval
+        rollup_metric_selects={
+            MarketMetric.PRICE: ("sum(price_sum) / sum(price_count)", ["price_sum", "price_count"]),
+            MarketMetric.DEMAND: ("sum(demand_sum) / sum(demand_count)", ["demand_sum", "demand_count"]),
+        },
+        base_rollup_columns={
+            "price_sum": "price",
+            "price_count": "toUInt64(price IS NOT NULL)",
+            "demand_sum": "demand",
+            "demand_count": "toUInt64(demand IS NOT NULL)",
+        },
     ),
     QueryType.DATA: QueryConfig(
         query_type=QueryType.DATA,
         base_table="unit_intervals",
-        daily_mv="unit_intervals_daily_mv",
-        monthly_mv=None,
         metric_columns={
             DataMetric.POWER: "generated",
             DataMetric.ENERGY: "energy",
@@ -123,12 +280,11 @@ QUERY_CONFIGS = {
             DataMetric.EMISSIONS: "sum",
             DataMetric.MARKET_VALUE: "sum",
         },
+        rollups=_UNIT_INTERVALS_ROLLUPS,
     ),
     QueryType.FACILITY: QueryConfig(
         query_type=QueryType.FACILITY,
         base_table="unit_intervals",
-        daily_mv="unit_intervals_daily_mv",
-        monthly_mv=None,
         metric_columns={
             DataMetric.POWER: "generated",
             DataMetric.ENERGY: "energy",
@@ -141,6 +297,7 @@ QUERY_CONFIGS = {
             DataMetric.EMISSIONS: "sum",
             DataMetric.MARKET_VALUE: "sum",
         },
+        rollups=_UNIT_INTERVALS_ROLLUPS,
     ),
 }
 
@@ -182,21 +339,8 @@ def get_timeseries_query(
     """
     config = QUERY_CONFIGS[query_type]
 
-    # Determine which table/view to use based on interval
-    table_name = config._get_table_for_interval(interval)
-    time_col = config._get_time_column(interval)
-    time_fn = get_interval_function(interval, time_col, database="clickhouse")
-
     # Convert date range to network time if interval is daily or longer
-    if interval in [
-        Interval.DAY,
-        Interval.WEEK,
-        Interval.MONTH,
-        Interval.QUARTER,
-        Interval.YEAR,
-        Interval.SEASON,
-        Interval.FINANCIAL_YEAR,
-    ]:
+    if interval in _DATE_INTERVALS:
         date_start = date_start.date()
         date_end = date_end.date()
 
@@ -210,22 +354,22 @@ def get_timeseries_query(
         # remove the network from the list
         params["network"].remove("OPENNEM_ROOFTOP_BACKFILL")
 
-    # logger.info(f"Querying {table_name} for {network.code} from {date_start} to {date_end}")
-
-    # Build metric selection part
-    metric_selects = [f"{config.metric_agg_functions[m]}({config.metric_columns[m]}) as {m.value.lower()}" for m in metrics]
-
     # Build grouping columns based on query type
     group_cols = [f"'{network.code}' as network"]
     group_cols_names = ["network"]
 
+    # dimension columns the query groups or filters on, used to pick a rollup
+    dimension_cols = {"network_id"}
+
     if query_type == QueryType.FACILITY:
         group_cols.extend(["facility_code", "unit_code"])
         group_cols_names.extend(["facility_code", "unit_code"])
+        dimension_cols.update(["facility_code", "unit_code"])
         params["facility_code"] = facility_code
     elif primary_grouping == PrimaryGrouping.NETWORK_REGION:
         group_cols.append("network_region")
         group_cols_names.append("network_region")
+        dimension_cols.add("network_region")
 
     # Add secondary grouping columns if supported and provided
     if query_type == QueryType.DATA and secondary_groupings:
@@ -233,43 +377,104 @@ def get_timeseries_query(
             if grouping == SecondaryGrouping.RENEWABLE:
                 group_cols.append("renewable")
                 group_cols_names.append("renewable")
+                dimension_cols.add("renewable")
             elif grouping == SecondaryGrouping.FUELTECH:
                 group_cols.append("fueltech_id")
                 group_cols_names.append("fueltech")
+                dimension_cols.add("fueltech_id")
             elif grouping == SecondaryGrouping.FUELTECH_GROUP:
                 group_cols.append("fueltech_group_id")
                 group_cols_names.append("fueltech_group")
+                dimension_cols.add("fueltech_group_id")
 
     # Build the query with facility filter if provided
-    where_clauses = [
-        "network_id in %(network)s",
-        f"{time_col} >= %(date_start)s",
-        f"{time_col} < %(date_end)s",
-    ]
+    filter_clauses = ["network_id in %(network)s"]
 
     if facility_code:
-        where_clauses.append("facility_code in %(facility_code)s")
+        filter_clauses.append("facility_code in %(facility_code)s")
         params["facility_code"] = facility_code
+        dimension_cols.add("facility_code")
 
     if network_region:
-        where_clauses.append("network_region = %(network_region)s")
+        filter_clauses.append("network_region = %(network_region)s")
         params["network_region"] = network_region
+        dimension_cols.add("network_region")
 
     if fueltech:
-        where_clauses.append("fueltech_id = %(fueltech)s")
+        filter_clauses.append("fueltech_id = %(fueltech)s")
         params["fueltech"] = fueltech
+        dimension_cols.add("fueltech_id")
 
     if fueltech_group:
-        where_clauses.append("fueltech_group_id = %(fueltech_group)s")
+        filter_clauses.append("fueltech_group_id = %(fueltech_group)s")
         params["fueltech_group"] = fueltech_group
+        dimension_cols.add("fueltech_group_id")
+
+    # Determine which tables/views to read based on interval, groupings and filters
+    sources = config._get_sources(interval, dimension_cols, date_start, date_end)
+
+    # Build metric selection part
+    metric_selects = []
+    metric_source_cols: list[str] = []
+
+    # sources read alongside a rollup are read as the rollup columns
+    read_rollup = any(s.is_rollup for s in sources)
+
+    for m in metrics:
+        metric_select, metric_cols = config._get_metric_select(m, rollup=read_rollup)
+        metric_selects.append(f"{metric_select} as {m.value.lower()}")
+        metric_source_cols.extend(c for c in metric_cols if c not in metric_source_cols)
+
+    if len(sources) == 1:
+        time_col = sources[0].time_column
+        from_clause = sources[0].table
+        where_clauses: list[str] = [
+            *filter_clauses,
+            f"{time_col} >= %(date_start)s",
+            f"{time_col} < %(date_end)s",
+        ]
+    else:
+        # read whole months and the rest of the range from their sources as one date keyed source
+        time_col = "date"
+        source_selects = []
+
+        for source_num, source in enumerate(sources):
+            params[f"date_start_{source_num}"] = source.date_start
+            params[f"date_end_{source_num}"] = source.date_end
+
+            if source.is_rollup:
+                source_cols = [f"{source.time_column} as date", *sorted(dimension_cols), *metric_source_cols]
+            else:
+                source_cols = [
+                    f"toDate({source.time_column}) as date",
+                    *sorted(dimension_cols),
+                    *(
+                        f"{config.base_rollup_columns[c]} as {c}" if c in config.base_rollup_columns else c
+                        for c in metric_source_cols
+                    ),
+                ]
+
+            source_where = [
+                *filter_clauses,
+                f"{source.time_column} >= %(date_start_{source_num})s",
+                f"{source.time_column} < %(date_end_{source_num})s",
+            ]
+            source_selects.append(f"SELECT {', '.join(source_cols)} FROM {source.table} WHERE {' AND '.join(source_where)}")
+
+        # filters are applied to each source
+        from_clause = f"({' UNION ALL '.join(source_selects)})"
+        where_clauses = []
+
+    time_fn = get_interval_function(interval, time_col, database="clickhouse")
+    where_clause = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
 
     query = f"""
         SELECT
             {time_fn} as interval,
             {", ".join(group_cols)},
             {", ".join(metric_selects)}
-        FROM {table_name}
-        WHERE {" AND ".join(where_clauses)}
+        FROM {from_clause}
+        {where_clause}
         GROUP BY
             interval,
             {", ".join([str(i) for i in range(2, len(group_cols) + 2)])}
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta, timezone
 from textwrap import dedent
 from typing import Any
 
+import numpy as np
 from datetime_truncate import truncate as date_trunc
 from sqlalchemy import text as sql
 
@@ -26,7 +27,14 @@ from opennem.utils.numbers import cast_trailing_nulls
 from opennem.utils.timezone import is_aware, make_aware
 from opennem.utils.version import get_version
 
-from .schema import DataQueryResult, OpennemData, OpennemDataHistory, OpennemDataSet, ScadaDateRange
+from .schema import (
+    DataQueryResult,
+    OpennemData,
+    OpennemDataHistory,
+    OpennemDataHistoryArray,
+    OpennemDataSet,
+    ScadaDateRange,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -47,10 +55,14 @@ def stats_factory(
     cast_nulls: bool | None = True,
     include_code: bool = True,
     exclude_nulls: bool = True,
+    history_array: bool = False,
 ) -> OpennemDataSet:
     """
     Takes a list of data query results and returns OpennemDataSets
 
+    With history_array the histories are built as OpennemDataHistoryArray which is
+    cheaper to hold and serialise for long series.
+
     @TODO optional groupby field
     @TODO multiple groupings / slight refactor
 
@@ -140,12 +152,22 @@ def stats_factory(
         # free
         dates = []
 
-        history = OpennemDataHistory(
-            start=start,
-            last=end,
-            interval=interval.interval_human,
-            data=[cast_float_or_none(i) for i in data_trimmed.values()],
-        )
+        history: OpennemDataHistory | OpennemDataHistoryArray
+
+        if history_array:
+            history = OpennemDataHistoryArray(
+                start=start,
+                last=end,
+                interval=interval.interval_human,
+                data=np.array(data_value, dtype=np.float64),
+            )
+        else:
+            history = OpennemDataHistory(
+                start=start,
+                last=end,
+                interval=interval.interval_human,
+                data=[cast_float_or_none(i) for i in data_trimmed.values()],
+            )
 
         data = OpennemData(
             data_type=units.unit_type,
@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import Annotated, Any
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pydantic
 import requests
 from datedelta import datedelta
@@ -74,6 +75,12 @@ def format_number_series(values: list[ValidNumberOrNull]) -> list[ValidNumberOrN
     )
 
 
+def format_number_array(values: np.ndarray) -> list[float | None]:
+    """Format a float array for data series outputs the same as OpennemDataHistory with NaN output
+    as null. The array is converted to python floats in a single pass before rounding"""
+    return [None if math.isnan(i) else cast_float_or_none(i) for i in np.asarray(values, dtype=np.float64).tolist()]
+
+
 def optionally_parse_string_datetime(value: str | datetime | date | None = None) -> str | datetime | date | None:
     if not value:
         return value
@@ -143,6 +150,59 @@ class OpennemDataHistory(BaseConfig):
         return timeseries_data
 
 
+class OpennemDataHistoryArray(BaseConfig):
+    """
+    History backed by a float64 array with NaN for nulls.
+
+    Serialises to the same output as OpennemDataHistory. Used
+    for long series (ie. the all-history exports) so values aren't held as python objects.
+    """
+
+    start: datetime
+    last: datetime
+    interval: str
+    data: Annotated[
+        np.ndarray,
+        PlainSerializer(format_number_array, return_type=list[float | None]),
+    ] = pydantic.Field(..., description="Data values")
+
+    @field_validator("data", mode="before")
+    @classmethod
+    def validate_data_array(cls, value: Any) -> np.ndarray:
+        return np.asarray(value, dtype=np.float64)
+
+    @classmethod
+    def from_history(cls, history: OpennemDataHistory | OpennemDataHistoryArray) -> OpennemDataHistoryArray:
+        if isinstance(history, OpennemDataHistoryArray):
+            return history
+
+        return cls(start=history.start, last=history.last, interval=history.interval, data=history.data)
+
+    def to_history(self) -> OpennemDataHistory:
+        return OpennemDataHistory(start=self.start, last=self.last, interval=self.interval, data=format_number_array(self.data))
+
+    def get_date(self, dt: date) -> ValidNumberOrNull:
+        """Get value for a specific date"""
+        return self.to_history().get_date(dt)
+
+    def get_interval(self) -> timedelta | datedelta:
+        return get_human_interval(self.interval)
+
+    def values(self) -> list[tuple[datetime, ValidNumberOrNull]]:
+        return self.to_history().values()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, OpennemDataHistoryArray):
+            return False
+
+        return (
+            self.start == other.start
+            and self.last == other.last
+            and self.interval == other.interval
+            and np.array_equal(self.data, other.data, equal_nan=True)
+        )
+
+
 class OpennemData(BaseConfig):
     id: str | None = None
     type: str | None = None
@@ -157,8 +217,8 @@ class OpennemData(BaseConfig):
     interval: TimeIntervalAPI | None = None
     period: TimePeriodAPI | None = None
 
-    history: OpennemDataHistory
-    forecast: OpennemDataHistory | None = None
+    history: OpennemDataHistory | OpennemDataHistoryArray
+    forecast: OpennemDataHistory | OpennemDataHistoryArray | None = None
 
     x_capacity_at_present: float | None = None
 
@@ -249,14 +309,22 @@ class OpennemDataSet(BaseConfig):
         # if they are not set, set them to the first and last values
         if VALIDATE_DATE_ENDS:
             max_date = max(
-                [i.history.last for i in value if i.history and i.history.last and isinstance(i.history, OpennemDataHistory)]
+                [
+                    i.history.last
+                    for i in value
+                    if i.history and i.history.last and isinstance(i.history, OpennemDataHistory | OpennemDataHistoryArray)
+                ]
             )
             min_date = min(
-                [i.history.start for i in value if i.history and i.history.start and isinstance(i.history, OpennemDataHistory)]
+                [
+                    i.history.start
+                    for i in value
+                    if i.history and i.history.start and isinstance(i.history, OpennemDataHistory | OpennemDataHistoryArray)
+                ]
             )
 
             for i in value:
-                if not isinstance(i.history, OpennemDataHistory):
+                if not isinstance(i.history, OpennemDataHistory | OpennemDataHistoryArray):
                     continue
 
                 if i.history.last < max_date:
@@ -9,6 +9,8 @@ from collections.abc import Sequence
 from datetime import datetime
 from typing import Any
 
+import numpy as np
+import polars as pl
 from pydantic import ConfigDict, computed_field, model_validator
 
 from opennem.api.utils import get_api_network_from_code
@@ -134,17 +136,71 @@ class TimeSeries(BaseConfig):
         return self
 
 
-def format_timeseries_response(
+def _cast_columns_to_booleans(columns: dict[str, Any]) -> dict[str, Any]:
+    """Same conversion as TimeSeriesResult.cast_columns_to_booleans for constructed results"""
+    for key, value in columns.items():
+        if isinstance(value, str) and value.lower() in ("true", "false"):
+            columns[key] = value.lower() == "true"
+
+    return columns
+
+
+def _round_significant_figures(values: pl.Series, sig_figs: int = 8) -> list[float | None]:
+    """Vectorised version of the SignificantFigures8 field validator. Nulls and NaN become None"""
+    array = values.cast(pl.Float64).to_numpy().copy()
+    rounded = array.copy()
+
+    round_mask = np.isfinite(array) & (array != 0)
+    decimals = np.zeros(len(array), dtype=np.int64)
+    decimals[round_mask] = sig_figs - 1 - np.floor(np.log10(np.abs(array[round_mask]))).astype(np.int64)
+
+    for decimal in np.unique(decimals[round_mask]):
+        decimal_mask = round_mask & (decimals == decimal)
+        rounded[decimal_mask] = np.round(array[decimal_mask], int(decimal))
+
+    return pl.Series(values=rounded, dtype=pl.Float64).fill_nan(None).to_list()
+
+
+def _get_label_columns(
+    primary_grouping: PrimaryGrouping,
+    secondary_groupings: Sequence[SecondaryGrouping] | None,
+    facility_code: str | list[str] | None = None,
+) -> list[tuple[str, str]]:
+    """Get the (label, result column) pairs that make up a series label in grouping order"""
+    if facility_code:
+        return [("unit_code", "unit_code")]
+
+    label_columns = []
+
+    if primary_grouping == PrimaryGrouping.NETWORK_REGION:
+        label_columns.append(("region", "network_region"))
+
+    for grouping in secondary_groupings or []:
+        if grouping == SecondaryGrouping.RENEWABLE:
+            label_columns.append(("renewable", "renewable"))
+        elif grouping == SecondaryGrouping.FUELTECH:
+            label_columns.append(("fueltech", "fueltech"))
+        elif grouping == SecondaryGrouping.FUELTECH_GROUP:
+            label_columns.append(("fueltech_group", "fueltech_group"))
+
+    return label_columns
+
+
+def format_timeseries_response_columnar(
     network: str,
     metrics: list[MetricType],
     interval: Interval,
     primary_grouping: PrimaryGrouping,
     secondary_groupings: Sequence[SecondaryGrouping] | None,
-    results: Sequence[dict[str, Any]],
-    facility_code: str | None = None,
+    columns: dict[str, Sequence[Any]],
+    facility_code: str | list[str] | None = None,
 ) -> list[TimeSeries]:
     """
-    Format time series query results into the API response format.
+    Format columnar time series query results into the API response format.
+
+    Results are grouped into series once for all metrics and each series is sorted by
+    interval. Values are rounded column-wise and the results are constructed without
+    re-validating every data point.
 
     Args:
         network: Network code
@@ -152,123 +208,123 @@ def format_timeseries_response(
         interval: Time interval used
         primary_grouping: Primary grouping that was applied
         secondary_groupings: Optional sequence of secondary groupings that were applied
-        results: Query results as sequence of dictionaries
+        columns: Query results as a mapping of column name to column values
         facility_code: Optional facility code for facility-level queries
 
     Returns:
         list[TimeSeries]: List of time series objects, one per metric
     """
-    # Get network timezone
     network_obj = get_api_network_from_code(network)
     tz_offset = network_obj.get_fixed_offset()
 
-    # Initialize response objects for each metric
+    df = pl.DataFrame({name: list(values) for name, values in columns.items()}, strict=False)
+
+    if df.is_empty():
+        return []
+
+    # intervals are in network time. dates are the start of the day. polars doesn't accept
+    # fixed offset zones so intervals stay naive and the offset is attached to the values
+    if df.schema["interval"] == pl.Date:
+        df = df.with_columns(pl.col("interval").cast(pl.Datetime))
+    elif getattr(df.schema["interval"], "time_zone", None):
+        df = df.with_columns(pl.col("interval").dt.replace_time_zone(None))
+
+    date_start = df.get_column("interval").min().replace(tzinfo=tz_offset)  # type: ignore
+    date_end = df.get_column("interval").max().replace(tzinfo=tz_offset)  # type: ignore
+
+    label_columns = _get_label_columns(primary_grouping, secondary_groupings, facility_code)
+    group_columns = [column for _, column in label_columns]
+
+    # groups are kept in the order they first appear in the results
+    partitions = df.partition_by(group_columns, maintain_order=True) if group_columns else [df]
+
+    series_groups = []
+
+    for partition in partitions:
+        partition = partition.sort("interval", maintain_order=True)
+        first_row = partition.row(0, named=True)
+
+        if facility_code:
+            label_key = str(first_row["unit_code"])
+            labels: dict[str, Any] = {"unit_code": label_key}
+        else:
+            label_key = "|".join(str(first_row[column]) for column in group_columns) if group_columns else "total"
+            labels = {label: first_row[column] for label, column in label_columns}
+
+        series_groups.append(
+            (
+                label_key,
+                _cast_columns_to_booleans(labels),
+                [i.replace(tzinfo=tz_offset) for i in partition.get_column("interval").to_list()],
+                {metric: _round_significant_figures(partition.get_column(metric.value.lower())) for metric in metrics},
+            )
+        )
+
     timeseries_list = []
 
     for metric in metrics:
         metric_name = metric.value.lower()
 
-        # Group results by the grouping dimensions
-        grouped_results = {}
-
-        for row in results:
-            # Apply timezone to interval
-            if isinstance(row["interval"], datetime):
-                row["interval"] = row["interval"].replace(tzinfo=tz_offset)
-
-            # Build label key based on groupings
-            label_parts = []
-
-            if facility_code:
-                # For facility queries, group by unit_code
-                label_key = str(row["unit_code"])
-                labels = {"unit_code": str(row["unit_code"])}
-            else:
-                # For network queries, use primary and secondary groupings
-                if primary_grouping == PrimaryGrouping.NETWORK_REGION:
-                    label_parts.append(row["network_region"])
-
-                if secondary_groupings:
-                    for grouping in secondary_groupings:
-                        if grouping == SecondaryGrouping.RENEWABLE:
-                            label_parts.append(str(row["renewable"]))
-                        elif grouping == SecondaryGrouping.FUELTECH:
-                            label_parts.append(row["fueltech"])
-                        elif grouping == SecondaryGrouping.FUELTECH_GROUP:
-                            label_parts.append(row["fueltech_group"])
-
-                label_key = "|".join(label_parts) if label_parts else "total"
-
-                # Build labels dictionary
-                labels = {}
-                if primary_grouping == PrimaryGrouping.NETWORK_REGION:
-                    labels["region"] = row["network_region"]
-                if secondary_groupings:
-                    for grouping in secondary_groupings:
-                        if grouping == SecondaryGrouping.RENEWABLE:
-                            labels["renewable"] = row["renewable"]
-                        elif grouping == SecondaryGrouping.FUELTECH:
-                            labels["fueltech"] = row["fueltech"]
-                        elif grouping == SecondaryGrouping.FUELTECH_GROUP:
-                            labels["fueltech_group"] = row["fueltech_group"]
-
-            # Initialize group if not exists
-            if label_key not in grouped_results:
-                grouped_results[label_key] = {
-                    "name": f"{metric_name}_{label_key}",
-                    "network": network,
-                    "interval": interval.value,
-                    "data": [],
-                    "labels": labels,
-                }
-                if facility_code:
-                    grouped_results[label_key]["facility_code"] = facility_code
-
-            # Add data point with timezone-aware timestamp
-            if isinstance(row["interval"], datetime):
-                grouped_results[label_key]["data"].append(
-                    [row["interval"].timestamp() * 1000, float(row[metric_name]) if row[metric_name] is not None else None]
-                )
-            else:
-                grouped_results[label_key]["data"].append([row["interval"], float(row[metric_name])])
-
-        # Sort data points by timestamp
-        for group in grouped_results.values():
-            group["data"] = [
-                # (timestamp.replace(tzinfo=tz_offset), value) if timestamp else (timestamp, value)
-                (
-                    datetime.fromtimestamp(timestamp / 1000, tz=tz_offset)
-                    if isinstance(timestamp, float)
-                    else datetime.combine(timestamp, datetime.min.time(), tzinfo=tz_offset),
-                    value,
-                )
-                for timestamp, value in group["data"]
-            ]
-            group["data"].sort(key=lambda x: x[0])
-
-        # Get timezone-aware start and end dates
-        date_start = min(row["interval"] for row in results)
-        date_end = max(row["interval"] for row in results)
-
-        # Create TimeSeries for this metric
         timeseries = TimeSeries(
             network_code=network,
             metric=metric,
             interval=interval,
-            date_start=date_start,  # Already timezone-aware
-            date_end=date_end,  # Already timezone-aware
+            date_start=date_start,
+            date_end=date_end,
             groupings=[primary_grouping.value] + [g.value.lower() for g in secondary_groupings] if secondary_groupings else [],
             results=[
-                TimeSeriesResult(
-                    name=group["name"],
-                    date_start=date_start,  # Already timezone-aware
-                    date_end=date_end,  # Already timezone-aware
-                    columns=group["labels"],
-                    data=group["data"],
+                TimeSeriesResult.model_construct(
+                    name=f"{metric_name}_{label_key}",
+                    date_start=date_start,
+                    date_end=date_end,
+                    columns=dict(labels),
+                    data=list(zip(intervals, values[metric], strict=True)),
                 )
-                for group in grouped_results.values()
+                for label_key, labels, intervals, values in series_groups
             ],
         )
         timeseries_list.append(timeseries)
 
     return timeseries_list
+
+
+def format_timeseries_response(
+    network: str,
+    metrics: list[MetricType],
+    interval: Interval,
+    primary_grouping: PrimaryGrouping,
+    secondary_groupings: Sequence[SecondaryGrouping] | None,
+    results: Sequence[dict[str, Any]],
+    facility_code: str | None = None,
+) -> list[TimeSeries]:
+    """
+    Format time series query results into the API response format.
+
+    Row based wrapper around format_timeseries_response_columnar.
+
+    Args:
+        network: Network code
+        metrics: List of metrics that were queried
+        interval: Time interval used
+        primary_grouping: Primary grouping that was applied
+        secondary_groupings: Optional sequence of secondary groupings that were applied
+        results: Query results as sequence of dictionaries
+        facility_code: Optional facility code for facility-level queries
+
+    Returns:
+        list[TimeSeries]: List of time series objects, one per metric
+    """
+    if not results:
+        return []
+
+    columns = {column: [row[column] for row in results] for column in results[0]}
+
+    return format_timeseries_response_columnar(
+        network=network,
+        metrics=metrics,
+        interval=interval,
+        primary_grouping=primary_grouping,
+        secondary_groupings=secondary_groupings,
+        columns=columns,
+        facility_code=facility_code,
+    )
@@ -15,7 +15,7 @@ from datetime import datetime
 
 from pydantic import ValidationError
 
-from opennem.core.battery import get_battery_unit_map
+from opennem.core.battery import get_battery_unit_remapper
 from opennem.persistence.schema import BalancingSummarySchema, FacilityScadaSchema
 from opennem.utils.archive import download_and_parse_json_zip
 
@@ -69,32 +69,20 @@ async def wemde_parse_facilityscada(url: str) -> list[FacilityScadaSchema]:
 
     models = []
 
-    # Get battery unit mappings
-    battery_unit_map = await get_battery_unit_map()
-
-    # Create a function to map facility codes based on generated value
-    def _map_battery_code(facility_code: str, generated: float) -> tuple[str, float]:
-        if facility_code in battery_unit_map:
-            battery_map = battery_unit_map[facility_code]
-            if generated < 0:
-                return battery_map.charge_unit, abs(generated)
-            else:
-                return battery_map.discharge_unit, generated
-        return facility_code, generated
+    # remap bidirectional battery units in one pass over all records
+    battery_remapper = await get_battery_unit_remapper()
+    facility_codes, quantities = battery_remapper.remap(
+        [entry.get("code") for entry in json_records],
+        [entry.get("quantity", 0) for entry in json_records],
+    )
 
     # map fields
-    for entry in json_records:
+    for entry, facility_code, quantity in zip(json_records, facility_codes, quantities, strict=True):
         interval = datetime.fromisoformat(entry.get("dispatchInterval"))
 
         # strip timezone from interval
         interval = interval.replace(tzinfo=None)
 
-        facility_code = entry.get("code")
-        quantity = entry.get("quantity", 0)
-
-        # map battery facility code if needed
-        facility_code, quantity = _map_battery_code(facility_code, quantity)
-
         try:
             m = FacilityScadaSchema(
                 **{
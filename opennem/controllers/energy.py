@@ -17,6 +17,7 @@ async def energy_fueltech_daily_v3(
     network: NetworkSchema,
     time_series: OpennemExportSeries,
     network_region_code: str | None = None,
+    history_array: bool = False,
 ) -> OpennemDataSet:
     engine = db_connect()
     units = get_unit("energy_giga")
@@ -61,6 +62,7 @@ async def energy_fueltech_daily_v3(
         region=network_region_code,
         localize=True,
         code=network.code.lower(),
+        history_array=history_array,
     )
 
     stats_market_value = stats_factory(
@@ -72,6 +74,7 @@ async def energy_fueltech_daily_v3(
         region=network_region_code,
         localize=True,
         code=network.code.lower(),
+        history_array=history_array,
     )
 
     stats.append_set(stats_market_value)
@@ -85,6 +88,7 @@ async def energy_fueltech_daily_v3(
         region=network_region_code,
         localize=True,
         code=time_series.network.code.lower(),
+        history_array=history_array,
     )
 
     stats.append_set(stats_emissions)
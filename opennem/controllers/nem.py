@@ -4,17 +4,18 @@ Parses MMS tables into OpenNEM derived database
 """
 
 import logging
-from collections.abc import Hashable
+from collections.abc import Hashable, Iterable
 from typing import Any
 
 import pandas as pd
 from sqlalchemy.dialects.postgresql import insert
 
+from opennem.aggregates.watermark import mark_intervals_dirty
 from opennem.controllers.schema import ControllerReturn
-from opennem.core.battery import get_battery_unit_map
+from opennem.core.battery import get_battery_unit_remapper
 from opennem.core.networks import NetworkNEM
 from opennem.core.normalizers import clean_float
-from opennem.core.parsers.aemo.mms import AEMOTableSchema, AEMOTableSet
+from opennem.core.parsers.aemo.mms import AEMOTableBatch, AEMOTableSchema, AEMOTableSet
 from opennem.db import get_write_session
 from opennem.db.bulk_insert_csv import bulkinsert_mms_items
 from opennem.db.models.opennem import BalancingSummary, FacilityScada
@@ -78,35 +79,9 @@ async def generate_facility_scada(
 
     df = df[FACILITY_SCADA_COLUMN_NAMES]
 
-    # Get battery unit mappings
-    battery_unit_map = await get_battery_unit_map()
-
-    # Create a function to map facility codes based on generated value
-    def map_battery_code(row):
-        facility_code = row["facility_code"]
-        generated = row["generated"]
-
-        if facility_code in battery_unit_map:
-            battery_map = battery_unit_map[facility_code]
-            if generated < 0:
-                return battery_map.charge_unit
-            else:
-                return battery_map.discharge_unit
-        return facility_code
-
-    def map_battery_generation(row):
-        facility_code = row["facility_code"]
-        generated = row["generated"]
-
-        for _, battery_map in battery_unit_map.items():
-            if facility_code == battery_map.charge_unit:
-                return abs(generated)
-
-        return generated
-
-    # Apply the mapping function
-    df["facility_code"] = df.apply(map_battery_code, axis=1)
-    df["generated"] = df.apply(map_battery_generation, axis=1)
+    # remap bidirectional battery units into charge and discharge units
+    battery_remapper = await get_battery_unit_remapper()
+    df["facility_code"], df["generated"] = battery_remapper.remap(df["facility_code"], df["generated"])
 
     # fill in energies
     df["energy"] = df.generated / (60 / network.interval_size)
@@ -395,6 +370,11 @@ async def process_trading_regionsum(table: AEMOTableSchema) -> ControllerReturn:
     return cr
 
 
+async def _mark_facility_scada_dirty(records: list[dict]) -> None:
+    """Mark the intervals written to facility_scada so unit intervals only re-aggregates those"""
+    await mark_intervals_dirty((i["network_id"], i["interval"]) for i in records if not i.get("is_forecast"))
+
+
 async def process_unit_scada_optimized(table: AEMOTableSchema) -> ControllerReturn:
     cr = ControllerReturn(total_records=len(table.records))
 
@@ -407,6 +387,7 @@ async def process_unit_scada_optimized(table: AEMOTableSchema) -> ControllerRetu
 
     cr.processed_records = len(records)
     cr.inserted_records = await bulkinsert_mms_items(FacilityScada, records, ["generated", "energy"])  # type: ignore
+    await _mark_facility_scada_dirty(records)
     cr.server_latest = max([i["interval"] for i in records if i["interval"]])
 
     return cr
@@ -424,6 +405,7 @@ async def process_unit_solution(table: AEMOTableSchema) -> ControllerReturn:
 
     cr.processed_records = len(records)
     cr.inserted_records = await bulkinsert_mms_items(FacilityScada, records, ["generated", "energy"])
+    await _mark_facility_scada_dirty(records)
     cr.server_latest = max([i["interval"] for i in records if i["interval"]])
 
     return cr
@@ -441,6 +423,7 @@ async def process_meter_data_gen_duid(table: AEMOTableSchema) -> ControllerRetur
 
     cr.processed_records = len(records)
     cr.inserted_records = await bulkinsert_mms_items(FacilityScada, records, ["generated", "energy"])
+    await _mark_facility_scada_dirty(records)
     cr.server_latest = max([i["interval"] for i in records])
 
     return cr
@@ -462,6 +445,7 @@ async def process_rooftop_actual(table: AEMOTableSchema) -> ControllerReturn:
 
     cr.processed_records = len(records)
     cr.inserted_records = await bulkinsert_mms_items(FacilityScada, records, ["generated", "energy"])
+    await _mark_facility_scada_dirty(records)
     cr.server_latest = max([i["interval"] for i in records])
 
     return cr
@@ -542,3 +526,30 @@ async def store_aemo_tableset(tableset: AEMOTableSet) -> ControllerReturn:
     logger.info(f"Stored {cr.inserted_records} records of {cr.total_records} in {len(tableset.tables)} tables")
 
     return cr
+
+
+async def store_aemo_table_batches(batches: Iterable[AEMOTableBatch]) -> ControllerReturn:
+    """Store a stream of table batches from iter_aemo_mms_csv_batches
+
+    Each batch is stored and released before the next one is read so memory stays
+    bounded by the batch size rather than the size of the source file.
+    """
+    cr = ControllerReturn()
+
+    for batch in batches:
+        if batch.full_name not in _TABLE_PROCESSOR_MAP:
+            logger.debug("No processor for table %s", batch.full_name)
+            continue
+
+        batch_cr = await store_aemo_tableset(batch.to_table_set())
+
+        cr.processed_records += batch_cr.processed_records
+        cr.total_records += batch_cr.total_records
+        cr.inserted_records += batch_cr.inserted_records
+        cr.errors += batch_cr.errors
+        cr.error_detail += batch_cr.error_detail
+
+        if batch_cr.server_latest and (not cr.server_latest or batch_cr.server_latest > cr.server_latest):
+            cr.server_latest = batch_cr.server_latest
+
+    return cr
@@ -8,7 +8,9 @@ It is called from the NEM crawl controller.
 """
 
 import logging
+from collections.abc import Sequence
 
+import pandas as pd
 from pydantic import BaseModel
 from sqlalchemy import select, text
 
@@ -31,6 +33,48 @@ class BatteryUnitMap(BaseModel):
 UNIT_MAP: dict[DUIDType, BatteryUnitMap] = {}
 
 
+class BatteryUnitRemapper:
+    """Vectorised remapping of bidirectional battery units into their charge and discharge units
+
+    Lookup tables are built once from a battery unit map and applied to whole columns
+    with hash joins and masks rather than per row.
+    """
+
+    def __init__(self, unit_map: dict[str, BatteryUnitMap]) -> None:
+        self.unit_map = unit_map
+        self.charge_units: dict[str, str] = {code: m.charge_unit for code, m in unit_map.items()}
+        self.discharge_units: dict[str, str] = {code: m.discharge_unit for code, m in unit_map.items()}
+        self.charge_unit_codes: list[str] = sorted({m.charge_unit for m in unit_map.values()})
+
+    def remap(
+        self, facility_codes: pd.Series | Sequence[str], generated: pd.Series | Sequence[float]
+    ) -> tuple[pd.Series, pd.Series]:
+        """Remap facility codes and generated values
+
+        Bidirectional units map to their charge unit when generated is negative and their
+        discharge unit otherwise. Values for any charge unit are made positive.
+        """
+        codes = facility_codes if isinstance(facility_codes, pd.Series) else pd.Series(facility_codes, dtype=object)
+        values = pd.to_numeric(pd.Series(generated, index=codes.index))
+
+        if not self.unit_map:
+            return codes, values
+
+        charge_code = codes.map(self.charge_units)
+        discharge_code = codes.map(self.discharge_units)
+
+        is_battery = charge_code.notna()
+        is_charging = is_battery & (values < 0)
+
+        codes = codes.mask(is_charging, charge_code).mask(is_battery & ~is_charging, discharge_code)
+        values = values.mask(codes.isin(self.charge_unit_codes), values.abs())
+
+        return codes, values
+
+
+_UNIT_REMAPPER: BatteryUnitRemapper | None = None
+
+
 async def get_battery_unit_map() -> dict[str, BatteryUnitMap]:
     """Get the battery unit mapping, generating it if not already cached.
 
@@ -43,6 +87,18 @@ async def get_battery_unit_map() -> dict[str, BatteryUnitMap]:
     return UNIT_MAP
 
 
+async def get_battery_unit_remapper() -> BatteryUnitRemapper:
+    """Get the vectorised battery remapper, rebuilt only when the battery unit map changes"""
+    global _UNIT_REMAPPER
+
+    unit_map = await get_battery_unit_map()
+
+    if not _UNIT_REMAPPER or _UNIT_REMAPPER.unit_map is not unit_map:
+        _UNIT_REMAPPER = BatteryUnitRemapper(unit_map)
+
+    return _UNIT_REMAPPER
+
+
 def _generate_manual_battery_unit_map() -> dict[str, BatteryUnitMap]:
     """This is a manual map of bidirectional units to their charge/discharge units"""
     return {"COLLIE_ESR1": BatteryUnitMap(unit="COLLIE_ESR1", charge_unit="COLLIE_ESRL1", discharge_unit="COLLIE_ESRG1")}
@@ -2,21 +2,50 @@
 OpenNEM Crawler Meta
 
 Gets metadata about crawls from the database
+
+Metadata is cached in process. Writes are batched into a single upsert per crawler and published
+on a Redis channel so the caches in other workers stay coherent. If the channel listener fails
+the cache is dropped and reloaded from the database on the next read.
 """
 
+import asyncio
+import json
 import logging
 from datetime import datetime
 from enum import Enum
 from typing import Any
 
-from sqlalchemy import select
+from arq import ArqRedis
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from opennem.db import SessionLocal
 from opennem.db.models.opennem import CrawlMeta
+from opennem.tasks.broker import get_redis_pool
 
 logger = logging.getLogger("opennem.crawler.meta")
 
+CRAWLER_META_CHANNEL = "opennem:crawler-meta"
+
+# server_latest only moves forward, every other key is overwritten
+_CRAWLER_META_UPSERT_QUERY = """
+    INSERT INTO crawl_meta (spider_name, data)
+    VALUES (:spider_name, CAST(:data AS jsonb))
+    ON CONFLICT (spider_name) DO UPDATE SET
+        data = coalesce(crawl_meta.data, '{}'::jsonb) || (excluded.data - 'server_latest') || (
+            CASE WHEN
+                excluded.data ? 'server_latest'
+                AND (
+                    crawl_meta.data->>'server_latest' IS NULL
+                    OR (excluded.data->>'server_latest')::timestamptz > (crawl_meta.data->>'server_latest')::timestamptz
+                )
+            THEN jsonb_build_object('server_latest', excluded.data->'server_latest')
+            ELSE '{}'::jsonb END
+        ),
+        updated_at = now()
+    RETURNING data
+"""
+
 
 class CrawlStatTypes(Enum):
     # version of crawler
@@ -41,6 +70,20 @@ class CrawlStatTypes(Enum):
     data = "data"
 
 
+_crawler_meta_cache: dict[str, dict[str, Any]] | None = None
+_crawler_meta_listener: asyncio.Task | None = None
+_redis_pool: ArqRedis | None = None
+
+
+async def _get_crawler_meta_redis() -> ArqRedis:
+    global _redis_pool
+
+    if _redis_pool is None:
+        _redis_pool = await get_redis_pool()
+
+    return _redis_pool
+
+
 async def crawlers_get_all_meta() -> dict[str, Any]:
     """Get all crawler metadata"""
     crawler_meta_dict = {}
@@ -77,64 +120,96 @@ async def crawler_get_all_meta(crawler_name: str, session: AsyncSession) -> dict
     return spider_meta.data
 
 
-async def crawler_get_meta(crawler_name: str, key: CrawlStatTypes) -> str | datetime | None:
-    """Crawler get specific stat type from metadata for crawler name"""
-    async with SessionLocal() as session:
-        stmt = select(CrawlMeta).filter_by(spider_name=crawler_name)
-        result = await session.execute(stmt)
-        spider_meta = result.scalar_one_or_none()
+def _parse_meta_value(key: CrawlStatTypes, value: Any) -> Any:
+    if key in [
+        CrawlStatTypes.latest_processed,
+        CrawlStatTypes.last_crawled,
+        CrawlStatTypes.server_latest,
+    ]:
+        return datetime.fromisoformat(value)
 
-        if not spider_meta:
-            return None
+    return value
 
-        if not spider_meta.data:
-            return None
 
-        if key.value not in spider_meta.data:
-            return None
+async def _listen_crawler_meta() -> None:
+    """Apply crawler metadata published by other workers to the cache"""
+    global _crawler_meta_cache
 
-        _val = spider_meta.data[key.value]
+    try:
+        redis = await _get_crawler_meta_redis()
 
-        if key in [
-            CrawlStatTypes.latest_processed,
-            CrawlStatTypes.last_crawled,
-            CrawlStatTypes.server_latest,
-        ]:
-            _val_processed = datetime.fromisoformat(_val)
-            return _val_processed
+        async with redis.pubsub() as pubsub:
+            await pubsub.subscribe(CRAWLER_META_CHANNEL)
 
-        return _val
+            async for message in pubsub.listen():
+                if message["type"] != "message" or _crawler_meta_cache is None:
+                    continue
 
+                update = json.loads(message["data"])
+                _crawler_meta_cache[update["crawler_name"]] = update["data"]
+    except Exception as e:
+        logger.error(f"Crawler meta listener stopped: {e}")
+        _crawler_meta_cache = None
 
-async def crawler_set_meta(crawler_name: str, key: CrawlStatTypes, value: Any) -> None:
-    """Set a crawler metadata stat type by name"""
-    async with SessionLocal() as session:
-        if key == CrawlStatTypes.server_latest:
-            current_value = await crawler_get_meta(crawler_name, key)
 
-            try:
-                if current_value and current_value >= value:
-                    return None
-            except TypeError:
-                logger.error(f"Error comparing {current_value} ({type(current_value)}) and {value} ({type(value)})")
+async def get_crawler_meta_cache() -> dict[str, dict[str, Any]]:
+    """Get the cached metadata for all crawlers, loading it and subscribing to updates on first use"""
+    global _crawler_meta_cache, _crawler_meta_listener
 
-        stmt = select(CrawlMeta).filter_by(spider_name=crawler_name)
-        result = await session.execute(stmt)
-        spider_meta = result.scalar_one_or_none()
+    if _crawler_meta_listener is None or _crawler_meta_listener.done():
+        _crawler_meta_listener = asyncio.create_task(_listen_crawler_meta())
 
-        if not spider_meta:
-            spider_meta = CrawlMeta(spider_name=crawler_name, data={})
+    if _crawler_meta_cache is None:
+        _crawler_meta_cache = await crawlers_get_all_meta()
 
-        if isinstance(value, datetime):
-            value = value.isoformat()
+    return _crawler_meta_cache
 
-        spider_meta.data[key.value] = value
 
-        logger.debug(f"Spider {crawler_name} meta: Set {key.value} to {value}")
+async def crawler_get_meta(crawler_name: str, key: CrawlStatTypes) -> str | datetime | None:
+    """Crawler get specific stat type from metadata for crawler name"""
+    crawler_meta = (await get_crawler_meta_cache()).get(crawler_name)
+
+    if not crawler_meta or key.value not in crawler_meta:
+        return None
+
+    return _parse_meta_value(key, crawler_meta[key.value])
+
+
+async def crawler_set_meta_batch(crawler_name: str, values: dict[CrawlStatTypes, Any]) -> None:
+    """
+    Set crawler metadata stat types by name in a single upsert
+
+    server_latest is only updated when it is later than the stored value. The stored metadata is
+    written to the cache and published to other workers.
+    """
+    global _crawler_meta_cache
+
+    if not values:
+        return None
 
-        session.add(spider_meta)
+    data = {key.value: value.isoformat() if isinstance(value, datetime) else value for key, value in values.items()}
+
+    async with SessionLocal() as session:
+        result = await session.execute(text(_CRAWLER_META_UPSERT_QUERY), {"spider_name": crawler_name, "data": json.dumps(data)})
+        crawler_meta = result.scalar_one()
         await session.commit()
 
+    logger.debug(f"Spider {crawler_name} meta: Set {data}")
+
+    if _crawler_meta_cache is not None:
+        _crawler_meta_cache[crawler_name] = crawler_meta
+
+    try:
+        redis = await _get_crawler_meta_redis()
+        await redis.publish(CRAWLER_META_CHANNEL, json.dumps({"crawler_name": crawler_name, "data": crawler_meta}))
+    except Exception as e:
+        logger.error(f"Could not publish crawler meta for {crawler_name}: {e}")
+
+
+async def crawler_set_meta(crawler_name: str, key: CrawlStatTypes, value: Any) -> None:
+    """Set a crawler metadata stat type by name"""
+    await crawler_set_meta_batch(crawler_name, {key: value})
+
 
 if __name__ == "__main__":
     import asyncio
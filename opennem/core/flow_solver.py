@@ -75,33 +75,118 @@ class RegionDemandEmissions:
 class NetworkRegionsDemandEmissions:
     """For a network contains a list of regions and the demand and emissions for each
     region.
+
+    Backed either by a list of RegionDemandEmissions or by a columnar frame (see
+    from_dataframe). Lookups go through an (interval, region) hash index built on first
+    use. Assigning data resets the index, in place mutation of the list does not.
     """
 
-    def __init__(self, network: NetworkSchema, data: list[RegionDemandEmissions]):
-        self.data = data
+    frame_columns = ["interval", "region_code", "energy_mwh", "emissions_t", "generated_mw"]
+
+    # column names as returned by load_energy_and_emissions_for_intervals
+    _frame_column_aliases = {
+        "network_region": "region_code",
+        "energy": "energy_mwh",
+        "emissions": "emissions_t",
+        "generated": "generated_mw",
+    }
+
+    def __init__(
+        self,
+        network: NetworkSchema,
+        data: list[RegionDemandEmissions] | None = None,
+        frame: pd.DataFrame | None = None,
+    ):
         self.network = network
+        self._data = data
+        self._frame = frame
+        self._index: dict[tuple[datetime, Region], int] | None = None
+
+        if data is None and frame is None:
+            self._data = []
+
+    @classmethod
+    def from_dataframe(cls, network: NetworkSchema, df: pd.DataFrame) -> "NetworkRegionsDemandEmissions":
+        """Build from a frame of region energy and emissions without creating per-row dataclasses"""
+        frame = df.rename(columns=cls._frame_column_aliases)
+
+        for column in cls.frame_columns:
+            if column not in frame.columns:
+                if column in ("energy_mwh", "generated_mw"):
+                    frame[column] = None
+                else:
+                    raise FlowSolverException(f"Region frame missing column {column}")
+
+        return cls(network=network, frame=frame[cls.frame_columns].reset_index(drop=True))
+
+    @property
+    def data(self) -> list[RegionDemandEmissions]:
+        if self._data is None:
+            self._data = [
+                RegionDemandEmissions(network=self.network, **record)  # type: ignore
+                for record in self.to_frame().to_dict("records")
+            ]
+
+        return self._data
+
+    @data.setter
+    def data(self, data: list[RegionDemandEmissions]) -> None:
+        self._data = data
+        self._frame = None
+        self._index = None
 
     def __repr__(self) -> str:
-        return f"<RegionNetEmissionsDemandForNetwork region_code={self.network.code} regions={len(self.data)}>"
+        return f"<RegionNetEmissionsDemandForNetwork region_code={self.network.code} regions={len(self.to_frame())}>"
+
+    def to_frame(self) -> pd.DataFrame:
+        """Columnar representation of the region data"""
+        if self._frame is None:
+            self._frame = pd.DataFrame(
+                [(i.interval, i.region_code, i.energy_mwh, i.emissions_t, i.generated_mw) for i in self.data],
+                columns=self.frame_columns,
+            )
+
+        return self._frame
+
+    def _get_index(self) -> dict[tuple[datetime, Region], int]:
+        if self._index is None:
+            if self._data is not None:
+                keys = [(i.interval, i.region_code) for i in self._data]
+            else:
+                keys = list(zip(self.to_frame()["interval"].tolist(), self.to_frame()["region_code"].tolist(), strict=True))
+
+            # last record wins for duplicate keys
+            self._index = {key: position for position, key in enumerate(keys)}
+
+        return self._index
 
     def get_region(self, interval: datetime, region: Region) -> RegionDemandEmissions:
         """Get region by code"""
-        region_result = list(filter(lambda x: x.interval == interval and x.region_code == region, self.data))
+        position = self._get_index().get((interval, region))
 
-        if not region_result:
+        if position is None:
             raise FlowSolverException(f"Region {region} not found in network {self.network.code}")
 
-        return region_result.pop()
+        if self._data is not None:
+            return self._data[position]
+
+        record = self.to_frame().iloc[position].to_dict()
+
+        return RegionDemandEmissions(network=self.network, **record)  # type: ignore
 
     def to_dict(self) -> list[dict]:
         """Return flow results as a dictionary"""
+        frame = self.to_frame()
+
         region_demand_emissions = [
             {
-                "region_code": i.region_code,
-                "generated_mwh": i.energy_mwh,
-                "emissions_t": i.emissions_t,
+                "region_code": region_code,
+                "generated_mwh": energy_mwh,
+                "emissions_t": emissions_t,
             }
-            for i in self.data
+            for region_code, energy_mwh, emissions_t in zip(
+                frame["region_code"], frame["energy_mwh"], frame["emissions_t"], strict=True
+            )
         ]
 
         return region_demand_emissions
@@ -140,45 +225,139 @@ class InterconnectorNetEmissionsEnergy:
 
 
 class NetworkInterconnectorEnergyEmissions:
-    """For a network contains a list of interconnectors and the emissions and generation for each"""
+    """For a network contains a list of interconnectors and the emissions and generation for each
+
+    Backed either by a list of InterconnectorNetEmissionsEnergy or by a columnar frame (see
+    from_dataframe). Lookups go through an (interval, region flow) hash index built on first
+    use. Assigning data resets the index, in place mutation of the list does not.
+    """
+
+    frame_columns = ["interval", "region_flow", "generated_mw", "energy_mwh"]
+
+    # column names as returned by load_interconnector_intervals
+    _frame_column_aliases = {
+        "generated": "generated_mw",
+        "energy": "energy_mwh",
+    }
 
-    def __init__(self, network: NetworkSchema, data: list[InterconnectorNetEmissionsEnergy]):
-        self.data = data
+    def __init__(
+        self,
+        network: NetworkSchema,
+        data: list[InterconnectorNetEmissionsEnergy] | None = None,
+        frame: pd.DataFrame | None = None,
+    ):
         self.network = network
+        self._data = data
+        self._frame = frame
+        self._index: dict[tuple[datetime, RegionFlow], int] | None = None
+        self._duplicate_keys: set[tuple[datetime, RegionFlow]] = set()
+
+        if data is None and frame is None:
+            self._data = []
+
+    @classmethod
+    def from_dataframe(cls, network: NetworkSchema, df: pd.DataFrame) -> "NetworkInterconnectorEnergyEmissions":
+        """Build from a frame of interconnector flows without creating per-row dataclasses
+
+        Accepts either a region_flow column or interconnector_region_from and
+        interconnector_region_to columns.
+        """
+        frame = df.rename(columns=cls._frame_column_aliases)
+
+        if "region_flow" not in frame.columns:
+            if "interconnector_region_from" not in frame.columns or "interconnector_region_to" not in frame.columns:
+                raise FlowSolverException("Interconnector frame requires region_flow or interconnector region columns")
+
+            frame["region_flow"] = frame["interconnector_region_from"] + "->" + frame["interconnector_region_to"]
+
+        for column in cls.frame_columns:
+            if column not in frame.columns:
+                raise FlowSolverException(f"Interconnector frame missing column {column}")
+
+        return cls(network=network, frame=frame[cls.frame_columns].reset_index(drop=True))
+
+    @property
+    def data(self) -> list[InterconnectorNetEmissionsEnergy]:
+        if self._data is None:
+            self._data = [
+                InterconnectorNetEmissionsEnergy(**record)  # type: ignore
+                for record in self.to_frame().to_dict("records")
+            ]
+
+        return self._data
+
+    @data.setter
+    def data(self, data: list[InterconnectorNetEmissionsEnergy]) -> None:
+        self._data = data
+        self._frame = None
+        self._index = None
+
+    def to_frame(self) -> pd.DataFrame:
+        """Columnar representation of the interconnector data"""
+        if self._frame is None:
+            self._frame = pd.DataFrame(
+                [(i.interval, i.region_flow, i.generated_mw, i.energy_mwh) for i in self.data],
+                columns=self.frame_columns,
+            )
+
+        return self._frame
+
+    def _get_index(self) -> dict[tuple[datetime, RegionFlow], int]:
+        if self._index is None:
+            if self._data is not None:
+                keys = [(i.interval, i.region_flow) for i in self._data]
+            else:
+                keys = list(zip(self.to_frame()["interval"].tolist(), self.to_frame()["region_flow"].tolist(), strict=True))
+
+            self._index = {}
+            self._duplicate_keys = set()
+
+            for position, key in enumerate(keys):
+                if key in self._index:
+                    self._duplicate_keys.add(key)
+
+                self._index[key] = position
+
+        return self._index
 
     def get_interconnector(
         self, interval: datetime, region_flow: RegionFlow, default: int = 0
     ) -> InterconnectorNetEmissionsEnergy:
         """Get interconnector by region flow"""
-        interconnector_result = list(filter(lambda x: x.interval == interval and x.region_flow == region_flow, self.data))
+        position = self._get_index().get((interval, region_flow))
 
-        if not interconnector_result:
+        if position is None:
             if default:
                 return InterconnectorNetEmissionsEnergy(
                     interval=interval, region_flow=region_flow, energy_mwh=default, generated_mw=default
                 )
 
-            avaliable_options = ", ".join([x.region_flow for x in self.data])
+            avaliable_options = ", ".join(self.to_frame()["region_flow"].unique())
 
             raise FlowSolverException(
                 f"Interconnector {interval} {region_flow} not found in network {self.network.code}."
                 f"Available options: {avaliable_options}"
             )
 
-        if len(interconnector_result) > 1:
+        if (interval, region_flow) in self._duplicate_keys:
             raise FlowSolverException(f"Interconnector {interval} {region_flow} has multiple results")
 
-        return interconnector_result.pop()
+        if self._data is not None:
+            return self._data[position]
+
+        return InterconnectorNetEmissionsEnergy(**self.to_frame().iloc[position].to_dict())  # type: ignore
 
     def to_dict(self) -> list[dict]:
         """Return flow results as a dictionary"""
+        frame = self.to_frame()
+
         solver_results = [
             {
-                "interconnector_region_from": i.interconnector_region_from,
-                "interconnector_region_to": i.interconnector_region_to,
-                "generated_mwh": i.energy_mwh,
+                "interconnector_region_from": region_flow.split("->")[0],
+                "interconnector_region_to": region_flow.split("->")[1],
+                "generated_mwh": energy_mwh,
             }
-            for i in self.data
+            for region_flow, energy_mwh in zip(frame["region_flow"], frame["energy_mwh"], strict=True)
         ]
 
         return solver_results
@@ -537,31 +716,175 @@ def solve_flow_emissions_for_interval(
     return flow_results
 
 
+# Regions of the NEM flow solver
+NEM_SOLVER_REGIONS: list[Region] = [Region("SA1"), Region("QLD1"), Region("TAS1"), Region("NSW1"), Region("VIC1")]
+
+# Flows for which emissions are calculated
+NEM_SOLVER_REGION_FLOWS: list[RegionFlow] = [
+    RegionFlow("VIC1->NSW1"),
+    RegionFlow("VIC1->TAS1"),
+    RegionFlow("VIC1->SA1"),
+    RegionFlow("NSW1->VIC1"),
+    RegionFlow("NSW1->QLD1"),
+    RegionFlow("QLD1->NSW1"),
+    RegionFlow("TAS1->VIC1"),
+    RegionFlow("SA1->VIC1"),
+]
+
+
+def _pivot_region_data(region_data: NetworkRegionsDemandEmissions, intervals: list[datetime]) -> tuple[np.ndarray, np.ndarray]:
+    """Pivot region data into dense (interval, region) energy and emissions arrays"""
+    frame = region_data.to_frame()
+
+    rows = pd.Index(intervals).get_indexer(frame["interval"])
+    cols = pd.Index(NEM_SOLVER_REGIONS).get_indexer(frame["region_code"])
+    found = (rows >= 0) & (cols >= 0)
+
+    # energy falls back to generated power when there is no energy value
+    energy_mwh = pd.to_numeric(frame["energy_mwh"]).astype(float).fillna(0).to_numpy()
+    generated_mw = pd.to_numeric(frame["generated_mw"]).astype(float).fillna(0).to_numpy()
+    region_energy = np.where(
+        energy_mwh != 0, energy_mwh, np.where(generated_mw != 0, generated_mw / region_data.network.intervals_per_hour, np.nan)
+    )
+
+    energy = np.full((len(intervals), len(NEM_SOLVER_REGIONS)), np.nan)
+    emissions = np.full((len(intervals), len(NEM_SOLVER_REGIONS)), np.nan)
+
+    energy[rows[found], cols[found]] = region_energy[found]
+    emissions[rows[found], cols[found]] = pd.to_numeric(frame["emissions_t"]).astype(float).to_numpy()[found]
+
+    return energy, emissions
+
+
+def _pivot_interconnector_data(
+    interconnector_data: NetworkInterconnectorEnergyEmissions, intervals: list[datetime]
+) -> np.ndarray:
+    """Pivot interconnector data into a dense (interval, region flow) energy array"""
+    frame = interconnector_data.to_frame()
+
+    rows = pd.Index(intervals).get_indexer(frame["interval"])
+    cols = pd.Index(NEM_SOLVER_REGION_FLOWS).get_indexer(frame["region_flow"])
+    found = (rows >= 0) & (cols >= 0)
+
+    energy = np.full((len(intervals), len(NEM_SOLVER_REGION_FLOWS)), np.nan)
+    energy[rows[found], cols[found]] = pd.to_numeric(frame["energy_mwh"]).astype(float).to_numpy()[found]
+
+    return energy
+
+
 def solve_flow_emissions_for_interval_range(
     network: NetworkSchema,
     interconnector_data: NetworkInterconnectorEnergyEmissions,
     region_data: NetworkRegionsDemandEmissions,
-) -> FlowSolverResult:
+) -> pd.DataFrame:
     """
     Solve flow emissions for interval range
+
+    Batched version of solve_flow_emissions_for_interval. Region and interconnector data
+    are pivoted into dense arrays indexed by interval and flow emissions are computed for
+    every interval at once. As with the interval solver, flow emissions are the flow energy
+    at the emissions intensity of the source region.
+
+    Returns a frame with the same columns as FlowSolverResult.to_dataframe
     """
 
     if network.code != "NEM":
         raise FlowSolverException(f"Flow solver only supports NEM network. {network.code} provided")
 
-    intervals = list({i.interval for i in interconnector_data.data})
+    intervals = sorted(set(interconnector_data.to_frame()["interval"].tolist()))
 
     logger.debug(f"Called with {len(intervals)} intervals")
 
-    flow_results = FlowSolverResult(network=network, interconnector_data=interconnector_data, region_data=region_data)
+    region_energy, region_emissions = _pivot_region_data(region_data, intervals)
+    flow_energy = _pivot_interconnector_data(interconnector_data, intervals)
 
-    for interval in intervals:
-        result_data = solve_flow_emissions_for_interval(
-            network=network, interval=interval, interconnector_data=interconnector_data, region_data=region_data
-        )
-        flow_results.append_results(result_data.data)
+    for region_col, region in enumerate(NEM_SOLVER_REGIONS):
+        missing = np.isnan(region_energy[:, region_col]) | (region_energy[:, region_col] == 0)
 
-    return flow_results
+        if missing.any():
+            raise FlowSolverException(f"Could not get energy for {network.code} {region} at {intervals[int(missing.argmax())]}")
+
+    for flow_col, region_flow in enumerate(NEM_SOLVER_REGION_FLOWS):
+        missing = np.isnan(flow_energy[:, flow_col])
+
+        if missing.any():
+            raise FlowSolverException(
+                f"Interconnector {intervals[int(missing.argmax())]} {region_flow} not found in network {network.code}."
+            )
+
+    region_col = {region: i for i, region in enumerate(NEM_SOLVER_REGIONS)}
+
+    # flow emissions are the flow energy at the emissions intensity of the source region
+    region_intensity = region_emissions / region_energy
+    source_cols = [region_col[Region(f.split("->")[0])] for f in NEM_SOLVER_REGION_FLOWS]
+    flow_emissions = flow_energy * region_intensity[:, source_cols]
+
+    num_flows = len(NEM_SOLVER_REGION_FLOWS)
+
+    return pd.DataFrame(
+        {
+            "trading_interval": np.repeat([i.replace(tzinfo=None) for i in intervals], num_flows),
+            "interconnector_region_from": np.tile([f.split("->")[0] for f in NEM_SOLVER_REGION_FLOWS], len(intervals)),
+            "interconnector_region_to": np.tile([f.split("->")[1] for f in NEM_SOLVER_REGION_FLOWS], len(intervals)),
+            "emissions": flow_emissions.ravel(),
+        }
+    )
+
+
+def solve_region_flows_for_interval_range(
+    interconnector_data: pd.DataFrame, region_data: pd.DataFrame, network: NetworkSchema = NetworkNEM
+) -> pd.DataFrame:
+    """Solve flow emissions for an interval range and total them into region imports and exports
+
+    Takes the same frames as solve_flow_emissions_with_pandas (net interconnector flows and
+    region demand) and returns the same region level frame, solved with
+    solve_flow_emissions_for_interval_range. Raises FlowSolverException if any interval is
+    missing a region or a region flow.
+    """
+    # both directions of a flow can come from more than one interconnector record
+    flows = (
+        interconnector_data.groupby(["interval", "interconnector_region_from", "interconnector_region_to"])[
+            ["generated", "energy"]
+        ]
+        .sum()
+        .reset_index()
+    )
+
+    flow_emissions = solve_flow_emissions_for_interval_range(
+        network=network,
+        interconnector_data=NetworkInterconnectorEnergyEmissions.from_dataframe(network, flows),
+        region_data=NetworkRegionsDemandEmissions.from_dataframe(network, region_data),
+    )
+
+    result_set = flow_emissions.rename(columns={"trading_interval": "interval"}).merge(
+        flows[["interval", "interconnector_region_from", "interconnector_region_to", "energy"]],
+        how="inner",
+        on=["interval", "interconnector_region_from", "interconnector_region_to"],
+    )
+
+    imports = (
+        result_set.groupby(["interval", "interconnector_region_to"])[["energy", "emissions"]]
+        .sum()
+        .rename_axis(["interval", "network_region"])
+        .rename(columns={"energy": "energy_imports", "emissions": "emissions_imports"})
+    )
+
+    exports = (
+        result_set.groupby(["interval", "interconnector_region_from"])[["energy", "emissions"]]
+        .sum()
+        .rename_axis(["interval", "network_region"])
+        .rename(columns={"energy": "energy_exports", "emissions": "emissions_exports"})
+    )
+
+    result_data = imports.merge(exports, left_index=True, right_index=True)
+
+    result_data["market_value_exports"] = 0.0
+    result_data["market_value_imports"] = 0.0
+    result_data["network_id"] = network.code
+    result_data.fillna(0, inplace=True)
+    result_data.reset_index(inplace=True)
+
+    return result_data
 
 
 # debugger entry point
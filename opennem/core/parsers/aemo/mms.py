@@ -5,10 +5,13 @@ Parse AEMO MMS CSV format which can have multiple tables and definitions per CSV
 
 import csv
 import logging
+from collections.abc import Generator, Iterable
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+import polars as pl
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from opennem.core.downloader import url_downloader
@@ -161,6 +164,149 @@ AEMO_ROW_HEADER_TYPES = ["C", "I", "D"]
 
 MMS_DUID_FIELDS = ["duid"]
 
+# number of D rows buffered per table before a batch is emitted by the streaming parser
+MMS_STREAM_CHUNK_SIZE = 50_000
+
+
+@dataclass
+class AEMOTableBatch:
+    """A bounded, columnar chunk of a single MMS table emitted by the streaming parser
+
+    Columns are keyed by the lowercased field names from the ``I`` header row and hold
+    the raw string values from the CSV (duid fields are normalized).
+    """
+
+    namespace: str
+    name: str
+    fieldnames: list[str]
+    columns: dict[str, list[Any]] = field(default_factory=dict)
+    url_source: str | None = None
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.namespace}_{self.name}"
+
+    def __len__(self) -> int:
+        if not self.fieldnames or self.fieldnames[0] not in self.columns:
+            return 0
+
+        return len(self.columns[self.fieldnames[0]])
+
+    def to_polars(self) -> pl.DataFrame:
+        """Return the batch as a polars frame of string columns"""
+        return pl.DataFrame(self.columns, schema=dict.fromkeys(self.fieldnames, pl.String))
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """Return the batch as row dicts as produced by parse_aemo_mms_csv"""
+        return [dict(zip(self.fieldnames, row, strict=True)) for row in zip(*self.columns.values(), strict=True)]
+
+    def to_table_schema(self) -> AEMOTableSchema:
+        table = AEMOTableSchema(
+            name=self.name,
+            namespace=self.namespace,
+            fieldnames=self.fieldnames,
+            url_source=self.url_source,
+        )
+        # extend in place to skip re-validating every record
+        table.records.extend(self.to_records())
+
+        return table
+
+    def to_table_set(self) -> AEMOTableSet:
+        """Wrap the batch in a single-table AEMOTableSet for store_aemo_tableset"""
+        return AEMOTableSet(tables=[self.to_table_schema()])
+
+
+def _build_table_batch(header: AEMOTableBatch, rows: list[list[str]]) -> AEMOTableBatch:
+    """Transpose a buffer of D row values into a columnar batch for the table header"""
+    columns: dict[str, list[Any]] = dict(zip(header.fieldnames, map(list, zip(*rows, strict=True)), strict=True))
+
+    for duid_field in MMS_DUID_FIELDS:
+        if duid_field in columns:
+            columns[duid_field] = [normalize_duid(i) for i in columns[duid_field]]
+
+    return AEMOTableBatch(
+        namespace=header.namespace,
+        name=header.name,
+        fieldnames=header.fieldnames,
+        columns=columns,
+        url_source=header.url_source,
+    )
+
+
+def iter_aemo_mms_csv_batches(
+    stream: Iterable[str],
+    chunk_size: int = MMS_STREAM_CHUNK_SIZE,
+    namespace_filter: list[str] | None = None,
+    url: str | None = None,
+) -> Generator[AEMOTableBatch, None, None]:
+    """
+    Streaming version of parse_aemo_mms_csv
+
+    Reads an AEMO MMS CSV line by line (ie. a file handle or a text wrapped zip member
+    stream) and yields columnar batches of at most chunk_size rows per table. Memory use
+    is bounded by the chunk size rather than the size of the file.
+    """
+    if chunk_size < 1:
+        raise AEMOParserException(f"Invalid chunk size: {chunk_size}")
+
+    table_current: AEMOTableBatch | None = None
+    rows: list[list[str]] = []
+
+    for row in csv.reader(stream):
+        if not row:
+            continue
+
+        record_type = row[0].strip().upper()
+
+        match record_type:
+            case "C":
+                if table_current is not None and rows:
+                    yield _build_table_batch(table_current, rows)
+
+                table_current = None
+                rows = []
+
+            case "I":
+                if table_current is not None and rows:
+                    yield _build_table_batch(table_current, rows)
+
+                rows = []
+                table_namespace = row[1].strip().lower()
+
+                if namespace_filter and table_namespace not in namespace_filter:
+                    table_current = None
+                    continue
+
+                table_current = AEMOTableBatch(
+                    namespace=table_namespace,
+                    name=row[2].strip().lower(),
+                    fieldnames=[i.lower() for i in row[4:]],
+                    url_source=url,
+                )
+
+            case "D":
+                if table_current is None:
+                    continue
+
+                values = row[4:]
+
+                if len(values) != len(table_current.fieldnames):
+                    logger.error("Malformed AEMO csv - length mismatch between records and fields")
+                    continue
+
+                rows.append(values)
+
+                if len(rows) >= chunk_size:
+                    yield _build_table_batch(table_current, rows)
+                    rows = []
+
+            case _:
+                logger.info(f"Skipping row, invalid type: {record_type}")
+
+    if table_current is not None and rows:
+        yield _build_table_batch(table_current, rows)
+
 
 def parse_aemo_mms_csv(
     content: str,
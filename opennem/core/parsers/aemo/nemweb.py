@@ -1,21 +1,199 @@
 """NEMWeb optimized parsers"""
 
+import asyncio
+import io
 import logging
+import multiprocessing
+import pickle
+from collections.abc import Generator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from shutil import rmtree
 
-from opennem.controllers.nem import store_aemo_tableset
+from opennem import settings
+from opennem.controllers.nem import store_aemo_table_batches, store_aemo_tableset
 from opennem.controllers.schema import ControllerReturn
-from opennem.core.parsers.aemo.mms import AEMOTableSet, parse_aemo_file
-from opennem.utils.archive import download_and_unzip
+from opennem.core.parsers.aemo.mms import (
+    MMS_STREAM_CHUNK_SIZE,
+    AEMOTableBatch,
+    AEMOTableSet,
+    iter_aemo_mms_csv_batches,
+    parse_aemo_file,
+)
+from opennem.utils.archive import download_and_unzip, download_archive, iter_zip_members, open_zip
 
 logger = logging.getLogger("opennem.core.parsers.aemo.nemweb")
 
 
+def _merge_controller_return(cr: ControllerReturn, other: ControllerReturn) -> None:
+    cr.processed_records += other.processed_records
+    cr.total_records += other.total_records
+    cr.inserted_records += other.inserted_records
+    cr.errors += other.errors
+
+    if other.server_latest and (not cr.server_latest or other.server_latest > cr.server_latest):
+        cr.server_latest = other.server_latest
+
+
+def _get_archive_members(archive_path: Path) -> list[str]:
+    """CSV and nested zip members of an archive, each parsed as one unit of work"""
+    with open_zip(archive_path) as zf:
+        return [i.filename for i in zf.infolist() if not i.is_dir() and i.filename.lower().endswith((".csv", ".zip"))]
+
+
+def _parse_archive_member(archive_path: str, member_name: str, url: str, chunk_size: int, spool_path: str) -> int:
+    """Parse a single archive member into table batches spooled to disk. Runs in a worker process
+
+    Batches are pickled one at a time to spool_path as they are parsed so neither the worker
+    nor the parent ever holds more than one batch of the member. Returns the batch count.
+    """
+    batch_count = 0
+
+    with open_zip(Path(archive_path)) as zf, zf.open(member_name) as member_fh, open(spool_path, "wb") as spool_fh:
+        if member_name.lower().endswith(".zip"):
+            member_streams = iter_zip_members(io.BytesIO(member_fh.read()), suffix=".csv")
+        else:
+            member_streams = iter([(member_name, member_fh)])
+
+        for _, member_stream in member_streams:
+            with io.TextIOWrapper(member_stream, encoding="utf-8", newline="") as member_text:
+                for batch in iter_aemo_mms_csv_batches(member_text, chunk_size=chunk_size, url=url):
+                    pickle.dump(batch, spool_fh, protocol=pickle.HIGHEST_PROTOCOL)
+                    batch_count += 1
+
+    return batch_count
+
+
+def _iter_spooled_batches(spool_path: Path) -> Generator[AEMOTableBatch, None, None]:
+    """Read back the table batches spooled by _parse_archive_member and remove the spool"""
+    try:
+        with spool_path.open("rb") as spool_fh:
+            while True:
+                try:
+                    yield pickle.load(spool_fh)
+                except EOFError:
+                    break
+    finally:
+        spool_path.unlink(missing_ok=True)
+
+
+async def _store_archive_streaming(archive_path: Path, url: str, chunk_size: int) -> ControllerReturn:
+    """Read each CSV straight out of the zip member stream and store it in bounded batches"""
+    cr = ControllerReturn()
+
+    for member_name, member_stream in iter_zip_members(archive_path, suffix=".csv"):
+        logger.info(f"parse_aemo_url_streaming parsing {member_name}")
+
+        with io.TextIOWrapper(member_stream, encoding="utf-8", newline="") as member_text:
+            batches = iter_aemo_mms_csv_batches(member_text, chunk_size=chunk_size, url=url)
+            _merge_controller_return(cr, await store_aemo_table_batches(batches))
+
+    return cr
+
+
+async def _store_archive_parallel(
+    archive_path: Path, members: list[str], url: str, workers: int, queue_size: int, chunk_size: int
+) -> ControllerReturn:
+    """Parse archive members in a process pool and store each member's tables exactly once
+
+    Workers spool each member's batches to disk next to the archive and only the spool
+    path is handed from the parse stage to the insert stage through a bounded queue, so
+    parse workers block rather than buffer the whole archive in memory. The insert stage
+    streams batches back out of the spool one at a time.
+    """
+    cr = ControllerReturn()
+    loop = asyncio.get_running_loop()
+    parsed_queue: asyncio.Queue[tuple[str, Path, int] | None] = asyncio.Queue(maxsize=queue_size)
+    parse_slots = asyncio.Semaphore(workers)
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+
+        async def _parse_member(member_num: int, member_name: str) -> None:
+            spool_path = archive_path.parent / f"{archive_path.stem}_{member_num}.batches"
+
+            async with parse_slots:
+                batch_count = await loop.run_in_executor(
+                    executor, _parse_archive_member, str(archive_path), member_name, url, chunk_size, str(spool_path)
+                )
+                await parsed_queue.put((member_name, spool_path, batch_count))
+
+        async def _parse_stage() -> None:
+            try:
+                await asyncio.gather(*[_parse_member(num, member_name) for num, member_name in enumerate(members)])
+            finally:
+                await parsed_queue.put(None)
+
+        parse_task = asyncio.create_task(_parse_stage())
+
+        try:
+            while (parsed := await parsed_queue.get()) is not None:
+                member_name, spool_path, batch_count = parsed
+                logger.info(f"Storing {batch_count} table batches from {member_name}")
+                _merge_controller_return(cr, await store_aemo_table_batches(_iter_spooled_batches(spool_path)))
+        except Exception:
+            parse_task.cancel()
+            raise
+
+        await parse_task
+
+    return cr
+
+
+async def parse_aemo_url_streaming(
+    url: str,
+    chunk_size: int = MMS_STREAM_CHUNK_SIZE,
+    workers: int | None = None,
+    queue_size: int | None = None,
+) -> ControllerReturn:
+    """Streaming aemo url parser and store
+
+    Downloads the archive and reads each CSV straight out of the zip member stream,
+    storing fixed-size table batches as they are parsed. Memory is bounded by chunk_size
+    regardless of the size of the archive.
+
+    Archives with more than one member (ie. daily or weekly NEMWeb archives) are parsed
+    across a pool of worker processes and stored through a bounded queue.
+    """
+    cr = ControllerReturn()
+    workers = workers or settings.nemweb_parse_workers
+    queue_size = queue_size or settings.nemweb_parse_queue_size or workers
+
+    try:
+        archive_path = await download_archive(url)
+    except Exception as e:
+        logger.error(f"Error downloading {url}: {e}")
+        return cr
+
+    try:
+        members = _get_archive_members(archive_path)
+
+        if workers > 1 and len(members) > 1:
+            logger.info(f"Parsing {len(members)} archive members from {url} with {workers} workers")
+            cr = await _store_archive_parallel(archive_path, members, url, workers, queue_size, chunk_size)
+        else:
+            cr = await _store_archive_streaming(archive_path, url, chunk_size)
+    finally:
+        try:
+            rmtree(archive_path.parent)
+            logger.info(f"Removed {archive_path.parent}")
+        except Exception as e:
+            logger.error(f"Error removing download path: {e}")
+
+    return cr
+
+
 async def parse_aemo_url_optimized(
     url: str, table_set: AEMOTableSet | None = None, persist_to_db: bool = True, values_only: bool = False
 ) -> ControllerReturn | AEMOTableSet:
     """Optimized version of aemo url parser that stores the files locally in tmp
-    and parses them individually to resolve memory pressure"""
+    and parses them individually to resolve memory pressure
+
+    When persisting to the database the archive is streamed in bounded batches by
+    parse_aemo_url_streaming. A table set is only built up when persist_to_db is False.
+    """
+    if persist_to_db and not table_set:
+        return await parse_aemo_url_streaming(url)
+
     cr = ControllerReturn()
 
     try:
@@ -39,20 +217,15 @@ async def parse_aemo_url_optimized(
 
         table_set = parse_aemo_file(str(csv_file_to_process), table_set=table_set, values_only=values_only)
 
-        if persist_to_db:
-            controller_returns = await store_aemo_tableset(table_set)
-            cr.inserted_records += controller_returns.inserted_records
-
-            if cr.last_modified and controller_returns.last_modified and cr.last_modified < controller_returns.last_modified:
-                cr.last_modified = controller_returns.last_modified
-
         try:
             csv_file_to_process.unlink()
         except Exception as e:
             logger.error(f"Error removing file {csv_file_to_process}: {e}")
 
-    if not persist_to_db:
-        return table_set
+    if persist_to_db:
+        # store the accumulated table set once so earlier files aren't stored again
+        controller_returns = await store_aemo_tableset(table_set)
+        _merge_controller_return(cr, controller_returns)
 
     try:
         rmtree(download_path)
@@ -60,6 +233,9 @@ async def parse_aemo_url_optimized(
     except Exception as e:
         logger.error(f"Error removing download path: {e}")
 
+    if not persist_to_db:
+        return table_set
+
     return cr
 
 
@@ -8,11 +8,17 @@ Currently supports:
 
     * IIS default listings and variations
     * Extracing metadata from AEMO filenames
+
+Listings are scanned in a single pass over the page. The parsed entries of the last listing of
+each URL are kept along with its ETag/Last-Modified so that unchanged listings aren't fetched or
+parsed again and only lines that are new since the last listing are parsed.
 """
 
+import calendar
 import html
 import logging
 import re
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from operator import attrgetter
@@ -21,6 +27,7 @@ from typing import Annotated, Any
 from urllib.parse import urljoin
 from zoneinfo import ZoneInfo
 
+from cachetools import LRUCache
 from pydantic import BaseModel, BeforeValidator, ValidationError, field_validator
 
 from opennem.core.normalizers import is_number, strip_double_spaces
@@ -50,6 +57,23 @@ __nemweb_line_match_new = re.compile(
 )
 
 
+# single pass scanner for a whole listing. matches both the long and short IIS date formats and
+# captures the date components so they don't need to go through strptime
+_DIRLISTING_ENTRY_RE = re.compile(
+    r"(?:[A-Za-z]+,\s+(?P<month_name>[A-Za-z]+)\s+(?P<day>\d{1,2}),\s+(?P<year>\d{4})"
+    r"|(?P<month_short>\d{1,2})/(?P<day_short>\d{1,2})/(?P<year_short>\d{4}))"
+    r"\s+(?P<hour>\d{1,2}):(?P<minute>\d{2})(?:\s+(?P<ampm>[AP]M))?"
+    r"\s+(?P<file_size>\d+|&lt;dir&gt;|<dir>)\s+"
+    r"<a href=['\"]?(?P<link>[^'\" >]+)['\"]?>(?P<filename>[^<]+)</a>",
+    re.IGNORECASE,
+)
+
+_MONTH_NAMES = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+
+# number of listing URLs to keep the last listing of
+DIRLISTING_CACHE_SIZE = 128
+
+
 def parse_dirlisting_datetime(datetime_string: str | datetime) -> datetime:
     """Parses dates from directory listings. Primarily used for modified time"""
 
@@ -254,28 +278,19 @@ def parse_dirlisting_line(dirlisting_line: str) -> DirlistingEntry | None:
     return model
 
 
-async def get_dirlisting(url: str, timezone: str | None = None) -> DirectoryListing:
-    """Parse a directory listng into a list of DirlistingEntry models"""
-    dirlisting_content = await http.get(url)
-
-    logger.debug(f"Got dirlisting content of lenght {len(dirlisting_content.text)}")
-
-    if not dirlisting_content.text:
-        raise Exception("No dirlisting content")
-
-    # resp = pq(dirlisting_content.text, parser="html")
-
-    _dirlisting_models: list[DirlistingEntry] = []
-
-    # pre_area = resp("pre")
-
+def _get_pre_content(content: str) -> str:
     # use regex to find the pre area
-    pre_area = re.search(r"<pre>(.*?)</pre>", dirlisting_content.text, re.DOTALL)
+    pre_area = re.search(r"<pre>(.*?)</pre>", content, re.DOTALL)
 
     if not pre_area:
         raise Exception("Invalid directory listing: no pre or bad html")
 
-    pre_content = pre_area.group(1)
+    return pre_area.group(1)
+
+
+def _parse_dirlisting_lines(pre_content: str, url: str) -> dict[str, DirlistingEntry]:
+    """Parse a listing line by line with parse_dirlisting_line"""
+    entries: dict[str, DirlistingEntry] = {}
 
     for i in pre_content.split("<br>"):
         # it catches the containing block so skip those
@@ -296,15 +311,169 @@ async def get_dirlisting(url: str, timezone: str | None = None) -> DirectoryList
             # append the base URL to the model link
             model.link = urljoin(url, model.link)
 
-            _dirlisting_models.append(model)
+            entries[dirlisting_line] = model
+
+    return entries
+
+
+def _entry_from_match(match: re.Match, url: str) -> DirlistingEntry:
+    """Build an entry from a scanner match without going through validation"""
+    if match["month_name"]:
+        month = _MONTH_NAMES[match["month_name"].lower()]
+        day, year = int(match["day"]), int(match["year"])
+    else:
+        month, day, year = int(match["month_short"]), int(match["day_short"]), int(match["year_short"])
+
+    # 12 hour clock, times without AM/PM are read as AM as strptime does with %I
+    hour = int(match["hour"]) % 12
+
+    if match["ampm"] and match["ampm"].upper() == "PM":
+        hour += 12
+
+    filename = match["filename"]
+    link = match["link"]
+
+    if "&" in filename:
+        filename = html.unescape(filename)
+
+    if "&" in link:
+        link = html.unescape(link)
+
+    file_size = match["file_size"]
+
+    aemo_interval_date: AEMOMMSFilename | None = None
+
+    try:
+        aemo_interval_date = parse_aemo_filename(filename)
+    except Exception:
+        pass
+
+    return DirlistingEntry.model_construct(
+        filename=Path(filename.strip()),
+        link=urljoin(url, link),
+        modified_date=datetime(year, month, day, hour, int(match["minute"])),
+        aemo_interval_date=aemo_interval_date,
+        file_size=int(file_size) if file_size.isdigit() else None,
+    )
+
+
+def scan_dirlisting(
+    content: str, url: str, previous_entries: dict[str, DirlistingEntry] | None = None
+) -> dict[str, DirlistingEntry]:
+    """
+    Scan a listing page into entries keyed on their listing line.
+
+    Entries for lines that are in previous_entries are reused rather than parsed again. Falls back
+    to parsing line by line if the scanner doesn't match every entry on the page.
+    """
+    pre_content = _get_pre_content(content)
+    entries: dict[str, DirlistingEntry] = {}
 
-    listing_model = DirectoryListing(url=url, timezone=timezone, entries=_dirlisting_models)
+    for match in _DIRLISTING_ENTRY_RE.finditer(pre_content):
+        line = match.group(0)
+
+        if previous_entries and (entry := previous_entries.get(line)):
+            entries[line] = entry
+            continue
+
+        entries[line] = _entry_from_match(match, url)
+
+    expected_entries = pre_content.lower().count("<a href") - pre_content.count("To Parent Directory")
+
+    if len(entries) < expected_entries:
+        logger.debug(f"Scanner matched {len(entries)} of {expected_entries} entries for {url}. Parsing line by line")
+        return _parse_dirlisting_lines(pre_content, url)
+
+    return entries
+
+
+@dataclass
+class _DirlistingCacheEntry:
+    etag: str | None = None
+    last_modified: str | None = None
+    entries: dict[str, DirlistingEntry] = field(default_factory=dict)
+
+
+_dirlisting_cache: LRUCache[str, _DirlistingCacheEntry] = LRUCache(maxsize=DIRLISTING_CACHE_SIZE)
+
+# lines of each listing already returned to a consumer by get_dirlisting_changes, keyed by
+# (consumer, url). kept apart from the fetch cache so other fetches of a listing don't hide changes
+_dirlisting_seen: LRUCache[tuple[str, str], frozenset[str]] = LRUCache(maxsize=DIRLISTING_CACHE_SIZE)
+
+
+async def _fetch_dirlisting(url: str) -> dict[str, DirlistingEntry]:
+    """
+    Fetch a listing with a conditional GET against the last listing of the url.
+
+    Returns:
+        dict of the listing line to its entry
+    """
+    cached = _dirlisting_cache.get(url)
+    headers: dict[str, str] = {}
+
+    if cached and cached.etag:
+        headers["If-None-Match"] = cached.etag
+
+    if cached and cached.last_modified:
+        headers["If-Modified-Since"] = cached.last_modified
+
+    dirlisting_content = await http.get(url, headers=headers)
+
+    if cached and dirlisting_content.status_code == 304:
+        logger.debug(f"Dirlisting not modified: {url}")
+        return cached.entries
+
+    logger.debug(f"Got dirlisting content of lenght {len(dirlisting_content.text)}")
+
+    if not dirlisting_content.text:
+        raise Exception("No dirlisting content")
+
+    entries = scan_dirlisting(dirlisting_content.text, url, cached.entries if cached else None)
+
+    _dirlisting_cache[url] = _DirlistingCacheEntry(
+        etag=dirlisting_content.headers.get("etag"),
+        last_modified=dirlisting_content.headers.get("last-modified"),
+        entries=entries,
+    )
+
+    return entries
+
+
+async def get_dirlisting(url: str, timezone: str | None = None) -> DirectoryListing:
+    """Parse a directory listng into a list of DirlistingEntry models"""
+    entries = await _fetch_dirlisting(url)
+
+    listing_model = DirectoryListing(url=url, timezone=timezone, entries=list(entries.values()))
 
     logger.debug(f"Got back {len(listing_model.entries)} models")
 
     return listing_model
 
 
+async def get_dirlisting_changes(url: str, consumer: str, timezone: str | None = None) -> DirectoryListing:
+    """
+    Get the entries of a directory listing that are new or changed since consumer last got the
+    changes of the listing in this process. The first call for a consumer returns all entries.
+
+    Args:
+        url: Listing url
+        consumer: Name the last seen listing is kept under, ie. the crawler name
+        timezone: Timezone of the listing dates
+    """
+    entries = await _fetch_dirlisting(url)
+    seen = _dirlisting_seen.get((consumer, url), frozenset())
+
+    _dirlisting_seen[(consumer, url)] = frozenset(entries)
+
+    listing_model = DirectoryListing(
+        url=url, timezone=timezone, entries=[entry for line, entry in entries.items() if line not in seen]
+    )
+
+    logger.debug(f"Got back {len(listing_model.entries)} new models for {consumer}")
+
+    return listing_model
+
+
 # debug entry point
 if __name__ == "__main__":
     import asyncio
@@ -3,13 +3,12 @@
 import asyncio
 import inspect
 import logging
+from datetime import datetime
 from typing import Any
 
-from pydantic import ValidationError
-
 from opennem import settings
 from opennem.controllers.schema import ControllerReturn
-from opennem.core.crawlers.meta import CrawlStatTypes, crawler_set_meta, crawlers_get_all_meta
+from opennem.core.crawlers.meta import CrawlStatTypes, crawler_set_meta_batch, get_crawler_meta_cache
 from opennem.core.crawlers.schema import CrawlerDefinition, CrawlerSet
 from opennem.core.parsers.aemo.nemweb import parse_aemo_url_optimized
 from opennem.crawlers.apvi import (
@@ -55,82 +54,87 @@ logger = logging.getLogger("opennem.crawl")
 _CRAWLERS_MODULE = "opennem.crawlers"
 
 
+# metadata keys overlaid onto crawler definition fields
+_CRAWLER_META_FIELDS = {
+    "last_crawled": CrawlStatTypes.last_crawled,
+    "server_latest": CrawlStatTypes.server_latest,
+}
+
+_CRAWLER_DEFINITIONS: list[CrawlerDefinition] = [
+    # NEM
+    AEMONEMDispatchActualGEN,
+    AEMONEMNextDayDispatch,
+    # NEMWEB
+    AEMONemwebRooftop,
+    AEMONemwebRooftopForecast,
+    AEMONemwebTradingIS,
+    AEMONemwebDispatchIS,
+    AEMONNemwebDispatchScada,
+    # NEMWEB Archive
+    AEMONEMDispatchActualGENArchvie,
+    AEMONEMNextDayDispatchArchvie,
+    AEMONNemwebDispatchScadaArchive,
+    AEMONemwebTradingISArchive,
+    AEMONemwebDispatchISArchive,
+    AEMONemwebRooftopArchive,
+    AEMONemwebRooftopForecastArchive,
+    # APVI
+    APVIRooftopTodayCrawler,
+    APVIRooftopLatestCrawler,
+    APVIRooftopMonthCrawler,
+    APVIRooftopYearCrawler,
+    APVIRooftopAllCrawler,
+    # BOM
+    BOMCapitals,
+    # WEM
+    WEMBalancing,
+    WEMBalancingLive,
+    WEMFacilityScada,
+    WEMFacilityScadaLive,
+    # WEMDE
+    AEMOWEMDEFacilityScadaHistory,
+    AEMOWEMDETradingReport,
+    AEMOWEMDETradingReportHistory,
+    # MMS Crawlers
+    AEMOMMSDispatchInterconnector,
+    AEMOMMSDispatchRegionsum,
+    AEMOMMSDispatchPrice,
+    AEMOMMSDispatchScada,
+    AEMOMMSTradingPrice,
+    AEMOMMSTradingRegionsum,
+]
+
+
+def _apply_crawler_meta(crawler: CrawlerDefinition, crawler_meta: dict[str, Any] | None) -> CrawlerDefinition:
+    """Overlay stored crawl metadata onto a crawler definition without re-validating the definition"""
+    if not crawler_meta:
+        return crawler
+
+    crawler_fields: dict[str, Any] = {"version": "2"}
+
+    try:
+        for field_name, stat_type in _CRAWLER_META_FIELDS.items():
+            if crawler_meta.get(stat_type.value):
+                crawler_fields[field_name] = datetime.fromisoformat(crawler_meta[stat_type.value])
+    except (TypeError, ValueError) as e:
+        logger.error(f"Validation error for crawler {crawler.name}: {e}")
+        raise Exception("Crawler initiation error") from None
+
+    return crawler.model_copy(update=crawler_fields)
+
+
 async def load_crawlers(live_load: bool = False) -> CrawlerSet:
     """Loads all the crawler definitions from a module and returns a CrawlSet"""
-    crawlers = []
     crawler_definitions: list[CrawlerDefinition] = []
 
     if live_load:
         crawler_definitions = load_all_crawler_definitions(_CRAWLERS_MODULE)
 
-    crawler_definitions = [
-        # NEM
-        AEMONEMDispatchActualGEN,
-        AEMONEMNextDayDispatch,
-        # NEMWEB
-        AEMONemwebRooftop,
-        AEMONemwebRooftopForecast,
-        AEMONemwebTradingIS,
-        AEMONemwebDispatchIS,
-        AEMONNemwebDispatchScada,
-        # NEMWEB Archive
-        AEMONEMDispatchActualGENArchvie,
-        AEMONEMNextDayDispatchArchvie,
-        AEMONNemwebDispatchScadaArchive,
-        AEMONemwebTradingISArchive,
-        AEMONemwebDispatchISArchive,
-        AEMONemwebRooftopArchive,
-        AEMONemwebRooftopForecastArchive,
-        # APVI
-        APVIRooftopTodayCrawler,
-        APVIRooftopLatestCrawler,
-        APVIRooftopMonthCrawler,
-        APVIRooftopYearCrawler,
-        APVIRooftopAllCrawler,
-        # BOM
-        BOMCapitals,
-        # WEM
-        WEMBalancing,
-        WEMBalancingLive,
-        WEMFacilityScada,
-        WEMFacilityScadaLive,
-        # WEMDE
-        AEMOWEMDEFacilityScadaHistory,
-        AEMOWEMDETradingReport,
-        AEMOWEMDETradingReportHistory,
-        # MMS Crawlers
-        AEMOMMSDispatchInterconnector,
-        AEMOMMSDispatchRegionsum,
-        AEMOMMSDispatchPrice,
-        AEMOMMSDispatchScada,
-        AEMOMMSTradingPrice,
-        AEMOMMSTradingRegionsum,
-    ]
-
-    crawler_meta = await crawlers_get_all_meta()
-
-    for crawler_inst in crawler_definitions:
-        if crawler_inst.name not in crawler_meta:
-            crawlers.append(crawler_inst)
-            continue
-
-        crawler_updated_with_meta: CrawlerDefinition | None = None
+    crawler_definitions = _CRAWLER_DEFINITIONS
 
-        try:
-            crawler_field_values = {
-                **crawler_inst.dict(),
-                **crawler_meta[crawler_inst.name],
-                "version": "2",
-            }
-            crawler_updated_with_meta = CrawlerDefinition(
-                **crawler_field_values,
-            )
-        except ValidationError as e:
-            logger.error(f"Validation error for crawler {crawler_inst.name}: {e}")
-            raise Exception("Crawler initiation error") from None
+    crawler_meta = await get_crawler_meta_cache()
 
-        if crawler_updated_with_meta:
-            crawlers.append(crawler_updated_with_meta)
+    crawlers = [_apply_crawler_meta(crawler_inst, crawler_meta.get(crawler_inst.name)) for crawler_inst in crawler_definitions]
 
     cs = CrawlerSet(crawlers=crawlers)
 
@@ -162,9 +166,38 @@ async def run_crawl(
     # now in opennem time which is Australia/Sydney
     now_opennem_time = get_today_opennem()
 
-    await crawler_set_meta(crawler.name, CrawlStatTypes.version, crawler.version)
-    await crawler_set_meta(crawler.name, CrawlStatTypes.last_crawled, now_opennem_time)
+    # crawl metadata is written in a single upsert once the crawl has finished or failed
+    crawl_meta: dict[CrawlStatTypes, Any] = {
+        CrawlStatTypes.version: crawler.version,
+        CrawlStatTypes.last_crawled: now_opennem_time,
+    }
+
+    try:
+        cr = await _run_crawl_processor(
+            crawler, last_crawled=last_crawled, limit=limit, latest=latest, date_range=date_range, reverse=reverse
+        )
+
+        if cr.server_latest:
+            crawl_meta[CrawlStatTypes.latest_processed] = cr.server_latest
+            crawl_meta[CrawlStatTypes.server_latest] = cr.server_latest
+            logger.info(f"Set last_processed to {crawler.last_processed} and server_latest to {cr.server_latest}")
+        else:
+            logger.debug(f"{crawler.name} has no server_latest return")
+    finally:
+        await crawler_set_meta_batch(crawler.name, crawl_meta)
+
+    return cr
+
 
+async def _run_crawl_processor(
+    crawler: CrawlerDefinition,
+    last_crawled: bool,
+    limit: int | None,
+    latest: bool,
+    date_range: CrawlDateRange | None,
+    reverse: bool,
+) -> ControllerReturn:
+    """Runs the crawler processor with the params it accepts and checks the return for errors"""
     cr: ControllerReturn | None = None
 
     # build the params for the crawler
@@ -197,24 +230,12 @@ async def run_crawl(
     if not cr:
         raise Exception(f"Crawl controller error no ControllerReturn for {crawler.name}") from None
 
-    # run here
-    has_errors = False
-
     logger.info(f"{crawler.name} Inserted {cr.inserted_records} of {cr.total_records} records")
 
     if cr.errors > 0:
-        has_errors = True
         logger.error(f"Crawl controller error for {crawler.name}: {cr.error_detail}")
         raise Exception("Crawl controller error") from None
 
-    if not has_errors:
-        if cr.server_latest:
-            await crawler_set_meta(crawler.name, CrawlStatTypes.latest_processed, cr.server_latest)
-            await crawler_set_meta(crawler.name, CrawlStatTypes.server_latest, cr.server_latest)
-            logger.info(f"Set last_processed to {crawler.last_processed} and server_latest to {cr.server_latest}")
-        else:
-            logger.debug(f"{crawler.name} has no server_latest return")
-
     return cr
 
 
@@ -234,14 +255,30 @@ async def run_crawl_urls(urls: list[str]) -> None:
 
 _CRAWLER_SET: CrawlerSet | None = None
 
+# metadata last applied to each crawler in the crawler set
+_CRAWLER_SET_META: dict[str, dict[str, Any] | None] = {}
+
 
 async def get_crawl_set() -> CrawlerSet:
-    """Access method for crawler set"""
+    """Access method for crawler set
+
+    The set is built once per worker. Crawlers whose metadata has changed in the metadata cache since
+    it was last applied are refreshed in place.
+    """
     global _CRAWLER_SET
 
     if not _CRAWLER_SET:
         _CRAWLER_SET = await load_crawlers()
 
+    crawler_meta = await get_crawler_meta_cache()
+
+    for index, crawler in enumerate(_CRAWLER_SET.crawlers):
+        if crawler.name in _CRAWLER_SET_META and crawler_meta.get(crawler.name) is _CRAWLER_SET_META[crawler.name]:
+            continue
+
+        _CRAWLER_SET.crawlers[index] = _apply_crawler_meta(crawler, crawler_meta.get(crawler.name))
+        _CRAWLER_SET_META[crawler.name] = crawler_meta.get(crawler.name)
+
     return _CRAWLER_SET
 
 
@@ -10,7 +10,7 @@ from opennem.core.crawlers.schema import CrawlerDefinition, CrawlerPriority, Cra
 from opennem.core.parsers.aemo.filenames import AEMODataBucketSize
 from opennem.core.parsers.aemo.mms import parse_aemo_url
 from opennem.core.parsers.aemo.nemweb import parse_aemo_url_optimized, parse_aemo_url_optimized_bulk
-from opennem.core.parsers.dirlisting import DirlistingEntry, get_dirlisting
+from opennem.core.parsers.dirlisting import DirlistingEntry, get_dirlisting, get_dirlisting_changes
 from opennem.crawlers.utils import get_time_interval_for_crawler
 from opennem.schema.date_range import CrawlDateRange
 from opennem.schema.network import NetworkAEMORooftop, NetworkNEM
@@ -77,6 +77,18 @@ async def run_nemweb_aemo_crawl(
         raise Exception("Require a URL to run AEMO MMS crawlers")
 
     try:
+        # per interval crawls only look for missing intervals once new files have been listed
+        if latest and not date_range:
+            changes = await get_dirlisting_changes(crawler.url, consumer=crawler.name, timezone="Australia/Brisbane")
+
+            if crawler.filename_filter:
+                changes.apply_filter(crawler.filename_filter)
+
+            if not changes.file_count:
+                logger.info("Nothing to do - no new files listed")
+                return ControllerReturn(inserted_records=0, processed_records=0, total_records=0)
+
+        # served from the conditional GET cache when the listing hasn't changed since
         dirlisting = await get_dirlisting(crawler.url, timezone="Australia/Brisbane")
     except Exception as e:
         raise Exception(f"Could not fetch directory listing: {crawler.url}. {e}") from e
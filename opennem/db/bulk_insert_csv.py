@@ -6,13 +6,19 @@ Bulk inserts records using temporary tables and CSV imports with copy_from
 
 """
 
+import asyncio
 import csv
 import logging
-from datetime import datetime
+import time
+import uuid
+from collections import deque
+from collections.abc import AsyncGenerator, Callable
+from dataclasses import dataclass
 from io import StringIO
 from typing import Any, TypeVar
 
 import asyncpg
+import pandas as pd
 from asyncpg.pool import Pool
 from sqlalchemy.sql.schema import Column, Table
 
@@ -44,13 +50,122 @@ _BULK_INSERT_CONFLICT_UPDATE = """
     ({pk_columns}) DO UPDATE set {update_values}
 """
 
+# number of rows converted at a time and streamed into a single binary COPY
+BULK_INSERT_COPY_CHUNK_SIZE = 50_000
+
+_BOOLEAN_TRUE_VALUES = ["true", "t", "yes", "y", "1"]
+
+
+def _convert_timestamp(column: pd.Series) -> pd.Series:
+    return pd.to_datetime(column, format="ISO8601")
+
+
+def _convert_timestamptz(column: pd.Series) -> pd.Series:
+    # naive values are taken as UTC, aware values are converted to it
+    return pd.to_datetime(column, format="ISO8601", utc=True)
+
+
+def _convert_date(column: pd.Series) -> pd.Series:
+    return pd.to_datetime(column, format="ISO8601").dt.date
+
+
+def _convert_float(column: pd.Series) -> pd.Series:
+    return pd.to_numeric(column).astype("float64")
+
+
+def _convert_integer(column: pd.Series) -> pd.Series:
+    return pd.to_numeric(column).astype("Int64")
+
+
+def _convert_boolean(column: pd.Series) -> pd.Series:
+    return column.astype(str).str.lower().isin(_BOOLEAN_TRUE_VALUES)
+
+
+def _convert_text(column: pd.Series) -> pd.Series:
+    return column.astype(str)
+
+
+# vectorised converters keyed by postgres data_type, anything else is sent as text
+_COLUMN_CODECS: dict[str, Callable[[pd.Series], pd.Series]] = {
+    "timestamp without time zone": _convert_timestamp,
+    "timestamp with time zone": _convert_timestamptz,
+    "date": _convert_date,
+    "numeric": _convert_float,
+    "double precision": _convert_float,
+    "real": _convert_float,
+    "integer": _convert_integer,
+    "bigint": _convert_integer,
+    "smallint": _convert_integer,
+    "boolean": _convert_boolean,
+}
+
+
+@dataclass
+class BulkInsertTableMeta:
+    """Column order and codecs for a bulk insert target table"""
+
+    columns: list[str]
+    column_types: dict[str, str]
+
+    def codec(self, column: str) -> Callable[[pd.Series], pd.Series]:
+        return _COLUMN_CODECS.get(self.column_types[column], _convert_text)
+
+
+# column metadata cache keyed by target table, populated on first insert
+_TABLE_META_CACHE: dict[str, BulkInsertTableMeta] = {}
+
+
+@dataclass
+class BulkInsertLaneMetrics:
+    """Metrics for a single bulk insert run on an insert lane"""
+
+    table: str
+    lane: int
+    rows: int
+    # in-memory size of the records frame, not the size of the COPY payload sent to postgres
+    frame_memory_bytes: int
+    duration_ms: float
+
+
+# free insert lane ids per target table. Acquiring a lane bounds concurrent inserts per table
+_TABLE_LANES: dict[str, asyncio.Queue[int]] = {}
+
+# most recent bulk insert metrics
+_LANE_METRICS: deque[BulkInsertLaneMetrics] = deque(maxlen=500)
+
+
+def get_bulk_insert_lane_count() -> int:
+    """Number of concurrent insert lanes per table, bounded by the size of the asyncpg pool"""
+    return max(1, min(settings.db_bulk_insert_lanes, settings.db_bulk_insert_pool_size))
+
+
+def _get_table_lanes(table_key: str) -> asyncio.Queue[int]:
+    if table_key not in _TABLE_LANES:
+        lanes: asyncio.Queue[int] = asyncio.Queue()
+
+        for lane in range(get_bulk_insert_lane_count()):
+            lanes.put_nowait(lane)
+
+        _TABLE_LANES[table_key] = lanes
+
+    return _TABLE_LANES[table_key]
+
+
+def get_bulk_insert_metrics(table: str | None = None) -> list[BulkInsertLaneMetrics]:
+    """Get the most recent bulk insert lane metrics, optionally for a single table"""
+    return [m for m in _LANE_METRICS if not table or m.table == table]
+
 
 def build_insert_query(
     table: Table,
     update_cols: list[str | Column] = None,
+    update_where: str | None = None,
 ) -> tuple[str, list[str]]:
     """
     Builds the bulk insert query
+
+    update_where is an optional condition on the conflicting row and EXCLUDED that rows must
+    meet to be updated, ie. to only update rows with newer data
     """
     on_conflict = "DO NOTHING"
 
@@ -76,6 +191,9 @@ def build_insert_query(
             update_values=", ".join([f"{n} = EXCLUDED.{n}" for n in update_col_names]),
         )
 
+        if update_where:
+            on_conflict += f" WHERE {update_where}"
+
     # Table schema
     table_schema: str = ""
     _ts: str = ""
@@ -95,10 +213,9 @@ def build_insert_query(
         else:
             table_schema = f"{_ts}."
 
-    # Temporary table name uniq
-    tmp_table_name: str = ""
-
-    tmp_table_name = datetime.strftime(datetime.now(), "%Y%m%d%H%M%S")
+    # Temporary table name uniq per call so concurrent lanes never collide
+    # @NOTE truncated to keep within the 63 char postgres identifier limit
+    tmp_table_name: str = uuid.uuid4().hex[:16]
 
     if _ts:
         tmp_table_name = f"{_ts}_{tmp_table_name}"
@@ -180,19 +297,130 @@ def _generate_bulkinsert_csv_from_records(
 async def get_pool() -> Pool:
     global pool
     if pool is None:
-        pool = await asyncpg.create_pool(dsn=settings.db_url.replace("+asyncpg", ""))
+        pool = await asyncpg.create_pool(dsn=settings.db_url.replace("+asyncpg", ""), max_size=settings.db_bulk_insert_pool_size)
     return pool
 
 
+def convert_records_for_copy(records: pd.DataFrame, table_meta: BulkInsertTableMeta) -> list[tuple]:
+    """Convert a frame of records into copy rows in table column order
+
+    Each column is converted in one vectorised pass using the codec for its postgres type.
+    Missing columns and null values are sent as NULL.
+    """
+    records = records.reindex(columns=table_meta.columns)
+    converted_columns: list[list[Any]] = []
+
+    for column_name in table_meta.columns:
+        column = records[column_name]
+        is_null = column.isna()
+
+        if not is_null.all():
+            column = table_meta.codec(column_name)(column.where(~is_null, None))
+
+        converted_columns.append(column.astype(object).where(~is_null, None).tolist())
+
+    return list(zip(*converted_columns, strict=True))
+
+
+async def _iter_copy_records(
+    records: pd.DataFrame, table_meta: BulkInsertTableMeta, chunk_size: int
+) -> AsyncGenerator[tuple, None]:
+    """Convert records a chunk at a time while they are streamed into COPY"""
+    for offset in range(0, len(records), chunk_size):
+        for row in convert_records_for_copy(records.iloc[offset : offset + chunk_size], table_meta):
+            yield row
+
+
+async def _get_table_meta(conn: asyncpg.Connection, table: ORMTableType, tmp_table_name: str) -> BulkInsertTableMeta:
+    """Get the cached column metadata for a table, reading it from the staging table on first use"""
+    cache_key = str(table.__table__)  # type: ignore
+
+    if cache_key in _TABLE_META_CACHE:
+        return _TABLE_META_CACHE[cache_key]
+
+    table_info = await conn.fetch(
+        """
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_name = $1
+        ORDER BY ordinal_position
+        """,
+        tmp_table_name.split(".")[-1],
+    )
+
+    table_meta = BulkInsertTableMeta(
+        columns=[col["column_name"] for col in table_info],
+        column_types={col["column_name"]: col["data_type"] for col in table_info},
+    )
+
+    _TABLE_META_CACHE[cache_key] = table_meta
+
+    return table_meta
+
+
 async def bulkinsert_mms_items(
     table: ORMTableType,
-    records: list[dict],
+    records: list[dict] | pd.DataFrame,
     update_fields: list[str | Column[Any]] | None = None,
+    chunk_size: int = BULK_INSERT_COPY_CHUNK_SIZE,
+    update_where: str | None = None,
 ) -> int:
-    if not records:
+    """Bulk insert records into a table using a staging table and binary COPY
+
+    Records can be a list of dicts or a DataFrame. Column order and codecs are cached per
+    table after the first call and values are converted column-wise a chunk at a time as
+    they are streamed to postgres.
+
+    Up to get_bulk_insert_lane_count() inserts run concurrently per table, each on its own
+    pooled connection and staging table. Per lane metrics are kept in get_bulk_insert_metrics.
+
+    Conflicting rows are updated with update_fields, only where update_where holds if it is set.
+    """
+    if records is None or len(records) == 0:
         return 0
 
-    tmp_table_name, sql_queries = build_insert_query(table=table, update_cols=update_fields)
+    records_df = records if isinstance(records, pd.DataFrame) else pd.DataFrame.from_records(records)
+
+    table_key = str(table.__table__)  # type: ignore
+    table_lanes = _get_table_lanes(table_key)
+
+    lane = await table_lanes.get()
+
+    try:
+        start_time = time.perf_counter()
+        num_records = await _bulkinsert_lane(
+            table=table, records_df=records_df, update_fields=update_fields, chunk_size=chunk_size, update_where=update_where
+        )
+        duration_ms = (time.perf_counter() - start_time) * 1000
+    finally:
+        table_lanes.put_nowait(lane)
+
+    lane_metrics = BulkInsertLaneMetrics(
+        table=table_key,
+        lane=lane,
+        rows=num_records,
+        frame_memory_bytes=int(records_df.memory_usage(deep=True).sum()),
+        duration_ms=round(duration_ms, 2),
+    )
+    _LANE_METRICS.append(lane_metrics)
+
+    logger.info(
+        f"Bulk insert lane {lane} on {table_key}: {lane_metrics.rows} rows, "
+        f"{lane_metrics.frame_memory_bytes} frame bytes in {lane_metrics.duration_ms}ms"
+    )
+
+    return num_records
+
+
+async def _bulkinsert_lane(
+    table: ORMTableType,
+    records_df: pd.DataFrame,
+    update_fields: list[str | Column[Any]] | None,
+    chunk_size: int,
+    update_where: str | None = None,
+) -> int:
+    """Run a bulk insert through a uniquely named staging table on its own pooled connection"""
+    tmp_table_name, sql_queries = build_insert_query(table=table, update_cols=update_fields, update_where=update_where)
 
     pool = await get_pool()
     async with pool.acquire() as conn:
@@ -201,51 +429,19 @@ async def bulkinsert_mms_items(
                 # Execute CREATE TEMP TABLE
                 await conn.execute(sql_queries[0])
 
-                # Get column names and types from the temporary table
-                table_info = await conn.fetch(f"""
-                    SELECT column_name, data_type
-                    FROM information_schema.columns
-                    WHERE table_name = '{tmp_table_name.split(".")[-1]}'
-                """)
-
-                # Prepare records
-                columns = [col["column_name"] for col in table_info]
-                column_types = {col["column_name"]: col["data_type"] for col in table_info}
-
-                records_to_insert = []
-                for record in records:
-                    record_values = []
-                    for col in columns:
-                        value = record.get(col)
-                        if value is None:
-                            record_values.append(None)
-                        elif column_types[col] == "timestamp without time zone":
-                            # Convert string to datetime object if it's not already
-                            record_values.append(value if isinstance(value, datetime) else datetime.fromisoformat(str(value)))
-                        elif column_types[col] == "numeric":
-                            # Ensure numeric values are passed as float or Decimal
-                            record_values.append(float(value) if value is not None else None)
-                        elif column_types[col] == "boolean":
-                            # Convert string to boolean
-                            value = str(value).lower()
-                            record_values.append(value in ("true", "t", "yes", "y", "1"))
-                        elif column_types[col] in ("integer", "bigint", "smallint"):
-                            record_values.append(int(value) if value is not None else None)
-                        else:
-                            record_values.append(str(value))
-                    records_to_insert.append(record_values)
+                table_meta = await _get_table_meta(conn, table, tmp_table_name)
 
                 # Use copy_records_to_table to bulk insert the records
                 await conn.copy_records_to_table(
                     tmp_table_name.split(".")[-1],  # Remove schema if present
-                    records=records_to_insert,
-                    columns=columns,
+                    records=_iter_copy_records(records_df, table_meta, chunk_size),
+                    columns=table_meta.columns,
                 )
 
                 # Execute the INSERT ... ON CONFLICT query
                 insert_result = await conn.execute(sql_queries[2])
 
-                num_records = len(records)
+                num_records = len(records_df)
                 logger.info(f"Bulk inserted {num_records} records: {insert_result}")
 
                 return num_records
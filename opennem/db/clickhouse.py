@@ -4,9 +4,11 @@ ClickHouse database connection and utilities module.
 This module provides a global ClickHouse client and common utilities for working with ClickHouse.
 """
 
+import asyncio
 import logging
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from typing import Any
 
 from clickhouse_driver import Client
 
@@ -49,6 +51,117 @@ async def get_clickhouse_context() -> AsyncGenerator[Client, None]:
         client.disconnect()
 
 
+class ClickHousePool:
+    """
+    Pool of ClickHouse clients for async callers.
+
+    Clients are created on first use and reused across queries. Each query runs on a worker
+    thread with a checked out client so the blocking driver never stalls the event loop.
+    """
+
+    def __init__(self, size: int | None = None, query_timeout: int | None = None):
+        self.size = size or settings.clickhouse_pool_size
+        self.query_timeout = query_timeout or settings.clickhouse_query_timeout
+        self._clients: asyncio.Queue[Client | None] = asyncio.Queue()
+
+        # empty slots are filled with a client when they are first checked out
+        for _ in range(self.size):
+            self._clients.put_nowait(None)
+
+    def _create_client(self) -> Client:
+        return Client(
+            host=settings.clickhouse_url.host,
+            port=settings.clickhouse_url.port,
+            user=settings.clickhouse_url.username,
+            password=settings.clickhouse_url.password,
+            send_receive_timeout=self.query_timeout,
+            settings={"connect_timeout": 10},
+        )
+
+    async def execute(
+        self, query: str, params: dict | None = None, columnar: bool = False, timeout: int | None = None
+    ) -> list[Any]:
+        """
+        Execute a query on a pooled client off the event loop.
+
+        Args:
+            query: The query to execute
+            params: Query parameters
+            columnar: Return a list of columns rather than a list of rows
+            timeout: Query timeout in seconds, defaults to the pool query timeout
+
+        Returns:
+            list: rows, or columns when columnar is set
+        """
+        timeout = timeout or self.query_timeout
+        client = await self._clients.get()
+        query_future: asyncio.Future[list[Any]] | None = None
+
+        try:
+            if client is None:
+                client = self._create_client()
+
+            query_future = asyncio.ensure_future(
+                asyncio.to_thread(client.execute, query, params, columnar=columnar, settings={"max_execution_time": timeout})
+            )
+
+            # shielded so a cancelled caller can't hand the client back while its query is still running
+            result = await asyncio.shield(query_future)
+        except asyncio.CancelledError:
+            if query_future is not None and not query_future.done():
+                query_future.add_done_callback(
+                    lambda f: self._release_client(client, failed=f.cancelled() or f.exception() is not None)
+                )
+            else:
+                self._release_client(client, failed=True)
+
+            raise
+        except Exception:
+            self._release_client(client, failed=True)
+            raise
+
+        self._release_client(client, failed=False)
+
+        return result
+
+    def _release_client(self, client: Client | None, failed: bool) -> None:
+        """Return a client to the pool once it is no longer running a query"""
+        # drop the connection so a broken client isn't handed to the next query
+        if failed and client is not None:
+            client.disconnect()
+
+        self._clients.put_nowait(client)
+
+    def disconnect(self) -> None:
+        """Disconnect all idle clients in the pool"""
+        for client in list(self._clients._queue):  # type: ignore
+            if client is not None:
+                client.disconnect()
+
+
+_clickhouse_pool: ClickHousePool | None = None
+
+
+def get_clickhouse_pool() -> ClickHousePool:
+    """Get the shared ClickHouse client pool"""
+    global _clickhouse_pool
+
+    if _clickhouse_pool is None:
+        _clickhouse_pool = ClickHousePool()
+
+    return _clickhouse_pool
+
+
+async def get_clickhouse_pool_dependency() -> ClickHousePool:
+    """
+    FastAPI dependency for injecting the shared ClickHouse pool into route handlers.
+
+    Returns:
+        ClickHousePool: pool for executing queries without blocking the event loop
+    """
+    return get_clickhouse_pool()
+
+
 async def get_clickhouse_dependency() -> AsyncGenerator[Client, None]:
     """
     FastAPI dependency for injecting ClickHouse client into route handlers.
@@ -1,11 +1,20 @@
 """
-Clickhouse materialized view definitions and utilities.
+Clickhouse materialized view and rollup definitions and utilities.
 
-This module contains the dataclass definitions for materialized views and their
-implementations in the OpenNEM system.
+This module contains the dataclass definitions for materialized views and monthly rollup
+tables and their implementations in the OpenNEM system.
 """
 
+import logging
 from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from clickhouse_driver import Client
+
+from opennem.db.clickhouse import get_clickhouse_client, table_exists
+from opennem.utils.dates import get_today_nem
+
+logger = logging.getLogger("opennem.db.clickhouse_views")
 
 
 @dataclass
@@ -279,6 +288,7 @@ RENEWABLE_INTERVALS_DAILY_VIEW = MaterializedView(
     """,
 )
 
+
 CLICKHOUSE_MATERIALIZED_VIEWS = {
     "unit_intervals_daily_mv": UNIT_INTERVALS_DAILY_VIEW,
     "fueltech_intervals_mv": FUELTECH_INTERVALS_VIEW,
@@ -286,3 +296,376 @@ CLICKHOUSE_MATERIALIZED_VIEWS = {
     "renewable_intervals_mv": RENEWABLE_INTERVALS_VIEW,
     "renewable_intervals_daily_mv": RENEWABLE_INTERVALS_DAILY_VIEW,
 }
+
+
+@dataclass
+class RollupTable:
+    """
+    Dataclass representing a Clickhouse monthly rollup table.
+
+    Rollups are not insert triggers. The aggregates re-insert the trailing intervals on every run,
+    so a trigger would either replace a month with a partial aggregate or sum the same interval
+    more than once. Only closed months are kept, each rebuilt whole from the deduplicated source
+    and swapped in with a partition replace so readers never see a month missing or half built.
+
+    Attributes:
+        name: The name of the rollup table
+        source_table: The table the rollup is built from
+        schema: The SQL schema definition for the table, partitioned by month
+        select_query: The SQL query aggregating the source between start and end (exclusive)
+    """
+
+    name: str
+    source_table: str
+    schema: str
+    select_query: str
+
+
+UNIT_INTERVALS_MONTHLY_ROLLUP = RollupTable(
+    name="unit_intervals_monthly",
+    source_table="unit_intervals",
+    schema="""
+        CREATE TABLE unit_intervals_monthly
+        ENGINE = MergeTree
+        PARTITION BY toYYYYMM(date)
+        ORDER BY (date, network_id, network_region, facility_code, unit_code, fueltech_id, fueltech_group_id)
+        AS SELECT
+            toStartOfMonth(interval) as date,
+            network_id,
+            network_region,
+            facility_code,
+            unit_code,
+            fueltech_id,
+            fueltech_group_id,
+            any(renewable) as renewable,
+            any(status_id) as status_id,
+            sum(generated) as generated,
+            sum(energy) as energy,
+            sum(emissions) as emissions,
+            sum(market_value) as market_value,
+            count() as count
+        FROM unit_intervals
+        WHERE 0
+        GROUP BY
+            date,
+            network_id,
+            network_region,
+            facility_code,
+            unit_code,
+            fueltech_id,
+            fueltech_group_id
+    """,
+    select_query="""
+        SELECT
+            toStartOfMonth(interval) as date,
+            network_id,
+            network_region,
+            facility_code,
+            unit_code,
+            fueltech_id,
+            fueltech_group_id,
+            any(renewable) as renewable,
+            any(status_id) as status_id,
+            sum(generated) as generated,
+            sum(energy) as energy,
+            sum(emissions) as emissions,
+            sum(market_value) as market_value,
+            count() as count
+        FROM unit_intervals FINAL
+        WHERE interval >= %(start)s AND interval < %(end)s
+        GROUP BY
+            date,
+            network_id,
+            network_region,
+            facility_code,
+            unit_code,
+            fueltech_id,
+            fueltech_group_id
+    """,
+)
+
+FUELTECH_INTERVALS_MONTHLY_ROLLUP = RollupTable(
+    name="fueltech_intervals_monthly",
+    source_table="unit_intervals",
+    schema="""
+        CREATE TABLE fueltech_intervals_monthly
+        ENGINE = MergeTree
+        PARTITION BY toYYYYMM(date)
+        ORDER BY (date, network_id, network_region, fueltech_id, fueltech_group_id)
+        AS SELECT
+            toStartOfMonth(interval) as date,
+            network_id,
+            network_region,
+            fueltech_id,
+            fueltech_group_id,
+            sum(generated) as generated,
+            sum(energy) as energy,
+            sum(emissions) as emissions,
+            sum(market_value) as market_value,
+            count() as unit_count,
+            count(distinct interval) as interval_count
+        FROM unit_intervals
+        WHERE 0
+        GROUP BY
+            date,
+            network_id,
+            network_region,
+            fueltech_id,
+            fueltech_group_id
+    """,
+    select_query="""
+        SELECT
+            toStartOfMonth(interval) as date,
+            network_id,
+            network_region,
+            fueltech_id,
+            fueltech_group_id,
+            sum(generated) as generated,
+            sum(energy) as energy,
+            sum(emissions) as emissions,
+            sum(market_value) as market_value,
+            count() as unit_count,
+            count(distinct interval) as interval_count
+        FROM unit_intervals FINAL
+        WHERE interval >= %(start)s AND interval < %(end)s
+        GROUP BY
+            date,
+            network_id,
+            network_region,
+            fueltech_id,
+            fueltech_group_id
+    """,
+)
+
+# the market summary rollup keeps sums and counts rather than averages so price and demand
+# can be averaged correctly across months
+
+MARKET_SUMMARY_MONTHLY_ROLLUP = RollupTable(
+    name="market_summary_monthly",
+    source_table="market_summary",
+    schema="""
+        CREATE TABLE market_summary_monthly
+        ENGINE = MergeTree
+        PARTITION BY toYYYYMM(date)
+        ORDER BY (date, network_id, network_region)
+        AS SELECT
+            toStartOfMonth(interval) as date,
+            network_id,
+            network_region,
+            sum(price) as price_sum,
+            count(price) as price_count,
+            sum(demand) as demand_sum,
+            count(demand) as demand_count,
+            sum(demand_total) as demand_total_sum,
+            count(demand_total) as demand_total_count,
+            sum(demand_energy) as demand_energy,
+            sum(demand_total_energy) as demand_total_energy,
+            sum(demand_market_value) as demand_market_value,
+            sum(demand_total_market_value) as demand_total_market_value,
+            count() as interval_count
+        FROM market_summary
+        WHERE 0
+        GROUP BY date, network_id, network_region
+    """,
+    select_query="""
+        SELECT
+            toStartOfMonth(interval) as date,
+            network_id,
+            network_region,
+            sum(price) as price_sum,
+            count(price) as price_count,
+            sum(demand) as demand_sum,
+            count(demand) as demand_count,
+            sum(demand_total) as demand_total_sum,
+            count(demand_total) as demand_total_count,
+            sum(demand_energy) as demand_energy,
+            sum(demand_total_energy) as demand_total_energy,
+            sum(demand_market_value) as demand_market_value,
+            sum(demand_total_market_value) as demand_total_market_value,
+            count() as interval_count
+        FROM market_summary FINAL
+        WHERE interval >= %(start)s AND interval < %(end)s
+        GROUP BY date, network_id, network_region
+    """,
+)
+
+CLICKHOUSE_ROLLUP_TABLES = {
+    "unit_intervals_monthly": UNIT_INTERVALS_MONTHLY_ROLLUP,
+    "fueltech_intervals_monthly": FUELTECH_INTERVALS_MONTHLY_ROLLUP,
+    "market_summary_monthly": MARKET_SUMMARY_MONTHLY_ROLLUP,
+}
+
+# closed months rebuilt by the daily rollup task, enough to pick up late revisions to the
+# month that has just closed
+CLICKHOUSE_ROLLUP_REBUILD_MONTHS = 2
+
+# a month is only read from the rollups once it has been closed this long, so the daily task
+# has run at least once since the month closed
+CLICKHOUSE_ROLLUP_LAG = timedelta(days=1)
+
+
+def _month_start(dt: datetime) -> datetime:
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month_start(dt: datetime) -> datetime:
+    return _month_start(_month_start(dt) + timedelta(days=32))
+
+
+def _current_month_start() -> datetime:
+    """Start of the open month in naive NEM time, rollups only hold the months before it"""
+    return _month_start(get_today_nem().replace(tzinfo=None))
+
+
+def get_rollups_closed_until(today: date | None = None) -> date:
+    """Start of the first month not yet available from the monthly rollups"""
+    today = today or get_today_nem().date()
+
+    return (today - CLICKHOUSE_ROLLUP_LAG).replace(day=1)
+
+
+def backfill_materialized_views(
+    client: Client, views: list[MaterializedView], start: datetime, end: datetime, chunk_months: int = 1
+) -> None:
+    """
+    Backfill materialized views from their source table between start and end.
+
+    Chunks are aligned to calendar months so daily rollup rows are always built from complete
+    source data rather than split across chunks.
+
+    Args:
+        client: ClickHouse client
+        views: Views to backfill, in dependency order
+        start: Start of the backfill
+        end: End of the backfill, inclusive
+        chunk_months: Number of calendar months to backfill per query
+    """
+    for view in views:
+        chunk_start = _month_start(start)
+
+        while chunk_start <= end:
+            chunk_end = chunk_start
+
+            for _ in range(chunk_months):
+                chunk_end = _next_month_start(chunk_end)
+
+            client.execute(view.backfill_query, {"start": chunk_start, "end": min(chunk_end - timedelta(seconds=1), end)})
+            logger.info(f"Backfilled {view.name} from {chunk_start} to {chunk_end}")
+
+            chunk_start = chunk_end
+
+
+def rebuild_rollup_months(client: Client, rollups: list[RollupTable], start: datetime, end: datetime) -> int:
+    """
+    Rebuild the closed months of rollups between start and end from their source table.
+
+    Each month is built into a staging copy of the rollup and swapped in with a single partition
+    replace. Months that have not closed yet are skipped.
+
+    Args:
+        client: ClickHouse client
+        rollups: Rollup tables to rebuild
+        start: Start of the range to rebuild
+        end: End of the range to rebuild, inclusive
+
+    Returns:
+        int: Number of months rebuilt
+    """
+    month_start = _month_start(start)
+    rebuild_end = min(_next_month_start(end), _current_month_start())
+    num_months = 0
+
+    while month_start < rebuild_end:
+        month_end = _next_month_start(month_start)
+
+        for rollup in rollups:
+            staging_table = f"{rollup.name}_staging"
+
+            client.execute(f"CREATE TABLE IF NOT EXISTS {staging_table} AS {rollup.name}")
+            client.execute(f"TRUNCATE TABLE {staging_table}")
+            client.execute(f"INSERT INTO {staging_table} {rollup.select_query}", {"start": month_start, "end": month_end})
+            client.execute(f"ALTER TABLE {rollup.name} REPLACE PARTITION {month_start:%Y%m} FROM {staging_table}")
+
+        logger.info(f"Rebuilt {', '.join(i.name for i in rollups)} for {month_start:%Y-%m}")
+
+        num_months += 1
+        month_start = month_end
+
+    return num_months
+
+
+def run_rollup_rebuild(
+    rollups: list[RollupTable] | None = None, start: datetime | None = None, refresh_rollups: bool = False
+) -> int:
+    """
+    Rebuild closed months of the monthly rollups. Scheduled daily for the last
+    CLICKHOUSE_ROLLUP_REBUILD_MONTHS, run with the start of the source data to backfill them. Queries
+    are only routed to the rollups once settings.clickhouse_rollup_routing is enabled after a backfill.
+
+    Args:
+        rollups: Optional rollups to rebuild, defaults to all of them
+        start: Optional start of the rebuild, defaults to the last CLICKHOUSE_ROLLUP_REBUILD_MONTHS
+        refresh_rollups: Drop and recreate each rollup before rebuilding it
+
+    Returns:
+        int: Number of months rebuilt
+    """
+    client = get_clickhouse_client(timeout=1000)
+    rollups = rollups or list(CLICKHOUSE_ROLLUP_TABLES.values())
+    end = _current_month_start() - timedelta(seconds=1)
+
+    if not start:
+        start = _month_start(end)
+
+        for _ in range(CLICKHOUSE_ROLLUP_REBUILD_MONTHS - 1):
+            start = _month_start(start - timedelta(days=1))
+
+    for rollup in rollups:
+        if refresh_rollups:
+            logger.info(f"Refreshing {rollup.name}")
+            client.execute(f"DROP TABLE IF EXISTS {rollup.name}")
+
+        if refresh_rollups or not table_exists(client, rollup.name):
+            client.execute(rollup.schema)
+
+    return rebuild_rollup_months(client, rollups, start, end)
+
+
+def backfill_clickhouse_views(view: MaterializedView | str | None = None, refresh_views: bool = False) -> None:
+    """
+    Backfill materialized views from the base unit_intervals table.
+    This should be run after bulk loading data into unit_intervals if the views are empty, and
+    with refresh_views to recreate views whose definition has changed.
+
+    Args:
+        view: Optional view to backfill. Can be either a MaterializedView instance or a view name.
+              If None, all views will be backfilled.
+        refresh_views: Drop and recreate each view before backfilling it
+
+    Raises:
+        ValueError: If a view name is provided but not found
+    """
+    client = get_clickhouse_client()
+
+    start_date, end_date = client.execute("SELECT min(interval), max(interval) FROM unit_intervals")[0]
+
+    if view is None:
+        views_to_process = list(CLICKHOUSE_MATERIALIZED_VIEWS.values())
+    elif isinstance(view, MaterializedView):
+        views_to_process = [view]
+    elif view in CLICKHOUSE_MATERIALIZED_VIEWS:
+        views_to_process = [CLICKHOUSE_MATERIALIZED_VIEWS[view]]
+    else:
+        raise ValueError(f"View {view} not found")
+
+    for view in views_to_process:
+        # delete and recreate the view if we are refreshing
+        if refresh_views:
+            logger.info(f"Refreshing {view.name}")
+            client.execute(f"DROP TABLE IF EXISTS {view.name}")
+            client.execute(view.schema)
+
+        backfill_materialized_views(client, [view], start=start_date, end=end_date)
+
+        record_count = client.execute(f"SELECT count() FROM {view.name}")[0][0]
+        logger.info(f"Backfill complete for {view.name}. Records: {record_count}")
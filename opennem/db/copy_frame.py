@@ -0,0 +1,47 @@
+"""
+Read postgres query results into polars frames with COPY.
+
+Query results are streamed out of postgres as CSV and parsed column-wise by polars so no per-row
+python objects are created.
+"""
+
+import io
+
+import polars as pl
+
+from opennem.db.bulk_insert_csv import get_pool
+
+
+async def copy_query_frame(query: str, schema: dict, *args) -> pl.DataFrame:
+    """
+    Stream a query out of postgres with COPY into a polars frame.
+
+    Args:
+        query: Query with positional ($1, $2 ..) parameters
+        schema: Polars schema of the query columns
+        *args: Query parameters
+
+    Returns:
+        pl.DataFrame: Query result, empty with the schema when there are no rows
+    """
+    output = io.BytesIO()
+
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        await conn.copy_from_query(query, *args, output=output, format="csv", header=True)
+
+    output.seek(0)
+
+    if not output.getbuffer().nbytes:
+        return pl.DataFrame(schema=schema)
+
+    boolean_columns = [name for name, dtype in schema.items() if dtype == pl.Boolean]
+
+    df = pl.read_csv(
+        output,
+        schema_overrides={**schema, **dict.fromkeys(boolean_columns, pl.String)},
+        try_parse_dates=False,
+    )
+
+    # postgres writes booleans as t/f
+    return df.with_columns([(pl.col(i) == "t") for i in boolean_columns])
@@ -5,23 +5,29 @@ Export data as parquet files to a bucket
 Purpose of this module is to export data as parquet files to a public bucket overnight so that it can be
 used for bulk imports in dev.
 
-The module streams data directly from the database to the storage bucket using polars and async IO.
+The module streams data from the database in time chunks sized from the measured row widths. Each
+chunk is written as parquet row groups to a spooled temporary file, or the local output file, while
+the next chunk is read, and the file is sent to the storage bucket as a multipart upload.
 
 Exports:
  * generation and energy data per interval by fueltech for the last year
  * price and demand data per interval for the last year
 """
 
-import io
+import asyncio
+import contextlib
 import logging
+import tempfile
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 from textwrap import dedent
+from typing import BinaryIO
 
 import polars as pl
 import psutil
+import pyarrow as pa
 import pyarrow.parquet as pq
 from humanize import naturalsize
 
@@ -37,6 +43,11 @@ logger.setLevel(logging.DEBUG)
 
 _BUCKET_UPLOAD_DIRECTORY = "archive/nem/"
 
+# share of available memory used for the chunks in flight and bounds on chunk sizes
+ARCHIVE_MEMORY_FRACTION = 0.25
+ARCHIVE_MIN_CHUNK_BYTES = 64 * 1024 * 1024
+ARCHIVE_MAX_CHUNK_DAYS = 366
+
 
 @dataclass
 class OpenNEMDataExport:
@@ -68,29 +79,6 @@ class OpenNEMDataExport:
 # queries for archive exports
 
 
-def _get_time_chunks(date_start: datetime, date_end: datetime, chunk_days: int = 90) -> list[tuple[datetime, datetime]]:
-    """
-    Generate time chunks for processing large date ranges.
-
-    Args:
-        date_start: Start date
-        date_end: End date
-        chunk_days: Number of days per chunk
-
-    Returns:
-        list[tuple[datetime, datetime]]: List of (chunk_start, chunk_end) tuples
-    """
-    chunks = []
-    chunk_start = date_start
-
-    while chunk_start < date_end:
-        chunk_end = min(chunk_start + timedelta(days=chunk_days), date_end)
-        chunks.append((chunk_start, chunk_end))
-        chunk_start = chunk_end
-
-    return chunks
-
-
 def _get_fueltech_interval_query(
     date_start: datetime, date_end: datetime, limit: int | None = None, offset: int | None = None
 ) -> str:
@@ -248,116 +236,149 @@ _ARCHIVE_EXPORT_QUERY_MAP = {
 }
 
 
-def _get_memory_chunk_size() -> int:
+def _get_chunk_memory_budget() -> int:
     """
-    Calculates an appropriate chunk size based on available system memory.
+    Memory budget in bytes for a chunk of rows.
 
-    Returns:
-        int: Recommended chunk size for data processing
+    Two chunks are held at once since the next chunk is prefetched while the current one is
+    written, so each gets half of the archive share of available memory.
     """
-    # Get available memory in bytes
     available_memory = psutil.virtual_memory().available
 
-    # Use 25% of available memory as a safe buffer
-    safe_memory = available_memory * 0.5
+    return max(ARCHIVE_MIN_CHUNK_BYTES, int(available_memory * ARCHIVE_MEMORY_FRACTION / 2))
 
-    # Estimate row size (adjust based on your data - this assumes 100 bytes per row)
-    estimated_row_size = 100
 
-    # Calculate chunk size with a minimum of 10,000 and maximum of 500,000 rows
-    chunk_size = int(safe_memory / estimated_row_size)
-    return max(10_000, min(500_000, chunk_size))
+def _get_chunk_days(bytes_per_day: float | None, memory_budget: int) -> int:
+    """
+    Number of days in the next chunk from the measured size of a day of rows.
 
+    Before anything has been measured a single day is read to size the rest from.
+    """
+    if bytes_per_day is None:
+        return 1
+
+    if bytes_per_day <= 0:
+        return ARCHIVE_MAX_CHUNK_DAYS
+
+    return max(1, min(ARCHIVE_MAX_CHUNK_DAYS, int(memory_budget / bytes_per_day)))
 
-async def _stream_to_parquet(export_definition: OpenNEMDataExport, buffer: io.BytesIO) -> tuple[int, int]:
+
+async def _write_parquet_chunks(
+    output: BinaryIO,
+    read_chunk: Callable[[datetime, datetime], pl.DataFrame],
+    date_start: datetime,
+    date_end: datetime,
+    memory_budget: int,
+) -> tuple[int, int]:
     """
-    Streams query results using time-based chunking.
+    Read chunks of rows from date_start to date_end and write them as row groups to output.
+
+    The next chunk is read in a thread while the current one is written and each chunk is sized
+    from the measured bytes per day of the chunk before it.
+
+    Returns:
+        tuple of the total rows and bytes written
     """
-    engine = db_connect_sync()
+    writer: pq.ParquetWriter | None = None
+    schema: pa.Schema | None = None
+    total_rows = 0
+    bytes_per_day: float | None = None
 
-    try:
-        with engine.connect() as conn:
-            # Get date range
-            date_start = NetworkNEM.data_first_seen.replace(tzinfo=None)
-            date_end = get_last_complete_day_for_network(network=NetworkNEM).replace(tzinfo=None)
+    def _next_chunk(chunk_start: datetime) -> tuple[datetime, datetime]:
+        chunk_days = _get_chunk_days(bytes_per_day, memory_budget)
+        return chunk_start, min(chunk_start + timedelta(days=chunk_days), date_end)
 
-            if export_definition.time_period:
-                date_start = date_end - export_definition.time_period
+    def _write_chunk(df_chunk: pl.DataFrame) -> None:
+        nonlocal writer, schema
 
-            if not date_start:
-                raise ValueError(f"Date start for {export_definition.file_name} is not set")
+        table = df_chunk.to_arrow()
 
-            # Get schema from first chunk
-            first_query = export_definition.query(date_start, date_start + timedelta(days=1), None, None)
-            first_chunk = pl.read_database(first_query, conn, schema_overrides={})
-            schema = first_chunk.to_arrow().schema
+        if writer is None or schema is None:
+            schema = table.schema
+            writer = pq.ParquetWriter(output, schema, compression="snappy", version="2.6", write_statistics=True)
+        elif table.schema != schema:
+            table = table.cast(schema)
 
-            # Create PyArrow writer
-            writer = pq.ParquetWriter(buffer, schema, compression="snappy", version="2.6", write_statistics=True)
+        writer.write_table(table)
 
-            # Process time chunks
-            total_rows = 0
-            chunks = _get_time_chunks(date_start, date_end)
+    chunk_start, chunk_end = _next_chunk(date_start)
+    next_read: asyncio.Task | None = asyncio.create_task(asyncio.to_thread(read_chunk, chunk_start, chunk_end))
 
-            for chunk_start, chunk_end in chunks:
-                logger.debug(f"Processing chunk {chunk_start} to {chunk_end}")
+    try:
+        while next_read:
+            df_chunk = await next_read
+            next_read = None
 
-                query = export_definition.query(chunk_start, chunk_end, None, None)
-                df_chunk = pl.read_database(query, conn, schema_overrides={})
+            if df_chunk.height:
+                chunk_seconds = (chunk_end - chunk_start).total_seconds()
+                bytes_per_day = df_chunk.estimated_size() / max(chunk_seconds / 86400, 1 / 24)
 
-                if df_chunk.height == 0:
-                    continue
+            # prefetch the next chunk while this one is written
+            if chunk_end < date_end:
+                chunk_start, chunk_end = _next_chunk(chunk_end)
+                next_read = asyncio.create_task(asyncio.to_thread(read_chunk, chunk_start, chunk_end))
 
-                arrow_table = df_chunk.to_arrow()
-                for batch in arrow_table.to_batches():
-                    writer.write_batch(batch)
-                    total_rows += batch.num_rows
+            if not df_chunk.height:
+                continue
 
-                logger.debug(f"Processed chunk with {df_chunk.height:,} rows")
+            await asyncio.to_thread(_write_chunk, df_chunk)
+            total_rows += df_chunk.height
 
+            logger.debug(
+                f"Wrote chunk with {df_chunk.height:,} rows ({naturalsize(df_chunk.estimated_size(), binary=True)}), "
+                f"next chunk {chunk_start} to {chunk_end}"
+            )
+    finally:
+        # a read running in a thread can't be cancelled so let it finish before the connection is closed
+        if next_read:
+            with contextlib.suppress(Exception):
+                await next_read
+
+        if writer:
             writer.close()
-            logger.info(f"Processed total of {total_rows:,} rows")
 
-            buffer.seek(0)
-            return total_rows, len(buffer.getvalue())
+    logger.info(f"Processed total of {total_rows:,} rows")
 
-    except Exception as e:
-        logger.error(f"Failed to stream to parquet: {str(e)}")
-        raise
+    return total_rows, output.tell()
 
 
-async def _stream_and_upload_query(export_definition: OpenNEMDataExport) -> int:
+async def _stream_to_parquet(export_definition: OpenNEMDataExport, output: BinaryIO) -> tuple[int, int]:
+    """
+    Streams query results to a parquet file object in adaptively sized time chunks.
     """
-    Streams query results to parquet and uploads to bucket.
+    engine = db_connect_sync()
 
-    Args:
-        query_func: Function that returns the SQL query to execute
-        filename: Name of the output file (without extension)
+    # Get date range
+    date_start = NetworkNEM.data_first_seen.replace(tzinfo=None)
+    date_end = get_last_complete_day_for_network(network=NetworkNEM).replace(tzinfo=None)
 
-    Returns:
-        int: The size of the file in bytes
+    if export_definition.time_period:
+        date_start = date_end - export_definition.time_period
 
-    Raises:
-        Exception: If processing or upload fails
-    """
-    buffer = io.BytesIO()
+    if not date_start:
+        raise ValueError(f"Date start for {export_definition.file_name} is not set")
 
     try:
-        _, file_size = await _stream_to_parquet(export_definition, buffer)
+        with engine.connect() as conn:
 
-        # Upload to bucket
-        destination = f"{_BUCKET_UPLOAD_DIRECTORY}{export_definition.get_file_name}"
-        await cloudflare_uploader.upload_bytes(buffer.getvalue(), destination, "application/octet-stream")
+            def _read_chunk(chunk_start: datetime, chunk_end: datetime) -> pl.DataFrame:
+                logger.debug(f"Reading chunk {chunk_start} to {chunk_end}")
+                return pl.read_database(export_definition.query(chunk_start, chunk_end, None, None), conn, schema_overrides={})
 
-        return file_size
+            return await _write_parquet_chunks(output, _read_chunk, date_start, date_end, _get_chunk_memory_budget())
 
-    finally:
-        buffer.close()
+    except Exception as e:
+        logger.error(f"Failed to stream to parquet: {str(e)}")
+        raise
 
 
 async def _stream_and_save_query(export_definition: OpenNEMDataExport) -> int:
     """
-    Streams query results to parquet and saves locally.
+    Streams query results to parquet and saves locally or uploads to the bucket.
+
+    Local exports are written straight to the output file. Uploads are written to a spooled
+    temporary file that moves to disk once it is larger than settings.archive_spool_bytes and
+    is then sent as a multipart upload.
 
     Args:
         export_definition: The export definition to use
@@ -368,24 +389,19 @@ async def _stream_and_save_query(export_definition: OpenNEMDataExport) -> int:
     Raises:
         Exception: If processing or save fails
     """
-    buffer = io.BytesIO()
+    if export_definition.save_local:
+        with Path(export_definition.get_file_name).open("wb") as output_file:
+            _, file_size = await _stream_to_parquet(export_definition, output_file)
 
-    try:
-        _, file_size = await _stream_to_parquet(export_definition, buffer)
+        return file_size
 
-        if export_definition.save_local:
-            # Save locally
-            output_path = Path(export_definition.get_file_name)
-            output_path.write_bytes(buffer.getvalue())
-        else:
-            # Upload to bucket
-            destination = f"{_BUCKET_UPLOAD_DIRECTORY}{export_definition.get_file_name}"
-            await cloudflare_uploader.upload_bytes(buffer.getvalue(), destination, "application/octet-stream")
+    with tempfile.SpooledTemporaryFile(max_size=settings.archive_spool_bytes) as spool:
+        _, file_size = await _stream_to_parquet(export_definition, spool)  # type: ignore
 
-        return file_size
+        destination = f"{_BUCKET_UPLOAD_DIRECTORY}{export_definition.get_file_name}"
+        await cloudflare_uploader.upload_fileobj(spool, destination, "application/octet-stream")  # type: ignore
 
-    finally:
-        buffer.close()
+    return file_size
 
 
 async def sync_archive_exports(local_save: bool = False) -> None:
@@ -455,7 +471,6 @@ def _test_polars_read(read_local: bool = False) -> None:
 
 
 if __name__ == "__main__":
-    import asyncio
 
     async def main() -> None:
         await sync_archive_exports(local_save=True)
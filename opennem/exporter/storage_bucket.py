@@ -7,28 +7,60 @@ Cloudflare R2 storage. It handles file uploads, content type detection, and prov
 a consistent interface for storing OpenNEM data files.
 
 The module supports:
- * Uploading files from disk
- * Uploading bytes from memory
+ * Uploading files from disk and multipart uploads of file objects
+ * Uploading bytes from memory with optional gzip/brotli Content-Encoding
+ * Skipping uploads of objects whose content hash hasn't changed
+ * A long lived client shared by all uploads
  * Content type detection
  * Async operations using aioboto3
  * Error handling and logging
  * Directory listing and file information retrieval
 """
 
+import asyncio
+import gzip
+import hashlib
 import logging
 import os
+import time
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Any, BinaryIO
 from zoneinfo import ZoneInfo
 
 import aioboto3
+import logfire
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
+from cachetools import LRUCache
 from humanize import naturalsize, naturaltime
 
 from opennem import settings
 
+try:
+    import brotli
+
+    HAVE_BROTLI = True
+except ImportError:
+    HAVE_BROTLI = False
+
 logger = logging.getLogger("opennem.storage_bucket")
 
+# object metadata key the content hash is stored under
+CONTENT_HASH_METADATA_KEY = "content-sha256"
+
+# number of objects whose last upload time is remembered to report the time a skip saved
+UPLOAD_SECONDS_CACHE_SIZE = 4096
+
+# bodies smaller than this aren't worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=settings.s3_multipart_chunk_size, multipart_chunksize=settings.s3_multipart_chunk_size
+)
+
+upload_bytes_counter = logfire.metric_counter("storage_bucket_upload_bytes", unit="By")
+
 
 @dataclass
 class BucketFile:
@@ -85,6 +117,49 @@ class BucketDirectory:
         return f"{bucket_url}{self.path}"
 
 
+@dataclass
+class UploadResult:
+    """
+    Result of an upload to the bucket.
+
+    Attributes:
+        object_name: The object name in the bucket
+        content_bytes: Size of the content before compression
+        uploaded_bytes: Bytes sent to the bucket, 0 if the upload was skipped
+        seconds: Time spent hashing, compressing and uploading
+        skipped: True if the object was unchanged and not uploaded
+        content_encoding: Content encoding of the uploaded body if compressed
+        seconds_saved: Time of the last upload of the object if this one was skipped
+    """
+
+    object_name: str
+    content_bytes: int
+    uploaded_bytes: int
+    seconds: float
+    skipped: bool = False
+    content_encoding: str | None = None
+    seconds_saved: float = 0.0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.content_bytes - self.uploaded_bytes
+
+
+def compress_content(content: bytes, content_encoding: str) -> bytes:
+    """Compress content for upload with a Content-Encoding of gzip or br"""
+    if content_encoding == "gzip":
+        # fixed mtime so the same content always compresses to the same bytes
+        return gzip.compress(content, mtime=0)
+
+    if content_encoding == "br":
+        if not HAVE_BROTLI:
+            raise ValueError("Brotli content encoding requires the brotli package")
+
+        return brotli.compress(content)
+
+    raise ValueError(f"Unsupported content encoding: {content_encoding}")
+
+
 class CloudflareR2Uploader:
     def __init__(self, bucket_name: str | None = None, bucket_url: str | None = None, region: str = "apac"):
         self.account_id = settings.s3_access_key_id
@@ -98,21 +173,60 @@ class CloudflareR2Uploader:
         if not self.bucket_public_url.endswith("/"):
             self.bucket_public_url += "/"
 
-    async def _get_s3_client(self):
+        # long lived client bound to the event loop it was created on
+        self._client: Any = None
+        self._client_context: Any = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._client_lock: asyncio.Lock | None = None
+
+        # object name to the seconds its last upload took
+        self._upload_seconds: LRUCache[str, float] = LRUCache(maxsize=UPLOAD_SECONDS_CACHE_SIZE)
+
+    async def _get_s3_client(self) -> Any:
         """
-        Create and return an S3 client session.
+        Get the shared S3 client, creating it on first use in the running event loop.
 
         Returns:
-            An aioboto3 S3 client session.
+            An aioboto3 S3 client.
         """
-        session = aioboto3.Session()
-        return session.client(
-            service_name="s3",
-            endpoint_url=self.endpoint_url,
-            aws_access_key_id=self.access_key_id,
-            aws_secret_access_key=self.secret_access_key,
-            region_name=self.region,
-        )
+        loop = asyncio.get_running_loop()
+
+        if self._client_loop is not loop or not self._client_lock:
+            self._client = None
+            self._client_context = None
+            self._client_loop = loop
+            self._client_lock = asyncio.Lock()
+
+        async with self._client_lock:
+            if self._client is None:
+                session = aioboto3.Session()
+                self._client_context = session.client(
+                    service_name="s3",
+                    endpoint_url=self.endpoint_url,
+                    aws_access_key_id=self.access_key_id,
+                    aws_secret_access_key=self.secret_access_key,
+                    region_name=self.region,
+                )
+                self._client = await self._client_context.__aenter__()
+
+        return self._client
+
+    async def close(self) -> None:
+        """Close the shared S3 client"""
+        if self._client_context is not None and self._client_loop is asyncio.get_running_loop():
+            await self._client_context.__aexit__(None, None, None)
+
+        self._client = None
+        self._client_context = None
+
+    async def _get_remote_hash(self, s3: Any, object_name: str) -> str | None:
+        """Content hash stored in the object metadata or None if the object doesn't exist"""
+        try:
+            head = await s3.head_object(Bucket=self.bucket_name, Key=object_name)
+        except ClientError:
+            return None
+
+        return head.get("Metadata", {}).get(CONTENT_HASH_METADATA_KEY)
 
     async def upload_file(
         self,
@@ -138,86 +252,211 @@ class CloudflareR2Uploader:
         if object_name.startswith("/"):
             object_name = object_name[1:]
 
-        async with await self._get_s3_client() as s3:  # type: ignore
-            try:
-                extra_args = {}
-                if content_type:
-                    extra_args["ContentType"] = content_type
+        s3 = await self._get_s3_client()
 
-                await s3.upload_file(file_path, self.bucket_name, object_name, ExtraArgs=extra_args)
-                logger.info(f"File {file_path} uploaded successfully to {self.bucket_name}/{object_name}")
-                return os.path.getsize(file_path)
+        try:
+            extra_args = {}
+            if content_type:
+                extra_args["ContentType"] = content_type
 
-            except ClientError as e:
-                logger.error(f"An error occurred while uploading file: {e}")
-                raise
+            await s3.upload_file(file_path, self.bucket_name, object_name, ExtraArgs=extra_args, Config=_TRANSFER_CONFIG)
+            logger.info(f"File {file_path} uploaded successfully to {self.bucket_name}/{object_name}")
+            return os.path.getsize(file_path)
 
-    async def upload_bytes(
+        except ClientError as e:
+            logger.error(f"An error occurred while uploading file: {e}")
+            raise
+
+    async def upload_fileobj(
         self,
-        content: bytes,
+        fileobj: BinaryIO,
         object_name: str,
         content_type: str | None = None,
     ) -> int:
+        """
+        Upload a file object to a Cloudflare R2 bucket.
+
+        Large objects are sent as a multipart upload in chunks of settings.s3_multipart_chunk_size
+        so the whole body isn't copied into a single request.
+
+        Raises:
+            ClientError: If an error occurs during the upload process.
+        """
+        if object_name.startswith("/"):
+            object_name = object_name[1:]
+
+        s3 = await self._get_s3_client()
+        started = time.perf_counter()
+
+        try:
+            extra_args = {}
+            if content_type:
+                extra_args["ContentType"] = content_type
+
+            size = fileobj.seek(0, os.SEEK_END)
+            fileobj.seek(0)
+            await s3.upload_fileobj(fileobj, self.bucket_name, object_name, ExtraArgs=extra_args, Config=_TRANSFER_CONFIG)
+        except ClientError as e:
+            logger.error(f"An error occurred while uploading file object: {e}")
+            raise
+
+        logger.info(
+            f"Uploaded {naturalsize(size, binary=True)} to {self.bucket_public_url}{object_name} "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+        return size
+
+    async def put_content(
+        self,
+        content: bytes,
+        object_name: str,
+        content_type: str | None = None,
+        content_encoding: str | None = None,
+        skip_unchanged: bool = True,
+    ) -> UploadResult:
         """
         Upload bytes to a Cloudflare R2 bucket.
 
+        The hash of the content and encoding is stored in the object metadata. With skip_unchanged
+        the upload is skipped if the stored object already has the same hash. The stored object is
+        always checked as it may have been written by another process since this one uploaded it.
+
         Args:
             content: The content to upload.
             object_name: The object name in the bucket.
             content_type: The content type of the data.
+            content_encoding: Compress the body with this Content-Encoding (gzip or br)
+            skip_unchanged: Skip the upload if the object content hasn't changed
 
         Raises:
             ClientError: If an error occurs during the upload process.
         """
-        async with await self._get_s3_client() as s3:  # type: ignore
-            try:
-                extra_args = {}
-                if content_type:
-                    extra_args["ContentType"] = content_type
+        if object_name.startswith("/"):
+            object_name = object_name[1:]
 
-                await s3.put_object(Bucket=self.bucket_name, Key=object_name, Body=content, **extra_args)
+        started = time.perf_counter()
+        s3 = await self._get_s3_client()
+
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        if content_encoding:
+            content_hash = f"{content_encoding}:{content_hash}"
+
+        if skip_unchanged and await self._get_remote_hash(s3, object_name) == content_hash:
+            result = UploadResult(
+                object_name=object_name,
+                content_bytes=len(content),
+                uploaded_bytes=0,
+                seconds=time.perf_counter() - started,
+                skipped=True,
+                content_encoding=content_encoding,
+                seconds_saved=self._upload_seconds.get(object_name, 0.0),
+            )
+            self._record(result)
+            return result
+
+        body = content
+        extra_args = {"Metadata": {CONTENT_HASH_METADATA_KEY: content_hash}}
+
+        if content_type:
+            extra_args["ContentType"] = content_type
+
+        if content_encoding and len(content) >= MIN_COMPRESS_BYTES:
+            body = compress_content(content, content_encoding)
+            extra_args["ContentEncoding"] = content_encoding
+        else:
+            content_encoding = None
+
+        try:
+            await s3.put_object(Bucket=self.bucket_name, Key=object_name, Body=body, **extra_args)
+        except ClientError as e:
+            logger.error(f"An error occurred while uploading content: {e}")
+            raise
+
+        result = UploadResult(
+            object_name=object_name,
+            content_bytes=len(content),
+            uploaded_bytes=len(body),
+            seconds=time.perf_counter() - started,
+            content_encoding=content_encoding,
+        )
 
-                return len(content)
-            except ClientError as e:
-                logger.error(f"An error occurred while uploading content: {e}")
-                raise
+        self._upload_seconds[object_name] = result.seconds
+        self._record(result)
 
-    async def upload_content(
+        return result
+
+    def _record(self, result: UploadResult) -> None:
+        upload_bytes_counter.add(result.uploaded_bytes, {"result": "uploaded"})
+        upload_bytes_counter.add(result.bytes_saved, {"result": "skipped" if result.skipped else "compressed"})
+
+        if result.skipped:
+            logger.info(
+                f"Skipped unchanged {self.bucket_public_url}{result.object_name}: saved "
+                f"{naturalsize(result.bytes_saved, binary=True)} and ~{result.seconds_saved:.2f}s"
+            )
+            return None
+
+        compressed = ""
+
+        if result.content_encoding:
+            compressed = f" ({result.content_encoding} saved {naturalsize(result.bytes_saved, binary=True)})"
+
+        logger.info(
+            f"Uploaded content {naturalsize(result.uploaded_bytes, binary=True)}{compressed} to "
+            f"{self.bucket_public_url}{result.object_name} in {result.seconds:.2f}s"
+        )
+
+    async def upload_bytes(
         self,
-        content: str,
+        content: bytes,
         object_name: str,
         content_type: str | None = None,
+        content_encoding: str | None = None,
     ) -> int:
         """
-        Upload content as a string to a Cloudflare R2 bucket.
+        Upload bytes to a Cloudflare R2 bucket. Unchanged objects are skipped.
 
         Args:
-            bucket_name (str): The name of the bucket to upload to.
-            content (str): The content to upload.
-            object_name (str): The object name in the bucket.
-            content_type (Optional[str]): The content type of the data.
+            content: The content to upload.
+            object_name: The object name in the bucket.
+            content_type: The content type of the data.
+            content_encoding: Compress the body with this Content-Encoding (gzip or br)
+
+        Returns:
+            The number of bytes uploaded, 0 if the object was unchanged
 
         Raises:
             ClientError: If an error occurs during the upload process.
         """
+        result = await self.put_content(content, object_name, content_type, content_encoding)
 
-        if object_name.startswith("/"):
-            object_name = object_name[1:]
+        return result.uploaded_bytes
 
-        async with await self._get_s3_client() as s3:  # type: ignore
-            try:
-                extra_args = {}
-                if content_type:
-                    extra_args["ContentType"] = content_type
+    async def upload_content(
+        self,
+        content: str,
+        object_name: str,
+        content_type: str | None = None,
+        content_encoding: str | None = None,
+    ) -> int:
+        """
+        Upload content as a string to a Cloudflare R2 bucket. Unchanged objects are skipped.
 
-                await s3.put_object(Bucket=self.bucket_name, Key=object_name, Body=content, **extra_args)
+        Args:
+            content (str): The content to upload.
+            object_name (str): The object name in the bucket.
+            content_type (Optional[str]): The content type of the data.
+            content_encoding: Compress the body with this Content-Encoding (gzip or br)
 
-                logger.info(f"Uploaded content {naturalsize(len(content), binary=True)} to {self.bucket_public_url}{object_name}")
+        Returns:
+            The number of bytes uploaded, 0 if the object was unchanged
 
-                return len(content)
-            except ClientError as e:
-                logger.error(f"An error occurred while uploading content: {e}")
-                raise
+        Raises:
+            ClientError: If an error occurs during the upload process.
+        """
+        return await self.upload_bytes(content.encode("utf-8"), object_name, content_type, content_encoding)
 
     async def list_directory(self, prefix: str = "") -> BucketDirectory:
         """
@@ -235,38 +474,39 @@ class CloudflareR2Uploader:
         if prefix and not prefix.endswith("/"):
             prefix += "/"
 
-        async with await self._get_s3_client() as s3:  # type: ignore
-            try:
-                paginator = s3.get_paginator("list_objects_v2")
-                file_list: list[BucketFile] = []
+        s3 = await self._get_s3_client()
 
-                async for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
-                    if "Contents" not in page:
+        try:
+            paginator = s3.get_paginator("list_objects_v2")
+            file_list: list[BucketFile] = []
+
+            async for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+                if "Contents" not in page:
+                    continue
+
+                for obj in page["Contents"]:
+                    # Skip directory markers
+                    if obj["Key"].endswith("/"):
                         continue
 
-                    for obj in page["Contents"]:
-                        # Skip directory markers
-                        if obj["Key"].endswith("/"):
-                            continue
-
-                        file_list.append(
-                            BucketFile(
-                                name=os.path.basename(obj["Key"]),
-                                file_path=obj["Key"],
-                                size=obj["Size"],
-                                last_modified=obj["LastModified"].astimezone(ZoneInfo("Australia/Sydney")),
-                            )
+                    file_list.append(
+                        BucketFile(
+                            name=os.path.basename(obj["Key"]),
+                            file_path=obj["Key"],
+                            size=obj["Size"],
+                            last_modified=obj["LastModified"].astimezone(ZoneInfo("Australia/Sydney")),
                         )
+                    )
 
-                return BucketDirectory(
-                    bucket_name=self.bucket_name,
-                    path=prefix,
-                    files=sorted(file_list, key=lambda x: x.last_modified, reverse=True),
-                )
+            return BucketDirectory(
+                bucket_name=self.bucket_name,
+                path=prefix,
+                files=sorted(file_list, key=lambda x: x.last_modified, reverse=True),
+            )
 
-            except ClientError as e:
-                logger.error(f"Error listing directory {prefix}: {e}")
-                raise
+        except ClientError as e:
+            logger.error(f"Error listing directory {prefix}: {e}")
+            raise
 
 
 cloudflare_uploader = CloudflareR2Uploader(region="apac")
@@ -5,6 +5,7 @@ import logging
 import deprecation
 from sqlalchemy.dialects.postgresql import insert
 
+from opennem.aggregates.watermark import mark_intervals_dirty
 from opennem.controllers.schema import ControllerReturn
 from opennem.db import SessionLocal, get_database_engine
 from opennem.db.bulk_insert_csv import bulkinsert_mms_items
@@ -66,4 +67,7 @@ async def persist_facility_scada_bulk(
 
     await bulkinsert_mms_items(table=table, records=records_to_store, update_fields=update_fields)  # type: ignore
 
+    if table is FacilityScada:
+        await mark_intervals_dirty((i["network_id"], i["interval"]) for i in records_to_store if not i.get("is_forecast"))
+
     return None
@@ -7,17 +7,18 @@ across different metrics, networks, periods and grouping configurations.
 The live engine which runs per interval is located at opennem.recordreactor.engine
 """
 
+import asyncio
 import logging
+import uuid
 from dataclasses import dataclass
 from datetime import datetime
 from textwrap import dedent
-from typing import Any
 
-from clickhouse_driver.client import Client
+import polars as pl
 from sqlalchemy import func, select, text
 
 from opennem.db import get_read_session, get_write_session
-from opennem.db.clickhouse import get_clickhouse_client
+from opennem.db.clickhouse import ClickHousePool
 from opennem.db.models.opennem import Milestones
 from opennem.queries.utils import list_to_case
 from opennem.recordreactor.persistence import check_and_persist_milestones_chunked
@@ -34,6 +35,12 @@ from opennem.utils.dates import get_last_completed_interval_for_network
 
 logger = logging.getLogger("opennem.recordreactor.backlog")
 
+# number of grouping configs analyzed concurrently, one pooled client each
+MILESTONE_ANALYSIS_CONCURRENCY = 6
+
+# backlog queries scan the full history so get a longer timeout than api queries
+MILESTONE_ANALYSIS_QUERY_TIMEOUT = 600
+
 
 @dataclass
 class IntervalThresholds:
@@ -171,8 +178,8 @@ def _trim_end_date(time_col: str, end_date: datetime, period: MilestonePeriod) -
         return f"{time_col} < {end_date_dt}"
 
 
-def _analyze_milestone_records(
-    client: Client,
+async def _analyze_milestone_records(
+    pool: ClickHousePool,
     network: NetworkSchema,
     period: MilestonePeriod,
     milestone_type: MilestoneType,
@@ -180,7 +187,7 @@ def _analyze_milestone_records(
     start_date: datetime | None = None,
     end_date: datetime | None = None,
     debug: bool = False,
-) -> list[dict[str, Any]]:
+) -> pl.DataFrame:
     """
     Analyze historical records to find milestone records.
 
@@ -188,8 +195,11 @@ def _analyze_milestone_records(
     For generation records (power, energy, emissions) it uses SUM aggregation.
     For market records (price, demand) it uses AVG aggregation.
 
+    Running highs and lows are found in a single window pass in ClickHouse so only the buckets
+    that set a record are returned.
+
     Args:
-        client: ClickHouse client
+        pool: ClickHouse client pool
         network: Network to analyze
         period: Period bucket to analyze
         milestone_type: Type of milestone to find
@@ -198,12 +208,12 @@ def _analyze_milestone_records(
         end_date: Optional end date to limit analysis
 
     Returns:
-        list[dict[str, Any]]: List of milestone records
+        pl.DataFrame: record breaking buckets with a row per high and low record
     """
 
     # skip WEM region queries
     if network == NetworkWEM and "network_region" in grouping.group_by_fields:
-        return []
+        return pl.DataFrame()
 
     source_table, time_col = _get_source_table_and_interval_name(milestone_type, period, grouping)
     time_bucket_sql = get_time_bucket_sql(period, source_table, time_col)
@@ -315,154 +325,81 @@ def _analyze_milestone_records(
       ORDER BY 1 asc, 2
     ),
 
-    running_maxes AS (
-      SELECT
-        time_bucket{group_by_select},
-        total_value,
-        interval_count,
-        max(total_value) OVER (
-          PARTITION BY {partition_clause}
-          ORDER BY time_bucket
-          ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
-        ) as running_max,
-        generateUUIDv7() as instance_id
-      FROM base_stats
-      WHERE round(total_value, 0) > {maxes_min_value}
-    ),
-
-    max_records AS (
-      SELECT
-        time_bucket{group_by_select},
-        total_value,
-        interval_count,
-        running_max,
-        instance_id,
-        lagInFrame(running_max) OVER (
-          PARTITION BY {partition_clause}
-          ORDER BY time_bucket
-          ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
-        ) as prev_max,
-        lagInFrame(instance_id) OVER (
-          PARTITION BY {partition_clause}
-          ORDER BY time_bucket
-          ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
-        ) as prev_instance_id
-      FROM running_maxes
-    ),
-
-    running_mins AS (
+    running_records AS (
       SELECT
         time_bucket{group_by_select},
         total_value,
         interval_count,
-        min(
-          if(
-            {value_limit_clause} interval_count >= {interval_threshold},
-            total_value,
-            NULL
-          )
-        ) OVER (
-          PARTITION BY {partition_clause}
-          ORDER BY time_bucket
-          ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
-        ) as running_min,
-        generateUUIDv7() as instance_id
+        round(total_value, 0) > {maxes_min_value} as is_max_candidate,
+        {value_limit_clause} interval_count >= {interval_threshold} as is_min_candidate,
+        max(if(is_max_candidate, total_value, NULL)) OVER previous_buckets as prev_max,
+        min(if(is_min_candidate, total_value, NULL)) OVER previous_buckets as prev_min
       FROM base_stats
-    ),
-
-    min_records AS (
-      SELECT
-        time_bucket{group_by_select},
-        total_value,
-        interval_count,
-        running_min,
-        instance_id,
-        lagInFrame(running_min) OVER (
-          PARTITION BY {partition_clause}
-          ORDER BY time_bucket
-          ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
-        ) as prev_min,
-        lagInFrame(instance_id) OVER (
-          PARTITION BY {partition_clause}
-          ORDER BY time_bucket
-          ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
-        ) as prev_instance_id
-      FROM running_mins
+      WINDOW previous_buckets AS (
+        PARTITION BY {partition_clause}
+        ORDER BY time_bucket
+        ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+      )
     )
 
-    SELECT *
-    FROM (
-      SELECT
-        time_bucket as interval{group_by_select},
-        total_value,
-        interval_count,
-        if(
-          prev_max IS NULL,
-          0,
-          ((total_value - prev_max) / prev_max) * 100
-        ) as pct_change,
-        'high' as record_type,
-        '{period.value}' as period,
-        instance_id,
-        prev_instance_id
-      FROM max_records
-      WHERE
-        total_value = running_max
-        AND (prev_max IS NULL OR total_value > prev_max)
-
-      UNION ALL
-
-      SELECT
-        time_bucket as interval{group_by_select},
-        total_value,
-        interval_count,
-        if(
-          prev_min IS NULL,
-          0,
-          ((total_value - prev_min) / prev_min) * 100
-        ) as pct_change,
-        'low' as record_type,
-        '{period.value}' as period,
-        instance_id,
-        prev_instance_id
-      FROM min_records
-      WHERE
-        total_value = running_min
-        AND (prev_min IS NULL OR total_value < prev_min AND interval_count >= {interval_threshold})
-    )
+    SELECT
+      time_bucket as interval{group_by_select},
+      total_value,
+      interval_count,
+      is_max_candidate AND (prev_max IS NULL OR total_value > prev_max) as is_high,
+      is_min_candidate AND (prev_min IS NULL OR total_value < prev_min) as is_low,
+      if(prev_max IS NULL, 0, ((total_value - prev_max) / prev_max) * 100) as high_pct_change,
+      if(prev_min IS NULL, 0, ((total_value - prev_min) / prev_min) * 100) as low_pct_change
+    FROM running_records
+    WHERE is_high OR is_low
     ORDER BY interval"""
 
-    try:
-        logger.info(f"running query for {network.code} {milestone_type.value} {period.value} {grouping.name}")
-
-        if debug:
-            print(dedent(base_query))
-
-        records = client.execute(base_query)
-        # Convert to list of dicts for easier processing
-        field_names = [
-            "interval",
-            *(list(grouping.group_by_fields) if grouping.group_by_fields else []),
-            "total_value",
-            "interval_count",
-            "pct_change",
-            "record_type",
-            "period",
-            "instance_id",
-            "prev_instance_id",
-        ]
-
-        records = [dict(zip(field_names, record, strict=False)) for record in records]
+    logger.info(f"running query for {network.code} {milestone_type.value} {period.value} {grouping.name}")
 
-        return records
+    if debug:
+        print(dedent(base_query))
 
+    try:
+        columns = await pool.execute(base_query, columnar=True, timeout=MILESTONE_ANALYSIS_QUERY_TIMEOUT)
     except Exception as e:
         logger.error(f"Error during milestone analysis: {str(e)}")
         raise
 
+    group_fields = list(grouping.group_by_fields) if grouping.group_by_fields else []
+    field_names = [
+        "interval",
+        *group_fields,
+        "total_value",
+        "interval_count",
+        "is_high",
+        "is_low",
+        "high_pct_change",
+        "low_pct_change",
+    ]
+
+    if not columns:
+        return pl.DataFrame()
+
+    records = pl.DataFrame(dict(zip(field_names, columns, strict=True)))
+
+    # a bucket can set both a high and a low so split the flags into a row per record
+    return pl.concat(
+        [
+            records.filter(pl.col(f"is_{record_type}")).select(
+                "interval",
+                *group_fields,
+                "total_value",
+                "interval_count",
+                pl.col(f"{record_type}_pct_change").alias("pct_change"),
+                pl.lit(record_type).alias("record_type"),
+            )
+            for record_type in ["high", "low"]
+        ]
+    ).sort("interval", maintain_order=True)
+
 
 def _analyzed_record_to_milestone_schema(
-    records: list[dict[str, Any]],
+    records: pl.DataFrame,
     network: NetworkSchema,
     period: MilestonePeriod,
     milestone_type: MilestoneType,
@@ -470,12 +407,15 @@ def _analyzed_record_to_milestone_schema(
 ) -> list[MilestoneRecordSchema]:
     """
     Convert analyzed records to milestone record schemas.
+
+    Instance ids are assigned here. Records are chained through previous_instance_id when they
+    are persisted, once they have been checked against the current milestone state.
     """
     unit = get_milestone_unit(milestone_type)
-    milestone_records = []
-    milestone_primary_keys: list[set(str, str)] = []  # type: ignore
+    milestone_records: list[MilestoneRecordSchema] = []
+    milestone_primary_keys: set[tuple] = set()
 
-    for record in records:
+    for record in records.iter_rows(named=True):
         milestone_type_out = milestone_type
 
         # Get network region and fueltech from grouping if present
@@ -493,10 +433,27 @@ def _analyzed_record_to_milestone_schema(
             if period == MilestonePeriod.interval:
                 milestone_type_out = MilestoneType.power
 
-        value = record.get("total_value", record.get("total_generation"))
+        # skip solar and renewable records before 26 October 2015
+        if fueltech in [
+            MilestoneFueltechGrouping.solar,
+            MilestoneFueltechGrouping.renewables,
+        ] and record["interval"] < datetime.fromisoformat("2015-10-26T00:00:00"):
+            continue
+
+        # skip wind before we had non-scheduled generation data
+        if fueltech in [MilestoneFueltechGrouping.wind] and record["interval"] < datetime.fromisoformat("2009-07-01T00:00:00"):
+            continue
+
+        series_key = (network_region, fueltech, record["record_type"])
+
+        # track primary keys and error if there is a duplicate
+        primary_keys = (*series_key, record["interval"])
+
+        if primary_keys in milestone_primary_keys:
+            logger.info(record)
+            raise ValueError(f"Duplicate milestone record: {primary_keys}")
 
-        # Only include previous_instance_id if it's not NULL
-        previous_instance_id = record["prev_instance_id"] if record["prev_instance_id"] else None
+        milestone_primary_keys.add(primary_keys)
 
         milestone_schema = MilestoneRecordSchema(
             interval=record["interval"],
@@ -507,36 +464,13 @@ def _analyzed_record_to_milestone_schema(
             unit=unit,
             network_region=network_region,
             fueltech=fueltech,
-            value=value,
+            value=record["total_value"],
             pct_change=round(record["pct_change"], 2)
             if record["pct_change"] and (abs(record["pct_change"]) < 9999 and abs(record["pct_change"]) > 0.01)
             else None,
-            instance_id=record["instance_id"],
-            previous_instance_id=previous_instance_id,
+            instance_id=uuid.uuid4(),
         )
 
-        # track primary keys and error if there is a duplicate
-        primary_keys = (milestone_schema.interval, milestone_schema.instance_id)
-
-        if primary_keys in milestone_primary_keys:
-            logger.info(milestone_schema)
-            raise ValueError(f"Duplicate milestone record: {primary_keys}")
-
-        # skip solar and renewable records before 26 October 2015
-        if fueltech in [
-            MilestoneFueltechGrouping.solar,
-            MilestoneFueltechGrouping.renewables,
-        ] and milestone_schema.interval < datetime.fromisoformat("2015-10-26T00:00:00"):
-            continue
-
-        # skip wind before we had non-scheduled generation data
-        if fueltech in [MilestoneFueltechGrouping.wind] and milestone_schema.interval < datetime.fromisoformat(
-            "2009-07-01T00:00:00"
-        ):
-            continue
-
-        milestone_primary_keys.append(primary_keys)
-
         milestone_records.append(milestone_schema)
 
     return milestone_records
@@ -567,6 +501,36 @@ _DEFAULT_NETWORKS = [
 ]
 
 
+def _is_valid_metric_period(metric: MilestoneType, period: MilestonePeriod) -> bool:
+    """Filter out the metrics that don't make sense for the period"""
+    if metric in [MilestoneType.power, MilestoneType.energy, MilestoneType.emissions]:
+        if period == MilestonePeriod.interval and metric not in [MilestoneType.power]:
+            return False
+
+        if period != MilestonePeriod.interval and metric == MilestoneType.power:
+            return False
+
+    if metric in [MilestoneType.price]:
+        if period != MilestonePeriod.interval:
+            return False
+
+    return True
+
+
+def _is_valid_metric_grouping(metric: MilestoneType, grouping: GroupingConfig) -> bool:
+    """Skip fueltech-related groupings for market summary records"""
+    if metric in [MilestoneType.demand, MilestoneType.price]:
+        if grouping.name in [
+            "fueltech",
+            "region_fueltech",
+            "renewable",
+            "region_renewable",
+        ]:
+            return False
+
+    return True
+
+
 async def run_milestone_analysis(
     start_date: datetime | None = None,
     end_date: datetime | None = None,
@@ -588,57 +552,51 @@ async def run_milestone_analysis(
         groupings: Optional list of grouping configurations to analyze
         debug: Optional flag to enable debug mode
     """
-    client = get_clickhouse_client()
-
-    # Iterate through all periods and grouping configurations
-    for metric in metrics or _DEFAULT_METRICS:
-        for network in networks or _DEFAULT_NETWORKS:
-            for period in periods or _DEFAULT_PERIODS:
-                milestone_records: list[MilestoneRecordSchema] = []
-
-                for grouping in groupings or _GROUPING_CONFIGS:
-                    # filter out the metrics that don't make sense for the period
-
-                    if metric in [MilestoneType.power, MilestoneType.energy, MilestoneType.emissions]:
-                        if period == MilestonePeriod.interval and metric not in [MilestoneType.power]:
-                            continue
-
-                        if period != MilestonePeriod.interval and metric == MilestoneType.power:
-                            continue
-
-                    if metric in [MilestoneType.price]:
-                        if period != MilestonePeriod.interval:
-                            continue
-
-                    if metric in [MilestoneType.demand, MilestoneType.price]:
-                        # Skip fueltech-related groupings for market summary records
-                        if grouping.name in [
-                            "fueltech",
-                            "region_fueltech",
-                            "renewable",
-                            "region_renewable",
-                        ]:
-                            continue
-
-                    records = _analyze_milestone_records(
-                        client=client,
-                        network=network,
-                        milestone_type=metric,
-                        period=period,
-                        grouping=grouping,
-                        start_date=start_date,
-                        end_date=end_date,
-                        debug=debug,
-                    )
+    pool = ClickHousePool(size=MILESTONE_ANALYSIS_CONCURRENCY, query_timeout=MILESTONE_ANALYSIS_QUERY_TIMEOUT)
+
+    async def _analyze_grouping(
+        network: NetworkSchema, metric: MilestoneType, period: MilestonePeriod, grouping: GroupingConfig
+    ) -> list[MilestoneRecordSchema]:
+        records = await _analyze_milestone_records(
+            pool=pool,
+            network=network,
+            milestone_type=metric,
+            period=period,
+            grouping=grouping,
+            start_date=start_date,
+            end_date=end_date,
+            debug=debug,
+        )
 
-                    milestone_records.extend(_analyzed_record_to_milestone_schema(records, network, period, metric, grouping))
+        return _analyzed_record_to_milestone_schema(records, network, period, metric, grouping)
 
-                if milestone_records:
-                    logger.info(
-                        f"Found {len(milestone_records)} milestone records for {network.code} {metric.value} {period.value}"
+    try:
+        # Iterate through all periods and grouping configurations
+        for metric in metrics or _DEFAULT_METRICS:
+            for network in networks or _DEFAULT_NETWORKS:
+                for period in periods or _DEFAULT_PERIODS:
+                    if not _is_valid_metric_period(metric, period):
+                        continue
+
+                    period_groupings = [
+                        grouping for grouping in groupings or _GROUPING_CONFIGS if _is_valid_metric_grouping(metric, grouping)
+                    ]
+
+                    # grouping configs are analyzed concurrently, bounded by the size of the pool
+                    grouping_records = await asyncio.gather(
+                        *[_analyze_grouping(network, metric, period, grouping) for grouping in period_groupings]
                     )
 
-                    await check_and_persist_milestones_chunked(milestone_records)
+                    milestone_records = [record for records in grouping_records for record in records]
+
+                    if milestone_records:
+                        logger.info(
+                            f"Found {len(milestone_records)} milestone records for {network.code} {metric.value} {period.value}"
+                        )
+
+                        await check_and_persist_milestones_chunked(milestone_records)
+    finally:
+        pool.disconnect()
 
     logger.info("Milestone analysis complete")
 
@@ -664,7 +622,8 @@ async def run_update_milestone_analysis_to_now() -> None:
     Run milestone analysis from the last recorded milestone to now.
 
     This function queries the max interval from the milestones table and runs the analysis
-    from that date to the current time.
+    from that date to the current time. New records are checked against and chained to the
+    stored records when they are persisted.
     """
     async with get_read_session() as session:
         # Get the max interval from milestones table
@@ -2,18 +2,16 @@
 RecordReactor engine
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
 
-import tqdm
-
 from opennem import settings
 from opennem.recordreactor.buckets import get_period_start_end, is_end_of_period
-from opennem.recordreactor.processors.demand import run_price_demand_milestone_for_interval
-from opennem.recordreactor.processors.energy import run_energy_emissions_milestones
-from opennem.recordreactor.processors.power import run_power_milestones, run_renewable_power_milestones
+from opennem.recordreactor.persistence import check_and_persist_milestones_chunked
 from opennem.recordreactor.processors.renewable_proportion import run_renewable_proportion_milestones
-from opennem.recordreactor.schema import MilestonePeriod, MilestoneType
+from opennem.recordreactor.schema import MilestonePeriod, MilestoneRecordSchema, MilestoneType
+from opennem.recordreactor.tracker import MilestoneTracker, get_milestone_tracker
 from opennem.schema.network import NetworkNEM, NetworkSchema, NetworkWEM
 from opennem.utils.dates import get_last_completed_interval_for_network
 
@@ -43,6 +41,39 @@ _DEFAULT_BUCKET_SIZES = [
 
 _DEFAULT_NETWORKS = [NetworkNEM, NetworkWEM]
 
+# interval data pulled and checked at a time
+MILESTONE_ENGINE_CHUNK_SIZE = timedelta(days=7)
+
+
+async def _run_proportion_milestones(
+    network: NetworkSchema, periods: list[MilestonePeriod], start_interval: datetime, end_interval: datetime
+) -> None:
+    """Renewable proportion records are still checked per period as they gap fill rooftop and demand in SQL"""
+    current_interval = start_interval
+
+    while current_interval <= end_interval:
+        tasks = []
+
+        for bucket_size in periods:
+            if not is_end_of_period(current_interval, bucket_size):
+                continue
+
+            period_start, period_end = get_period_start_end(dt=current_interval, bucket_size=bucket_size, network=network)
+
+            tasks.append(
+                run_renewable_proportion_milestones(
+                    network=network,
+                    bucket_size=bucket_size,
+                    start_date=period_start,
+                    end_date=period_end,
+                )
+            )
+
+        if tasks:
+            await asyncio.gather(*tasks)
+
+        current_interval += timedelta(minutes=network.interval_size)
+
 
 async def run_milestone_engine(
     start_interval: datetime,
@@ -53,6 +84,13 @@ async def run_milestone_engine(
     bulk_insert: bool = False,
     bulk_insert_batch_size: int = 100,
 ):
+    """
+    Find and persist milestone records from start_interval to end_interval.
+
+    Interval data is pulled in MILESTONE_ENGINE_CHUNK_SIZE chunks and checked against the
+    current records in the milestone tracker, so only new records are persisted. The tracker
+    only advances past records once they are persisted.
+    """
     # normalise start and end intervals with no timezone info (ie. make unaware)
     start_interval = start_interval.replace(tzinfo=None)
 
@@ -73,6 +111,12 @@ async def run_milestone_engine(
         f" {len(metrics)} metrics from {start_interval} to {end_interval}"
     )
 
+    tracker = await get_milestone_tracker()
+
+    # dry runs check against a copy so the process tracker is not advanced past unpersisted records
+    if settings.dry_run:
+        tracker = MilestoneTracker(dict(tracker.state))
+
     for network in networks:
         if not network.interval_size:
             logger.info(f"Skipping {network.code} as it has no interval size")
@@ -84,104 +128,50 @@ async def run_milestone_engine(
 
         logger.info(f"Processing milestone data network {network.code}")
 
-        if not end_interval:
-            end_interval = get_last_completed_interval_for_network(network)
-            logger.info(f"Set end interval for {network.code} to {end_interval}")
-
-        # how many intervals we process at a time
-        interval_leap_size = network.interval_size
-
-        current_interval = start_interval
-
-        total_intervals = (end_interval - start_interval).total_seconds() / 60 / interval_leap_size
-
-        with tqdm.tqdm(total=total_intervals, unit="interval") as progress_bar:
-            while current_interval <= end_interval:
-                # don't process the network data if it is after the last data seen
-                if network.data_last_seen and current_interval > network.data_last_seen.replace(tzinfo=None):
-                    logger.info(f"Breaking at {current_interval} as it is after the last data seen for {network.code}")
-                    break
-
-                # don't process the network data if it is before the first data seen
-                if current_interval < network.data_first_seen.replace(tzinfo=None):
-                    logger.info(f"Skipping {current_interval} as it is before the first data seen for {network.code}")
-                    current_interval += timedelta(minutes=network.interval_size)
-                    continue
-
-                tasks = []  # Move this inside the loop
-
-                for bucket_size in periods:
-                    if not is_end_of_period(current_interval, bucket_size):
-                        continue
-
-                    period_start, period_end = get_period_start_end(dt=current_interval, bucket_size=bucket_size, network=network)
-
-                    if settings.dry_run:
-                        continue
-
-                    if MilestoneType.power in metrics:
-                        tasks.append(
-                            run_power_milestones(
-                                network=network,
-                                bucket_size=bucket_size,
-                                period_start=period_start,
-                                period_end=period_end,
-                            )
-                        )
-
-                        tasks.append(
-                            run_renewable_power_milestones(
-                                network=network,
-                                bucket_size=bucket_size,
-                                period_start=period_start,
-                                period_end=period_end,
-                            )
-                        )
-
-                    if MilestoneType.demand in metrics or MilestoneType.price in metrics:
-                        tasks.append(
-                            run_price_demand_milestone_for_interval(
-                                network=network,
-                                bucket_size=bucket_size,
-                                interval=period_start,
-                            )
-                        )
-
-                    if MilestoneType.energy in metrics or MilestoneType.emissions in metrics:
-                        tasks.append(
-                            run_energy_emissions_milestones(
-                                network=network,
-                                bucket_size=bucket_size,
-                                period_start=period_start,
-                                period_end=period_end,
-                            )
-                        )
-
-                    if MilestoneType.proportion in metrics:
-                        tasks.append(
-                            run_renewable_proportion_milestones(
-                                network=network,
-                                bucket_size=bucket_size,
-                                start_date=period_start,
-                                end_date=period_end,
-                            )
-                        )
-
-                # Move to the next interval and pad it out
-                current_interval += timedelta(minutes=interval_leap_size)
-
-                if tasks:
-                    await asyncio.gather(*tasks)  # Await tasks for each interval
-
-                progress_bar.update(1)
-
-        # Remove the final gather outside the loop, as it's no longer needed
+        network_end_interval = end_interval
+
+        if not network_end_interval:
+            network_end_interval = get_last_completed_interval_for_network(network)
+            logger.info(f"Set end interval for {network.code} to {network_end_interval}")
+
+        # don't process the network data outside of the data seen
+        network_start_interval = max(start_interval, network.data_first_seen.replace(tzinfo=None))
+
+        if network.data_last_seen:
+            network_end_interval = min(network_end_interval, network.data_last_seen.replace(tzinfo=None))
+
+        interval_size = timedelta(minutes=network.interval_size)
+        chunk_start = network_start_interval
+        num_records = 0
+
+        while chunk_start <= network_end_interval:
+            chunk_end = min(chunk_start + MILESTONE_ENGINE_CHUNK_SIZE, network_end_interval + interval_size)
+
+            milestone_records: list[MilestoneRecordSchema] = []
+
+            if MilestonePeriod.interval in periods:
+                milestone_records += await tracker.run_intervals(network, metrics, chunk_start, chunk_end)
+
+            # periods that end on any interval in the chunk
+            milestone_records += await tracker.run_periods(network, metrics, periods, chunk_start, chunk_end - interval_size)
+
+            if milestone_records and not settings.dry_run:
+                num_records += await check_and_persist_milestones_chunked(milestone_records)
+
+            tracker.advance(milestone_records)
+
+            logger.info(f"{network.code}: found {len(milestone_records)} records from {chunk_start} to {chunk_end}")
+
+            chunk_start = chunk_end
+
+        if MilestoneType.proportion in metrics and not settings.dry_run:
+            await _run_proportion_milestones(network, periods, network_start_interval, network_end_interval)
+
+        logger.info(f"Persisted {num_records} milestone records for {network.code}")
 
 
 # debug entry point
 if __name__ == "__main__":
-    import asyncio
-
     nem_start = datetime.fromisoformat("1998-12-08 00:00:00")
     # start_interval = datetime.fromisoformat("1999-03-26 04:55:00")
     # test_start_interval = datetime.fromisoformat("2010-01-01 00:00:00")
@@ -3,37 +3,152 @@ RecordReactor peristence methods
 """
 
 import logging
+import time
+import uuid
 from datetime import datetime
 
-from sqlalchemy.dialects.postgresql import insert as pg_insert
+import pandas as pd
 from sqlalchemy.exc import IntegrityError
 
 from opennem.db import get_write_session
+from opennem.db.bulk_insert_csv import bulkinsert_mms_items
 from opennem.db.models.opennem import Milestones
-from opennem.recordreactor.schema import MilestoneRecordOutputSchema, MilestoneRecordSchema
+from opennem.recordreactor.schema import MilestonePeriod, MilestoneRecordOutputSchema, MilestoneRecordSchema
 from opennem.recordreactor.significance import calculate_milestone_significance
 from opennem.recordreactor.state import get_current_milestone_state
 from opennem.recordreactor.utils import check_milestone_is_new, get_record_description
 
 logger = logging.getLogger("opennem.recordreactor.persistence")
 
-# PostgreSQL has a limit of 32767 parameters per query
-# Each record has 13 fields, so we'll set chunk size to ensure we stay well under the limit
-CHUNK_SIZE = 2000  # This gives us max 26000 parameters per query
+# fields updated when a milestone for the same record id and interval is persisted again
+MILESTONE_UPDATE_FIELDS = [
+    "aggregate",
+    "metric",
+    "period",
+    "significance",
+    "value",
+    "value_unit",
+    "pct_change",
+    "network_id",
+    "description",
+    "previous_instance_id",
+    "network_region",
+    "fueltech_id",
+]
+
+
+def _get_description_key(record: MilestoneRecordSchema) -> tuple[str, datetime | None]:
+    """Descriptions only vary by record id, except for seasons which are named by their start date"""
+    return (record.record_id, record.interval if record.period is MilestonePeriod.season else None)
+
+
+def _map_milestone_records(
+    milestones: list[MilestoneRecordSchema], milestone_state: dict[str, MilestoneRecordOutputSchema]
+) -> list[dict]:
+    """
+    Filter milestones against the current state and map them to milestone table rows
+
+    Significance and descriptions are derived from the fields that make up the record id so
+    they are calculated once per record id rather than once per milestone.
+
+    Milestones are chained through previous_instance_id to the last milestone kept for their
+    record id, starting from the current record in the state, so a milestone is never chained
+    to one that was filtered out and not stored.
+
+    Raises:
+        ValueError: if two milestones share a record id and interval
+    """
+    milestone_records: list[dict] = []
+    primary_keys: set[tuple[str, datetime]] = set()
+    significance_cache: dict[str, int] = {}
+    description_cache: dict[tuple[str, datetime | None], str] = {}
+    previous_instance_ids: dict[str, uuid.UUID | None] = {}
+    created_at = datetime.now()
+    num_stale = 0
+
+    for record in milestones:
+        if record.value is None:
+            logger.warning(f"Skipping milestone {record.record_id} because it has no value")
+            continue
+
+        if record.instance_id is None:
+            logger.warning(f"Skipping milestone {record.record_id} because it has no instance_id")
+            continue
+
+        # check if the milestone is already in the state
+        milestone_prev = milestone_state.get(record.record_id)
+
+        if milestone_prev:
+            if record.interval <= milestone_prev.interval:
+                num_stale += 1
+                continue
+
+            if not check_milestone_is_new(record, milestone_prev):
+                continue
+
+        # check primary key to make sure we don't have duplicates
+        primary_key = (record.record_id, record.interval)
+
+        if primary_key in primary_keys:
+            raise ValueError(f"Duplicate primary key: {primary_key}")
+
+        primary_keys.add(primary_key)
+
+        if record.record_id not in previous_instance_ids:
+            previous_instance_ids[record.record_id] = milestone_prev.instance_id if milestone_prev else None
+
+        previous_instance_id = previous_instance_ids[record.record_id]
+        previous_instance_ids[record.record_id] = record.instance_id
+
+        if record.record_id not in significance_cache:
+            significance_cache[record.record_id] = calculate_milestone_significance(record)
+
+        description_key = _get_description_key(record)
 
+        if description_key not in description_cache:
+            description_cache[description_key] = get_record_description(record)
 
-def _chunks(lst: list, n: int):
-    """Yield successive n-sized chunks from lst."""
-    for i in range(0, len(lst), n):
-        yield lst[i : i + n]
+        milestone_records.append(
+            {
+                "record_id": record.record_id,
+                "interval": record.interval,
+                "instance_id": record.instance_id,
+                "aggregate": record.aggregate.value,
+                "metric": record.metric.value,
+                "period": record.period.value,
+                "significance": significance_cache[record.record_id],
+                "value": round(record.value, 4),
+                "pct_change": round(record.pct_change, 2) if record.pct_change else None,
+                "value_unit": record.unit.unit,
+                "network_id": record.network.code,
+                "network_region": record.network_region if record.network_region else None,
+                "fueltech_id": record.fueltech.value if record.fueltech else None,
+                "description": description_cache[description_key],
+                "description_long": None,
+                "previous_instance_id": previous_instance_id,
+                "created_at": created_at,
+            }
+        )
+
+    if num_stale:
+        logger.info(f"Skipped {num_stale} milestones at or before their current record interval")
+
+    return milestone_records
+
+
+def _update_milestone_state(milestone_state: dict[str, MilestoneRecordOutputSchema], milestone_records: list[dict]) -> None:
+    """Make persisted milestone rows, in interval order, the current record for their record id"""
+    for record in milestone_records:
+        milestone_state[record["record_id"]] = MilestoneRecordOutputSchema(**record)
 
 
 async def check_and_persist_milestones_chunked(milestones: list[MilestoneRecordSchema]) -> int:
     """
     Persist milestones using bulk insert
 
-    This takes all the milestone records and persists them using a bulk insert operation
-    for better performance. Records are processed in chunks to avoid PostgreSQL parameter limits.
+    Milestones are checked against the current milestone state, deduplicated on record id and
+    interval and then staged with COPY and merged into the milestones table through
+    bulkinsert_mms_items.
 
     Args:
         milestones: list[MilestoneRecordSchema] - the milestones to persist
@@ -44,112 +159,40 @@ async def check_and_persist_milestones_chunked(milestones: list[MilestoneRecordS
     if not milestones:
         return 0
 
+    start_time = time.perf_counter()
+
     # ensure milestones are sorted from earliest to latest
     milestones = sorted(milestones, key=lambda x: x.interval)
 
-    # Pre-process records into a list of dictionaries for bulk insert
-    milestone_records = []
-
     # get the current milestone state
     milestone_state = await get_current_milestone_state()
 
-    # check for duplicate primary keys
-    primary_keys: list[tuple[str, datetime]] = []
-
-    for record in milestones:
-        if record.value is None:
-            logger.warning(f"Skipping milestone {record.record_id} because it has no value")
-            continue
-
-        if record.instance_id is None:
-            logger.warning(f"Skipping milestone {record.record_id} because it has no instance_id")
-            continue
+    milestone_records = _map_milestone_records(milestones, milestone_state)
 
-        # check if the milestone is already in the state
-        milestone_prev: MilestoneRecordOutputSchema | None = None
-
-        if record.record_id in milestone_state:
-            milestone_prev = milestone_state[record.record_id]
-
-        if milestone_prev and not check_milestone_is_new(record, milestone_prev):
-            continue
+    if not milestone_records:
+        return 0
 
-        # check primary key to make sure we don't have duplicates
-        primary_key = (record.record_id, record.interval)
+    records_df = pd.DataFrame.from_records(milestone_records)
 
-        if primary_key in primary_keys:
-            raise ValueError(f"Duplicate primary key: {primary_key}")
+    try:
+        total_inserted = await bulkinsert_mms_items(Milestones, records_df, MILESTONE_UPDATE_FIELDS)  # type: ignore
+    except Exception as e:
+        logger.error(f"Error during bulk milestone insertion: {str(e)}")
+        # write the records as a csv to a file
+        records_df.to_csv(f"milestone_records_{datetime.now().strftime('%Y%m%d%H%M%S')}.csv", index=False)
+        raise
 
-        primary_keys.append(primary_key)
-
-        # get the new milestone record details
-        description = get_record_description(record)
-        significance = calculate_milestone_significance(record)
-
-        milestone_dict = {
-            "record_id": record.record_id,
-            "instance_id": record.instance_id,
-            "interval": record.interval,
-            "aggregate": record.aggregate.value,
-            "metric": record.metric.value,
-            "period": record.period.value,
-            "significance": significance,
-            "value": round(record.value, 4),
-            "pct_change": round(record.pct_change, 2) if record.pct_change else None,
-            "value_unit": record.unit.unit,
-            "network_id": record.network.code,
-            "description": description,
-            "previous_instance_id": record.previous_instance_id,
-            "network_region": record.network_region if record.network_region else None,
-            "fueltech_id": record.fueltech.value if record.fueltech else None,
-        }
-        milestone_records.append(milestone_dict)
+    # keep the current state in step so later batches check and chain against these records
+    _update_milestone_state(milestone_state, milestone_records)
 
-    if not milestone_records:
-        return 0
+    duration = time.perf_counter() - start_time
 
-    total_inserted = 0
-    async with get_write_session() as session:
-        for chunk in _chunks(milestone_records, CHUNK_SIZE):
-            stmt = pg_insert(Milestones.__table__).values(chunk)
-            stmt = stmt.on_conflict_do_update(
-                constraint="excl_milestone_record_id_interval",
-                set_={
-                    "aggregate": stmt.excluded.aggregate,
-                    "metric": stmt.excluded.metric,
-                    "period": stmt.excluded.period,
-                    "significance": stmt.excluded.significance,
-                    "value": stmt.excluded.value,
-                    "value_unit": stmt.excluded.value_unit,
-                    "pct_change": stmt.excluded.pct_change,
-                    "network_id": stmt.excluded.network_id,
-                    "description": stmt.excluded.description,
-                    "previous_instance_id": stmt.excluded.previous_instance_id,
-                    "network_region": stmt.excluded.network_region,
-                    "fueltech_id": stmt.excluded.fueltech_id,
-                },
-            )
-            try:
-                # Process records in chunks
-
-                await session.execute(stmt)
-                total_inserted += len(chunk)
-
-            except Exception as e:
-                logger.error(f"Error during bulk milestone insertion: {str(e)}")
-                # write the records for the current chunk as a csv to a file
-                with open(f"milestone_records_{datetime.now().strftime('%Y%m%d%H%M%S')}.csv", "w") as f:
-                    for record in chunk:
-                        f.write(
-                            f"{record['record_id']},{record['instance_id']},{record['interval']},{record['aggregate']},{record['metric']},{record['period']},{record['value']},{record['value_unit']},{record['network_id']},{record['description']},{record['previous_instance_id']},{record['network_region']},{record['fueltech_id']}\n"
-                        )
-
-                await session.rollback()
-                raise
+    logger.info(
+        f"Successfully inserted {total_inserted} of {len(milestones)} milestone records in {duration:.2f}s "
+        f"({total_inserted / duration:.0f} records/sec)"
+    )
 
-        await session.commit()
-        logger.info(f"Successfully inserted {total_inserted} records")
-        return total_inserted
+    return total_inserted
 
 
 async def check_and_persist_milestones(
@@ -0,0 +1,492 @@
+"""
+RecordReactor streaming record tracker
+
+Keeps the current high and low for each record_id in memory, loaded once from the milestone state,
+and checks whole runs of interval data against it at once. Interval data is pulled a chunk at a time
+as columns, power, demand and price are checked per interval and energy and emissions are rolled up
+from daily totals into day, month, quarter, year and financial year buckets. Only values that beat
+the current record are turned into milestone records.
+
+The live engine that drives this is opennem.recordreactor.engine
+"""
+
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import polars as pl
+
+from opennem.db.copy_frame import copy_query_frame
+from opennem.queries.utils import list_to_case
+from opennem.recordreactor.schema import (
+    MilestoneAggregate,
+    MilestoneFueltechGrouping,
+    MilestonePeriod,
+    MilestoneRecordSchema,
+    MilestoneType,
+)
+from opennem.recordreactor.state import get_current_milestone_state
+from opennem.recordreactor.unit import get_milestone_unit
+from opennem.schema.network import NetworkNEM, NetworkSchema, NetworkWEM, NetworkWEMDE
+
+logger = logging.getLogger("opennem.recordreactor.tracker")
+
+# columns that identify a record series, along with the aggregate
+_SERIES_KEYS = ["metric", "period", "network_region", "fueltech"]
+
+_SERIES_SCHEMA = {
+    "interval": pl.Datetime,
+    "metric": pl.String,
+    "period": pl.String,
+    "network_region": pl.String,
+    "fueltech": pl.String,
+    "value": pl.Float64,
+}
+
+# bucket size and offset of each rolled up period
+_PERIOD_BUCKETS: dict[MilestonePeriod, tuple[str, str | None]] = {
+    MilestonePeriod.day: ("1d", None),
+    MilestonePeriod.month: ("1mo", None),
+    MilestonePeriod.quarter: ("3mo", None),
+    MilestonePeriod.year: ("1y", None),
+    MilestonePeriod.financial_year: ("1y", "6mo"),
+}
+
+_FUELTECH_GROUPS = [i.value for i in MilestoneFueltechGrouping]
+
+_POWER_QUERY = """
+    SELECT
+        fs.interval,
+        fs.network_region,
+        ftg.code as fueltech_group_id,
+        ftg.renewable,
+        sum(fs.generated) as generated
+    FROM at_facility_intervals fs
+    JOIN fueltech ft ON ft.code = fs.fueltech_code
+    JOIN fueltech_group ftg ON ftg.code = ft.fueltech_group_id
+    WHERE
+        fs.network_id IN ({network_ids})
+        AND fs.interval >= $1
+        AND fs.interval < $2
+    GROUP BY 1, 2, 3, 4
+"""
+
+_POWER_SCHEMA = {
+    "interval": pl.Datetime,
+    "network_region": pl.String,
+    "fueltech_group_id": pl.String,
+    "renewable": pl.Boolean,
+    "generated": pl.Float64,
+}
+
+_BALANCING_QUERY = """
+    SELECT
+        bs.interval,
+        bs.network_region,
+        bs.demand,
+        bs.price
+    FROM mv_balancing_summary bs
+    WHERE
+        bs.network_id = $1
+        AND bs.interval >= $2
+        AND bs.interval < $3
+"""
+
+_BALANCING_SCHEMA = {
+    "interval": pl.Datetime,
+    "network_region": pl.String,
+    "demand": pl.Float64,
+    "price": pl.Float64,
+}
+
+_DAILY_QUERY = """
+    SELECT
+        fs.interval,
+        fs.network_region,
+        ftg.code as fueltech_group_id,
+        sum(fs.energy) as energy,
+        sum(fs.emissions) as emissions
+    FROM mv_fueltech_daily fs
+    JOIN fueltech ft ON fs.fueltech_code = ft.code
+    JOIN fueltech_group ftg on ftg.code = ft.fueltech_group_id
+    WHERE
+        fs.network_id IN ({network_ids})
+        {network_region_filter}
+        AND fs.interval >= $1
+        AND fs.interval < $2
+    GROUP BY 1, 2, 3
+"""
+
+_DAILY_SCHEMA = {
+    "interval": pl.Datetime,
+    "network_region": pl.String,
+    "fueltech_group_id": pl.String,
+    "energy": pl.Float64,
+    "emissions": pl.Float64,
+}
+
+
+@dataclass(slots=True)
+class MilestoneRecordState:
+    """Current record value for a record_id"""
+
+    value: float
+    interval: datetime
+    instance_id: uuid.UUID | None = None
+
+
+def _period_bucket(period: MilestonePeriod, column: str = "interval") -> pl.Expr:
+    """Start of the period bucket each value of column falls in"""
+    every, offset = _PERIOD_BUCKETS[period]
+
+    if not offset:
+        return pl.col(column).dt.truncate(every)
+
+    return pl.col(column).dt.offset_by(f"-{offset}").dt.truncate(every).dt.offset_by(offset)
+
+
+def _period_end(period: MilestonePeriod, column: str = "interval") -> pl.Expr:
+    return pl.col(column).dt.offset_by(_PERIOD_BUCKETS[period][0])
+
+
+def get_completed_period_range(period: MilestonePeriod, start: datetime, end: datetime) -> tuple[datetime, datetime] | None:
+    """
+    Range covered by every period that ends between start and end inclusive, which are the
+    periods the engine closes while walking those intervals.
+    """
+    # the first period to end on or after start is the one containing the instant before it
+    bounds = pl.DataFrame({"interval": [start - timedelta(microseconds=1), end]}).select(_period_bucket(period))
+    first_start, last_end = bounds["interval"].to_list()
+
+    first_end = pl.DataFrame({"interval": [first_start]}).select(_period_end(period)).item()
+
+    if first_end > end:
+        return None
+
+    return first_start, last_end
+
+
+def _power_series(frame: pl.DataFrame) -> pl.DataFrame:
+    """Interval power for the network, each region, fueltech group and renewable grouping"""
+    renewable_label = pl.when(pl.col("renewable")).then(pl.lit("renewables")).otherwise(pl.lit("fossils"))
+
+    groupings: list[tuple[list[str], pl.Expr]] = [
+        ([], pl.lit(None, dtype=pl.String)),
+        (["network_region"], pl.lit(None, dtype=pl.String)),
+        (["fueltech_group_id"], pl.col("fueltech_group_id")),
+        (["network_region", "fueltech_group_id"], pl.col("fueltech_group_id")),
+        (["renewable"], renewable_label),
+        (["network_region", "renewable"], renewable_label),
+    ]
+
+    series = []
+
+    for fields, fueltech in groupings:
+        grouped = frame.group_by("interval", *fields).agg(pl.col("generated").sum().alias("value"))
+
+        series.append(
+            grouped.select(
+                "interval",
+                pl.lit(MilestoneType.power.value).alias("metric"),
+                pl.lit(MilestonePeriod.interval.value).alias("period"),
+                (pl.col("network_region") if "network_region" in fields else pl.lit(None, dtype=pl.String)).alias(
+                    "network_region"
+                ),
+                fueltech.alias("fueltech"),
+                "value",
+            )
+        )
+
+    return pl.concat(series).filter(pl.col("fueltech").is_null() | pl.col("fueltech").is_in(_FUELTECH_GROUPS))
+
+
+def _demand_price_series(frame: pl.DataFrame) -> pl.DataFrame:
+    """Interval demand and price for the network and each region"""
+    network = frame.group_by("interval").agg(pl.col("demand").sum(), pl.col("price").mean())
+    regions = frame.group_by("interval", "network_region").agg(pl.col("demand").sum(), pl.col("price").mean())
+
+    series = []
+
+    for grouped, has_region in ((network, False), (regions, True)):
+        network_region = pl.col("network_region") if has_region else pl.lit(None, dtype=pl.String)
+
+        for metric, fueltech in ((MilestoneType.demand, MilestoneFueltechGrouping.demand.value), (MilestoneType.price, None)):
+            series.append(
+                grouped.select(
+                    "interval",
+                    pl.lit(metric.value).alias("metric"),
+                    pl.lit(MilestonePeriod.interval.value).alias("period"),
+                    network_region.alias("network_region"),
+                    pl.lit(fueltech, dtype=pl.String).alias("fueltech"),
+                    pl.col(metric.value).alias("value"),
+                )
+            )
+
+    return pl.concat(series)
+
+
+def _energy_emissions_series(
+    daily: pl.DataFrame, periods: list[MilestonePeriod], start: datetime, end: datetime, group_by_region: bool
+) -> pl.DataFrame:
+    """
+    Energy and emissions per fueltech group rolled up from daily totals into each period, for the
+    periods that end between start and end. Months are rolled up from days and longer periods from
+    months.
+    """
+    fields = ["network_region", "fueltech_group_id"] if group_by_region else ["fueltech_group_id"]
+    values = [pl.col("energy").sum(), pl.col("emissions").sum()]
+
+    days = daily.group_by("interval", *fields).agg(values)
+    months = days.group_by(_period_bucket(MilestonePeriod.month), *fields).agg(values)
+
+    series = []
+
+    for period in periods:
+        if period not in _PERIOD_BUCKETS:
+            continue
+
+        source = days if period == MilestonePeriod.day else months
+        buckets = source.group_by(_period_bucket(period), *fields).agg(values)
+
+        # only completed periods that the engine closes in this window
+        end_of_bucket = _period_end(period)
+        buckets = buckets.filter((end_of_bucket >= start) & (end_of_bucket <= end))
+
+        for metric in (MilestoneType.energy, MilestoneType.emissions):
+            series.append(
+                buckets.select(
+                    "interval",
+                    pl.lit(metric.value).alias("metric"),
+                    pl.lit(period.value).alias("period"),
+                    (pl.col("network_region") if group_by_region else pl.lit(None, dtype=pl.String)).alias("network_region"),
+                    pl.col("fueltech_group_id").alias("fueltech"),
+                    pl.col(metric.value).alias("value"),
+                )
+            )
+
+    if not series:
+        return pl.DataFrame(schema=_SERIES_SCHEMA)
+
+    return pl.concat(series).filter(pl.col("fueltech").is_in(_FUELTECH_GROUPS))
+
+
+class MilestoneTracker:
+    """Tracks the current high and low for each record_id and finds new records in series of values"""
+
+    def __init__(self, state: dict[str, MilestoneRecordState] | None = None) -> None:
+        self.state: dict[str, MilestoneRecordState] = state or {}
+
+    @classmethod
+    async def from_milestone_state(cls) -> "MilestoneTracker":
+        """Load the tracker from the current milestone state"""
+        milestone_state = await get_current_milestone_state()
+
+        return cls(
+            {
+                record_id: MilestoneRecordState(
+                    value=float(record.value), interval=record.interval.replace(tzinfo=None), instance_id=record.instance_id
+                )
+                for record_id, record in milestone_state.items()
+            }
+        )
+
+    def _get_series_ids(self, series: pl.DataFrame, network: NetworkSchema) -> pl.DataFrame:
+        """Record id and current state of each series and aggregate"""
+        rows = []
+
+        for metric, period, network_region, fueltech in series.select(_SERIES_KEYS).unique().iter_rows():
+            for aggregate in MilestoneAggregate:
+                record_id = MilestoneRecordSchema.model_construct(
+                    network=network,
+                    network_region=network_region,
+                    fueltech=MilestoneFueltechGrouping(fueltech) if fueltech else None,
+                    metric=MilestoneType(metric),
+                    period=MilestonePeriod(period),
+                    aggregate=aggregate,
+                ).record_id
+                state = self.state.get(record_id)
+
+                rows.append(
+                    (
+                        metric,
+                        period,
+                        network_region,
+                        fueltech,
+                        aggregate.value,
+                        record_id,
+                        state.value if state else None,
+                        state.interval if state else None,
+                    )
+                )
+
+        return pl.DataFrame(
+            rows,
+            schema={
+                **dict.fromkeys(_SERIES_KEYS, pl.String),
+                "aggregate": pl.String,
+                "record_id": pl.String,
+                "state_value": pl.Float64,
+                "state_interval": pl.Datetime,
+            },
+            orient="row",
+        )
+
+    def find_records(self, series: pl.DataFrame, network: NetworkSchema) -> list[MilestoneRecordSchema]:
+        """
+        Find the values in series that set a new high or low.
+
+        Values are compared rounded as check_milestone_is_new does, empty and zero values are never
+        records and values at or before the current record interval are skipped. The state is not
+        changed, records are only tracked once they are passed to advance.
+
+        Args:
+            series: frame with _SERIES_SCHEMA columns
+            network: network the series are for
+
+        Returns:
+            list[MilestoneRecordSchema]: new records in interval order, chained to the previous record
+        """
+        series = series.filter(pl.col("value").is_not_null() & (pl.col("value") != 0))
+
+        if series.is_empty():
+            return []
+
+        # proportion records are compared to 2 decimal places, everything else to whole numbers
+        is_proportion = pl.col("metric") == MilestoneType.proportion.value
+
+        df = (
+            series.join(self._get_series_ids(series, network), on=_SERIES_KEYS, join_nulls=True)
+            .filter(pl.col("state_interval").is_null() | (pl.col("interval") > pl.col("state_interval")))
+            .with_columns(
+                pl.when(is_proportion).then(pl.col("value").round(2)).otherwise(pl.col("value").round(0)).alias("rounded"),
+                pl.when(is_proportion)
+                .then(pl.col("state_value").round(2))
+                .otherwise(pl.col("state_value").round(0))
+                .alias("state_rounded"),
+            )
+            .sort("record_id", "interval")
+        )
+
+        is_high = pl.col("aggregate") == MilestoneAggregate.high.value
+        running = pl.when(is_high).then(pl.col("rounded").cum_max()).otherwise(pl.col("rounded").cum_min())
+        df = df.with_columns(running.shift(1).over("record_id").alias("running"))
+
+        best = (
+            pl.when(is_high)
+            .then(pl.max_horizontal("state_rounded", "running"))
+            .otherwise(pl.min_horizontal("state_rounded", "running"))
+        )
+        beats = pl.when(is_high).then(pl.col("rounded") > best).otherwise(pl.col("rounded") < best)
+
+        records = df.filter(best.is_null() | beats).sort("interval", "record_id")
+
+        milestone_records: list[MilestoneRecordSchema] = []
+        previous_instance_ids: dict[str, uuid.UUID | None] = {}
+
+        for row in records.iter_rows(named=True):
+            record_id = row["record_id"]
+            metric = MilestoneType(row["metric"])
+
+            if record_id not in previous_instance_ids:
+                state = self.state.get(record_id)
+                previous_instance_ids[record_id] = state.instance_id if state else None
+
+            milestone_record = MilestoneRecordSchema(
+                interval=row["interval"],
+                aggregate=MilestoneAggregate(row["aggregate"]),
+                metric=metric,
+                period=MilestonePeriod(row["period"]),
+                network=network,
+                unit=get_milestone_unit(metric),
+                network_region=row["network_region"],
+                fueltech=MilestoneFueltechGrouping(row["fueltech"]) if row["fueltech"] else None,
+                value=row["value"],
+                instance_id=uuid.uuid4(),
+                previous_instance_id=previous_instance_ids[record_id],
+            )
+
+            previous_instance_ids[record_id] = milestone_record.instance_id
+            milestone_records.append(milestone_record)
+
+        return milestone_records
+
+    def advance(self, milestone_records: list[MilestoneRecordSchema]) -> None:
+        """Make records returned by find_records the current high or low for their record_id"""
+        for record in sorted(milestone_records, key=lambda x: x.interval):
+            self.state[record.record_id] = MilestoneRecordState(
+                value=record.value, interval=record.interval, instance_id=record.instance_id
+            )
+
+    async def run_intervals(
+        self, network: NetworkSchema, metrics: list[MilestoneType], start: datetime, end: datetime
+    ) -> list[MilestoneRecordSchema]:
+        """Check interval power, demand and price records for intervals from start up to end"""
+        series = []
+
+        if MilestoneType.power in metrics and network not in [NetworkWEM, NetworkWEMDE] and network.subnetworks:
+            power = await copy_query_frame(
+                _POWER_QUERY.format(network_ids=list_to_case(network.get_network_codes())), _POWER_SCHEMA, start, end
+            )
+            series.append(_power_series(power))
+
+        if MilestoneType.demand in metrics or MilestoneType.price in metrics:
+            balancing = await copy_query_frame(_BALANCING_QUERY, _BALANCING_SCHEMA, network.code, start, end)
+            demand_price = _demand_price_series(balancing)
+            series.append(demand_price.filter(pl.col("metric").is_in([i.value for i in metrics])))
+
+        if not series:
+            return []
+
+        return self.find_records(pl.concat(series), network)
+
+    async def run_periods(
+        self,
+        network: NetworkSchema,
+        metrics: list[MilestoneType],
+        periods: list[MilestonePeriod],
+        start: datetime,
+        end: datetime,
+    ) -> list[MilestoneRecordSchema]:
+        """Check energy and emissions records for every period that ends between start and end"""
+        if MilestoneType.energy not in metrics and MilestoneType.emissions not in metrics:
+            return []
+
+        ranges = [
+            i for i in (get_completed_period_range(period, start, end) for period in periods if period in _PERIOD_BUCKETS) if i
+        ]
+
+        if not ranges:
+            return []
+
+        network_ids = ["NEM", "AEMO_ROOFTOP", "AEMO_ROOFTOP_BACKFILL"] if network == NetworkNEM else ["WEM", "APVI"]
+        network_region_filter = "AND fs.network_region IN ('WEM', 'WEMDE')" if network in [NetworkWEM, NetworkWEMDE] else ""
+
+        daily = await copy_query_frame(
+            _DAILY_QUERY.format(network_ids=list_to_case(network_ids), network_region_filter=network_region_filter),
+            _DAILY_SCHEMA,
+            min(i[0] for i in ranges),
+            max(i[1] for i in ranges),
+        )
+
+        # don't region group for WEM/WEMDE as they are not region specific
+        region_groups = [False] if network in [NetworkWEM, NetworkWEMDE] else [False, True]
+
+        series = pl.concat(
+            [_energy_emissions_series(daily, periods, start, end, group_by_region=i) for i in region_groups]
+        ).filter(pl.col("metric").is_in([i.value for i in metrics]))
+
+        return self.find_records(series, network)
+
+
+_MILESTONE_TRACKER: MilestoneTracker | None = None
+
+
+async def get_milestone_tracker() -> MilestoneTracker:
+    """Get the process milestone tracker, loading it from the milestone state on first use"""
+    global _MILESTONE_TRACKER
+
+    if not _MILESTONE_TRACKER:
+        _MILESTONE_TRACKER = await MilestoneTracker.from_milestone_state()
+
+    return _MILESTONE_TRACKER
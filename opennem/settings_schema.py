@@ -38,11 +38,22 @@ class OpennemSettings(BaseSettings):
         description="ClickHouse connection URL in format clickhouse:// schema url",
     )
 
+    # pooled clickhouse clients shared by the API and the per query execution timeout in seconds
+    clickhouse_pool_size: int = 10
+    clickhouse_query_timeout: int = 30
+
     redis_url: RedisDsn = Field(
         RedisDsn("redis://127.0.0.1"),
         validation_alias=AliasChoices("REDIS_HOST_URL", "cache_url"),
     )
 
+    # shared v4 data and market response cache. entries are invalidated by the aggregate watermark
+    # versions, the ttls only bound how long unused entries are kept. l1 is per process in bytes
+    api_response_cache_enabled: bool = True
+    api_response_cache_live_ttl: int = 60 * 60
+    api_response_cache_historical_ttl: int = 60 * 60 * 24 * 7
+    api_response_cache_l1_bytes: int = 64 * 1024 * 1024
+
     # if we're doing a dry run
     dry_run: bool = False
 
@@ -91,9 +102,21 @@ class OpennemSettings(BaseSettings):
     s3_bucket_public_url: URLNoPath = Field("https://data.opennem.org.au", description="The public URL of the S3 bucket")
     s3_region: str = "apac"
 
+    # compress JSON exports with this Content-Encoding (gzip or br) and the multipart chunk size
+    # for large uploads
+    export_content_encoding: str | None = None
+    s3_multipart_chunk_size: int = 16 * 1024 * 1024
+
+    # archive parquet files are spooled in memory up to this size before moving to a temp file
+    archive_spool_bytes: int = 64 * 1024 * 1024
+
     # show database debug
     db_debug: bool = False
 
+    # asyncpg pool used by the bulk inserter and the number of concurrent insert lanes per table
+    db_bulk_insert_pool_size: int = 10
+    db_bulk_insert_lanes: int = 4
+
     # timeout on http requests
     # see opennem.utils.http
     http_timeout: int = 20
@@ -105,6 +128,29 @@ class OpennemSettings(BaseSettings):
     http_verify_ssl: bool = True
     http_proxy_url: str | None = None  # @note don't let it confict with env HTTP_PROXY
 
+    # worker processes and bounded parse queue size for multi-file NEMWeb archives
+    nemweb_parse_workers: int = 4
+    nemweb_parse_queue_size: int | None = None
+
+    # only re-aggregate unit intervals marked dirty by ingest rather than the whole window
+    unit_intervals_incremental: bool = True
+
+    # update facility aggregates, market summary and unit intervals from a single read of the
+    # source tables each interval rather than a query per target
+    interval_aggregate_engine: bool = True
+
+    # route v4 queries to the monthly rollups and the fueltech daily view. enable once the rollups
+    # have been backfilled with run_rollup_rebuild and the views with backfill_clickhouse_views
+    clickhouse_rollup_routing: bool = False
+
+    # all-history daily and monthly exports only recompute this trailing window and merge it
+    # into the published sets unless a full rebuild is requested
+    export_incremental_days: int = 14
+    export_incremental_months: int = 2
+
+    # number of export regions and stats computed concurrently across the process
+    export_concurrency: int = 4
+
     # catchup and incident settings
     catchup_max_gap_minutes: int = 60
 
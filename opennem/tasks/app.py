@@ -50,6 +50,7 @@ from opennem.tasks.tasks import (
     task_nem_per_day_check,
     task_nem_rooftop_crawl,
     task_optimize_clickhouse_tables,
+    task_rebuild_clickhouse_rollups,
     task_refresh_from_cms,
     task_run_aggregates_demand_network_days,
     task_update_facility_first_seen,
@@ -108,6 +109,15 @@ class WorkerSettings:
             timeout=None,
             unique=True,
         ),
+        # Rebuild monthly rollups for closed months daily
+        cron(
+            task_rebuild_clickhouse_rollups,
+            hour=0,
+            minute=45,
+            second=0,
+            timeout=None,
+            unique=True,
+        ),
         # NEM Rooftop
         cron(
             task_nem_rooftop_crawl,
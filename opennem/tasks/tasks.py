@@ -12,6 +12,7 @@ from opennem.aggregates.facility_interval import (
     run_update_facility_aggregate_last_interval,
     update_facility_aggregate_last_hours,
 )
+from opennem.aggregates.interval_engine import run_interval_aggregates
 from opennem.aggregates.market_summary import run_market_summary_aggregate_to_now
 from opennem.aggregates.network_demand import run_aggregates_demand_network_days
 from opennem.aggregates.network_flows_v3 import run_flows_for_last_days
@@ -35,6 +36,7 @@ from opennem.crawlers.nemweb import (
 )
 from opennem.crawlers.wemde import run_all_wem_crawlers
 from opennem.db.clickhouse_schema import optimize_clickhouse_tables
+from opennem.db.clickhouse_views import run_rollup_rebuild
 from opennem.exporter.archive import generate_archive_dirlisting, sync_archive_exports
 from opennem.exporter.facilities import export_facilities_static
 
@@ -58,27 +60,30 @@ logger = logging.getLogger("opennem.pipelines.nem")
 async def task_nem_interval_check(ctx) -> None:
     """This task runs per interval and checks for new data"""
     with logfire.span("task_nem_interval_check"):
-        _ = await run_crawl(AEMONemwebDispatchIS, latest=True)
-        dispatch_scada = await run_crawl(AEMONNemwebDispatchScada, latest=True)
-        _ = await run_crawl(AEMONemwebTradingIS, latest=True)
+        # crawlers ingest in parallel through separate bulk insert lanes
+        _, dispatch_scada, _ = await asyncio.gather(
+            run_crawl(AEMONemwebDispatchIS, latest=True),
+            run_crawl(AEMONNemwebDispatchScada, latest=True),
+            run_crawl(AEMONemwebTradingIS, latest=True),
+        )
 
         if not dispatch_scada.inserted_records:
             logfire.warning("No new data from crawlers")
             raise Retry(defer=ctx["job_try"] * 15)
 
-    # update facility aggregates
-    await run_update_facility_aggregate_last_interval(num_intervals=3)
-
-    # update aggregates
-    # update market summary
-    await run_market_summary_aggregate_to_now()
-    await run_unit_intervals_aggregate_to_now()
+    # update facility aggregates, market summary and unit intervals
+    if settings.interval_aggregate_engine:
+        await run_interval_aggregates(num_intervals=3)
+    else:
+        await run_update_facility_aggregate_last_interval(num_intervals=3)
+        await run_market_summary_aggregate_to_now()
+        await run_unit_intervals_aggregate_to_now()
 
     # update energy
     await process_energy_last_intervals(num_intervals=3)
 
     # run flows
-    run_flows_for_last_days(days=1, network=NetworkNEM)
+    await run_flows_for_last_days(days=1, network=NetworkNEM)
 
     await asyncio.gather(
         run_export_power_latest_for_network(network=NetworkNEM), run_export_power_latest_for_network(network=NetworkAU)
@@ -146,7 +151,7 @@ async def task_run_energy_calculation(ctx) -> None:
 @logfire.instrument("task_run_flows_for_last_days")
 async def task_run_flows_for_last_days(ctx) -> None:
     """Runs the flows for the last 2 days"""
-    run_flows_for_last_days(days=2, network=NetworkNEM)
+    await run_flows_for_last_days(days=2, network=NetworkNEM)
 
 
 @logfire.instrument("task_run_aggregates_demand_network_days")
@@ -304,5 +309,13 @@ async def task_optimize_clickhouse_tables(ctx: dict) -> None:
     await optimize_clickhouse_tables()
 
 
+@logfire.instrument("task_rebuild_clickhouse_rollups")
+async def task_rebuild_clickhouse_rollups(ctx: dict) -> None:
+    """
+    Rebuild the monthly ClickHouse rollups for the most recently closed months.
+    """
+    await asyncio.to_thread(run_rollup_rebuild)
+
+
 if __name__ == "__main__":
     asyncio.run(task_nem_interval_check(ctx={"job_try": 0}))
@@ -9,6 +9,7 @@ import logging
 import os
 import shutil
 import zipfile
+from collections.abc import Generator
 from io import BytesIO
 from pathlib import Path
 from tempfile import mkdtemp
@@ -128,27 +129,64 @@ def fix_central_directory_file(zip_file_path: Path) -> Path:
     Fixes the central directory on bad zip files
     """
     # @NOTE See http://bugs.python.org/issue10694
+    content = zip_file_path.read_bytes()
 
-    with zip_file_path.open("wb") as zfile:
-        content = zfile.read()
+    # reverse find: this string of bytes is the end of
+    #  the zip's central directory.
+    pos = content.rfind(b"\x50\x4b\x05\x06")
 
-        # reverse find: this string of bytes is the end of
-        #  the zip's central directory.
-        pos = content.rfind(b"\x50\x4b\x05\x06")
+    if pos > 0:
+        # Zip file comment length: 0 byte length;
+        zip_file_path.write_bytes(content[: pos + 20] + b"\x00\x00")
 
-        if pos > 0:
-            zfile.seek(pos + 20)
-            zfile.truncate()
-            zfile.write(b"\x00\x00")  # Zip file comment length: 0 byte length;
-            zfile.seek(0)
+    return zip_file_path
 
-        zip_file_path.write_bytes(zfile.read())
 
-    return zip_file_path
+def open_zip(file_obj: Path | IO[bytes]) -> ZipFile:
+    """Open a zip file, repairing the central directory and retrying if it can't be read"""
+    try:
+        return ZipFile(file_obj)
+    except zipfile.BadZipFile as e:
+        logger.error(f"Bad zip file, fixing central directory: {e}")
 
+    if isinstance(file_obj, Path):
+        fix_central_directory_file(file_obj)
+    else:
+        file_obj.seek(0)
+        fix_central_directory(file_obj)  # type: ignore
 
-async def download_and_unzip(url: str) -> Path:
-    """Download and unzip a multi-zip file into a temporary directory"""
+    return ZipFile(file_obj)
+
+
+def iter_zip_members(file_obj: Path | IO[bytes], suffix: str | None = None) -> Generator[tuple[str, IO[bytes]], None, None]:
+    """Yield (name, stream) for each member of a zip, descending into nested zips
+
+    Members are streamed out of the archive without being extracted to disk. Nested zips
+    (ie. AEMO archive files) are buffered one at a time since ZipFile requires a seekable
+    file. Archives with a broken central directory are repaired and retried. Optionally
+    filter members by file suffix.
+    """
+    with open_zip(file_obj) as zf:
+        for member in zf.infolist():
+            if member.is_dir():
+                continue
+
+            if member.filename.lower().endswith(".zip"):
+                with zf.open(member) as nested_fh:
+                    nested_zip = BytesIO(nested_fh.read())
+
+                yield from iter_zip_members(nested_zip, suffix=suffix)
+                continue
+
+            if suffix and not member.filename.lower().endswith(suffix.lower()):
+                continue
+
+            with zf.open(member) as member_fh:
+                yield member.filename, member_fh
+
+
+async def download_archive(url: str) -> Path:
+    """Download a zip archive into a temporary directory without extracting it"""
 
     dest_dir = Path(mkdtemp(prefix="opennem_"))
 
@@ -173,12 +211,23 @@ async def download_and_unzip(url: str) -> Path:
 
     logger.info(f"Wrote file to {save_path}")
 
-    with ZipFile(save_path) as zf:
-        try:
+    return save_path
+
+
+async def download_and_unzip(url: str) -> Path:
+    """Download and unzip a multi-zip file into a temporary directory"""
+
+    save_path = await download_archive(url)
+    dest_dir = save_path.parent
+
+    try:
+        with open_zip(save_path) as zf:
             zf.extractall(dest_dir)
-        except Exception as e:
-            logger.error(e)
-            fix_central_directory_file(save_path)
+    except Exception as e:
+        logger.error(e)
+        fix_central_directory_file(save_path)
+
+        with ZipFile(save_path) as zf:
             zf.extractall(dest_dir)
 
     os.remove(save_path)
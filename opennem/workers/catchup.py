@@ -268,7 +268,7 @@ async def catchup_last_days(days: int = 1, network: NetworkSchema | None = None,
     await process_energy_last_days(days=days)
     await run_unit_intervals_aggregate_for_last_days(days=days)
     await run_market_summary_aggregate_for_last_days(days=days)
-    run_flows_for_last_days(days=days, network=NetworkNEM)
+    await run_flows_for_last_days(days=days, network=NetworkNEM)
     await update_facility_aggregate_last_hours(hours_back=days * 24)
 
     # refresh materialized views
@@ -7,6 +7,7 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from opennem import settings
+from opennem.aggregates.watermark import mark_interval_range_dirty
 from opennem.db import get_write_session
 from opennem.schema.network import NetworkNEM
 from opennem.utils.dates import get_last_completed_interval_for_network
@@ -107,6 +108,9 @@ async def process_energy_last_intervals(num_intervals: int = 6) -> None:
     async with get_write_session() as session:
         await _calculate_energy_for_interval(session=session, start_time=start_time, end_time=end_time)
 
+    # late energy updates need to be picked up by the incremental unit intervals aggregate
+    await mark_interval_range_dirty(network_id=NetworkNEM.code, interval_start=start_time, interval_end=end_time)
+
 
 async def process_energy_last_days(days: int = 1):
     """
@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+
+import polars as pl
+
+from opennem.aggregates.interval_engine import (
+    _BALANCING_SUMMARY_SCHEMA,
+    _FACILITY_AGGREGATE_UPDATE_FIELDS,
+    _FACILITY_AGGREGATE_UPDATE_WHERE,
+    _SCADA_SCHEMA,
+    compute_interval_aggregates,
+)
+from opennem.db.bulk_insert_csv import BulkInsertTableMeta, build_insert_query, convert_records_for_copy
+from opennem.db.models.opennem import FacilityAggregate
+
+TEST_START = datetime.fromisoformat("2024-01-01T10:00:00")
+TEST_END = TEST_START + timedelta(minutes=15)
+
+
+def _interval(minutes: int) -> datetime:
+    return TEST_START + timedelta(minutes=minutes)
+
+
+def _scada() -> pl.DataFrame:
+    records = [
+        (_interval(i), "NEM", "ERARING", "ER01", "NSW1", "operating", "coal_black", "coal", False, 0.9, 600.0, 50.0)
+        for i in (0, 5, 10)
+    ]
+    records.append((_interval(0), "NEM", "WIND", "WIND1", "NSW1", "operating", "wind", "wind", True, None, 100.0, 0.0))
+
+    # rooftop is at 30 minutes and carried forward onto 5 minute intervals
+    rooftop_unit = ("AEMO_ROOFTOP", "ROOFTOP_NSW1", "ROOFTOP_NSW1", "NSW1", "operating", "solar_rooftop", "solar", True)
+    records.append((_interval(-30), *rooftop_unit, 0.0, 60.0, 30.0))
+
+    return pl.DataFrame(records, schema=_SCADA_SCHEMA, orient="row")
+
+
+def _balancing() -> pl.DataFrame:
+    records = [(_interval(i), "NEM", "NSW1", False, 100.0, 7000.0 + i, 7100.0 + i) for i in range(-10, 15, 5)]
+
+    # a missing price is carried forward from the previous interval
+    records[-2] = (_interval(5), "NEM", "NSW1", False, None, 7005.0, 7105.0)
+
+    return pl.DataFrame(records, schema=_BALANCING_SUMMARY_SCHEMA, orient="row")
+
+
+def test_compute_facility_intervals() -> None:
+    aggregates = compute_interval_aggregates(_scada(), _balancing(), TEST_START, TEST_END)
+    facility = aggregates.facility_intervals.filter(pl.col("unit_code") == "ER01").sort("interval")
+
+    assert facility["interval"].to_list() == [_interval(0), _interval(5), _interval(10)]
+    assert facility["energy"].to_list() == [50.0, 50.0, 50.0]
+    assert facility["emissions"].to_list() == [45.0, 45.0, 45.0]
+    assert facility["emissions_intensity"].to_list() == [0.9, 0.9, 0.9]
+    assert facility["market_value"].to_list() == [5000.0, 5000.0, 5000.0]
+
+    wind = aggregates.facility_intervals.filter(pl.col("unit_code") == "WIND1")
+
+    assert wind["emissions"].to_list() == [0.0]
+    assert wind["market_value"].to_list() == [0.0]
+
+
+def test_facility_intervals_convert_for_copy() -> None:
+    aggregates = compute_interval_aggregates(_scada(), _balancing(), TEST_START, TEST_END)
+
+    # postgres types of at_facility_intervals as read by the bulk inserter
+    table_meta = BulkInsertTableMeta(
+        columns=[c.name for c in FacilityAggregate.__table__.columns],  # type: ignore
+        column_types={
+            "interval": "timestamp without time zone",
+            "last_updated": "timestamp with time zone",
+        }
+        | {c: "numeric" for c in ["generated", "energy", "emissions", "emissions_intensity", "market_value"]}
+        | {c: "text" for c in ["network_id", "facility_code", "unit_code", "fueltech_code", "network_region", "status_id"]},
+    )
+
+    rows = convert_records_for_copy(aggregates.facility_intervals.to_pandas(), table_meta)
+    last_updated = [r[table_meta.columns.index("last_updated")] for r in rows]
+
+    assert len(rows) == len(aggregates.facility_intervals)
+    assert all(isinstance(i, datetime) and i.utcoffset() == timedelta(0) for i in last_updated)
+    assert all(isinstance(r[0], datetime) and r[0].tzinfo is None for r in rows)
+
+
+def test_facility_intervals_only_update_older_rows() -> None:
+    _, queries = build_insert_query(
+        FacilityAggregate, _FACILITY_AGGREGATE_UPDATE_FIELDS, update_where=_FACILITY_AGGREGATE_UPDATE_WHERE
+    )
+
+    assert queries[2].rstrip().endswith("WHERE at_facility_intervals.last_updated < EXCLUDED.last_updated")
+
+
+def test_compute_unit_intervals_fills_rooftop() -> None:
+    aggregates = compute_interval_aggregates(_scada(), _balancing(), TEST_START, TEST_END)
+    unit_intervals = aggregates.unit_intervals
+
+    assert unit_intervals.columns[-1] == "version"
+
+    rooftop = unit_intervals.filter(pl.col("unit_code") == "ROOFTOP_NSW1")
+
+    assert rooftop["interval"].to_list() == [_interval(0), _interval(5), _interval(10)]
+    assert rooftop["energy"].to_list() == [5.0, 5.0, 5.0]
+    assert rooftop["fueltech_group_id"].to_list() == ["solar"] * 3
+    assert rooftop["market_value"].to_list() == [500.0, 500.0, 500.0]
+
+    coal = unit_intervals.filter(pl.col("unit_code") == "ER01")
+
+    assert coal["emissions"].to_list() == [45.0, 45.0, 45.0]
+    assert coal["emission_factor"].to_list() == [0.9, 0.9, 0.9]
+
+
+def test_compute_market_summary() -> None:
+    aggregates = compute_interval_aggregates(_scada(), _balancing(), TEST_START, TEST_END)
+    market_summary = aggregates.market_summary
+
+    # the first interval in the window has a previous demand from the lookback
+    assert market_summary["interval"].to_list() == [_interval(0), _interval(5), _interval(10)]
+    # rounded half away from zero by polars the same as the per-target aggregate
+    assert market_summary["demand_energy"].to_list()[0] == pl.Series([(7000.0 + 6995.0) / 2 / 12]).round(2)[0]
+
+
+def test_compute_interval_aggregates_empty() -> None:
+    aggregates = compute_interval_aggregates(
+        pl.DataFrame(schema=_SCADA_SCHEMA), pl.DataFrame(schema=_BALANCING_SUMMARY_SCHEMA), TEST_START, TEST_END
+    )
+
+    assert aggregates.facility_intervals.is_empty()
+    assert aggregates.unit_intervals.is_empty()
+    assert aggregates.market_summary.is_empty()
@@ -0,0 +1,230 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from opennem.aggregates import network_flows_v3
+from opennem.aggregates.network_flows_v3 import (
+    FlowWorkerException,
+    calculate_demand_region_for_interval,
+    calculate_total_import_and_export_per_region_for_interval,
+    invert_interconnectors_invert_all_flows,
+    load_energy_and_emissions_for_intervals,
+    load_interconnector_intervals,
+    persist_network_flows_and_emissions_for_interval,
+)
+from opennem.core.flow_solver import (
+    FlowSolverException,
+    solve_flow_emissions_with_pandas,
+    solve_region_flows_for_interval_range,
+)
+from opennem.db.bulk_insert_csv import BulkInsertTableMeta, convert_records_for_copy
+from opennem.db.models.opennem import AggregateNetworkFlows
+from opennem.schema.network import NetworkNEM
+
+TEST_INTERVAL_START = datetime.fromisoformat("2023-04-09T10:15:00")
+
+# interconnector energy (MWh) as loaded by load_interconnector_intervals
+TEST_INTERCONNECTORS = {
+    ("NSW1", "QLD1"): -55.8,
+    ("TAS1", "VIC1"): -33.3,
+    ("VIC1", "NSW1"): -21.8,
+    ("VIC1", "SA1"): 34.4,
+}
+
+# region energy (MWh) and emissions (t) as loaded by load_energy_and_emissions_for_intervals
+TEST_REGIONS = {
+    "NSW1": (468.1, 226.5),
+    "QLD1": (459.6, 295.1),
+    "SA1": (36.9, 9.1),
+    "TAS1": (71.1, 0.0),
+    "VIC1": (387.1, 236.1),
+}
+
+
+def _build_flow_frames(num_intervals: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    interconnector_records = []
+    region_records = []
+
+    for i in range(num_intervals):
+        interval = TEST_INTERVAL_START + timedelta(minutes=5 * i)
+
+        for (region_from, region_to), energy in TEST_INTERCONNECTORS.items():
+            interconnector_records.append(
+                {
+                    "interval": interval,
+                    "interconnector_region_from": region_from,
+                    "interconnector_region_to": region_to,
+                    "generated": (energy + i) * 12,
+                    "energy": energy + i,
+                }
+            )
+
+        for region, (energy, emissions) in TEST_REGIONS.items():
+            region_records.append(
+                {
+                    "interval": interval,
+                    "network_id": "NEM",
+                    "network_region": region,
+                    "generated": (energy + i) * 12,
+                    "energy": energy + i,
+                    "emissions": emissions + i / 2,
+                    "emissions_intensity": (emissions + i / 2) / (energy + i),
+                }
+            )
+
+    return pd.DataFrame(interconnector_records), pd.DataFrame(region_records)
+
+
+def _prepare_solver_frames(
+    interconnector_data: pd.DataFrame, energy_and_emissions: pd.DataFrame
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Run the frame preparation steps of run_aggregate_flow_for_interval_v3"""
+    interconnector_data_net = invert_interconnectors_invert_all_flows(interconnector_data)
+    region_imports_and_exports = calculate_total_import_and_export_per_region_for_interval(interconnector_data)
+    region_net_demand = calculate_demand_region_for_interval(energy_and_emissions, region_imports_and_exports)
+
+    return interconnector_data_net, region_net_demand
+
+
+def test_batched_region_flows_match_join_solver() -> None:
+    interconnector_data_net, region_net_demand = _prepare_solver_frames(*_build_flow_frames(num_intervals=12))
+
+    batched = solve_region_flows_for_interval_range(interconnector_data_net, region_net_demand)
+    joined = solve_flow_emissions_with_pandas(interconnector_data_net, region_net_demand)
+
+    assert len(batched) == 12 * len(TEST_REGIONS)
+    pd.testing.assert_frame_equal(batched, joined, check_dtype=False)
+
+
+def test_batched_region_flows_missing_region() -> None:
+    interconnector_data, energy_and_emissions = _build_flow_frames(num_intervals=2)
+    energy_and_emissions = energy_and_emissions[energy_and_emissions.network_region != "TAS1"]
+
+    interconnector_data_net, region_net_demand = _prepare_solver_frames(interconnector_data, energy_and_emissions)
+
+    with pytest.raises(FlowSolverException):
+        solve_region_flows_for_interval_range(interconnector_data_net, region_net_demand)
+
+
+class _QueryResult:
+    def __init__(self, columns: list[str], rows: list[tuple]):
+        self.columns = columns
+        self.rows = rows
+
+    def keys(self) -> list[str]:
+        return self.columns
+
+    def fetchall(self) -> list[tuple]:
+        return self.rows
+
+
+class _Session:
+    """Returns a fixed result and keeps the queries and bound parameters it was asked to run"""
+
+    def __init__(self, result: _QueryResult):
+        self.result = result
+        self.executed: list[tuple[str, dict]] = []
+
+    async def execute(self, query, params: dict) -> _QueryResult:
+        self.executed.append((str(query), params))
+        return self.result
+
+
+def _patch_read_session(monkeypatch: pytest.MonkeyPatch, result: _QueryResult) -> _Session:
+    session = _Session(result)
+
+    @asynccontextmanager
+    async def _get_read_session():
+        yield session
+
+    monkeypatch.setattr(network_flows_v3, "get_read_session", _get_read_session)
+
+    return session
+
+
+@pytest.mark.asyncio
+async def test_load_interconnector_intervals_binds_range(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = _patch_read_session(
+        monkeypatch,
+        _QueryResult(
+            ["interval", "interconnector_region_from", "interconnector_region_to", "generated", "energy"],
+            [(TEST_INTERVAL_START, "NSW1", "QLD1", Decimal("-669.9"), Decimal("-55.825"))],
+        ),
+    )
+
+    interval_start = datetime.fromisoformat("2023-04-09T10:15:00+10:00")
+
+    df = await load_interconnector_intervals(NetworkNEM, interval_start, interval_start + timedelta(hours=1))
+
+    query, params = session.executed[0]
+
+    # bounds are bound as parameters, naive in network time
+    assert ":interval_start" in query and ":interval_end" in query and ":network_id" in query
+    assert params == {
+        "interval_start": datetime.fromisoformat("2023-04-09T10:15:00"),
+        "interval_end": datetime.fromisoformat("2023-04-09T11:15:00"),
+        "network_id": "NEM",
+    }
+
+    # numeric sums come back as Decimal and are cast to float
+    assert df["energy"].dtype == float
+    assert df["energy"].to_list() == [-55.825]
+
+
+@pytest.mark.asyncio
+async def test_load_energy_and_emissions_single_interval_and_empty(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = _patch_read_session(
+        monkeypatch,
+        _QueryResult(
+            ["interval", "network_id", "network_region", "generated", "energy", "emissions", "emissions_intensity"],
+            [],
+        ),
+    )
+
+    with pytest.raises(FlowWorkerException):
+        await load_energy_and_emissions_for_intervals(NetworkNEM, TEST_INTERVAL_START)
+
+    _, params = session.executed[0]
+
+    assert params["interval_start"] == params["interval_end"] == TEST_INTERVAL_START
+
+
+@pytest.mark.asyncio
+async def test_persist_network_flows_maps_frame_to_table(monkeypatch: pytest.MonkeyPatch) -> None:
+    interconnector_data_net, region_net_demand = _prepare_solver_frames(*_build_flow_frames(num_intervals=2))
+    flow_results = solve_region_flows_for_interval_range(interconnector_data_net, region_net_demand)
+
+    inserted: list[tuple] = []
+
+    async def _bulkinsert_mms_items(table, records, update_fields):
+        inserted.append((table, records, update_fields))
+        return len(records)
+
+    monkeypatch.setattr(network_flows_v3, "bulkinsert_mms_items", _bulkinsert_mms_items)
+
+    assert await persist_network_flows_and_emissions_for_interval(flow_results) == len(flow_results)
+
+    table, records, update_fields = inserted[0]
+    table_columns = [c.name for c in AggregateNetworkFlows.__table__.columns]  # type: ignore
+
+    assert table is AggregateNetworkFlows
+    assert set(update_fields) == set(table_columns) - {"interval", "network_id", "network_region"}
+    assert set(table_columns) <= set(records.columns)
+
+    # every column converts for COPY in table order with primary keys set
+    table_meta = BulkInsertTableMeta(
+        columns=table_columns,
+        column_types={c: "timestamp without time zone" if c == "interval" else "text" for c in table_columns}
+        | dict.fromkeys(update_fields, "numeric"),
+    )
+    rows = convert_records_for_copy(records, table_meta)
+
+    nsw_row = next(r for r in rows if r[0] == TEST_INTERVAL_START and r[2] == "NSW1")
+    nsw_flows = flow_results.query("network_region == 'NSW1' and interval == @TEST_INTERVAL_START").iloc[0]
+
+    assert nsw_row[1] == "NEM"
+    assert nsw_row[table_columns.index("energy_imports")] == pytest.approx(nsw_flows["energy_imports"])
+    assert nsw_row[table_columns.index("emissions_exports")] == pytest.approx(nsw_flows["emissions_exports"])
@@ -0,0 +1,105 @@
+import io
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import polars as pl
+import pytest
+
+from opennem.aggregates import unit_intervals
+from opennem.aggregates.unit_intervals import (
+    UNIT_INTERVALS_SOURCE_SCHEMA,
+    _get_unit_interval_query,
+    _prepare_unit_interval_data,
+    _prepare_unit_interval_frame,
+    run_unit_intervals_aggregate_dirty,
+)
+from opennem.schema.network import NetworkNEM
+
+# unit interval query output as written by postgres COPY ... TO STDOUT csv
+_UNIT_INTERVALS_COPY_CSV = b"""interval,network_id,network_region,facility_code,unit_code,status_id,fueltech_id,\
+fueltech_group_id,renewable,generated,energy,emissions,emission_factor,market_value
+2024-01-01 10:00:00,NEM,SNOWY1,MURRAY,MURRAY1,operating,hydro,hydro,t,120.123456,10.0101,0,0,550.5
+2024-01-01 10:00:00,NEM,NSW1,ERARING,ER01,operating,coal_black,coal,f,600.5,50.04,45.036,0.9,
+"""
+
+_UNIT_INTERVALS_RECORDS = [
+    (
+        datetime(2024, 1, 1, 10),
+        "NEM",
+        "SNOWY1",
+        "MURRAY",
+        "MURRAY1",
+        "operating",
+        "hydro",
+        "hydro",
+        True,
+        120.123456,
+        10.0101,
+        0.0,
+        0.0,
+        550.5,
+    ),
+    (
+        datetime(2024, 1, 1, 10),
+        "NEM",
+        "NSW1",
+        "ERARING",
+        "ER01",
+        "operating",
+        "coal_black",
+        "coal",
+        False,
+        600.5,
+        50.04,
+        45.036,
+        0.9,
+        None,
+    ),
+]
+
+
+def test_prepare_unit_interval_frame_matches_records() -> None:
+    df = pl.read_csv(
+        io.BytesIO(_UNIT_INTERVALS_COPY_CSV), schema_overrides={**UNIT_INTERVALS_SOURCE_SCHEMA, "renewable": pl.String}
+    ).with_columns(pl.col("renewable") == "t")
+
+    frame_rows = [i[:-1] for i in _prepare_unit_interval_frame(df).rows()]
+    record_rows = [i[:-1] for i in _prepare_unit_interval_data(_UNIT_INTERVALS_RECORDS)]
+
+    assert frame_rows == record_rows
+    assert frame_rows[0][2] == "NSW1"
+    assert frame_rows[0][9] == 120.1235
+
+
+def test_unit_interval_query_network_bind() -> None:
+    assert ":network_id" not in _get_unit_interval_query()
+    assert ":network_id" in _get_unit_interval_query(network=NetworkNEM)
+    assert _get_unit_interval_query().count(":start_time") == _get_unit_interval_query().count(":end_time")
+
+
+@pytest.mark.asyncio
+async def test_aggregate_dirty_skips_unknown_networks(monkeypatch: pytest.MonkeyPatch) -> None:
+    cleared: list[str] = []
+
+    async def _get_dirty_intervals(touched_before: float) -> dict[str, list[datetime]]:
+        return {"NEM": [datetime(2024, 1, 1, 10)], "NOTANETWORK": [datetime(2024, 1, 1, 10)]}
+
+    async def _clear_dirty_intervals(network_id: str, touched_before: float) -> int:
+        cleared.append(network_id)
+        return 1
+
+    async def _get_unit_interval_data(*args) -> list[tuple]:
+        return []
+
+    @asynccontextmanager
+    async def _get_read_session():
+        yield None
+
+    monkeypatch.setattr(unit_intervals, "get_dirty_intervals", _get_dirty_intervals)
+    monkeypatch.setattr(unit_intervals, "clear_dirty_intervals", _clear_dirty_intervals)
+    monkeypatch.setattr(unit_intervals, "_get_unit_interval_data", _get_unit_interval_data)
+    monkeypatch.setattr(unit_intervals, "get_read_session", _get_read_session)
+    monkeypatch.setattr(unit_intervals, "get_clickhouse_client", lambda: None)
+
+    assert await run_unit_intervals_aggregate_dirty(touched_before=0) == 0
+    assert cleared == ["NEM"]
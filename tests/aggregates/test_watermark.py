@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+
+from opennem.aggregates.watermark import group_interval_ranges
+
+TEST_INTERVAL = datetime.fromisoformat("2024-01-01T10:00:00")
+
+
+def test_group_interval_ranges_contiguous() -> None:
+    intervals = [TEST_INTERVAL + timedelta(minutes=5 * i) for i in range(4)]
+
+    assert group_interval_ranges(intervals) == [(TEST_INTERVAL, TEST_INTERVAL + timedelta(minutes=15))]
+
+
+def test_group_interval_ranges_gaps() -> None:
+    intervals = [
+        TEST_INTERVAL,
+        TEST_INTERVAL + timedelta(minutes=5),
+        TEST_INTERVAL + timedelta(minutes=30),
+        TEST_INTERVAL + timedelta(hours=2),
+    ]
+
+    assert group_interval_ranges(intervals) == [
+        (TEST_INTERVAL, TEST_INTERVAL + timedelta(minutes=5)),
+        (TEST_INTERVAL + timedelta(minutes=30), TEST_INTERVAL + timedelta(minutes=30)),
+        (TEST_INTERVAL + timedelta(hours=2), TEST_INTERVAL + timedelta(hours=2)),
+    ]
+
+
+def test_group_interval_ranges_rooftop_interval_size() -> None:
+    intervals = [TEST_INTERVAL + timedelta(minutes=30 * i) for i in range(3)]
+
+    assert group_interval_ranges(intervals, interval_size=30) == [(TEST_INTERVAL, TEST_INTERVAL + timedelta(hours=1))]
+    assert len(group_interval_ranges(intervals)) == 3
+
+
+def test_group_interval_ranges_empty() -> None:
+    assert group_interval_ranges([]) == []
@@ -0,0 +1,88 @@
+"""Benchmark battery unit remapping on a full day of NEM SCADA
+
+Compares the previous per-row DataFrame.apply remapping with the vectorised
+BatteryUnitRemapper on the same full day unit_scada file as
+benchmark_facility_scada_generate. Run with:
+
+    pytest tests/benchmark_battery_remap.py --benchmark-columns=mean,ops
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from opennem.core.battery import BatteryUnitMap, BatteryUnitRemapper
+from opennem.core.downloader import file_opener
+from opennem.core.parsers.aemo.mms import parse_aemo_mms_csv
+
+NEM_FILE_PATH = Path("data/NEM_FACILITY_SCADA_DAY.zip")
+
+
+def load_nem_scada() -> pd.DataFrame:
+    csv_content = file_opener(NEM_FILE_PATH).decode("utf-8")
+
+    ts = parse_aemo_mms_csv(csv_content)
+
+    if not ts:
+        raise Exception("no table set")
+
+    df = pd.DataFrame.from_records(ts.get_table("unit_scada").records)
+
+    return pd.DataFrame(
+        {"facility_code": df["duid"], "generated": pd.to_numeric(df["scadavalue"]).fillna(0)},
+    )
+
+
+test_full_day_scada = load_nem_scada()
+
+# the battery map comes from the database, units that both charge and discharge during the day
+# stand in for the bidirectional batteries
+BATTERY_UNIT_MAP = {
+    code: BatteryUnitMap(unit=code, charge_unit=f"{code}L", discharge_unit=f"{code}G")
+    for code, generated in test_full_day_scada.groupby("facility_code")["generated"]
+    if generated.min() < 0 < generated.max()
+}
+
+
+def _remap_row_apply(df: pd.DataFrame) -> pd.DataFrame:
+    def map_battery_code(row):
+        if row["facility_code"] in BATTERY_UNIT_MAP:
+            battery_map = BATTERY_UNIT_MAP[row["facility_code"]]
+            return battery_map.charge_unit if row["generated"] < 0 else battery_map.discharge_unit
+        return row["facility_code"]
+
+    def map_battery_generation(row):
+        for battery_map in BATTERY_UNIT_MAP.values():
+            if row["facility_code"] == battery_map.charge_unit:
+                return abs(row["generated"])
+        return row["generated"]
+
+    df = df.copy()
+    df["facility_code"] = df.apply(map_battery_code, axis=1)
+    df["generated"] = df.apply(map_battery_generation, axis=1)
+
+    return df
+
+
+def _remap_vectorised(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df["facility_code"], df["generated"] = BatteryUnitRemapper(BATTERY_UNIT_MAP).remap(df["facility_code"], df["generated"])
+
+    return df
+
+
+def test_remap_implementations_match() -> None:
+    sample = test_full_day_scada.head(5_000)
+
+    pd.testing.assert_frame_equal(_remap_row_apply(sample), _remap_vectorised(sample))
+
+
+@pytest.mark.benchmark(group="battery_remap", min_rounds=1)
+def test_benchmark_battery_remap_row_apply(benchmark) -> None:
+    benchmark(_remap_row_apply, test_full_day_scada)
+
+
+@pytest.mark.benchmark(group="battery_remap", min_rounds=5)
+def test_benchmark_battery_remap_vectorised(benchmark) -> None:
+    benchmark(_remap_vectorised, test_full_day_scada)
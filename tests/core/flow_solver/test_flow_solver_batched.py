@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from opennem.core.flow_solver import (
+    NEM_SOLVER_REGION_FLOWS,
+    FlowSolverException,
+    InterconnectorNetEmissionsEnergy,
+    NetworkInterconnectorEnergyEmissions,
+    NetworkRegionsDemandEmissions,
+    Region,
+    RegionDemandEmissions,
+    solve_flow_emissions_for_interval,
+    solve_flow_emissions_for_interval_range,
+)
+from opennem.schema.network import NetworkNEM
+
+TEST_INTERVAL_START = datetime.fromisoformat("2023-07-01T00:30:00+10:00")
+
+# region energy (MWh) and emissions (t) adapted from the flow solver spreadsheet
+TEST_REGIONS = {
+    "QLD1": (500, 325),
+    "NSW1": (600, 330),
+    "VIC1": (300, 180),
+    "SA1": (100, 15),
+    "TAS1": (80, 4),
+}
+
+
+def _build_test_data(num_intervals: int) -> tuple[NetworkRegionsDemandEmissions, NetworkInterconnectorEnergyEmissions]:
+    region_records = []
+    interconnector_records = []
+
+    for i in range(num_intervals):
+        interval = TEST_INTERVAL_START + timedelta(minutes=5 * i)
+
+        for region, (energy, emissions) in TEST_REGIONS.items():
+            region_records.append(
+                RegionDemandEmissions(
+                    interval=interval, region_code=Region(region), energy_mwh=energy + i, emissions_t=emissions + i / 2
+                )
+            )
+
+        for flow_number, region_flow in enumerate(NEM_SOLVER_REGION_FLOWS):
+            energy = 5.0 * (flow_number + 1) + i
+            interconnector_records.append(
+                InterconnectorNetEmissionsEnergy(
+                    interval=interval, region_flow=region_flow, generated_mw=energy * 12, energy_mwh=energy
+                )
+            )
+
+    return (
+        NetworkRegionsDemandEmissions(network=NetworkNEM, data=region_records),
+        NetworkInterconnectorEnergyEmissions(network=NetworkNEM, data=interconnector_records),
+    )
+
+
+def test_batched_flow_solver_matches_interval_solver() -> None:
+    region_data, interconnector_data = _build_test_data(num_intervals=12)
+
+    batched = solve_flow_emissions_for_interval_range(
+        network=NetworkNEM, interconnector_data=interconnector_data, region_data=region_data
+    )
+
+    per_interval = pd.concat(
+        [
+            solve_flow_emissions_for_interval(
+                network=NetworkNEM, interval=interval, interconnector_data=interconnector_data, region_data=region_data
+            ).to_dataframe()
+            for interval in sorted({i.interval for i in interconnector_data.data})
+        ],
+        ignore_index=True,
+    )
+
+    assert len(batched) == 12 * len(NEM_SOLVER_REGION_FLOWS)
+    pd.testing.assert_frame_equal(batched, per_interval, check_dtype=False)
+
+
+def test_batched_flow_solver_missing_region() -> None:
+    region_data, interconnector_data = _build_test_data(num_intervals=2)
+    region_data.data = [i for i in region_data.data if i.region_code != "SA1"]
+
+    with pytest.raises(FlowSolverException):
+        solve_flow_emissions_for_interval_range(
+            network=NetworkNEM, interconnector_data=interconnector_data, region_data=region_data
+        )
+
+
+def test_from_dataframe_matches_dataclass_containers() -> None:
+    region_data, interconnector_data = _build_test_data(num_intervals=6)
+
+    region_frame = region_data.to_frame().rename(
+        columns={"region_code": "network_region", "energy_mwh": "energy", "emissions_t": "emissions"}
+    )
+    interconnector_frame = interconnector_data.to_frame()
+    interconnector_frame[["interconnector_region_from", "interconnector_region_to"]] = interconnector_frame[
+        "region_flow"
+    ].str.split("->", expand=True)
+    interconnector_frame = interconnector_frame.drop(columns=["region_flow"])
+
+    region_data_frame = NetworkRegionsDemandEmissions.from_dataframe(NetworkNEM, region_frame)
+    interconnector_data_frame = NetworkInterconnectorEnergyEmissions.from_dataframe(NetworkNEM, interconnector_frame)
+
+    pd.testing.assert_frame_equal(
+        solve_flow_emissions_for_interval_range(
+            network=NetworkNEM, interconnector_data=interconnector_data_frame, region_data=region_data_frame
+        ),
+        solve_flow_emissions_for_interval_range(
+            network=NetworkNEM, interconnector_data=interconnector_data, region_data=region_data
+        ),
+    )
+
+    region = region_data_frame.get_region(TEST_INTERVAL_START, Region("NSW1"))
+    assert region.energy_mwh == 600
+    assert region.emissions_t == 330
+
+    interconnector = interconnector_data_frame.get_interconnector(TEST_INTERVAL_START, NEM_SOLVER_REGION_FLOWS[1])
+    assert interconnector.energy_mwh == 10.0
+
+
+def test_indexed_lookups_errors_and_defaults() -> None:
+    region_data, interconnector_data = _build_test_data(num_intervals=1)
+
+    with pytest.raises(FlowSolverException):
+        region_data.get_region(TEST_INTERVAL_START + timedelta(days=1), Region("NSW1"))
+
+    default = interconnector_data.get_interconnector(TEST_INTERVAL_START + timedelta(days=1), "NSW1->QLD1", default=1)
+    assert default.energy_mwh == 1
+
+    with pytest.raises(FlowSolverException):
+        interconnector_data.get_interconnector(TEST_INTERVAL_START + timedelta(days=1), "NSW1->QLD1")
+
+    interconnector_data.data = interconnector_data.data + interconnector_data.data[:1]
+    duplicate = interconnector_data.data[0]
+
+    with pytest.raises(FlowSolverException, match="multiple results"):
+        interconnector_data.get_interconnector(duplicate.interval, duplicate.region_flow)
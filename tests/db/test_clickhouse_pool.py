@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from opennem.db.clickhouse import ClickHousePool
+
+
+class _StubClient:
+    """Blocking stand in for clickhouse_driver.Client"""
+
+    def __init__(self) -> None:
+        self.disconnected = False
+        self.busy = False
+        self.threads: set[int] = set()
+
+    def execute(self, query: str, params: dict | None = None, columnar: bool = False, settings: dict | None = None):
+        self.threads.add(threading.get_ident())
+
+        if self.busy:
+            raise RuntimeError("Simultaneous queries on single connection")
+
+        if query == "fail":
+            raise RuntimeError("query failed")
+
+        self.busy = True
+
+        try:
+            time.sleep(0.1)
+        finally:
+            self.busy = False
+
+        return [(1, 2)] if columnar else [(1,), (2,)]
+
+    def disconnect(self) -> None:
+        self.disconnected = True
+
+
+@pytest.fixture
+def stub_pool(monkeypatch: pytest.MonkeyPatch) -> tuple[ClickHousePool, list[_StubClient]]:
+    clients: list[_StubClient] = []
+
+    def _create_client(self) -> _StubClient:
+        clients.append(_StubClient())
+        return clients[-1]
+
+    monkeypatch.setattr(ClickHousePool, "_create_client", _create_client)
+
+    return ClickHousePool(size=2, query_timeout=5), clients
+
+
+@pytest.mark.asyncio
+async def test_clickhouse_pool_runs_queries_concurrently(stub_pool) -> None:
+    pool, clients = stub_pool
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[pool.execute("select 1", columnar=True) for _ in range(4)])
+    elapsed = time.perf_counter() - start
+
+    assert results == [[(1, 2)]] * 4
+    # two clients at 0.1s per query, not four queries in series
+    assert elapsed < 0.35
+    assert len(clients) == 2
+    assert threading.get_ident() not in set.union(*[i.threads for i in clients])
+
+
+@pytest.mark.asyncio
+async def test_clickhouse_pool_disconnects_failed_client(stub_pool) -> None:
+    pool, clients = stub_pool
+
+    with pytest.raises(RuntimeError):
+        await pool.execute("fail")
+
+    assert clients[0].disconnected
+    assert await pool.execute("select 1") == [(1,), (2,)]
+
+
+@pytest.mark.asyncio
+async def test_clickhouse_pool_holds_client_of_cancelled_query(monkeypatch: pytest.MonkeyPatch) -> None:
+    clients: list[_StubClient] = []
+
+    def _create_client(self) -> _StubClient:
+        clients.append(_StubClient())
+        return clients[-1]
+
+    monkeypatch.setattr(ClickHousePool, "_create_client", _create_client)
+    pool = ClickHousePool(size=1, query_timeout=5)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(pool.execute("select 1"), timeout=0.02)
+
+    # the next query waits for the cancelled query to finish rather than sharing its client
+    assert await pool.execute("select 1") == [(1,), (2,)]
+    assert len(clients) == 1
+    assert not clients[0].disconnected
@@ -0,0 +1,67 @@
+"""
+Tests for chunked parquet archive writing in opennem.exporter.archive
+
+
+"""
+
+import io
+from datetime import datetime, timedelta
+
+import polars as pl
+import pytest
+
+from opennem.exporter.archive import ARCHIVE_MAX_CHUNK_DAYS, _get_chunk_days, _write_parquet_chunks
+
+
+def test_get_chunk_days() -> None:
+    assert _get_chunk_days(None, 1_000_000) == 1
+    assert _get_chunk_days(100_000, 1_000_000) == 10
+    assert _get_chunk_days(10_000_000, 1_000_000) == 1
+    assert _get_chunk_days(1, 1_000_000) == ARCHIVE_MAX_CHUNK_DAYS
+
+
+@pytest.mark.asyncio
+async def test_write_parquet_chunks_covers_range() -> None:
+    date_start = datetime(2024, 1, 1)
+    date_end = datetime(2024, 3, 1)
+    reads: list[tuple[datetime, datetime]] = []
+
+    def read_chunk(chunk_start: datetime, chunk_end: datetime) -> pl.DataFrame:
+        reads.append((chunk_start, chunk_end))
+        intervals = pl.datetime_range(chunk_start, chunk_end, interval="1h", closed="left", eager=True)
+        return pl.DataFrame({"interval": intervals, "value": [float(i) for i in range(len(intervals))]})
+
+    output = io.BytesIO()
+    one_day = pl.DataFrame({"interval": [date_start] * 24, "value": [0.0] * 24}).estimated_size()
+
+    total_rows, total_bytes = await _write_parquet_chunks(output, read_chunk, date_start, date_end, memory_budget=one_day * 7)
+
+    # the first day is read to measure row widths then chunks are sized to the budget
+    assert reads[0] == (date_start, date_start + timedelta(days=1))
+    assert reads[1] == (date_start + timedelta(days=1), date_start + timedelta(days=8))
+    assert all(reads[i][1] == reads[i + 1][0] for i in range(len(reads) - 1))
+    assert reads[-1][1] == date_end
+
+    output.seek(0)
+    df = pl.read_parquet(output)
+
+    assert total_rows == df.height == 60 * 24
+    assert total_bytes == len(output.getvalue())
+    assert df["interval"].min() == date_start
+
+
+@pytest.mark.asyncio
+async def test_write_parquet_chunks_skips_empty_chunks() -> None:
+    def read_chunk(chunk_start: datetime, chunk_end: datetime) -> pl.DataFrame:
+        if chunk_start.day % 2:
+            return pl.DataFrame({"interval": [], "value": []}, schema={"interval": pl.Datetime, "value": pl.Float64})
+
+        return pl.DataFrame({"interval": [chunk_start], "value": [1.0]})
+
+    output = io.BytesIO()
+    total_rows, _ = await _write_parquet_chunks(output, read_chunk, datetime(2024, 1, 1), datetime(2024, 1, 5), memory_budget=1)
+
+    output.seek(0)
+
+    assert total_rows == 2
+    assert pl.read_parquet(output).height == 2
@@ -0,0 +1,87 @@
+"""
+Tests for merging trailing windows into published all-history exports in opennem.api.export.incremental
+
+
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from datedelta import datedelta
+
+from opennem.api.export.incremental import ExportMergeException, merge_dataset_histories, merge_history
+from opennem.api.stats.schema import OpennemDataHistory, load_opennem_dataset_from_file
+from tests.conftest import PATH_TESTS_FIXTURES
+
+DAILY_START = datetime.fromisoformat("2024-01-01T00:00:00+10:00")
+
+
+def _daily_history(start: datetime, data: list) -> OpennemDataHistory:
+    return OpennemDataHistory(start=start, last=start + timedelta(days=len(data) - 1), interval="1d", data=data)
+
+
+def test_merge_history_daily_splices_window() -> None:
+    existing = _daily_history(DAILY_START, [1, 2, 3, 4, 5])
+    update = _daily_history(DAILY_START + timedelta(days=3), [40, 50, 60])
+
+    merged = merge_history(existing, update)
+
+    assert merged.start == DAILY_START
+    assert merged.last == DAILY_START + timedelta(days=5)
+    assert merged.data == [1, 2, 3, 40, 50, 60]
+
+
+def test_merge_history_update_covers_existing() -> None:
+    existing = _daily_history(DAILY_START, [1, 2])
+    update = _daily_history(DAILY_START - timedelta(days=1), [0, 10, 20])
+
+    assert merge_history(existing, update) == update
+
+
+def test_merge_history_gap_raises() -> None:
+    existing = _daily_history(DAILY_START, [1, 2])
+
+    with pytest.raises(ExportMergeException):
+        merge_history(existing, _daily_history(DAILY_START + timedelta(days=5), [1]))
+
+
+def test_merge_history_off_grid_raises() -> None:
+    existing = _daily_history(DAILY_START, [1, 2, 3])
+
+    with pytest.raises(ExportMergeException):
+        merge_history(existing, _daily_history(DAILY_START + timedelta(days=1, hours=1), [1]))
+
+
+def test_merge_dataset_histories_monthly_matches_full_build() -> None:
+    published = load_opennem_dataset_from_file(PATH_TESTS_FIXTURES / "nem_nsw1_all.json")
+    series = published.get_id("au.nem.nsw1.demand.energy")
+    assert series
+
+    # recompute the last two months with revised values, leaving one series out of the update
+    window_start = series.history.last - datedelta(months=1)
+    update = published.model_copy(deep=True)
+
+    for update_series in update.data:
+        history = update_series.history
+        offset = (window_start.year - history.start.year) * 12 + window_start.month - history.start.month
+        update_series.history = OpennemDataHistory(
+            start=window_start, last=history.last, interval=history.interval, data=[i or 0 for i in history.data[offset:]]
+        )
+
+    update.data = update.data[1:]
+
+    merged = merge_dataset_histories(published, update)
+
+    assert merged.ids == published.ids
+
+    merged_series = merged.get_id("au.nem.nsw1.demand.energy")
+    assert merged_series and merged_series.history == series.history
+
+    for published_series in published.data[1:]:
+        merged_series = merged.get_id(published_series.id)  # type: ignore
+
+        assert merged_series
+        assert merged_series.history.start == published_series.history.start
+        assert merged_series.history.last == published_series.history.last
+        assert merged_series.history.data[:-2] == published_series.history.data[:-2]
+        assert merged_series.history.data[-2:] == [i or 0 for i in published_series.history.data[-2:]]
@@ -0,0 +1,81 @@
+"""
+Tests for bounded concurrent export scheduling in opennem.api.export.scheduler
+
+
+"""
+
+import asyncio
+
+import pytest
+
+from opennem.api.export import scheduler as export_scheduler
+from opennem.api.export.scheduler import ExportScheduler
+from opennem.api.stats.schema import OpennemDataSet
+
+
+@pytest.mark.asyncio
+async def test_scheduler_bounds_concurrency() -> None:
+    running = 0
+    max_running = 0
+
+    async def work(value: int) -> int:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return value
+
+    async with ExportScheduler("test", semaphore=asyncio.Semaphore(2)) as scheduler:
+        tasks = [scheduler.submit(f"stat-{i}", work(i)) for i in range(6)]
+
+    assert max_running == 2
+    assert [task.result() for task in tasks] == list(range(6))
+    assert set(scheduler.timings) == {f"stat-{i}" for i in range(6)}
+    assert all(i.query_seconds > 0 for i in scheduler.timings.values())
+
+
+@pytest.mark.asyncio
+async def test_scheduler_raises_after_remaining_work() -> None:
+    completed: list[str] = []
+
+    async def fail() -> None:
+        raise ValueError("export failed")
+
+    async def work() -> None:
+        await asyncio.sleep(0.01)
+        completed.append("work")
+
+    with pytest.raises(ValueError):
+        async with ExportScheduler("test", semaphore=asyncio.Semaphore(2)) as scheduler:
+            scheduler.submit("fail", fail())
+            scheduler.submit("work", work())
+
+    assert completed == ["work"]
+    assert scheduler.timings["fail"].failed
+
+
+@pytest.mark.asyncio
+async def test_scheduler_uploads_overlap_with_work(monkeypatch: pytest.MonkeyPatch) -> None:
+    events: list[str] = []
+
+    async def write_output(path: str, stat_set: OpennemDataSet) -> int:
+        events.append(f"upload-start {path}")
+        await asyncio.sleep(0.02)
+        events.append(f"upload-end {path}")
+        return 10
+
+    monkeypatch.setattr(export_scheduler, "write_output", write_output)
+
+    async def work(name: str, scheduler: ExportScheduler) -> None:
+        events.append(f"work {name}")
+        scheduler.upload(name, OpennemDataSet(type="energy", data=[]))
+        await asyncio.sleep(0.01)
+
+    async with ExportScheduler("test", semaphore=asyncio.Semaphore(1)) as scheduler:
+        scheduler.submit("a", work("a", scheduler))
+        scheduler.submit("b", work("b", scheduler))
+
+    # the second unit of work starts before the first upload has finished
+    assert events.index("work b") < events.index("upload-end a")
+    assert scheduler.timings["a"].upload_bytes == 10
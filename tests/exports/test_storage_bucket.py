@@ -0,0 +1,110 @@
+"""
+Tests for content hash skipping and compression in opennem.exporter.storage_bucket
+
+
+"""
+
+import asyncio
+import gzip
+
+import pytest
+from botocore.exceptions import ClientError
+
+from opennem.exporter.storage_bucket import CONTENT_HASH_METADATA_KEY, CloudflareR2Uploader, compress_content
+
+
+class _FakeS3Client:
+    def __init__(self) -> None:
+        self.objects: dict[str, dict] = {}
+        self.puts: list[str] = []
+        self.heads: list[str] = []
+
+    async def put_object(self, Bucket: str, Key: str, Body: bytes, **kwargs) -> None:
+        self.puts.append(Key)
+        self.objects[Key] = {"Body": Body, **kwargs}
+
+    async def head_object(self, Bucket: str, Key: str) -> dict:
+        self.heads.append(Key)
+
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+
+        return {"Metadata": self.objects[Key].get("Metadata", {})}
+
+
+def _uploader(client: _FakeS3Client) -> CloudflareR2Uploader:
+    uploader = CloudflareR2Uploader(bucket_name="test", bucket_url="https://data.example.org/")
+    uploader._client = client
+    uploader._client_loop = asyncio.get_running_loop()
+    uploader._client_lock = asyncio.Lock()
+    return uploader
+
+
+@pytest.mark.asyncio
+async def test_upload_skips_unchanged_content() -> None:
+    client = _FakeS3Client()
+    uploader = _uploader(client)
+
+    assert await uploader.upload_content('{"a": 1}', "/v4/test.json", "application/json") == 8
+
+    result = await uploader.put_content(b'{"a": 1}', "v4/test.json", "application/json")
+
+    assert result.skipped
+    assert result.bytes_saved == 8
+    assert client.puts == ["v4/test.json"]
+
+    assert await uploader.upload_content('{"a": 2}', "v4/test.json", "application/json") == 8
+    assert client.puts == ["v4/test.json", "v4/test.json"]
+
+
+@pytest.mark.asyncio
+async def test_upload_checks_stored_object_before_skipping() -> None:
+    client = _FakeS3Client()
+    uploader = _uploader(client)
+
+    await uploader.upload_content('{"a": 1}', "v4/test.json")
+
+    # another process overwrites the object after this uploader last wrote it
+    await _uploader(client).upload_content('{"a": 2}', "v4/test.json")
+
+    result = await uploader.put_content(b'{"a": 1}', "v4/test.json")
+
+    assert not result.skipped
+    assert client.puts == ["v4/test.json"] * 3
+
+
+@pytest.mark.asyncio
+async def test_upload_skips_unchanged_content_from_object_metadata() -> None:
+    client = _FakeS3Client()
+    await _uploader(client).upload_content('{"a": 1}', "v4/test.json")
+
+    # a new uploader has no local hashes so checks the stored object
+    result = await _uploader(client).put_content(b'{"a": 1}', "v4/test.json")
+
+    assert result.skipped
+    assert client.heads == ["v4/test.json", "v4/test.json"]
+    assert CONTENT_HASH_METADATA_KEY in client.objects["v4/test.json"]["Metadata"]
+
+
+@pytest.mark.asyncio
+async def test_upload_compressed_content() -> None:
+    client = _FakeS3Client()
+    uploader = _uploader(client)
+    content = b'{"data": [' + b"1.0, " * 1000 + b"1.0]}"
+
+    result = await uploader.put_content(content, "v4/test.json", "application/json", content_encoding="gzip")
+
+    assert result.content_encoding == "gzip"
+    assert result.uploaded_bytes < result.content_bytes
+    assert client.objects["v4/test.json"]["ContentEncoding"] == "gzip"
+    assert gzip.decompress(client.objects["v4/test.json"]["Body"]) == content
+
+    # same content uncompressed is a different object body
+    assert not (await uploader.put_content(content, "v4/test.json", "application/json")).skipped
+
+
+def test_compress_content_is_deterministic() -> None:
+    assert compress_content(b"opennem" * 100, "gzip") == compress_content(b"opennem" * 100, "gzip")
+
+    with pytest.raises(ValueError):
+        compress_content(b"opennem", "zstd")
@@ -1,4 +1,9 @@
-from opennem.core.parsers.aemo.mms import parse_aemo_mms_csv
+import zipfile
+from io import BytesIO
+from pathlib import Path
+
+from opennem.core.parsers.aemo.mms import iter_aemo_mms_csv_batches, parse_aemo_mms_csv
+from opennem.utils.archive import iter_zip_members
 
 
 def test_parse_aemo_mms_dispatch_scada(aemo_nemweb_dispatch_scada: str) -> None:
@@ -24,3 +29,60 @@ def test_parse_aemo_mms_dispatch_scada(aemo_nemweb_dispatch_scada: str) -> None:
         raise Exception("Invalid record")
 
     # assert record.settlementdate, "Record has settlement date"  # type: ignore
+
+
+_MMS_STREAM_CSV = """C,NEMP.WORLD,DISPATCHSCADA,AEMO,PUBLIC,2021/09/02,12:50:12,0000000348376188,DISPATCHSCADA,0000000348376182
+I,DISPATCH,UNIT_SCADA,1,SETTLEMENTDATE,DUID,SCADAVALUE
+D,DISPATCH,UNIT_SCADA,1,"2021/09/02 12:55:00",BARCSF1,22.1
+D,DISPATCH,UNIT_SCADA,1,"2021/09/02 12:55:00",BBTHREE1,0
+D,DISPATCH,UNIT_SCADA,1,"2021/09/02 12:55:00",BBTHREE2,0
+I,DISPATCH,PRICE,1,SETTLEMENTDATE,REGIONID,RRP
+D,DISPATCH,PRICE,1,"2021/09/02 12:55:00",NSW1,45.2
+D,DISPATCH,PRICE,1,"2021/09/02 12:55:00",bad
+C,"END OF REPORT",8
+"""
+
+
+def test_iter_aemo_mms_csv_batches_chunks_tables() -> None:
+    batches = list(iter_aemo_mms_csv_batches(_MMS_STREAM_CSV.splitlines(), chunk_size=2))
+
+    assert [(b.full_name, len(b)) for b in batches] == [
+        ("dispatch_unit_scada", 2),
+        ("dispatch_unit_scada", 1),
+        ("dispatch_price", 1),
+    ]
+
+    assert batches[0].fieldnames == ["settlementdate", "duid", "scadavalue"]
+    assert batches[0].columns["duid"] == ["BARCSF1", "BBTHREE1"]
+    assert batches[1].to_polars()["scadavalue"].to_list() == ["0"]
+
+
+def test_iter_aemo_mms_csv_batches_matches_parser() -> None:
+    table_set = parse_aemo_mms_csv(_MMS_STREAM_CSV)
+    batches = iter_aemo_mms_csv_batches(_MMS_STREAM_CSV.splitlines(), namespace_filter=["dispatch"])
+
+    for batch in batches:
+        table = table_set.get_table(batch.full_name)
+
+        assert table, f"Parser has table {batch.full_name}"
+        assert batch.to_table_schema().records == table.records
+
+
+def test_iter_zip_members_repairs_central_directory(tmp_path: Path) -> None:
+    nested = BytesIO()
+
+    with zipfile.ZipFile(nested, "w") as zf:
+        zf.writestr("PUBLIC_DISPATCHSCADA_202109021255.CSV", _MMS_STREAM_CSV)
+
+    archive = BytesIO()
+
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("PUBLIC_DISPATCHSCADA_202109021255.zip", nested.getvalue())
+
+    # trailing garbage past the end of central directory record breaks ZipFile
+    archive_path = tmp_path / "PUBLIC_DISPATCHSCADA_20210902.zip"
+    archive_path.write_bytes(archive.getvalue() + b"\x00" * 70_000)
+
+    members = [(name, fh.read().decode()) for name, fh in iter_zip_members(archive_path, suffix=".csv")]
+
+    assert members == [("PUBLIC_DISPATCHSCADA_202109021255.CSV", _MMS_STREAM_CSV)]
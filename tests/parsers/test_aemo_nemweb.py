@@ -0,0 +1,73 @@
+import io
+import multiprocessing
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from opennem.core.parsers.aemo.mms import iter_aemo_mms_csv_batches
+from opennem.core.parsers.aemo.nemweb import _get_archive_members, _iter_spooled_batches, _parse_archive_member
+from opennem.utils.archive import iter_zip_members
+
+_URL = "https://nemweb.com.au/Reports/ARCHIVE/DispatchIS_Reports/PUBLIC_DISPATCHIS_20210902.zip"
+
+_DISPATCH_CSV = """C,NEMP.WORLD,DISPATCHIS,AEMO,PUBLIC,2021/09/02,12:50:12,0000000348376188,DISPATCHIS,0000000348376182
+I,DISPATCH,UNIT_SCADA,1,SETTLEMENTDATE,DUID,SCADAVALUE
+D,DISPATCH,UNIT_SCADA,1,"2021/09/02 12:55:00",BARCSF1,22.1
+D,DISPATCH,UNIT_SCADA,1,"2021/09/02 12:55:00",BBTHREE1,0
+D,DISPATCH,UNIT_SCADA,1,"2021/09/02 12:55:00",BBTHREE2,0
+I,DISPATCH,PRICE,1,SETTLEMENTDATE,REGIONID,RRP
+D,DISPATCH,PRICE,1,"2021/09/02 12:55:00",NSW1,45.2
+D,DISPATCH,PRICE,1,"2021/09/02 12:55:00",QLD1,51.9
+D,DISPATCH,PRICE,1,"2021/09/02 12:55:00",VIC1,38.0
+C,"END OF REPORT",10
+"""
+
+
+def _build_archive(archive_path: Path) -> None:
+    """Archive with a plain CSV member and a nested zip member like the NEMWeb archives"""
+    nested = io.BytesIO()
+
+    with zipfile.ZipFile(nested, "w") as zf:
+        zf.writestr("PUBLIC_DISPATCHIS_202109021300.CSV", _DISPATCH_CSV.replace("12:55:00", "13:00:00"))
+
+    with zipfile.ZipFile(archive_path, "w") as zf:
+        zf.writestr("PUBLIC_DISPATCHIS_202109021255.CSV", _DISPATCH_CSV)
+        zf.writestr("PUBLIC_DISPATCHIS_202109021300.zip", nested.getvalue())
+
+
+def _serial_batches(archive_path: Path, chunk_size: int) -> list[tuple[str, dict]]:
+    batches = []
+
+    for _, member_stream in iter_zip_members(archive_path, suffix=".csv"):
+        with io.TextIOWrapper(member_stream, encoding="utf-8", newline="") as member_text:
+            batches += [(b.full_name, b.columns) for b in iter_aemo_mms_csv_batches(member_text, chunk_size=chunk_size, url=_URL)]
+
+    return batches
+
+
+def test_parse_archive_member_workers_match_serial(tmp_path: Path) -> None:
+    archive_path = tmp_path / "PUBLIC_DISPATCHIS_20210902.zip"
+    _build_archive(archive_path)
+
+    members = _get_archive_members(archive_path)
+    spool_paths = [tmp_path / f"member_{num}.batches" for num in range(len(members))]
+
+    assert len(members) == 2
+
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as executor:
+        batch_counts = list(
+            executor.map(
+                _parse_archive_member,
+                [str(archive_path)] * len(members),
+                members,
+                [_URL] * len(members),
+                [2] * len(members),
+                [str(p) for p in spool_paths],
+            )
+        )
+
+    worker_batches = [(b.full_name, b.columns) for p in spool_paths for b in _iter_spooled_batches(p)]
+
+    assert batch_counts == [4, 4]
+    assert worker_batches == _serial_batches(archive_path, chunk_size=2)
+    assert not any(p.exists() for p in spool_paths), "Spools are removed once read"
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from opennem.recordreactor.backlog import (
+    GroupingConfig,
+    _analyze_milestone_records,
+    _analyzed_record_to_milestone_schema,
+)
+from opennem.recordreactor.schema import MilestoneAggregate, MilestoneFueltechGrouping, MilestonePeriod, MilestoneType
+from opennem.schema.network import NetworkNEM
+
+TEST_INTERVAL = datetime.fromisoformat("2024-01-01T10:00:00")
+
+FUELTECH_GROUPING = GroupingConfig(name="fueltech", group_by_fields=["fueltech_group_id"])
+
+
+class _ColumnarPool:
+    """Returns a fixed columnar result and keeps the queries it was asked to run"""
+
+    def __init__(self, columns: list[tuple]):
+        self.columns = columns
+        self.queries: list[str] = []
+
+    async def execute(self, query: str, params: dict | None = None, columnar: bool = False, timeout: int | None = None):
+        assert columnar
+        self.queries.append(query)
+        return self.columns
+
+
+def _interval(minutes: int) -> datetime:
+    return TEST_INTERVAL + timedelta(minutes=minutes)
+
+
+async def _analyze(columns: list[tuple]):
+    pool = _ColumnarPool(columns)
+
+    records = await _analyze_milestone_records(
+        pool=pool,  # type: ignore
+        network=NetworkNEM,
+        period=MilestonePeriod.interval,
+        milestone_type=MilestoneType.power,
+        grouping=FUELTECH_GROUPING,
+    )
+
+    return pool, records
+
+
+@pytest.mark.asyncio
+async def test_analyze_milestone_records_splits_highs_and_lows() -> None:
+    columns = [
+        (_interval(0), _interval(5), _interval(10)),
+        ("wind", "wind", "wind"),
+        (200.0, 300.0, 150.0),
+        (1, 1, 1),
+        (True, True, False),
+        (True, False, True),
+        (0.0, 50.0, 0.0),
+        (0.0, 0.0, -25.0),
+    ]
+
+    pool, records = await _analyze(columns)
+
+    # a single window pass returns the record breaking buckets only
+    assert "OVER previous_buckets" in pool.queries[0]
+    assert "generateUUIDv7" not in pool.queries[0]
+
+    assert records["interval"].to_list() == [_interval(0), _interval(0), _interval(5), _interval(10)]
+    assert records["record_type"].to_list() == ["high", "low", "high", "low"]
+    assert records["pct_change"].to_list() == [0.0, 0.0, 50.0, -25.0]
+
+    milestones = _analyzed_record_to_milestone_schema(
+        records, NetworkNEM, MilestonePeriod.interval, MilestoneType.power, FUELTECH_GROUPING
+    )
+
+    highs = [i for i in milestones if i.aggregate == MilestoneAggregate.high]
+    lows = [i for i in milestones if i.aggregate == MilestoneAggregate.low]
+
+    assert all(i.fueltech == MilestoneFueltechGrouping.wind for i in milestones)
+    assert len(highs) == len(lows) == 2
+    assert highs[1].pct_change == 50.0
+
+
+@pytest.mark.asyncio
+async def test_analyze_milestone_records_empty() -> None:
+    _, records = await _analyze([])
+
+    assert records.is_empty()
+    assert (
+        _analyzed_record_to_milestone_schema(
+            records, NetworkNEM, MilestonePeriod.interval, MilestoneType.power, FUELTECH_GROUPING
+        )
+        == []
+    )
+
+
+@pytest.mark.asyncio
+async def test_analyzed_records_skip_early_wind() -> None:
+    early = datetime.fromisoformat("2008-01-01T00:00:00")
+    columns = [
+        (early, TEST_INTERVAL),
+        ("wind", "wind"),
+        (200.0, 300.0),
+        (1, 1),
+        (True, True),
+        (False, False),
+        (0.0, 50.0),
+        (0.0, 0.0),
+    ]
+
+    _, records = await _analyze(columns)
+    milestones = _analyzed_record_to_milestone_schema(
+        records, NetworkNEM, MilestonePeriod.interval, MilestoneType.power, FUELTECH_GROUPING
+    )
+
+    assert [i.interval for i in milestones] == [TEST_INTERVAL]
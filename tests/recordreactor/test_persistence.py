@@ -0,0 +1,107 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from opennem.recordreactor.persistence import _map_milestone_records, _update_milestone_state
+from opennem.recordreactor.schema import (
+    MilestoneAggregate,
+    MilestoneFueltechGrouping,
+    MilestonePeriod,
+    MilestoneRecordOutputSchema,
+    MilestoneRecordSchema,
+    MilestoneType,
+)
+from opennem.recordreactor.significance import calculate_milestone_significance
+from opennem.recordreactor.unit import get_milestone_unit
+from opennem.recordreactor.utils import get_record_description
+from opennem.schema.network import NetworkNEM
+
+TEST_INTERVAL = datetime.fromisoformat("2024-01-01T10:00:00")
+
+
+def _milestone(minutes: int, value: float | None, period: MilestonePeriod = MilestonePeriod.interval) -> MilestoneRecordSchema:
+    return MilestoneRecordSchema(
+        interval=TEST_INTERVAL + timedelta(minutes=minutes),
+        aggregate=MilestoneAggregate.high,
+        metric=MilestoneType.power,
+        period=period,
+        network=NetworkNEM,
+        unit=get_milestone_unit(MilestoneType.power),
+        network_region="NSW1",
+        fueltech=MilestoneFueltechGrouping.wind,
+        value=value,
+        instance_id=uuid.uuid4(),
+    )
+
+
+def test_map_milestone_records() -> None:
+    milestones = [_milestone(0, 100.0), _milestone(5, 110.0), _milestone(10, None)]
+
+    records = _map_milestone_records(milestones, {})
+
+    assert [i["value"] for i in records] == [100.0, 110.0]
+    assert records[0]["record_id"] == "au.nem.nsw1.wind.power.interval.high"
+    assert records[0]["significance"] == calculate_milestone_significance(milestones[0])
+    assert records[1]["description"] == get_record_description(milestones[1])
+
+
+def _state(record_id: str, value: float) -> dict[str, MilestoneRecordOutputSchema]:
+    return {
+        record_id: MilestoneRecordOutputSchema(
+            record_id=record_id,
+            interval=TEST_INTERVAL,
+            instance_id=uuid.uuid4(),
+            aggregate="high",
+            metric="power",
+            period="interval",
+            significance=1,
+            value=value,
+            value_unit="MW",
+            network_id="NEM",
+        )
+    }
+
+
+def test_map_milestone_records_against_state() -> None:
+    milestones = [_milestone(0, 100.0), _milestone(5, 100.2), _milestone(10, 120.0)]
+    milestone_state = _state(milestones[0].record_id, 100.0)
+
+    records = _map_milestone_records(milestones, milestone_state)
+
+    # the first is at the state interval and the second doesn't beat the state once rounded
+    assert [i["value"] for i in records] == [120.0]
+
+
+def test_map_milestone_records_chains_kept_records() -> None:
+    milestones = [_milestone(5, 100.2), _milestone(10, 120.0), _milestone(15, 130.0)]
+    milestone_state = _state(milestones[0].record_id, 100.0)
+    stored_instance_id = milestone_state[milestones[0].record_id].instance_id
+
+    records = _map_milestone_records(milestones, milestone_state)
+
+    # the first kept record chains to the stored record rather than the filtered one before it
+    assert [i["previous_instance_id"] for i in records] == [stored_instance_id, milestones[1].instance_id]
+
+    # once persisted the next batch chains to the last stored record
+    _update_milestone_state(milestone_state, records)
+
+    assert _map_milestone_records([_milestone(20, 140.0)], milestone_state)[0]["previous_instance_id"] == (
+        milestones[2].instance_id
+    )
+
+
+def test_map_milestone_records_duplicate_key() -> None:
+    with pytest.raises(ValueError):
+        _map_milestone_records([_milestone(0, 100.0), _milestone(0, 110.0)], {})
+
+
+def test_map_milestone_records_season_descriptions() -> None:
+    summer = _milestone(0, 100.0, period=MilestonePeriod.season)
+    autumn = _milestone(60 * 24 * 90, 110.0, period=MilestonePeriod.season)
+
+    records = _map_milestone_records([summer, autumn], {})
+
+    assert records[0]["description"] == get_record_description(summer)
+    assert records[1]["description"] == get_record_description(autumn)
+    assert records[0]["description"] != records[1]["description"]
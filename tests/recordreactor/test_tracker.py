@@ -0,0 +1,134 @@
+import uuid
+from datetime import datetime, timedelta
+
+import polars as pl
+
+from opennem.recordreactor.schema import MilestoneAggregate, MilestonePeriod, MilestoneType
+from opennem.recordreactor.tracker import (
+    _SERIES_SCHEMA,
+    MilestoneRecordState,
+    MilestoneTracker,
+    _energy_emissions_series,
+    _power_series,
+    get_completed_period_range,
+)
+from opennem.schema.network import NetworkNEM
+
+TEST_INTERVAL = datetime.fromisoformat("2024-01-01T10:00:00")
+
+
+def _power(values: list[float | None], network_region: str | None = None) -> pl.DataFrame:
+    return pl.DataFrame(
+        [
+            (TEST_INTERVAL + timedelta(minutes=5 * i), "power", "interval", network_region, "coal", value)
+            for i, value in enumerate(values)
+        ],
+        schema=_SERIES_SCHEMA,
+        orient="row",
+    )
+
+
+def test_find_records_without_state() -> None:
+    tracker = MilestoneTracker()
+
+    records = tracker.find_records(_power([100.0, 90.0, 120.0, 0.0, None, 80.0]), NetworkNEM)
+
+    highs = [i.value for i in records if i.aggregate == MilestoneAggregate.high]
+    lows = [i.value for i in records if i.aggregate == MilestoneAggregate.low]
+
+    assert highs == [100.0, 120.0]
+    assert lows == [100.0, 90.0, 80.0]
+    assert records[0].record_id == "au.nem.coal.power.interval.high"
+
+    # each record is chained to the one it beat
+    high_records = [i for i in records if i.aggregate == MilestoneAggregate.high]
+    assert high_records[1].previous_instance_id == high_records[0].instance_id
+
+    # the state only moves once the records are advanced past
+    assert not tracker.state
+    assert len(tracker.find_records(_power([100.0, 90.0, 120.0, 0.0, None, 80.0]), NetworkNEM)) == len(records)
+
+    tracker.advance(records)
+
+    assert tracker.state["au.nem.coal.power.interval.high"].value == 120.0
+    assert tracker.state["au.nem.coal.power.interval.high"].instance_id == high_records[1].instance_id
+
+
+def test_find_records_against_state() -> None:
+    instance_id = uuid.uuid4()
+    tracker = MilestoneTracker(
+        {
+            "au.nem.coal.power.interval.high": MilestoneRecordState(value=110.2, interval=TEST_INTERVAL, instance_id=instance_id),
+        }
+    )
+
+    records = tracker.find_records(_power([120.0, 110.4, 115.0, 125.0]), NetworkNEM)
+    highs = [i for i in records if i.aggregate == MilestoneAggregate.high]
+
+    # the value at the state interval is skipped and values are compared rounded
+    assert [i.value for i in highs] == [115.0, 125.0]
+    assert highs[0].previous_instance_id == instance_id
+
+    # a second pass over the same values finds nothing new once the records are tracked
+    tracker.advance(records)
+
+    assert not tracker.find_records(_power([120.0, 110.4, 115.0, 125.0]), NetworkNEM)
+
+
+def test_power_series_groupings() -> None:
+    frame = pl.DataFrame(
+        {
+            "interval": [TEST_INTERVAL] * 3,
+            "network_region": ["NSW1", "NSW1", "QLD1"],
+            "fueltech_group_id": ["coal", "wind", "coal"],
+            "renewable": [False, True, False],
+            "generated": [100.0, 50.0, 200.0],
+        }
+    )
+
+    series = _power_series(frame)
+    values = {(i["network_region"], i["fueltech"]): i["value"] for i in series.iter_rows(named=True)}
+
+    assert values[(None, None)] == 350.0
+    assert values[("NSW1", None)] == 150.0
+    assert values[(None, "coal")] == 300.0
+    assert values[("NSW1", "wind")] == 50.0
+    assert values[(None, "fossils")] == 300.0
+    assert values[("NSW1", "renewables")] == 50.0
+
+
+def test_get_completed_period_range() -> None:
+    start = datetime.fromisoformat("2024-07-01T00:00:00")
+
+    assert get_completed_period_range(MilestonePeriod.day, start, start) == (start - timedelta(days=1), start)
+    assert get_completed_period_range(MilestonePeriod.financial_year, start, start + timedelta(hours=1)) == (
+        datetime.fromisoformat("2023-07-01T00:00:00"),
+        start,
+    )
+    assert get_completed_period_range(MilestonePeriod.month, start + timedelta(minutes=5), start + timedelta(days=1)) is None
+
+
+def test_energy_emissions_series_rolls_up_periods() -> None:
+    days = [datetime(2023, 12, 1) + timedelta(days=i) for i in range(62)]
+    daily = pl.DataFrame(
+        {
+            "interval": days,
+            "network_region": ["NSW1"] * len(days),
+            "fueltech_group_id": ["coal"] * len(days),
+            "energy": [10.0] * len(days),
+            "emissions": [9.0] * len(days),
+        }
+    )
+
+    # only periods that close on the first of january are included
+    boundary = datetime(2024, 1, 1)
+    periods = [MilestonePeriod.day, MilestonePeriod.month, MilestonePeriod.quarter, MilestonePeriod.year]
+    series = _energy_emissions_series(daily, periods, boundary, boundary + timedelta(minutes=5), group_by_region=False)
+
+    energy = {i["period"]: (i["interval"], i["value"]) for i in series.iter_rows(named=True) if i["metric"] == "energy"}
+
+    assert energy[MilestonePeriod.day.value] == (datetime(2023, 12, 31), 10.0)
+    assert energy[MilestonePeriod.month.value] == (datetime(2023, 12, 1), 310.0)
+    assert energy[MilestonePeriod.quarter.value] == (datetime(2023, 10, 1), 310.0)
+    assert energy[MilestonePeriod.year.value] == (datetime(2023, 1, 1), 310.0)
+    assert {i["metric"] for i in series.iter_rows(named=True)} == {MilestoneType.energy.value, MilestoneType.emissions.value}
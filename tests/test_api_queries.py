@@ -0,0 +1,212 @@
+from datetime import date, datetime
+
+import pytest
+
+from opennem import settings
+from opennem.api import queries
+from opennem.api.data.schema import DataMetric
+from opennem.api.market.schema import MarketMetric
+from opennem.api.queries import QUERY_CONFIGS, QueryType, get_timeseries_query
+from opennem.core.grouping import PrimaryGrouping, SecondaryGrouping
+from opennem.core.time_interval import Interval
+from opennem.db import clickhouse_views
+from opennem.db.clickhouse_views import (
+    MARKET_SUMMARY_MONTHLY_ROLLUP,
+    UNIT_INTERVALS_DAILY_VIEW,
+    backfill_materialized_views,
+    rebuild_rollup_months,
+)
+from opennem.schema.network import NetworkNEM
+
+
+@pytest.fixture(autouse=True)
+def rollup_routing(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "clickhouse_rollup_routing", True)
+    monkeypatch.setattr(queries, "get_rollups_closed_until", lambda: date(2025, 6, 1))
+
+
+def _sources(query_type: QueryType, interval: Interval, columns: set[str], date_start: date, date_end: date) -> list:
+    return [
+        (s.table, s.date_start, s.date_end)
+        for s in QUERY_CONFIGS[query_type]._get_sources(interval, columns, date_start, date_end)
+    ]
+
+
+def test_sub_daily_intervals_read_base_table() -> None:
+    assert _sources(QueryType.DATA, Interval.HOUR, {"network_id"}, date(2024, 1, 1), date(2024, 1, 2)) == [
+        ("unit_intervals", date(2024, 1, 1), date(2024, 1, 2))
+    ]
+
+
+def test_daily_interval_reads_coarsest_daily_rollup() -> None:
+    assert _sources(QueryType.DATA, Interval.DAY, {"network_id", "fueltech_id"}, date(2024, 1, 1), date(2024, 2, 1)) == [
+        ("fueltech_intervals_daily_mv", date(2024, 1, 1), date(2024, 2, 1))
+    ]
+
+    # unit level columns are only kept in the unit rollups
+    assert _sources(
+        QueryType.FACILITY, Interval.DAY, {"network_id", "facility_code", "unit_code"}, date(2024, 1, 1), date(2024, 2, 1)
+    ) == [("unit_intervals_daily_mv", date(2024, 1, 1), date(2024, 2, 1))]
+
+
+def test_monthly_interval_reads_whole_months_from_monthly_rollup() -> None:
+    assert _sources(QueryType.DATA, Interval.YEAR, {"network_id", "renewable"}, date(2000, 1, 15), date(2025, 3, 10)) == [
+        ("unit_intervals_daily_mv", date(2000, 1, 15), date(2000, 2, 1)),
+        ("unit_intervals_monthly", date(2000, 2, 1), date(2025, 3, 1)),
+        ("unit_intervals_daily_mv", date(2025, 3, 1), date(2025, 3, 10)),
+    ]
+
+    assert _sources(QueryType.MARKET, Interval.MONTH, {"network_id"}, date(2020, 1, 1), date(2025, 1, 1)) == [
+        ("market_summary_monthly", date(2020, 1, 1), date(2025, 1, 1))
+    ]
+
+
+def test_monthly_rollups_only_read_closed_months() -> None:
+    assert _sources(QueryType.DATA, Interval.YEAR, {"network_id"}, date(2024, 1, 1), date(2025, 8, 10)) == [
+        ("fueltech_intervals_monthly", date(2024, 1, 1), date(2025, 6, 1)),
+        ("fueltech_intervals_daily_mv", date(2025, 6, 1), date(2025, 8, 10)),
+    ]
+
+
+def test_partial_months_without_daily_rollup_read_base_table() -> None:
+    assert _sources(QueryType.MARKET, Interval.MONTH, {"network_id"}, date(2020, 1, 15), date(2025, 8, 1)) == [
+        ("market_summary", date(2020, 1, 15), date(2020, 2, 1)),
+        ("market_summary_monthly", date(2020, 2, 1), date(2025, 6, 1)),
+        ("market_summary", date(2025, 6, 1), date(2025, 8, 1)),
+    ]
+
+
+def test_monthly_interval_within_a_month_reads_daily_rollup() -> None:
+    assert _sources(QueryType.DATA, Interval.MONTH, {"network_id"}, date(2024, 1, 3), date(2024, 1, 20)) == [
+        ("fueltech_intervals_daily_mv", date(2024, 1, 3), date(2024, 1, 20))
+    ]
+
+    assert _sources(QueryType.MARKET, Interval.MONTH, {"network_id"}, date(2024, 1, 3), date(2024, 1, 20)) == [
+        ("market_summary", date(2024, 1, 3), date(2024, 1, 20))
+    ]
+
+
+def test_week_interval_does_not_read_monthly_rollup() -> None:
+    assert _sources(QueryType.DATA, Interval.WEEK, {"network_id"}, date(2024, 1, 1), date(2024, 6, 1)) == [
+        ("fueltech_intervals_daily_mv", date(2024, 1, 1), date(2024, 6, 1))
+    ]
+
+
+def test_rollups_are_not_routed_to_before_backfill(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "clickhouse_rollup_routing", False)
+
+    assert _sources(QueryType.DATA, Interval.YEAR, {"network_id", "renewable"}, date(2000, 1, 1), date(2025, 1, 1)) == [
+        ("unit_intervals_daily_mv", date(2000, 1, 1), date(2025, 1, 1))
+    ]
+
+    assert _sources(QueryType.DATA, Interval.DAY, {"network_id", "fueltech_id"}, date(2024, 1, 1), date(2024, 2, 1)) == [
+        ("unit_intervals_daily_mv", date(2024, 1, 1), date(2024, 2, 1))
+    ]
+
+    assert _sources(QueryType.MARKET, Interval.YEAR, {"network_id"}, date(2024, 1, 1), date(2024, 2, 1)) == [
+        ("market_summary", date(2024, 1, 1), date(2024, 2, 1))
+    ]
+
+
+def test_timeseries_query_union_of_rollups() -> None:
+    query, params, column_names = get_timeseries_query(
+        query_type=QueryType.DATA,
+        network=NetworkNEM,
+        metrics=[DataMetric.ENERGY],
+        interval=Interval.MONTH,
+        date_start=datetime(2020, 1, 15),
+        date_end=datetime(2024, 3, 10, 12, 0),
+        primary_grouping=PrimaryGrouping.NETWORK_REGION,
+        secondary_groupings=[SecondaryGrouping.FUELTECH_GROUP],
+    )
+
+    assert "UNION ALL" in query
+    assert "FROM fueltech_intervals_monthly " in query
+    assert query.count("FROM fueltech_intervals_daily_mv") == 2
+    assert params["date_start_1"] == date(2020, 2, 1)
+    assert params["date_end_1"] == date(2024, 3, 1)
+    assert column_names == ["interval", "network", "network_region", "fueltech_group", "energy"]
+
+
+def test_market_rollup_weights_averages_by_interval() -> None:
+    query, _, column_names = get_timeseries_query(
+        query_type=QueryType.MARKET,
+        network=NetworkNEM,
+        metrics=[MarketMetric.PRICE, MarketMetric.DEMAND_ENERGY],
+        interval=Interval.MONTH,
+        date_start=datetime(2024, 1, 15),
+        date_end=datetime(2024, 6, 1),
+    )
+
+    assert "FROM market_summary_monthly " in query
+    assert "sum(price_sum) / sum(price_count) as price" in query
+
+    # the partial month is read from the base table as the rollup columns
+    assert "SELECT toDate(interval) as date, network_id, price as price_sum, toUInt64(price IS NOT NULL) as price_count" in query
+    assert "sum(demand_energy) as demand_energy" in query
+    assert column_names == ["interval", "network", "price", "demand_energy"]
+
+
+class _RecordingClient:
+    def __init__(self) -> None:
+        self.executed: list[dict | None] = []
+        self.queries: list[str] = []
+
+    def execute(self, query: str, params: dict | None = None) -> None:
+        self.executed.append(params)
+        self.queries.append(query)
+
+
+def test_backfill_materialized_views_chunks_on_month_boundaries() -> None:
+    client = _RecordingClient()
+
+    backfill_materialized_views(
+        client,  # type: ignore
+        [UNIT_INTERVALS_DAILY_VIEW],
+        start=datetime(2024, 1, 15),
+        end=datetime(2024, 3, 10),
+    )
+
+    assert [(i["start"], i["end"]) for i in client.executed] == [  # type: ignore
+        (datetime(2024, 1, 1), datetime(2024, 1, 31, 23, 59, 59)),
+        (datetime(2024, 2, 1), datetime(2024, 2, 29, 23, 59, 59)),
+        (datetime(2024, 3, 1), datetime(2024, 3, 10)),
+    ]
+
+
+def test_rebuild_rollup_months_replaces_whole_months(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(clickhouse_views, "_current_month_start", lambda: datetime(2024, 3, 1))
+    client = _RecordingClient()
+
+    num_months = rebuild_rollup_months(
+        client,  # type: ignore
+        [MARKET_SUMMARY_MONTHLY_ROLLUP],
+        start=datetime(2024, 1, 31, 23, 50),
+        end=datetime(2024, 2, 1, 0, 5),
+    )
+
+    # each month is built into a staging table and swapped in whole
+    assert num_months == 2
+    assert client.queries[:2] == [
+        "CREATE TABLE IF NOT EXISTS market_summary_monthly_staging AS market_summary_monthly",
+        "TRUNCATE TABLE market_summary_monthly_staging",
+    ]
+    assert client.queries[2].startswith("INSERT INTO market_summary_monthly_staging")
+    assert client.executed[2] == {"start": datetime(2024, 1, 1), "end": datetime(2024, 2, 1)}
+    assert client.queries[3] == "ALTER TABLE market_summary_monthly REPLACE PARTITION 202401 FROM market_summary_monthly_staging"
+    assert client.queries[7] == "ALTER TABLE market_summary_monthly REPLACE PARTITION 202402 FROM market_summary_monthly_staging"
+
+
+def test_rebuild_rollup_months_skips_open_month(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(clickhouse_views, "_current_month_start", lambda: datetime(2024, 2, 1))
+    client = _RecordingClient()
+
+    num_months = rebuild_rollup_months(
+        client,  # type: ignore
+        [MARKET_SUMMARY_MONTHLY_ROLLUP],
+        start=datetime(2024, 1, 31, 23, 50),
+        end=datetime(2024, 2, 1, 0, 5),
+    )
+
+    assert num_months == 1
+    assert not any("202402" in i for i in client.queries)
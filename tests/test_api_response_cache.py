@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+import pytest
+
+from opennem.aggregates.watermark import WATERMARK_VERSION_HISTORICAL, WATERMARK_VERSION_LIVE, get_network_day_start
+from opennem.api import cache
+from opennem.api.cache import ResponseCache, get_response_cache_key, get_response_cache_tier
+from opennem.api.queries import QueryType
+from opennem.schema.network import NetworkNEM
+
+TEST_QUERY = """
+    SELECT interval, sum(energy)
+    FROM unit_intervals
+    WHERE network_id IN %(network)s
+"""
+
+
+class _StubRedis:
+    """In memory stand in for the watermark redis pool"""
+
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+        self.versions = (1, 1)
+
+    async def get(self, key: str) -> bytes | None:
+        return self.store.get(key)
+
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        self.store[key] = value
+
+
+@pytest.fixture
+def stub_redis(monkeypatch: pytest.MonkeyPatch) -> _StubRedis:
+    redis = _StubRedis()
+
+    async def _get_watermark_redis() -> _StubRedis:
+        return redis
+
+    async def _get_watermark_versions(watermark: str) -> tuple[int, int]:
+        return redis.versions
+
+    monkeypatch.setattr(cache, "get_watermark_redis", _get_watermark_redis)
+    monkeypatch.setattr(cache, "get_watermark_versions", _get_watermark_versions)
+
+    return redis
+
+
+def _builder(content: bytes, calls: list[int]):
+    async def _build() -> bytes:
+        calls.append(1)
+        return content
+
+    return _build
+
+
+def test_response_cache_key_normalises_query() -> None:
+    params = {"network": ["NEM"], "date_start": "2024-01-01", "date_end": "2024-01-02"}
+    reordered = {"date_end": "2024-01-02", "network": ["NEM"], "date_start": "2024-01-01"}
+
+    assert get_response_cache_key(QueryType.DATA, TEST_QUERY, params) == get_response_cache_key(
+        QueryType.DATA, " ".join(TEST_QUERY.split()), reordered
+    )
+    assert get_response_cache_key(QueryType.DATA, TEST_QUERY, params) != get_response_cache_key(
+        QueryType.FACILITY, TEST_QUERY, params
+    )
+
+
+def test_response_cache_tier() -> None:
+    day_start = get_network_day_start(NetworkNEM)
+
+    assert get_response_cache_tier(NetworkNEM, day_start - timedelta(days=1)) == WATERMARK_VERSION_HISTORICAL
+    assert get_response_cache_tier(NetworkNEM, day_start + timedelta(minutes=5)) == WATERMARK_VERSION_LIVE
+
+
+@pytest.mark.asyncio
+async def test_response_cache_hits_and_invalidates(stub_redis: _StubRedis) -> None:
+    response_cache = ResponseCache(l1_bytes=1024)
+    date_end = get_network_day_start(NetworkNEM) + timedelta(hours=1)
+    calls: list[int] = []
+    build = _builder(b'{"data": []}', calls)
+
+    assert await response_cache.get_or_build(QueryType.DATA, NetworkNEM, date_end, TEST_QUERY, {}, build) == (
+        b'{"data": []}',
+        "miss",
+    )
+    assert (await response_cache.get_or_build(QueryType.DATA, NetworkNEM, date_end, TEST_QUERY, {}, build))[1] == "hit_l1"
+
+    # another process with an empty l1 is served from redis
+    other_cache = ResponseCache(l1_bytes=1024)
+    assert (await other_cache.get_or_build(QueryType.DATA, NetworkNEM, date_end, TEST_QUERY, {}, build))[1] == "hit_l2"
+
+    # an aggregate run moves the live version and the entry is rebuilt
+    stub_redis.versions = (2, 1)
+    assert (await response_cache.get_or_build(QueryType.DATA, NetworkNEM, date_end, TEST_QUERY, {}, build))[1] == "miss"
+
+    assert len(calls) == 2
+    assert response_cache.stats.hits_l1 == 1
+    assert response_cache.stats.misses == 2
+    assert response_cache.stats.bytes_served == len(b'{"data": []}')
+
+
+@pytest.mark.asyncio
+async def test_response_cache_historical_survives_live_updates(stub_redis: _StubRedis) -> None:
+    response_cache = ResponseCache(l1_bytes=1024)
+    date_end = get_network_day_start(NetworkNEM) - timedelta(days=1)
+    calls: list[int] = []
+    build = _builder(b"{}", calls)
+
+    await response_cache.get_or_build(QueryType.MARKET, NetworkNEM, date_end, TEST_QUERY, {}, build)
+
+    stub_redis.versions = (5, 1)
+    assert (await response_cache.get_or_build(QueryType.MARKET, NetworkNEM, date_end, TEST_QUERY, {}, build))[1] == "hit_l1"
+
+    stub_redis.versions = (5, 2)
+    assert (await response_cache.get_or_build(QueryType.MARKET, NetworkNEM, date_end, TEST_QUERY, {}, build))[1] == "miss"
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_response_cache_bypassed_when_redis_unavailable(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def _get_watermark_versions(watermark: str) -> tuple[int, int]:
+        raise ConnectionError("redis unavailable")
+
+    monkeypatch.setattr(cache, "get_watermark_versions", _get_watermark_versions)
+
+    response_cache = ResponseCache(l1_bytes=1024)
+    date_end = get_network_day_start(NetworkNEM)
+    calls: list[int] = []
+    build = _builder(b"{}", calls)
+
+    for _ in range(2):
+        assert (await response_cache.get_or_build(QueryType.DATA, NetworkNEM, date_end, TEST_QUERY, {}, build))[1] == "bypass"
+
+    assert len(calls) == 2
+    assert response_cache.stats.bypassed == 2
@@ -0,0 +1,100 @@
+from datetime import date, datetime, timedelta
+
+from opennem.api.timeseries import format_timeseries_response, format_timeseries_response_columnar
+from opennem.core.grouping import PrimaryGrouping, SecondaryGrouping
+from opennem.core.metric import Metric
+from opennem.core.time_interval import Interval
+from opennem.schema.network import NetworkNEM
+
+TEST_INTERVAL = datetime(2024, 1, 1, 10, 0)
+
+
+def _build_columns() -> dict[str, list]:
+    columns: dict[str, list] = {"interval": [], "network_region": [], "fueltech_group": [], "renewable": [], "energy": []}
+
+    # intervals out of order to check each series is sorted
+    for interval_number in [2, 0, 1]:
+        for region, fueltech_group, energy in [("NSW1", "coal", 1234.567891), ("QLD1", "wind", None), ("NSW1", "wind", 0.0)]:
+            columns["interval"].append(TEST_INTERVAL + timedelta(minutes=5 * interval_number))
+            columns["network_region"].append(region)
+            columns["fueltech_group"].append(fueltech_group)
+            columns["renewable"].append(fueltech_group == "wind")
+            columns["energy"].append(energy)
+
+    return columns
+
+
+def test_format_timeseries_response_columnar_groups() -> None:
+    timeseries = format_timeseries_response_columnar(
+        network="NEM",
+        metrics=[Metric.ENERGY],
+        interval=Interval.INTERVAL,
+        primary_grouping=PrimaryGrouping.NETWORK_REGION,
+        secondary_groupings=[SecondaryGrouping.FUELTECH_GROUP, SecondaryGrouping.RENEWABLE],
+        columns=_build_columns(),
+    )
+
+    assert len(timeseries) == 1
+
+    results = timeseries[0].results
+
+    assert [i.name for i in results] == ["energy_NSW1|coal|False", "energy_QLD1|wind|True", "energy_NSW1|wind|True"]
+    assert results[0].columns == {"region": "NSW1", "fueltech_group": "coal", "renewable": False}
+
+    intervals = [i[0] for i in results[0].data]
+    assert intervals == sorted(intervals)
+    assert intervals[0].utcoffset() == NetworkNEM.get_fixed_offset().utcoffset(None)
+    assert intervals[0].replace(tzinfo=None) == TEST_INTERVAL
+
+    # values are rounded to 8 significant figures
+    assert results[0].data[0][1] == 1234.5679
+    assert results[1].data[0][1] is None
+    assert results[2].data[0][1] == 0.0
+
+
+def test_format_timeseries_response_rows_match_columnar() -> None:
+    columns = _build_columns()
+    rows = [dict(zip(columns.keys(), row, strict=True)) for row in zip(*columns.values(), strict=True)]
+
+    kwargs = {
+        "network": "NEM",
+        "metrics": [Metric.ENERGY],
+        "interval": Interval.INTERVAL,
+        "primary_grouping": PrimaryGrouping.NETWORK_REGION,
+        "secondary_groupings": [SecondaryGrouping.FUELTECH_GROUP],
+    }
+
+    from_rows = format_timeseries_response(results=rows, **kwargs)
+    from_columns = format_timeseries_response_columnar(columns=columns, **kwargs)
+
+    assert from_rows[0].model_dump_json() == from_columns[0].model_dump_json()
+
+
+def test_format_timeseries_response_dates() -> None:
+    timeseries = format_timeseries_response_columnar(
+        network="NEM",
+        metrics=[Metric.ENERGY],
+        interval=Interval.DAY,
+        primary_grouping=PrimaryGrouping.NETWORK,
+        secondary_groupings=None,
+        columns={"interval": [date(2024, 1, 2), date(2024, 1, 1)], "energy": [2.0, 1.0]},
+    )
+
+    result = timeseries[0].results[0]
+
+    assert result.name == "energy_total"
+    assert [i[1] for i in result.data] == [1.0, 2.0]
+    assert result.data[0][0].isoformat() == "2024-01-01T00:00:00+10:00"
+
+
+def test_format_timeseries_response_empty_results() -> None:
+    params = {
+        "network": "NEM",
+        "metrics": [Metric.ENERGY],
+        "interval": Interval.DAY,
+        "primary_grouping": PrimaryGrouping.NETWORK_REGION,
+        "secondary_groupings": None,
+    }
+
+    assert format_timeseries_response(results=[], **params) == []
+    assert format_timeseries_response_columnar(columns={"interval": [], "network_region": [], "energy": []}, **params) == []
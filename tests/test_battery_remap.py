@@ -0,0 +1,36 @@
+import pandas as pd
+
+from opennem.core.battery import BatteryUnitMap, BatteryUnitRemapper
+
+_TEST_UNIT_MAP = {
+    "HPR1": BatteryUnitMap(unit="HPR1", charge_unit="HPRL1", discharge_unit="HPRG1"),
+    "COLLIE_ESR1": BatteryUnitMap(unit="COLLIE_ESR1", charge_unit="COLLIE_ESRL1", discharge_unit="COLLIE_ESRG1"),
+}
+
+
+def test_battery_remapper_splits_bidirectional_units() -> None:
+    remapper = BatteryUnitRemapper(_TEST_UNIT_MAP)
+
+    codes, generated = remapper.remap(
+        pd.Series(["HPR1", "HPR1", "BAYSW1", "COLLIE_ESR1", "HPRL1"]),
+        pd.Series([-10.5, 20.0, -1.0, 0.0, -3.0]),
+    )
+
+    assert codes.to_list() == ["HPRL1", "HPRG1", "BAYSW1", "COLLIE_ESRG1", "HPRL1"]
+    assert generated.to_list() == [10.5, 20.0, -1.0, 0.0, 3.0]
+
+
+def test_battery_remapper_accepts_sequences() -> None:
+    remapper = BatteryUnitRemapper(_TEST_UNIT_MAP)
+
+    codes, generated = remapper.remap(["COLLIE_ESR1", "OTHER"], [-2, 4])
+
+    assert codes.to_list() == ["COLLIE_ESRL1", "OTHER"]
+    assert generated.to_list() == [2, 4]
+
+
+def test_battery_remapper_empty_map() -> None:
+    codes, generated = BatteryUnitRemapper({}).remap(["HPR1"], [-1.0])
+
+    assert codes.to_list() == ["HPR1"]
+    assert generated.to_list() == [-1.0]
@@ -0,0 +1,90 @@
+from datetime import UTC, date, datetime, timedelta, timezone
+
+import pandas as pd
+
+from opennem.db.bulk_insert_csv import BulkInsertTableMeta, build_insert_query, convert_records_for_copy
+from opennem.db.models.opennem import FacilityScada
+
+_FACILITY_SCADA_META = BulkInsertTableMeta(
+    columns=["network_id", "interval", "facility_code", "generated", "is_forecast", "energy_quality_flag"],
+    column_types={
+        "network_id": "text",
+        "interval": "timestamp without time zone",
+        "facility_code": "text",
+        "generated": "numeric",
+        "is_forecast": "boolean",
+        "energy_quality_flag": "integer",
+    },
+)
+
+
+def test_convert_records_for_copy_column_order_and_types() -> None:
+    records = pd.DataFrame.from_records(
+        [
+            {"facility_code": "BAYSW1", "interval": "2021/09/02 12:55:00", "generated": "22.5", "network_id": "NEM"},
+            {"facility_code": "ER01", "interval": datetime(2021, 9, 2, 13, 0), "generated": None, "network_id": "NEM"},
+        ]
+    )
+
+    rows = convert_records_for_copy(records, _FACILITY_SCADA_META)
+
+    assert rows == [
+        ("NEM", datetime(2021, 9, 2, 12, 55), "BAYSW1", 22.5, None, None),
+        ("NEM", datetime(2021, 9, 2, 13, 0), "ER01", None, None, None),
+    ]
+    assert isinstance(rows[0][3], float)
+
+
+def test_convert_records_for_copy_booleans_and_integers() -> None:
+    records = pd.DataFrame(
+        {
+            "network_id": ["NEM", "NEM", "NEM"],
+            "is_forecast": ["True", "f", None],
+            "energy_quality_flag": ["2", 0, None],
+        }
+    )
+
+    rows = convert_records_for_copy(records, _FACILITY_SCADA_META)
+
+    assert [r[4] for r in rows] == [True, False, None]
+    assert [r[5] for r in rows] == [2, 0, None]
+    assert isinstance(rows[0][5], int)
+
+
+def test_convert_records_for_copy_datetimes() -> None:
+    table_meta = BulkInsertTableMeta(
+        columns=["interval", "last_updated", "trading_day"],
+        column_types={
+            "interval": "timestamp without time zone",
+            "last_updated": "timestamp with time zone",
+            "trading_day": "date",
+        },
+    )
+    aest = timezone(timedelta(hours=10))
+    records = pd.DataFrame(
+        {
+            "interval": [datetime(2024, 1, 1, 10, 0), None, "2024-01-01T10:10:00"],
+            "last_updated": [datetime(2024, 1, 1, 10, 0, tzinfo=aest), None, datetime(2024, 1, 1, 0, 10)],
+            "trading_day": [date(2024, 1, 1), None, "2024-01-02"],
+        }
+    )
+
+    rows = convert_records_for_copy(records, table_meta)
+
+    assert rows == [
+        (datetime(2024, 1, 1, 10, 0), datetime(2024, 1, 1, 0, 0, tzinfo=UTC), date(2024, 1, 1)),
+        (None, None, None),
+        (datetime(2024, 1, 1, 10, 10), datetime(2024, 1, 1, 0, 10, tzinfo=UTC), date(2024, 1, 2)),
+    ]
+
+    # binary COPY needs datetime and date values rather than their text
+    assert isinstance(rows[0][0], datetime) and rows[0][0].tzinfo is None
+    assert isinstance(rows[0][1], datetime) and rows[0][1].utcoffset() == timedelta(0)
+    assert type(rows[2][2]) is date
+
+
+def test_build_insert_query_unique_staging_tables() -> None:
+    tmp_table_names = {build_insert_query(FacilityScada, ["generated"])[0] for _ in range(100)}
+
+    assert len(tmp_table_names) == 100
+    assert all(len(name) <= 63 for name in tmp_table_names)
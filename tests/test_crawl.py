@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import pytest
+
+from opennem import crawl
+from opennem.crawl import _apply_crawler_meta, get_crawl_set
+from opennem.crawlers.bom import BOMCapitals
+
+TEST_SERVER_LATEST = "2024-01-01T10:00:00+10:00"
+
+
+def test_apply_crawler_meta() -> None:
+    crawler = _apply_crawler_meta(
+        BOMCapitals, {"version": "1", "server_latest": TEST_SERVER_LATEST, "latest_processed": TEST_SERVER_LATEST}
+    )
+
+    assert crawler.version == "2"
+    assert crawler.server_latest == datetime.fromisoformat(TEST_SERVER_LATEST)
+    assert crawler.last_crawled is None
+
+    # the definition the crawler was copied from is unchanged
+    assert BOMCapitals.server_latest is None
+    assert _apply_crawler_meta(BOMCapitals, None) is BOMCapitals
+
+
+def test_apply_crawler_meta_invalid() -> None:
+    with pytest.raises(Exception, match="Crawler initiation error"):
+        _apply_crawler_meta(BOMCapitals, {"last_crawled": "not a date"})
+
+
+@pytest.mark.asyncio
+async def test_get_crawl_set_refreshes_changed_meta(monkeypatch: pytest.MonkeyPatch) -> None:
+    crawler_meta_cache: dict[str, dict] = {}
+
+    async def get_crawler_meta_cache() -> dict[str, dict]:
+        return crawler_meta_cache
+
+    monkeypatch.setattr(crawl, "get_crawler_meta_cache", get_crawler_meta_cache)
+    monkeypatch.setattr(crawl, "_CRAWLER_SET", None)
+    monkeypatch.setattr(crawl, "_CRAWLER_SET_META", {})
+
+    crawler_set = await get_crawl_set()
+    assert crawler_set.get_crawler(BOMCapitals.name).last_crawled is None
+
+    crawler_meta_cache[BOMCapitals.name] = {"last_crawled": TEST_SERVER_LATEST}
+
+    # the set is built once and only crawlers with changed metadata are replaced
+    unchanged = crawler_set.get_crawler("au.wem.live.balancing")
+    assert await get_crawl_set() is crawler_set
+    assert crawler_set.get_crawler(BOMCapitals.name).last_crawled == datetime.fromisoformat(TEST_SERVER_LATEST)
+    assert crawler_set.get_crawler("au.wem.live.balancing") is unchanged
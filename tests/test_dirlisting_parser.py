@@ -3,7 +3,17 @@ from pathlib import Path
 
 import pytest
 
-from opennem.core.parsers.dirlisting import DirlistingEntry, parse_dirlisting_datetime, parse_dirlisting_line
+from opennem.core.parsers import dirlisting
+from opennem.core.parsers.dirlisting import (
+    DirlistingEntry,
+    _get_pre_content,
+    _parse_dirlisting_lines,
+    get_dirlisting,
+    get_dirlisting_changes,
+    parse_dirlisting_datetime,
+    parse_dirlisting_line,
+    scan_dirlisting,
+)
 
 from .conftest import PATH_TESTS_FIXTURES
 
@@ -68,3 +78,84 @@ def test_dirlisting_line(line: str, result: dict[str, str | datetime | int]) ->
     dirlisting_line_result = parse_dirlisting_line(line)
 
     assert result_model == dirlisting_line_result, "Models match for dirlisting line"
+
+
+DIRLISTING_URL = "http://nemweb.com.au/Reports/Current/DispatchIS_Reports/"
+
+
+def test_scan_dirlisting_matches_line_parser() -> None:
+    content = load_fixture()
+    pre_content = _get_pre_content(content)
+
+    scanned = list(scan_dirlisting(content, DIRLISTING_URL).values())
+    parsed = list(_parse_dirlisting_lines(pre_content, DIRLISTING_URL).values())
+
+    assert len(scanned) == len(parsed) > 500
+    assert scanned == parsed
+
+
+def test_scan_dirlisting_reuses_previous_entries() -> None:
+    content = load_fixture()
+    previous_entries = scan_dirlisting(content, DIRLISTING_URL)
+
+    entries = scan_dirlisting(content, DIRLISTING_URL, previous_entries)
+
+    assert all(entries[line] is entry for line, entry in previous_entries.items())
+
+
+class _Response:
+    def __init__(self, text: str, status_code: int = 200, headers: dict | None = None) -> None:
+        self.text = text
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+@pytest.mark.asyncio
+async def test_dirlisting_conditional_get_and_changes(monkeypatch: pytest.MonkeyPatch) -> None:
+    content = load_fixture()
+    lines = content.split("<br>")
+    # the first listing is missing the last two entries
+    responses = [
+        _Response("<br>".join(lines[:-3] + lines[-1:]), headers={"etag": '"v1"'}),
+        _Response(content, headers={"etag": '"v2"'}),
+        _Response("", status_code=304),
+        _Response("", status_code=304),
+    ]
+    requests: list[dict] = []
+
+    async def get(url: str, headers: dict) -> _Response:
+        requests.append(headers)
+        return responses.pop(0)
+
+    monkeypatch.setattr(dirlisting.http, "get", get)
+    dirlisting._dirlisting_cache.clear()
+    dirlisting._dirlisting_seen.clear()
+
+    first = await get_dirlisting_changes(DIRLISTING_URL, consumer="crawler")
+
+    # a plain fetch of the new listing doesn't hide its changes from the consumer
+    listing = await get_dirlisting(DIRLISTING_URL)
+    changes = await get_dirlisting_changes(DIRLISTING_URL, consumer="crawler")
+    unchanged = await get_dirlisting_changes(DIRLISTING_URL, consumer="crawler")
+
+    assert requests == [{}, {"If-None-Match": '"v1"'}, {"If-None-Match": '"v2"'}, {"If-None-Match": '"v2"'}]
+    assert [str(i.filename) for i in changes.entries] == [str(i.filename) for i in listing.entries[-2:]]
+    assert first.count + changes.count == listing.count
+    assert unchanged.count == 0
+
+
+@pytest.mark.asyncio
+async def test_dirlisting_changes_are_kept_per_consumer(monkeypatch: pytest.MonkeyPatch) -> None:
+    content = load_fixture()
+
+    async def get(url: str, headers: dict) -> _Response:
+        return _Response(content)
+
+    monkeypatch.setattr(dirlisting.http, "get", get)
+    dirlisting._dirlisting_cache.clear()
+    dirlisting._dirlisting_seen.clear()
+
+    first = await get_dirlisting_changes(DIRLISTING_URL, consumer="dispatch_is")
+
+    assert (await get_dirlisting_changes(DIRLISTING_URL, consumer="dispatch_is")).count == 0
+    assert (await get_dirlisting_changes(DIRLISTING_URL, consumer="dispatch_scada")).count == first.count
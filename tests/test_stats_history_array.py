@@ -0,0 +1,60 @@
+import json
+from datetime import datetime, timedelta
+
+from opennem.api.export.incremental import merge_history
+from opennem.api.stats.controllers import stats_factory
+from opennem.api.stats.schema import DataQueryResult, OpennemDataHistory, OpennemDataHistoryArray, OpennemDataSet
+from opennem.api.time import human_to_interval
+from opennem.core.units import get_unit
+from opennem.schema.network import NetworkNEM
+
+START = datetime.fromisoformat("2024-01-01T00:00:00+10:00")
+
+
+def _energy_set(history_array: bool = False) -> OpennemDataSet:
+    stats = [
+        DataQueryResult(interval=START.replace(tzinfo=None) + timedelta(days=day), result=value, group_by=fueltech)
+        for fueltech in ["coal_black", "solar_utility"]
+        for day, value in enumerate([1.23456, None, 98765.4, 1234567.891, 2.00005, 0])
+    ]
+
+    return stats_factory(
+        stats,
+        code="nsw1",
+        network=NetworkNEM,
+        interval=human_to_interval("1d"),
+        units=get_unit("energy_giga"),
+        region="NSW1",
+        fueltech_group=True,
+        cast_nulls=False,
+        history_array=history_array,
+    )
+
+
+def test_stats_factory_history_array() -> None:
+    result = _energy_set(history_array=True)
+
+    assert all(isinstance(i.history, OpennemDataHistoryArray) for i in result.data)
+
+    # array and list backed histories serialise the same
+    assert json.loads(result.model_dump_json()) == json.loads(_energy_set().model_dump_json())
+
+
+def test_history_array_round_trips_to_list_history() -> None:
+    result = OpennemDataSet.model_validate_json(_energy_set(history_array=True).model_dump_json())
+
+    assert isinstance(result.data[0].history, OpennemDataHistory)
+    assert result.data[0].history.data == _energy_set().data[0].history.model_dump(mode="json")["data"]
+
+
+def test_merge_history_array_update() -> None:
+    existing = OpennemDataHistory(start=START, last=START + timedelta(days=2), interval="1d", data=[1, None, 3])
+    update = OpennemDataHistoryArray(
+        start=START + timedelta(days=2), last=START + timedelta(days=3), interval="1d", data=[30, 40]
+    )
+
+    merged = merge_history(existing, update)
+
+    assert isinstance(merged, OpennemDataHistoryArray)
+    assert merged == OpennemDataHistoryArray(start=START, last=START + timedelta(days=3), interval="1d", data=[1, None, 30, 40])
+    assert merged.to_history().data == [1, None, 30, 40]